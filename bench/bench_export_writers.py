@@ -0,0 +1,49 @@
+# 各导出格式/压缩方式的吞吐对比
+# 用法: python bench/bench_export_writers.py [行数]
+import datetime
+import decimal
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from db.export_writers import EXPORT_FORMATS, COMPRESSIONS, open_export_writer, export_path_suffix
+
+HEADERS = ['id', 'name', 'amount', 'created_at', 'note']
+
+
+def make_rows(n):
+    base = datetime.datetime(2024, 1, 1)
+    return [
+        (i, f'user_{i % 5000}', decimal.Decimal(i) / 100, base + datetime.timedelta(seconds=i),
+         None if i % 4 else f"line with 'quote' #{i}")
+        for i in range(n)
+    ]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rows = make_rows(n)
+    batch = 5000
+    print(f'rows={n}')
+    print(f'{"format":<8}{"compression":<12}{"rows/s":>12}{"MB/s(raw)":>12}{"size MB":>10}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in EXPORT_FORMATS:
+            raw_size = None
+            for compression in COMPRESSIONS:
+                path = os.path.join(tmp, 'out' + export_path_suffix(fmt, compression))
+                t0 = time.perf_counter()
+                writer = open_export_writer(path, fmt, HEADERS, compression, table_name='bench')
+                for start in range(0, n, batch):
+                    writer.write_rows(rows[start:start + batch])
+                writer.close()
+                elapsed = time.perf_counter() - t0
+                size = os.path.getsize(path)
+                if raw_size is None:
+                    raw_size = size
+                print(f'{fmt:<8}{compression or "-":<12}{n / elapsed:>12,.0f}{raw_size / elapsed / 1e6:>12.1f}{size / 1e6:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
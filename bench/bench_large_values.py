@@ -0,0 +1,64 @@
+# 含大字段（TEXT/BLOB）的表翻页：SELECT * 与只取前缀和长度的对比，以及分段保存单个大值
+# 用法: python bench/bench_large_values.py [行数] [每个值的KB数]
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from db.table_pager import TablePager
+from db.large_values import large_columns, save_value
+from db.sqlite_pool import close_pools
+
+PAGE_SIZE = 50
+
+
+def make_db(path, n, kb):
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE docs (id INTEGER PRIMARY KEY, title VARCHAR(50), body TEXT, payload BLOB)')
+    body = 'x' * (kb * 1024)
+    payload = os.urandom(kb * 1024)
+    db.executemany('INSERT INTO docs VALUES (?, ?, ?, ?)', ((i, f'doc_{i}', body, payload) for i in range(n)))
+    db.commit()
+    db.close()
+
+
+def bench_pages(pager, pages):
+    started = time.perf_counter()
+    size = 0
+    for page in range(1, pages + 1):
+        rows, _ = pager(page, PAGE_SIZE)
+        size += sum(len(v) for row in rows for v in row if isinstance(v, (str, bytes)))
+    return (time.perf_counter() - started) * 1000 / pages, size / pages
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    kb = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        make_db(path, n, kb)
+        conn = {'type': 'SQLite', 'db_path': path}
+        headers = ['id', 'title', 'body', 'payload']
+        db = sqlite3.connect(path)
+        schema = [dict(zip([d[0] for d in db.execute("PRAGMA table_info('docs')").description], row))
+                  for row in db.execute("PRAGMA table_info('docs')").fetchall()]
+        db.close()
+        large = large_columns(schema, 'sqlite')
+        pages = max(1, min(20, n // PAGE_SIZE))
+        print(f'{n} 行，每行 TEXT/BLOB 各 {kb} KB，每页 {PAGE_SIZE} 行，大字段: {large}')
+        for title, pager in (('SELECT *', TablePager(conn, 'docs', ['id'])),
+                             ('前缀 + 长度', TablePager(conn, 'docs', ['id'], columns=headers, large_columns=large))):
+            pager(1, PAGE_SIZE)  # 预热
+            ms, size = bench_pages(pager, pages)
+            print(f'{title:<10} 每页 {ms:8.1f} ms，传到客户端 {size / 1024 / 1024:8.2f} MB')
+        out = os.path.join(tmp, 'value.bin')
+        started = time.perf_counter()
+        written = save_value(conn, 'docs', 'payload', large['payload'], {'id': 0}, out, chunk_size=64 * 1024)
+        print(f'分段保存单个 BLOB: {written / 1024:.0f} KB，{(time.perf_counter() - started) * 1000:.1f} ms')
+        close_pools()
+
+
+if __name__ == '__main__':
+    main()
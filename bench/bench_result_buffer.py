@@ -0,0 +1,61 @@
+# 对比 list[tuple] 与 ColumnarResult 在100万行结果上的内存占用
+# 用法: python bench/bench_result_buffer.py [行数]
+import datetime
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from db.result_buffer import ColumnarResult
+
+HEADERS = ['id', 'price', 'name', 'created_at', 'parent_id']
+
+
+def make_rows(n):
+    base = datetime.datetime(2024, 1, 1)
+    for i in range(n):
+        yield (i, i * 0.5, f'user_{i % 5000}', base + datetime.timedelta(seconds=i), None if i % 3 else i // 3)
+
+
+def measure(build):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current, elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows, tuple_bytes, tuple_time = measure(lambda: list(make_rows(n)))
+    del rows
+
+    def build_columnar():
+        result = ColumnarResult(HEADERS)
+        batch = []
+        for row in make_rows(n):
+            batch.append(row)
+            if len(batch) == 10000:
+                result.append_rows(batch)
+                batch = []
+        result.append_rows(batch)
+        return result
+    result, col_bytes, col_time = measure(build_columnar)
+
+    t0 = time.perf_counter()
+    for r in range(0, n, max(1, n // 1000)):
+        result.slice(r, r + 50).row(0)
+    slice_us = (time.perf_counter() - t0) / 1000 * 1e6
+
+    print(f'rows={n} cells={n * len(HEADERS)}  (耗时在tracemalloc开启下测得)')
+    print(f'list[tuple]     : {tuple_bytes / 1e6:8.1f} MB  build {tuple_time:.2f}s')
+    print(f'ColumnarResult  : {col_bytes / 1e6:8.1f} MB  build {col_time:.2f}s  (nbytes={result.nbytes / 1e6:.1f} MB)')
+    print(f'saving          : {(1 - col_bytes / tuple_bytes) * 100:.1f}%  ({(tuple_bytes - col_bytes) / (n * len(HEADERS)):.1f} bytes/cell)')
+    print(f'slice+row       : {slice_us:.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# 在100万行 ColumnarResult 上测量本地排序/筛选耗时
+# 用法: python bench/bench_result_view.py [行数]
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from db.result_buffer import ColumnarResult
+from db.result_view import ResultView
+
+HEADERS = ['id', 'price', 'name', 'created_at', 'parent_id']
+
+
+def make_rows(n):
+    rnd = random.Random(42)
+    base = datetime.datetime(2024, 1, 1)
+    for i in range(n):
+        yield (i, rnd.random() * 1000, f'user_{rnd.randrange(50000)}', base + datetime.timedelta(seconds=rnd.randrange(10 ** 7)),
+               None if i % 3 else i // 3)
+
+
+def timed(label, func):
+    t0 = time.perf_counter()
+    result = func()
+    print(f'{label:<36}{(time.perf_counter() - t0) * 1000:>10.1f} ms')
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = list(make_rows(n))
+    result = ColumnarResult.from_rows(HEADERS, rows)
+    print(f'行数: {n}')
+    view = ResultView(result)
+    timed('排序 price (float)', lambda: view.apply(order_by=(1, 'ASC')))
+    timed('排序 created_at (datetime) 降序', lambda: view.apply(order_by=(3, 'DESC')))
+    timed('排序 parent_id (含NULL)', lambda: view.apply(order_by=(4, 'ASC')))
+    timed('排序 name (文本，首次含编码)', lambda: view.apply(order_by=(2, 'ASC')))
+    timed('排序 name (文本，已编码)', lambda: view.apply(order_by=(2, 'DESC')))
+    timed('筛选 price > 500', lambda: view.apply(filters=[(1, '>', '500')]))
+    timed('筛选 name LIKE user_1% + 排序 id', lambda: view.apply(filters=[(2, 'LIKE', 'user_1%')], order_by=(0, 'DESC')))
+    timed('对照: list.sort 按 price', lambda: sorted(range(n), key=lambda i: rows[i][1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# 测量SQL编辑器在10万行脚本上的按键延迟和粘贴耗时（含语法高亮与布局）
+# 用法: QT_QPA_PLATFORM=offscreen python bench/bench_sql_highlighter.py [行数]
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QTextCursor
+
+LINES = [
+    "INSERT INTO `orders` (`id`, `user_id`, `note`, `amount`) VALUES ({i}, {u}, 'note {i} -- not a comment', 12.50);",
+    "-- batch {i}",
+    "/* multi-line comment {i}",
+    "   still inside the comment */ UPDATE orders SET amount = amount * 1.1 WHERE id = {i};",
+    "SELECT o.id, u.name FROM orders o JOIN users u ON u.id = o.user_id WHERE o.note LIKE '%{i}%';",
+]
+# 不含块注释的脚本：中部输入的 /* 没有后续 */ 闭合，之后的每一行状态都会改变
+PLAIN_LINES = [line for line in LINES if '/*' not in line and '*/' not in line]
+
+
+def make_script(n, lines=LINES):
+    return '\n'.join(lines[i % len(lines)].format(i=i, u=i % 997) for i in range(n))
+
+
+def block_state_at(editor, number):
+    return editor.document().findBlockByNumber(number).userState()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    app = QApplication(sys.argv)
+    from ui.sql_editor import SQLPlainTextEdit
+    editor = SQLPlainTextEdit()
+    editor.resize(1000, 700)
+    editor.show()
+    script = make_script(n)
+
+    t0 = time.perf_counter()
+    cursor = editor.textCursor()
+    cursor.insertText(script)
+    app.processEvents()
+    print(f'粘贴 {n} 行: {(time.perf_counter() - t0) * 1000:.0f} ms')
+
+    # 在文档中部逐字符输入，每次按键包含高亮与重新布局
+    cursor = QTextCursor(editor.document().findBlockByNumber(n // 2))
+    cursor.movePosition(QTextCursor.EndOfBlock)
+    editor.setTextCursor(cursor)
+    editor.centerCursor()
+    app.processEvents()
+    samples = []
+    for ch in " AND amount > 100 /* x */ OR note = 'it''s'":
+        t0 = time.perf_counter()
+        editor.textCursor().insertText(ch)
+        app.processEvents()
+        samples.append((time.perf_counter() - t0) * 1000)
+    print(f'按键延迟: 中位数 {statistics.median(samples):.2f} ms, 最大 {max(samples):.2f} ms')
+
+    # 最坏情况：在没有块注释的脚本中部输入 /*，后续所有行都变为注释状态；再删除它，所有行恢复
+    editor.setPlainText(make_script(n, PLAIN_LINES))
+    app.processEvents()
+    cursor = QTextCursor(editor.document().findBlockByNumber(n // 2))
+    editor.setTextCursor(cursor)
+    editor.centerCursor()
+    app.processEvents()
+    t0 = time.perf_counter()
+    editor.textCursor().insertText('/*')
+    app.processEvents()
+    open_comment = (time.perf_counter() - t0) * 1000
+    opened = block_state_at(editor, n - 1)
+    t0 = time.perf_counter()
+    cursor = editor.textCursor()
+    cursor.movePosition(QTextCursor.Left, QTextCursor.KeepAnchor, 2)
+    cursor.removeSelectedText()
+    app.processEvents()
+    close_comment = (time.perf_counter() - t0) * 1000
+    closed = block_state_at(editor, n - 1)
+    print(f'输入未闭合注释(影响后续 {n - n // 2} 行, 末行状态 {opened}): {open_comment:.0f} ms')
+    print(f'删除该注释(末行状态恢复为 {closed}): {close_comment:.0f} ms')
+
+    t0 = time.perf_counter()
+    editor.verticalScrollBar().setValue(editor.verticalScrollBar().maximum() // 4)
+    app.processEvents()
+    print(f'滚动到新位置并补全可视区高亮: {(time.perf_counter() - t0) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# 多线程同时读写同一个 SQLite 文件：各自独立连接（原方式）与只读连接池 + 单写线程的对比
+# 用法: python bench/bench_sqlite_pool.py [行数] [秒数]
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from db.sqlite_pool import SQLitePool
+
+READERS = 4
+WRITERS = 2
+PAGE_SIZE = 100
+
+
+def make_db(path, n):
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE big (id INTEGER PRIMARY KEY, name TEXT, amount REAL)')
+    db.executemany('INSERT INTO big VALUES (?, ?, ?)', ((i, f'user_{i}', i / 100) for i in range(n)))
+    db.commit()
+    db.close()
+
+
+def run(n, seconds, read_page, write_row):
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def loop(func):
+        done = errors = 0
+        while time.perf_counter() < stop:
+            try:
+                func(random.randrange(n))
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        return done, errors
+
+    def reader():
+        done, errors = loop(read_page)
+        with lock:
+            counts['reads'] += done
+            counts['errors'] += errors
+
+    def writer():
+        done, errors = loop(write_row)
+        with lock:
+            counts['writes'] += done
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(READERS)]
+    threads += [threading.Thread(target=writer) for _ in range(WRITERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return counts
+
+
+def bench_direct(path, n, seconds):
+    # 原方式：每次操作新建连接，默认日志模式，读写互相阻塞
+    def read_page(start):
+        db = sqlite3.connect(path, timeout=1)
+        try:
+            db.execute('SELECT * FROM big WHERE id > ? ORDER BY id LIMIT ?', (start, PAGE_SIZE)).fetchall()
+        finally:
+            db.close()
+
+    def write_row(key):
+        db = sqlite3.connect(path, timeout=1)
+        try:
+            db.execute('UPDATE big SET amount = amount + 1 WHERE id = ?', (key,))
+            db.commit()
+        finally:
+            db.close()
+
+    return run(n, seconds, read_page, write_row), None
+
+
+def bench_pool(path, n, seconds, pragmas=None):
+    pool = SQLitePool(path, pragmas)
+
+    def read_page(start):
+        with pool.reader() as db:
+            db.execute('SELECT * FROM big WHERE id > ? ORDER BY id LIMIT ?', (start, PAGE_SIZE)).fetchall()
+
+    def write_row(key):
+        pool.execute('UPDATE big SET amount = amount + 1 WHERE id = ?', (key,))
+
+    counts = run(n, seconds, read_page, write_row)
+    metrics = pool.metrics()
+    pool.close()
+    return counts, metrics
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f'rows={n} seconds={seconds} readers={READERS} writers={WRITERS}')
+    print(f'{"mode":<10}{"reads/s":>10}{"writes/s":>10}{"locked":>8}{"txns":>8}{"lock wait max ms":>18}')
+    with tempfile.TemporaryDirectory() as tmp:
+        # 连接池不修改日志模式：pool 为数据库原有的 DELETE 模式，pool+wal 为“均衡”等配置下的 WAL
+        modes = (('direct', bench_direct), ('pool', bench_pool),
+                 ('pool+wal', lambda path, n, seconds: bench_pool(path, n, seconds, {'journal_mode': 'WAL'})))
+        for mode, bench in modes:
+            path = os.path.join(tmp, f'{mode.replace("+", "_")}.db')
+            make_db(path, n)
+            counts, metrics = bench(path, n, seconds)
+            txns = f"{metrics['transactions']:>8}" if metrics else f'{"-":>8}'
+            wait = f"{metrics['lock_wait_max_ms']:>18.1f}" if metrics else f'{"-":>18}'
+            print(f"{mode:<10}{counts['reads'] / seconds:>10,.0f}{counts['writes'] / seconds:>10,.0f}"
+                  f"{counts['errors']:>8}{txns}{wait}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# 各 SQLite 性能配置下导入、翻页、导出的耗时对比（每个配置使用一个新建的 .db 文件）
+# 用法: python bench/bench_sqlite_profiles.py [行数]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from db.client_factory import create_client
+from db.export_writers import open_export_writer, export_cursor
+from db.sqlite_client import PROFILES
+from db.table_pager import TablePager
+
+HEADERS = ['id', 'name', 'amount', 'created_at', 'note']
+BATCH = 5000
+PAGE_SIZE = 100
+PAGES = 50  # 连续翻页数
+
+
+def make_batch(start, n):
+    return [
+        (i, f'user_{i % 5000}', i / 100, f'2024-01-01 00:00:{i % 60:02d}',
+         None if i % 4 else f"line with 'quote' #{i}")
+        for i in range(start, start + n)
+    ]
+
+
+def bench_import(conn, n):
+    # 与界面导入 CSV 相同：每批 executemany 后提交一次
+    client = create_client(conn)
+    db = client.connect()
+    try:
+        db.execute('CREATE TABLE big (id INTEGER PRIMARY KEY, name TEXT, amount REAL, created_at TEXT, note TEXT)')
+        db.commit()
+        t0 = time.perf_counter()
+        for start in range(0, n, BATCH):
+            db.executemany('INSERT INTO big VALUES (?, ?, ?, ?, ?)', make_batch(start, min(BATCH, n - start)))
+            db.commit()
+        return time.perf_counter() - t0
+    finally:
+        client.close()
+
+
+def bench_paging(conn, n):
+    # 从第一页连续翻 PAGES 页，再跳到中间一页（OFFSET）
+    pager = TablePager(conn, 'big', ['id'])
+    t0 = time.perf_counter()
+    for page in range(1, PAGES + 1):
+        pager(page, PAGE_SIZE)
+    pager(max(1, n // PAGE_SIZE // 2), PAGE_SIZE)
+    return time.perf_counter() - t0
+
+
+def bench_export(conn, tmp):
+    client = create_client(conn)
+    path = os.path.join(tmp, 'out.csv')
+    t0 = time.perf_counter()
+    try:
+        cursor = client.stream_cursor()
+        cursor.execute('SELECT * FROM big')
+        writer = open_export_writer(path, 'csv', HEADERS)
+        try:
+            export_cursor(cursor, writer)
+        finally:
+            writer.close()
+    finally:
+        client.close()
+    return time.perf_counter() - t0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f'rows={n}')
+    print(f'{"profile":<10}{"import s":>10}{"rows/s":>12}{"paging s":>10}{"export s":>10}{"rows/s":>12}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, profile in PROFILES.items():
+            path = os.path.join(tmp, f'bench_{len(os.listdir(tmp))}.db')
+            conn = {'type': 'SQLite', 'db_path': path, 'pragmas': profile['pragmas'], 'read_only': profile['read_only']}
+            # 只读配置不能写入，用默认设置生成数据，只比较读取
+            writable = dict(conn, read_only=False) if profile['read_only'] else conn
+            import_time = bench_import(writable, n)
+            paging_time = bench_paging(conn, n)
+            export_time = bench_export(conn, tmp)
+            import_cols = f'{"-":>10}{"-":>12}' if profile['read_only'] else f'{import_time:>10.2f}{n / import_time:>12,.0f}'
+            print(f'{name:<10}{import_cols}{paging_time:>10.3f}{export_time:>10.2f}{n / export_time:>12,.0f}')
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
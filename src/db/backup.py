@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from db.client_factory import create_client, dialect_of
+from db.export_writers import open_export_writer, export_cursor, quote_ident, export_path_suffix
+
+# 整库逻辑备份。目录结构：
+#   manifest.json   表清单、DDL、行数、校验和
+#   schema.sql      全部DDL，便于人工查看
+#   data/<表名>.jsonl[.gz]
+# 数据以 JSON Lines 保存（二进制使用 {"$binary": base64}），恢复时可按列名批量写入
+MANIFEST_FILE = 'manifest.json'
+BACKUP_FORMAT_VERSION = 1
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _safe_filename(name):
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+
+
+class _MySQLSnapshot:
+    """
+    为每个工作线程准备一个处于同一一致性快照中的连接：
+    先 FLUSH TABLES WITH READ LOCK，各连接 START TRANSACTION WITH CONSISTENT SNAPSHOT 后立即解锁。
+    没有 RELOAD 权限时退化为各连接独立快照，manifest 中记录 consistent=false。
+    """
+
+    def __init__(self, conn, database, workers):
+        self.conn = conn
+        self.database = database
+        self.clients = []
+        self.pool = queue.Queue()
+        self.consistent = False
+        coordinator = create_client(conn, database=database)
+        coord_conn = coordinator.connect()
+        try:
+            with coord_conn.cursor() as cursor:
+                try:
+                    cursor.execute('FLUSH TABLES WITH READ LOCK')
+                    locked = True
+                except Exception:
+                    locked = False
+                # 先读表清单，连接数不超过表数
+                self.schema = self._read_schema(cursor)
+                for _ in range(min(workers, len(self.schema))):
+                    client = create_client(conn, database=database)
+                    c = client.connect()
+                    with c.cursor() as wc:
+                        wc.execute('SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+                        wc.execute('START TRANSACTION WITH CONSISTENT SNAPSHOT')
+                    self.clients.append(client)
+                    self.pool.put(client)
+                if locked:
+                    cursor.execute('UNLOCK TABLES')
+                self.consistent = locked
+        finally:
+            coordinator.close()
+
+    def _read_schema(self, cursor):
+        cursor.execute('SHOW FULL TABLES')
+        tables = [row[0] for row in cursor.fetchall() if row[1] == 'BASE TABLE']
+        result = []
+        for t in tables:
+            cursor.execute(f'SHOW CREATE TABLE {quote_ident(t)}')
+            result.append({'name': t, 'ddl': cursor.fetchone()[1], 'indexes': []})
+        return result
+
+    def acquire(self):
+        return self.pool.get()
+
+    def release(self, client):
+        self.pool.put(client)
+
+    def close(self):
+        for client in self.clients:
+            try:
+                client.conn.rollback()
+            except Exception:
+                pass
+            client.close()
+
+
+class _SQLiteSnapshot:
+    # 使用 SQLite 在线备份API复制出一致的快照文件，各线程从快照只读读取
+    def __init__(self, conn, workers):
+        fd, self.path = tempfile.mkstemp(prefix='dbtool_snapshot_', suffix='.db')
+        os.close(fd)
+        src = sqlite3.connect(conn['db_path'])
+        dst = sqlite3.connect(self.path)
+        try:
+            src.backup(dst)
+        finally:
+            src.close()
+            dst.close()
+        self.consistent = True
+        self.pool = queue.Queue()
+        self.conns = []
+        for _ in range(workers):
+            c = sqlite3.connect(self.path, check_same_thread=False)
+            self.conns.append(c)
+            self.pool.put(c)
+        self.schema = self._read_schema(self.conns[0])
+        self.others = self._read_others(self.conns[0])
+
+    def _read_schema(self, c):
+        tables = c.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        ).fetchall()
+        result = []
+        for name, sql in tables:
+            indexes = [r[0] for r in c.execute(
+                "SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL", (name,)
+            )]
+            result.append({'name': name, 'ddl': sql, 'indexes': indexes})
+        return result
+
+    def _read_others(self, c):
+        # 视图、触发器在数据恢复完成后再创建
+        return [r[0] for r in c.execute(
+            "SELECT sql FROM sqlite_master WHERE type IN ('view', 'trigger') AND sql IS NOT NULL"
+        )]
+
+    def acquire(self):
+        return _SQLiteCursorClient(self.pool.get())
+
+    def release(self, client):
+        self.pool.put(client.conn)
+
+    def close(self):
+        for c in self.conns:
+            c.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class _SQLiteCursorClient:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def stream_cursor(self):
+        return self.conn.cursor()
+
+
+def _dump_table(snapshot, table, data_path, compression, dialect, cancel_event=None):
+    client = snapshot.acquire()
+    try:
+        cursor = client.stream_cursor()
+        cursor.execute(f'SELECT * FROM {quote_ident(table, dialect)}')
+        headers = [d[0] for d in cursor.description]
+        writer = open_export_writer(data_path, 'jsonl', headers, compression, table_name=table, dialect=dialect)
+        try:
+            count = 0
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise RuntimeError('备份已取消')
+                rows = cursor.fetchmany(5000)
+                if not rows:
+                    break
+                writer.write_rows(rows)
+                count += len(rows)
+        finally:
+            writer.close()
+        return headers, count
+    finally:
+        snapshot.release(client)
+
+
+def backup_database(conn, out_dir, database=None, workers=4, compression='gzip',
+                    progress_callback=None, cancel_event=None):
+    """
+    备份整个数据库。
+    :param conn: 连接配置
+    :param out_dir: 备份根目录，会在其下创建 <库名>_<时间戳> 子目录
+    :param database: MySQL 库名（默认取连接配置中的库）
+    :param workers: 并行导出表的线程数
+    :param compression: '', 'gzip', 'bz2', 'xz'
+    :return: 备份目录路径
+    """
+    dialect = dialect_of(conn)
+    if dialect not in ('mysql', 'sqlite'):
+        raise ValueError(f'暂不支持该类型的备份: {conn["type"]}')
+    database = database or conn.get('database')
+    if dialect == 'mysql' and not database:
+        raise ValueError('请先选择要备份的数据库')
+    name = database if dialect == 'mysql' else os.path.splitext(os.path.basename(conn['db_path']))[0]
+    target = os.path.join(out_dir, f"{_safe_filename(name)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(os.path.join(target, 'data'))
+    workers = max(1, workers)
+    if dialect == 'mysql':
+        snapshot = _MySQLSnapshot(conn, database, workers)
+        others = []
+    else:
+        snapshot = _SQLiteSnapshot(conn, workers)
+        others = snapshot.others
+    tables = snapshot.schema
+    lock = threading.Lock()
+    finished = []
+    try:
+        with open(os.path.join(target, 'schema.sql'), 'w', encoding='utf-8') as f:
+            for t in tables:
+                f.write(t['ddl'].rstrip(';') + ';\n')
+                for idx in t['indexes']:
+                    f.write(idx.rstrip(';') + ';\n')
+                f.write('\n')
+            for sql in others:
+                f.write(sql.rstrip(';') + ';\n')
+
+        def job(t):
+            rel = os.path.join('data', _safe_filename(t['name']) + export_path_suffix('jsonl', compression))
+            path = os.path.join(target, rel)
+            headers, count = _dump_table(snapshot, t['name'], path, compression, dialect, cancel_event)
+            entry = dict(t, columns=headers, rows=count, data_file=rel.replace(os.sep, '/'),
+                         bytes=os.path.getsize(path), sha256=file_sha256(path))
+            with lock:
+                finished.append(t['name'])
+                if progress_callback:
+                    progress_callback({'table': t['name'], 'rows': count,
+                                       'tables_done': len(finished), 'tables_total': len(tables)})
+            return entry
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(job, t) for t in tables]
+            entries = {}
+            for future in as_completed(futures):
+                entry = future.result()
+                entries[entry['name']] = entry
+    except Exception:
+        snapshot.close()
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+    snapshot.close()
+    manifest = {
+        'format_version': BACKUP_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'source': {'type': conn['type'], 'database': name, 'dialect': dialect},
+        'consistent': snapshot.consistent,
+        'compression': compression,
+        'tables': [entries[t['name']] for t in tables],
+        'others': others,
+    }
+    with open(os.path.join(target, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return target
@@ -0,0 +1,199 @@
+import importlib.util
+import os
+import threading
+from importlib.metadata import entry_points
+from db.utils import data_path
+
+# 数据库驱动注册表：
+# - 每种连接类型注册一个 Driver：创建客户端的函数、SQL 方言和能力标志
+# - 各功能按能力选择最快的实现（例如支持批量装载的驱动导出 CSV 时用 COPY），不再按类型名写分支
+# - 第三方驱动作为插件加载：插件目录下的 .py 文件，或声明了 dbtool.drivers 入口点的包，在其中调用 register_driver
+#
+# 客户端通用接口：connect / close / ping / test_connection / get_tables / get_table_schema
+# 带 CAP_SQL 的驱动另需：stream_cursor / get_primary_keys / get_indexed_columns / insert_row / update_row / delete_row
+# 其他能力对应的方法见下方各标志
+
+CAP_SQL = 'sql'                      # 表和 SQL：浏览、导入导出、可视化、SQL 编辑器
+CAP_DATABASES = 'databases'          # get_databases()：一个连接下有多个库，可按库建立连接
+CAP_SERVER_CURSOR = 'server_cursor'  # stream_cursor() 的结果保存在服务器端，逐批读取
+CAP_BULK_LOAD = 'bulk_load'          # copy_to(表, 文件) / copy_from(表, 文件, 列) 批量导出导入 CSV
+CAP_KEYSET_PAGING = 'keyset_paging'  # 可按主键 WHERE pk > ? 翻页，不必 OFFSET 扫过前面的行
+CAP_ROW_ESTIMATE = 'row_estimate'    # estimate_rows(表) 从统计信息读取行数估计，无需 COUNT(*)
+CAP_CANCEL = 'cancel'                # cancel() 可从其他线程中断该客户端正在执行的语句
+CAP_BULK_TOOLS = 'bulk_tools'        # 并行导出、跨连接传输、数据对比、备份恢复
+CAP_KEY_BROWSER = 'key_browser'      # 键值库：scan_keys / key_info / get_value 等，用键浏览页代替表
+CAP_READ_POOL = 'read_pool'          # stream_cursor() 从只读连接池借连接，浏览、可视化等短查询也用它，不与写入互相阻塞
+CAP_SWITCH_DATABASE = 'switch_database'  # select_database(库名) 在已连接的客户端上切换库，预热的连接可直接用于其他库
+
+PLUGIN_DIR = data_path('plugins')
+ENTRY_POINT_GROUP = 'dbtool.drivers'
+
+
+class Driver:
+    def __init__(self, name, dialect, factory, capabilities=(), default_port=None, default_user='',
+                 file_based=False, label=None):
+        """
+        :param name: 连接类型名，即连接配置中的 type
+        :param dialect: SQL 方言（mysql / postgres / sqlite ...），用于标识符引用和占位符
+        :param factory: factory(conn, database) -> 客户端
+        :param file_based: 连接配置为 {'type', 'db_path'}，否则为 host/port/user/password/database
+        :param label: label(conn) -> 连接的显示名称
+        """
+        self.name = name
+        self.dialect = dialect
+        self.factory = factory
+        self.capabilities = frozenset(capabilities)
+        self.default_port = default_port
+        self.default_user = default_user
+        self.file_based = file_based
+        self._label = label
+
+    def supports(self, capability):
+        return capability in self.capabilities
+
+    def label(self, conn):
+        if self._label is not None:
+            return self._label(conn)
+        if self.file_based:
+            return conn.get('db_path', '')
+        return f"{conn.get('user')}@{conn.get('host')}:{conn.get('port')}"
+
+
+_drivers = {}
+_local = threading.local()  # 当前线程上的客户端登记函数，由后台任务调度器设置
+
+
+def register_driver(driver):
+    # 同名驱动后注册的覆盖先注册的，插件可以替换内置驱动
+    _drivers[driver.name] = driver
+    return driver
+
+
+def get_driver(name):
+    """
+    :return: Driver，未注册时返回 None
+    """
+    return _drivers.get(name)
+
+
+def driver_names():
+    return list(_drivers)
+
+
+def driver_of(conn):
+    driver = _drivers.get(conn['type'])
+    if driver is None:
+        raise ValueError(f"暂不支持该类型: {conn['type']}")
+    return driver
+
+
+def supports(conn, capability):
+    driver = _drivers.get(conn['type']) if conn else None
+    return driver is not None and driver.supports(capability)
+
+
+def create_client(conn, database=None):
+    """
+    根据连接配置创建数据库客户端
+    :param conn: 连接配置字典（ConnectionManager 中保存的条目）
+    :param database: 覆盖配置中的数据库名（MySQL / PostgreSQL）或库编号（Redis）
+    :return: 对应驱动的客户端实例
+    """
+    return register_client(conn, driver_of(conn).factory(conn, database))
+
+
+def set_client_hook(hook):
+    """
+    设置当前线程的客户端登记函数，之后本线程创建的客户端都会交给它（如用于取消任务时中断查询）
+    :param hook: hook(conn, client)；None 表示清除
+    """
+    _local.hook = hook
+
+
+def register_client(conn, client):
+    # 不经 create_client 得到的客户端（如复用的健康检查连接）也需要登记
+    hook = getattr(_local, 'hook', None)
+    if hook is not None and client is not None:
+        hook(conn, client)
+    return client
+
+
+def dialect_of(conn):
+    return driver_of(conn).dialect
+
+
+def load_plugins(directory=PLUGIN_DIR):
+    """
+    加载驱动插件：directory 下的每个 .py 文件，以及 dbtool.drivers 入口点（加载后若为函数则调用一次）
+    :return: [(插件名, 错误)]，加载失败的插件不影响其他插件
+    """
+    errors = []
+    if directory and os.path.isdir(directory):
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith('.py') or filename.startswith('_'):
+                continue
+            name = filename[:-3]
+            try:
+                spec = importlib.util.spec_from_file_location(f'dbtool_plugin_{name}', os.path.join(directory, filename))
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+            except Exception as e:
+                errors.append((name, e))
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            target = ep.load()
+            if callable(target):
+                target()
+        except Exception as e:
+            errors.append((ep.name, e))
+    return errors
+
+
+def _mysql(conn, database):
+    from db.mysql_client import MySQLClient
+    return MySQLClient(
+        host=conn['host'],
+        port=conn['port'],
+        user=conn['user'],
+        password=conn['password'],
+        database=database or conn['database']
+    )
+
+
+def _postgres(conn, database):
+    from db.postgres_client import PostgresClient
+    return PostgresClient(
+        host=conn['host'],
+        port=conn['port'],
+        user=conn['user'],
+        password=conn['password'],
+        database=database or conn['database']
+    )
+
+
+def _sqlite(conn, database):
+    from db.sqlite_client import SQLiteClient
+    # 性能配置（PRAGMA、只读模式）保存在连接配置中，旧连接没有时保持 SQLite 默认设置
+    return SQLiteClient(conn['db_path'], pragmas=conn.get('pragmas'), read_only=conn.get('read_only', False))
+
+
+def _redis(conn, database):
+    from db.redis_client import RedisClient
+    return RedisClient(
+        host=conn['host'],
+        port=conn['port'],
+        user=conn.get('user'),
+        password=conn.get('password'),
+        database=database or conn.get('database')
+    )
+
+
+register_driver(Driver('MySQL', 'mysql', _mysql, default_port=3306, default_user='root', capabilities=(
+    CAP_SQL, CAP_DATABASES, CAP_SERVER_CURSOR, CAP_KEYSET_PAGING, CAP_ROW_ESTIMATE, CAP_CANCEL, CAP_BULK_TOOLS,
+    CAP_SWITCH_DATABASE)))
+register_driver(Driver('PostgreSQL', 'postgres', _postgres, default_port=5432, default_user='postgres', capabilities=(
+    CAP_SQL, CAP_DATABASES, CAP_SERVER_CURSOR, CAP_BULK_LOAD, CAP_KEYSET_PAGING, CAP_ROW_ESTIMATE, CAP_CANCEL)))
+register_driver(Driver('SQLite', 'sqlite', _sqlite, file_based=True, capabilities=(
+    CAP_SQL, CAP_KEYSET_PAGING, CAP_CANCEL, CAP_BULK_TOOLS, CAP_READ_POOL)))
+register_driver(Driver('Redis', 'redis', _redis, default_port=6379, capabilities=(CAP_KEY_BROWSER,),
+                       label=lambda conn: f"{conn['host']}:{conn['port']}/db{conn.get('database') or 0}"))
@@ -8,6 +8,7 @@ from cryptography.hazmat.backends import default_backend
 import base64
 import secrets
 import sys
+import time
 from db.utils import data_path
 
 CONNECTIONS_FILE = data_path('connections.json.enc')
@@ -101,6 +102,24 @@ class ConnectionManager:
             self.connections[index] = conn_info
             self.save_connections()
 
+    def mark_used(self, index: int):
+        # 记录最近使用时间，用于启动时预热；一分钟内重复使用不重复写文件
+        conn = self.get_connection(index)
+        if conn is None:
+            return
+        now = time.time()
+        if now - conn.get('last_used', 0) > 60:
+            conn['last_used'] = now
+            self.save_connections()
+
+    def recent_connections(self, limit: int = 5) -> List[int]:
+        """
+        按最近使用时间排序的连接序号（从未使用过的不包括在内）
+        """
+        used = [i for i, c in enumerate(self.connections) if c.get('last_used')]
+        used.sort(key=lambda i: self.connections[i]['last_used'], reverse=True)
+        return used[:limit]
+
     def get_connections(self) -> List[Dict]:
         return self.connections
 
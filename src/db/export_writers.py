@@ -0,0 +1,295 @@
+import abc
+import base64
+import bz2
+import csv
+import datetime
+import decimal
+import io
+import json
+import lzma
+import queue
+import threading
+import zlib
+
+# 可插拔的流式导出层：
+# - 格式写入器只负责把一批行编码为字节，不持有整张表
+# - 压缩在独立线程中进行，与取数、编码并行（zlib/bz2/lzma压缩时会释放GIL）
+
+
+class ExportWriter(abc.ABC):
+    # 子类必须实现 write_rows；write_header / write_footer 为可选的钩子，默认不输出
+    encoding = 'utf-8'
+
+    def __init__(self, stream, headers, table_name=None, dialect='mysql', header=True):
+        self.stream = stream
+        self.headers = list(headers)
+        self.table_name = table_name
+        self.dialect = dialect
+        self.header = header  # 分片导出时只有第一片输出表头
+        self.rows_written = 0
+
+    def write_header(self):
+        pass
+
+    @abc.abstractmethod
+    def write_rows(self, rows):
+        """
+        编码一批行并写入 stream，累加 rows_written
+        """
+
+    def write_footer(self):
+        pass
+
+    def _emit(self, text):
+        if text:
+            self.stream.write(text.encode(self.encoding))
+
+    def close(self):
+        self.write_footer()
+        self.stream.close()
+
+
+class CsvWriter(ExportWriter):
+    # 保持与原导出一致：UTF-8 BOM，便于Excel直接打开
+    encoding = 'utf-8'
+    delimiter = ','
+    bom = '\ufeff'
+
+    def write_header(self):
+        if self.header:
+            self._emit(self.bom + self._format([self.headers]))
+
+    def _format(self, rows):
+        buf = io.StringIO()
+        writer = csv.writer(buf, delimiter=self.delimiter)
+        writer.writerows(rows)
+        return buf.getvalue()
+
+    def write_rows(self, rows):
+        self._emit(self._format(rows))
+        self.rows_written += len(rows)
+
+
+class TsvWriter(CsvWriter):
+    delimiter = '\t'
+    bom = ''
+
+
+def json_default(value):
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {'$binary': base64.b64encode(bytes(value)).decode('ascii')}
+    return str(value)
+
+
+def json_decode_value(value):
+    # json_default 的逆操作，仅还原二进制
+    if isinstance(value, dict) and '$binary' in value:
+        return base64.b64decode(value['$binary'])
+    return value
+
+
+class JsonLinesWriter(ExportWriter):
+    def write_rows(self, rows):
+        headers = self.headers
+        dumps = json.dumps
+        self._emit(''.join(
+            dumps(dict(zip(headers, row)), ensure_ascii=False, default=json_default) + '\n'
+            for row in rows
+        ))
+        self.rows_written += len(rows)
+
+
+def quote_ident(name, dialect='mysql'):
+    if dialect == 'mysql':
+        return '`' + str(name).replace('`', '``') + '`'
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+_MYSQL_ESCAPES = str.maketrans({
+    '\\': '\\\\', "'": "\\'", '\n': '\\n', '\r': '\\r', '\0': '\\0', '\x1a': '\\Z',
+})
+
+
+def sql_literal(value, dialect='mysql'):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        if dialect == 'postgres':
+            return 'TRUE' if value else 'FALSE'
+        return '1' if value else '0'
+    if isinstance(value, (int, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value) if value == value and value not in (float('inf'), float('-inf')) else 'NULL'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if dialect == 'postgres':
+            return "'\\x" + bytes(value).hex() + "'::bytea"
+        return "X'" + bytes(value).hex() + "'"
+    text = str(value)
+    if dialect == 'mysql':
+        return "'" + text.translate(_MYSQL_ESCAPES) + "'"
+    return "'" + text.replace("'", "''") + "'"
+
+
+class SqlInsertWriter(ExportWriter):
+    rows_per_statement = 500
+
+    def write_header(self):
+        cols = ', '.join(quote_ident(h, self.dialect) for h in self.headers)
+        self._prefix = f'INSERT INTO {quote_ident(self.table_name or "data", self.dialect)} ({cols}) VALUES\n'
+
+    def write_rows(self, rows):
+        dialect = self.dialect
+        parts = []
+        for start in range(0, len(rows), self.rows_per_statement):
+            chunk = rows[start:start + self.rows_per_statement]
+            values = ',\n'.join('(' + ', '.join(sql_literal(v, dialect) for v in row) + ')' for row in chunk)
+            parts.append(self._prefix + values + ';\n')
+        self._emit(''.join(parts))
+        self.rows_written += len(rows)
+
+
+# 格式注册表：name -> (显示名, 扩展名, 写入器类)
+EXPORT_FORMATS = {
+    'csv': ('CSV', '.csv', CsvWriter),
+    'tsv': ('TSV', '.tsv', TsvWriter),
+    'jsonl': ('JSON Lines', '.jsonl', JsonLinesWriter),
+    'sql': ('SQL INSERT', '.sql', SqlInsertWriter),
+}
+
+
+def register_export_format(name, label, extension, writer_cls):
+    EXPORT_FORMATS[name] = (label, extension, writer_cls)
+
+
+def _gzip_compressor(level):
+    # wbits=31 输出标准gzip格式
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+# 压缩注册表：name -> (扩展名, 压缩器工厂)
+COMPRESSIONS = {
+    '': ('', None),
+    'gzip': ('.gz', lambda: _gzip_compressor(6)),
+    'bz2': ('.bz2', lambda: bz2.BZ2Compressor(9)),
+    'xz': ('.xz', lambda: lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=1)),
+}
+
+
+class ThreadedCompressor:
+    """
+    类文件对象：write() 只把数据放入有界队列，由后台线程压缩并写盘。
+    """
+    _CHUNK = 256 * 1024
+
+    def __init__(self, fileobj, compressor, max_pending=32):
+        self._file = fileobj
+        self._compressor = compressor
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = bytearray()
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='export-compressor', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        done = False
+        try:
+            while True:
+                chunk = self._queue.get()
+                if chunk is None:
+                    done = True
+                    break
+                data = self._compressor.compress(chunk)
+                if data:
+                    self._file.write(data)
+            self._file.write(self._compressor.flush())
+        except Exception as e:
+            self._error = e
+            # 继续消费队列，避免写入方阻塞
+            while not done:
+                done = self._queue.get() is None
+
+    def write(self, data):
+        if self._error:
+            raise self._error
+        self._pending += data
+        if len(self._pending) >= self._CHUNK:
+            self._queue.put(bytes(self._pending))
+            self._pending.clear()
+        return len(data)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._pending:
+            self._queue.put(bytes(self._pending))
+            self._pending.clear()
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._error:
+            raise self._error
+
+
+def export_path_suffix(fmt, compression=''):
+    return EXPORT_FORMATS[fmt][1] + COMPRESSIONS[compression][0]
+
+
+def detect_format(path):
+    """
+    根据文件名推断 (格式, 压缩方式)，无法识别时返回 (None, '')
+    """
+    lower = path.lower()
+    compression = ''
+    for name, (ext, _) in COMPRESSIONS.items():
+        if ext and lower.endswith(ext):
+            compression = name
+            lower = lower[:-len(ext)]
+            break
+    for name, (_, ext, _) in EXPORT_FORMATS.items():
+        if lower.endswith(ext):
+            return name, compression
+    return None, compression
+
+
+def open_export_stream(path, compression=''):
+    """
+    打开导出文件，返回带缓冲（或后台压缩）的二进制写入对象
+    """
+    raw = open(path, 'wb')
+    factory = COMPRESSIONS[compression][1]
+    return ThreadedCompressor(raw, factory()) if factory else io.BufferedWriter(raw, 1024 * 1024)
+
+
+def open_export_writer(path, fmt, headers, compression='', table_name=None, dialect='mysql', header=True):
+    _, _, writer_cls = EXPORT_FORMATS[fmt]
+    stream = open_export_stream(path, compression)
+    writer = writer_cls(stream, headers, table_name=table_name, dialect=dialect, header=header)
+    writer.write_header()
+    return writer
+
+
+def export_cursor(cursor, writer, batch_size=5000, progress_callback=None, cancel_event=None):
+    """
+    从游标分批读取并写出，返回写出行数。
+    """
+    total = 0
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            raise RuntimeError('导出已取消')
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        writer.write_rows(rows)
+        total += len(rows)
+        if progress_callback:
+            progress_callback(total)
+    return total
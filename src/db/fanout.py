@@ -0,0 +1,189 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from db.client_factory import create_client, supports, CAP_CANCEL, CAP_SERVER_CURSOR
+from db.result_buffer import ColumnarResult
+
+# 同一条SQL在多个连接（分片）上并发执行：
+# - 线程池大小即并发上限，每个连接有独立的超时
+# - 超时的查询会被中断（MySQL: KILL QUERY；PostgreSQL: cancel；SQLite: interrupt），不会一直占用工作线程
+# - 各分片结果合并为一个结果集，首列为来源连接；失败的分片单独报告，不影响其他分片
+
+SOURCE_COLUMN = '来源连接'
+AGGREGATE_FUNCS = ('SUM', 'COUNT', 'MAX', 'MIN')
+
+
+class _Shard:
+    def __init__(self, label, conn):
+        self.label = label
+        self.conn = conn
+        self.client = None
+        self.started = None
+        self.timed_out = False
+        self.stat = {'label': label, 'status': '等待', 'rows': None, 'elapsed_ms': None, 'error': None}
+
+    def interrupt(self):
+        client = self.client
+        if client is None or client.conn is None or not supports(self.conn, CAP_CANCEL):
+            return
+        try:
+            client.cancel()
+        except Exception:
+            pass
+
+
+def _run_shard(shard, sql, cancel_event):
+    shard.started = time.perf_counter()
+    shard.client = create_client(shard.conn)
+    try:
+        # 任意语句（可能是写操作）：只有服务器端游标才用 stream_cursor，SQLite 的 stream_cursor 是只读连接
+        cursor = shard.client.stream_cursor() if supports(shard.conn, CAP_SERVER_CURSOR) else shard.client.connect().cursor()
+        cursor.execute(sql)
+        if not cursor.description:
+            shard.client.conn.commit()
+            return None, [], cursor.rowcount
+        headers = [d[0] for d in cursor.description]
+        rows = []
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise RuntimeError('已取消')
+            batch = cursor.fetchmany(5000)
+            if not batch:
+                break
+            rows.extend(batch)
+        return headers, rows, len(rows)
+    finally:
+        client, shard.client = shard.client, None
+        client.close()
+
+
+def fanout_query(connections, sql, max_workers=8, timeout=30, progress_callback=None, cancel_event=None):
+    """
+    在多个连接上并发执行同一条SQL。
+    :param connections: [(连接名称, 连接配置), ...]
+    :param timeout: 每个连接的超时秒数，从该连接开始执行时计时
+    :param progress_callback: 回调参数为 {'done': 已完成数, 'total': 总数, 'label': 刚完成的连接, 'ok': 是否成功}
+    :return: {'result': 合并后的 ColumnarResult 或 None, 'shards': [{'label', 'status', 'rows', 'elapsed_ms', 'error'}]}
+    """
+    shards = [_Shard(label, conn) for label, conn in connections]
+    merged = None
+    headers = None
+    done_count = 0
+    lock = threading.Lock()
+
+    def finish(shard, ok, rows=None, error=None):
+        nonlocal done_count
+        with lock:
+            done_count += 1
+            stat = shard.stat
+            stat['status'] = '成功' if ok else ('超时' if shard.timed_out else '失败')
+            stat['rows'] = rows
+            stat['error'] = error
+            if shard.started is not None:
+                stat['elapsed_ms'] = (time.perf_counter() - shard.started) * 1000
+        if progress_callback:
+            progress_callback({'done': done_count, 'total': len(shards), 'label': shard.label, 'ok': ok})
+
+    # 不用 with：退出时会等待所有线程，中断无效的超时分片（不支持取消、仍在连接、服务器忽略取消）会让整个调用一直挂起。
+    # 超时的分片直接放弃，线程结束后自己关闭连接
+    pools = [ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='fanout')]
+    futures = {pools[0].submit(_run_shard, s, sql, cancel_event): s for s in shards}
+    pending = set(futures)
+
+    def requeue_waiting():
+        # 放弃的分片仍占着原线程池的线程：尚未开始的分片改到新线程池执行，并发数不超过 max_workers
+        nonlocal pending
+        waiting = [f for f in pending if futures[f].started is None and f.cancel()]
+        if not waiting:
+            return
+        running = sum(1 for f in pending if futures[f].started is not None)
+        pool = ThreadPoolExecutor(max_workers=max(1, max_workers - running), thread_name_prefix='fanout')
+        pools.append(pool)
+        pending = pending.difference(waiting)
+        for future in waiting:
+            moved = pool.submit(_run_shard, futures[future], sql, cancel_event)
+            futures[moved] = futures[future]
+            pending.add(moved)
+
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard = futures[future]
+                if shard.timed_out or future.cancelled():
+                    continue
+                try:
+                    shard_headers, rows, count = future.result()
+                except Exception as e:
+                    finish(shard, False, error=str(e))
+                    continue
+                if shard_headers is None:
+                    finish(shard, True, rows=count)
+                    continue
+                if headers is None:
+                    headers = shard_headers
+                    merged = ColumnarResult([SOURCE_COLUMN] + headers)
+                elif shard_headers != headers:
+                    finish(shard, False, error=f"返回的列与其他连接不一致: {', '.join(shard_headers)}")
+                    continue
+                merged.append_rows([(shard.label,) + tuple(r) for r in rows])
+                finish(shard, True, rows=count)
+            # 检查超时：中断查询并记为失败，不再等待其结果
+            now = time.perf_counter()
+            abandoned = False
+            for future in list(pending):
+                shard = futures[future]
+                if shard.started is not None and not shard.timed_out and now - shard.started > timeout:
+                    shard.timed_out = True
+                    shard.interrupt()
+                    finish(shard, False, error=f'执行超过 {timeout} 秒')
+                    pending.discard(future)
+                    abandoned = True
+            if abandoned:
+                requeue_waiting()
+            if cancel_event is not None and cancel_event.is_set():
+                # 取消时同样不等待正在执行的分片
+                for future in pending:
+                    shard = futures[future]
+                    future.cancel()
+                    shard.interrupt()
+                    finish(shard, False, error='已取消')
+                pending = set()
+    finally:
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+    return {'result': merged, 'shards': [s.stat for s in shards]}
+
+
+def aggregate_result(result, aggregations):
+    """
+    跨分片聚合：未指定聚合函数的列（来源连接列除外）作为分组键。
+    COUNT 表示把各分片返回的计数相加（即分片SQL中的 COUNT(*)）。
+    :param aggregations: {列号: 'SUM'/'COUNT'/'MAX'/'MIN'}
+    :return: 新的 ColumnarResult
+    """
+    source = result.headers.index(SOURCE_COLUMN) if SOURCE_COLUMN in result.headers else None
+    keys = [c for c in range(len(result.headers)) if c not in aggregations and c != source]
+    agg_cols = sorted(aggregations)
+    groups = {}
+    for r in range(len(result)):
+        key = tuple(result.value(r, c) for c in keys)
+        acc = groups.get(key)
+        values = [result.value(r, c) for c in agg_cols]
+        if acc is None:
+            groups[key] = values
+            continue
+        for i, c in enumerate(agg_cols):
+            v, cur = values[i], acc[i]
+            if v is None:
+                continue
+            if cur is None:
+                acc[i] = v
+            elif aggregations[c] in ('SUM', 'COUNT'):
+                acc[i] = cur + v
+            elif aggregations[c] == 'MAX':
+                acc[i] = max(cur, v)
+            else:
+                acc[i] = min(cur, v)
+    headers = [result.headers[c] for c in keys] + [f'{aggregations[c]}({result.headers[c]})' for c in agg_cols]
+    return ColumnarResult.from_rows(headers, [key + tuple(acc) for key, acc in groups.items()])
@@ -0,0 +1,218 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from db.client_factory import create_client, get_driver, driver_of, CAP_SWITCH_DATABASE
+from db.sqlite_client import readonly_uri
+
+# 连接健康监控：
+# - 解锁后为最近使用的连接预先建立连接（MySQL/PostgreSQL/Redis 保留一个已认证的连接供首次操作直接使用）
+# - 按固定间隔 ping，记录往返延迟和在线/离线状态，状态变化通过回调通知界面
+# - 失败后按指数退避重试（2, 4, 8 … 秒，最长 PING_BACKOFF_MAX），避免对宕机的服务器反复发起连接
+# 所有网络操作都在监控自己的线程池中进行，界面线程只读取缓存的状态
+
+PING_INTERVAL = 30
+PING_BACKOFF_BASE = 2
+PING_BACKOFF_MAX = 300
+CONNECT_TIMEOUT = 5
+
+
+def profile_key(conn):
+    """
+    连接配置的标识：服务器类连接为 (类型, 主机, 端口, 用户, 库)，文件类连接（SQLite 及插件驱动）为 (类型, 文件路径)
+    """
+    driver = get_driver(conn['type'])
+    if driver is not None and driver.file_based:
+        return (conn['type'], conn.get('db_path', ''))
+    return (conn['type'], conn.get('host'), conn.get('port'), conn.get('user'), conn.get('database'))
+
+
+class _Target:
+    def __init__(self, key, conn):
+        self.key = key
+        self.conn = conn
+        self.client = None  # 预热的连接（SQLite 除外）
+        self.busy = False
+        self.up = None  # None 表示尚未检测
+        self.latency_ms = None
+        self.error = None
+        self.failures = 0
+        self.next_check = 0.0
+        self.checked_at = None
+
+    def status(self):
+        return {'up': self.up, 'latency_ms': self.latency_ms, 'error': self.error, 'failures': self.failures,
+                'checked_at': self.checked_at, 'next_check': self.next_check}
+
+
+class HealthMonitor:
+    def __init__(self, interval=PING_INTERVAL, on_status=None, max_workers=4):
+        """
+        :param on_status: 状态回调 on_status(key, status)，在监控线程中调用
+        """
+        self.interval = interval
+        self.on_status = on_status
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='health')
+        self._thread = threading.Thread(target=self._loop, name='health-monitor', daemon=True)
+        self._thread.start()
+
+    def watch(self, conn):
+        """
+        开始监控（并预热）一个连接，已在监控中时忽略
+        """
+        key = profile_key(conn)
+        with self._lock:
+            target = self._targets.get(key)
+            if target is None:
+                self._targets[key] = _Target(key, dict(conn))
+            elif target.conn != conn:
+                target.conn = dict(conn)
+        self._wake.set()
+        return key
+
+    def unwatch(self, conn):
+        with self._lock:
+            target = self._targets.pop(profile_key(conn), None)
+        if target is not None and not target.busy:
+            self._close_client(target)
+
+    def status(self, conn):
+        target = self._targets.get(profile_key(conn))
+        return target.status() if target is not None else None
+
+    def check_now(self, conn):
+        # 跳过退避等待，立即重新检测
+        with self._lock:
+            target = self._targets.get(profile_key(conn))
+            if target is not None:
+                target.next_check = 0.0
+        self._wake.set()
+
+    def take_client(self, conn, database=None):
+        """
+        取走预热好的连接（调用方负责关闭），监控随后在后台补充新的预热连接。
+        没有可用的预热连接时返回 None，调用方自行新建
+        """
+        with self._lock:
+            target = self._targets.get(profile_key(conn))
+            if target is None or target.busy or target.client is None or not target.up:
+                return None
+            switch = bool(database) and database != target.client.database
+            if switch and not driver_of(conn).supports(CAP_SWITCH_DATABASE):
+                return None  # 如 PostgreSQL 不能在已有连接上切换数据库，Redis 的连接池固定一个库
+            client, target.client = target.client, None
+            target.next_check = 0.0
+        self._wake.set()
+        if switch:
+            try:
+                client.select_database(database)
+            except Exception:
+                client.close()
+                return None
+        return client
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+        self._pool.shutdown(wait=False)
+        with self._lock:
+            targets = list(self._targets.values())
+        for target in targets:
+            if not target.busy:
+                self._close_client(target)
+
+    def _loop(self):
+        while not self._stopped:
+            now = time.time()
+            due = []
+            with self._lock:
+                for target in self._targets.values():
+                    if not target.busy and target.next_check <= now:
+                        target.busy = True
+                        due.append(target)
+                waits = [t.next_check - now for t in self._targets.values() if not t.busy]
+            for target in due:
+                try:
+                    self._pool.submit(self._check, target)
+                except RuntimeError:
+                    return  # 线程池已关闭
+            self._wake.wait(max(0.1, min(waits, default=self.interval)))
+            self._wake.clear()
+
+    def _check(self, target):
+        started = time.perf_counter()
+        try:
+            driver = driver_of(target.conn)
+            if driver.file_based:
+                self._ping_file(driver, target.conn)
+            else:
+                self._ping_server(target)
+            latency = (time.perf_counter() - started) * 1000
+            changed = target.up is not True
+            target.up, target.latency_ms, target.error, target.failures = True, latency, None, 0
+            target.next_check = time.time() + self.interval
+        except Exception as e:
+            self._close_client(target)
+            changed = target.up is not False
+            target.up, target.latency_ms, target.error = False, None, str(e)
+            target.failures += 1
+            delay = min(PING_BACKOFF_MAX, PING_BACKOFF_BASE * 2 ** (target.failures - 1))
+            target.next_check = time.time() + delay
+        target.checked_at = time.time()
+        with self._lock:
+            target.busy = False
+            removed = self._targets.get(target.key) is not target
+        if removed or self._stopped:
+            self._close_client(target)
+            return
+        if self.on_status is not None:
+            self.on_status(target.key, dict(target.status(), changed=changed))
+
+    @staticmethod
+    def _ping_file(driver, conn):
+        # 文件类连接不保留预热连接；SQLite 文件用只读方式检查，其他驱动用自己的客户端连接一次
+        if driver.dialect == 'sqlite':
+            HealthMonitor._ping_sqlite(conn['db_path'])
+            return
+        client = create_client(conn)
+        try:
+            client.connect()
+            client.ping()
+        finally:
+            client.close()
+
+    @staticmethod
+    def _ping_sqlite(path):
+        # 只读方式打开，文件不存在时报错而不是新建空库
+        conn = sqlite3.connect(readonly_uri(path), uri=True, timeout=CONNECT_TIMEOUT)
+        try:
+            conn.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchall()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _ping_server(target):
+        if target.client is not None:
+            try:
+                target.client.ping()
+                return
+            except Exception:
+                # 空闲连接可能已被服务器断开（wait_timeout），重新连接一次再判断是否离线
+                HealthMonitor._close_client(target)
+        client = create_client(target.conn)
+        client.connect_timeout = CONNECT_TIMEOUT
+        client.connect()
+        target.client = client
+
+    @staticmethod
+    def _close_client(target):
+        client, target.client = target.client, None
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
@@ -0,0 +1,476 @@
+import json
+import math
+import re
+import statistics
+import threading
+import time
+from collections import OrderedDict
+from db.client_factory import create_client, dialect_of
+from db.export_writers import quote_ident
+from db.health_monitor import profile_key
+
+# 索引建议：
+# - 记录工具实际执行的查询（SQL 编辑器中的语句、带筛选/排序的表数据翻页），按连接在内存中保存
+# - 从 WHERE / JOIN ON / ORDER BY 中解析出各表的等值列、范围列和排序列，
+#   组合成候选索引（等值列在前，随后一个范围列，再接排序列）
+# - 首列已有索引的候选跳过；再用 EXPLAIN 确认该表确实被全表扫描或需要额外排序
+# - 按 出现次数 × 平均耗时 × log10(扫描行数估计) 排序，生成 CREATE INDEX 语句供审阅
+# - 可重新执行相关查询，对比创建索引前后的耗时
+# 只分析 SELECT / UPDATE / DELETE；重新执行时只执行 SELECT
+
+MAX_STATEMENTS = 500  # 每个连接最多保留的不同语句数
+MAX_INDEX_COLUMNS = 4
+SUPPORTED_DIALECTS = ('mysql', 'postgres', 'sqlite')
+
+_workload = {}
+_workload_lock = threading.Lock()
+
+_KEYWORDS = {
+    'AND', 'OR', 'NOT', 'NULL', 'IS', 'IN', 'LIKE', 'BETWEEN', 'EXISTS', 'SELECT', 'FROM', 'WHERE', 'ON', 'AS',
+    'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'OUTER', 'CROSS', 'GROUP', 'ORDER', 'BY', 'LIMIT', 'OFFSET', 'HAVING',
+    'UNION', 'ASC', 'DESC', 'SET', 'USING', 'TRUE', 'FALSE', 'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'FOR', 'NATURAL',
+}
+_IDENT = r'(?:`[^`]+`|"[^"]+"|\[[^\]]+\]|[A-Za-z_][\w$]*)'
+_COLUMN_REF = rf'(?:({_IDENT})\s*\.\s*)?({_IDENT})'
+_TABLE_REF = re.compile(rf'\b(?:FROM|JOIN|UPDATE)\s+(?:{_IDENT}\s*\.\s*)?({_IDENT})(?:\s+(?:AS\s+)?({_IDENT}))?', re.I)
+_EQ_PRED = re.compile(rf'{_COLUMN_REF}\s*(?:=(?!=)|\bIN\s*\(|\bIS\s+NULL\b)', re.I)
+_RANGE_PRED = re.compile(rf'{_COLUMN_REF}\s*(?:<=|>=|<(?!>)|>|\bBETWEEN\b|\bLIKE\s+(?!%))', re.I)
+_JOIN_PRED = re.compile(rf'{_COLUMN_REF}\s*=\s*{_COLUMN_REF}', re.I)
+_CLAUSE_END = r'(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bOFFSET\b|\bHAVING\b|\bUNION\b|\bFOR\s+UPDATE\b|$)'
+_WHERE = re.compile(rf'\bWHERE\b(.*?){_CLAUSE_END}', re.I | re.S)
+_ON = re.compile(r'\bON\b(.*?)(?=\b(?:LEFT|RIGHT|INNER|FULL|CROSS|NATURAL)?\s*(?:OUTER\s+)?JOIN\b|\bWHERE\b|\bGROUP\s+BY\b'
+                 r'|\bORDER\s+BY\b|\bLIMIT\b|$)', re.I | re.S)
+_ORDER_BY = re.compile(r'\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|\bOFFSET\b|\bFOR\b|$)', re.I | re.S)
+
+
+def _unquote(name):
+    if name[:1] in '`"[':
+        return name[1:-1]
+    return name
+
+
+def _shape(sql):
+    # 语句的形状：去掉字面量和多余空白，只有字面量不同的语句合并计数
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    return re.sub(r'\s+', ' ', sql).strip().lower()
+
+
+def record_query(conn, sql, params=None, duration_ms=None, database=None):
+    """
+    记录一条执行成功的查询（任意线程调用）；只有字面量不同的语句合并计数，保留最近一次的 SQL 和参数
+    """
+    if not re.match(r'\s*(SELECT|WITH|UPDATE|DELETE)\b', sql, re.I):
+        return
+    key = profile_key(conn)
+    shape = (database, _shape(sql))
+    with _workload_lock:
+        entries = _workload.setdefault(key, OrderedDict())
+        entry = entries.pop(shape, None)
+        if entry is None:
+            entry = {'sql': sql, 'params': None, 'database': database, 'count': 0, 'total_ms': 0.0, 'timed': 0}
+        entry['sql'], entry['params'] = sql, list(params) if params else None
+        entry['count'] += 1
+        if duration_ms is not None:
+            entry['total_ms'] += duration_ms
+            entry['timed'] += 1
+        entry['last_at'] = time.time()
+        entries[shape] = entry
+        while len(entries) > MAX_STATEMENTS:
+            entries.popitem(last=False)
+
+
+def workload_of(conn):
+    """
+    :return: 该连接记录的语句列表（副本），最近执行的在后
+    """
+    with _workload_lock:
+        return [dict(e) for e in _workload.get(profile_key(conn), {}).values()]
+
+
+def clear_workload(conn):
+    with _workload_lock:
+        _workload.pop(profile_key(conn), None)
+
+
+def _strip_literals(sql):
+    # 去掉注释和字符串字面量，避免其中的关键字、运算符干扰解析；以 % 开头的 LIKE 模式保留 %，用于判断能否走索引
+    sql = re.sub(r'--[^\n]*|/\*.*?\*/', ' ', sql, flags=re.S)
+    return re.sub(r"'((?:[^']|'')*)'", lambda m: '%' if m.group(1).startswith('%') else '?', sql)
+
+
+def parse_statement(sql):
+    """
+    解析语句中各表可用于索引的列
+    :return: {'tables': {别名小写: 表名}, 'eq': [(限定名, 列)], 'range': [...], 'join': [...], 'order': [...]}，
+             限定名为 None 表示未写表名/别名
+    """
+    text = _strip_literals(sql)
+    tables = {}
+    for m in _TABLE_REF.finditer(text):
+        table = _unquote(m.group(1))
+        if table.upper() in _KEYWORDS:
+            continue
+        tables.setdefault(table.lower(), table)
+        alias = m.group(2)
+        if alias and alias.upper() not in _KEYWORDS:
+            tables[_unquote(alias).lower()] = table
+
+    def refs(pattern, clause):
+        found = []
+        for m in pattern.finditer(clause):
+            qualifier, column = m.group(1), _unquote(m.group(2))
+            if column.upper() in _KEYWORDS or column[0].isdigit():
+                continue
+            found.append((_unquote(qualifier) if qualifier else None, column))
+        return found
+
+    result = {'tables': tables, 'eq': [], 'range': [], 'join': [], 'order': []}
+    for m in _ON.finditer(text):
+        clause = m.group(1)
+        for j in _JOIN_PRED.finditer(clause):
+            for qualifier, column in ((j.group(1), j.group(2)), (j.group(3), j.group(4))):
+                result['join'].append((_unquote(qualifier) if qualifier else None, _unquote(column)))
+        result['eq'] += refs(_EQ_PRED, _JOIN_PRED.sub(' ', clause))
+        result['range'] += refs(_RANGE_PRED, clause)
+    for m in _WHERE.finditer(text):
+        clause = m.group(1)
+        # WHERE 中的 a.x = b.y 同样是连接条件
+        for j in _JOIN_PRED.finditer(clause):
+            if j.group(1) and j.group(3):
+                for qualifier, column in ((j.group(1), j.group(2)), (j.group(3), j.group(4))):
+                    result['join'].append((_unquote(qualifier), _unquote(column)))
+        result['eq'] += refs(_EQ_PRED, clause)
+        result['range'] += refs(_RANGE_PRED, clause)
+    m = _ORDER_BY.search(text)
+    if m:
+        for item in m.group(1).split(','):
+            ref = re.match(rf'\s*{_COLUMN_REF}\s*(?:ASC|DESC)?\s*$', item, re.I)
+            if ref is None:
+                result['order'] = []  # 按表达式排序，索引帮不上
+                break
+            result['order'].append((_unquote(ref.group(1)) if ref.group(1) else None, _unquote(ref.group(2))))
+    return result
+
+
+def candidate_indexes(parsed, columns_of):
+    """
+    按表组合候选索引列：等值列（含连接列）在前，随后一个范围列；单表查询再接排序列
+    :param columns_of: columns_of(表名) -> 列名小写集合，用于确定未限定的列属于哪张表并排除别名、表达式
+    :return: {表名: (列列表, 是否包含排序列)}
+    """
+    tables = parsed['tables']
+
+    def resolve(qualifier, column):
+        if qualifier is not None:
+            owners = {tables[qualifier.lower()]} if qualifier.lower() in tables else set()
+        else:
+            owners = set(tables.values())
+        owners = {t for t in owners if column.lower() in columns_of(t)}
+        return (owners.pop(), column) if len(owners) == 1 else None
+
+    per_table = {}
+    for kind in ('eq', 'join', 'range'):
+        for ref in parsed[kind]:
+            resolved = resolve(*ref)
+            if resolved is None:
+                continue
+            table, column = resolved
+            slot = per_table.setdefault(table, {'eq': [], 'range': []})
+            slot['range' if kind == 'range' else 'eq'].append(column)
+    order = [resolve(*ref) for ref in parsed['order']]
+    # 多表连接时结果顺序取决于连接方式，单表索引不一定能避免排序
+    single = len({t.lower() for t in tables.values()}) == 1
+    order_table = order[0][0] if single and order and all(order) else None
+    if order_table is not None:
+        per_table.setdefault(order_table, {'eq': [], 'range': []})
+    candidates = {}
+    for table, slot in per_table.items():
+        columns = list(dict.fromkeys(slot['eq']))
+        ranges = [c for c in slot['range'] if c not in columns]
+        if ranges:
+            columns.append(ranges[0])
+        ordered = False
+        if table == order_table:
+            order_columns = [c for _, c in order]
+            # 有范围条件时，只有范围列就是第一个排序列，索引才能同时提供顺序
+            if not ranges or order_columns[0] == ranges[0]:
+                columns += [c for c in order_columns if c not in columns]
+                ordered = len(columns) <= MAX_INDEX_COLUMNS
+        if columns:
+            candidates[table] = (columns[:MAX_INDEX_COLUMNS], ordered)
+    return candidates
+
+
+# ---- EXPLAIN：各方言的输出统一为 {表名小写: {'full_scan', 'sort', 'rows'}} ----
+
+def _explain_sqlite(cursor, sql, params):
+    cursor.execute('EXPLAIN QUERY PLAN ' + sql, params or [])
+    plan = {}
+    for row in cursor.fetchall():
+        detail = row[-1]
+        m = re.match(r'(SCAN|SEARCH)\s+(?:TABLE\s+)?(\S+)(?:\s+AS\s+(\S+))?(.*)', detail)
+        if m:
+            entry = plan.setdefault(m.group(2).lower(), {'full_scan': False, 'sort': False, 'rows': None})
+            # SCAN ... USING COVERING INDEX 同样是遍历整个索引，但不回表，视为已有合适的索引
+            if m.group(1) == 'SCAN' and 'INDEX' not in m.group(4):
+                entry['full_scan'] = True
+        elif 'USE TEMP B-TREE FOR ORDER BY' in detail:
+            for entry in plan.values():
+                entry['sort'] = True
+    return plan
+
+
+def _explain_mysql(cursor, sql, params):
+    cursor.execute('EXPLAIN ' + sql, params or None)
+    desc = [d[0] for d in cursor.description]
+    plan = {}
+    for row in cursor.fetchall():
+        row = dict(zip(desc, row))
+        table = row.get('table')
+        if not table or table.startswith('<'):
+            continue  # 派生表、子查询
+        entry = plan.setdefault(table.lower(), {'full_scan': False, 'sort': False, 'rows': None})
+        if row.get('type') == 'ALL':
+            entry['full_scan'] = True
+        if 'Using filesort' in (row.get('Extra') or ''):
+            entry['sort'] = True
+        if row.get('rows') is not None:
+            entry['rows'] = max(entry['rows'] or 0, int(row['rows']))
+    return plan
+
+
+def _explain_postgres(cursor, sql, params):
+    cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params or None)
+    doc = cursor.fetchone()[0]
+    if isinstance(doc, str):
+        doc = json.loads(doc)
+    plan = {}
+
+    def walk(node, sorting):
+        kind = node.get('Node Type')
+        sorting = sorting or kind in ('Sort', 'Incremental Sort')
+        table = node.get('Relation Name')
+        if table:
+            entry = plan.setdefault(table.lower(), {'full_scan': False, 'sort': False, 'rows': None})
+            if kind == 'Seq Scan':
+                entry['full_scan'] = True
+                entry['rows'] = max(entry['rows'] or 0, int(node.get('Plan Rows', 0)))
+            entry['sort'] = entry['sort'] or sorting
+        for child in node.get('Plans', []):
+            walk(child, sorting)
+
+    walk(doc[0]['Plan'], False)
+    cursor.connection.rollback()
+    return plan
+
+
+EXPLAINERS = {'sqlite': _explain_sqlite, 'mysql': _explain_mysql, 'postgres': _explain_postgres}
+
+
+def _row_count(cursor, dialect, table):
+    # EXPLAIN 没有给出行数估计时读取表的行数估计；读不到则返回 None
+    try:
+        if dialect == 'sqlite':
+            # 用最大 rowid 近似行数，只需在 B 树上走一条路径
+            cursor.execute(f'SELECT MAX(rowid) FROM {quote_ident(table, dialect)}')
+        elif dialect == 'mysql':
+            cursor.execute('SELECT TABLE_ROWS FROM information_schema.TABLES '
+                           'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s', (table,))
+        else:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+                           (quote_ident(table, dialect),))
+        row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+    except Exception:
+        return None
+
+
+def _existing_indexes(cursor, dialect, table):
+    """
+    :return: 表上各索引（含主键）的列，[(列小写, ...)]
+    """
+    indexes = {}
+    if dialect == 'sqlite':
+        cursor.execute(f"PRAGMA table_info({quote_ident(table, dialect)})")
+        pks = sorted((r[5], r[1]) for r in cursor.fetchall() if r[5])
+        if pks:
+            indexes['PRIMARY'] = [name for _, name in pks]
+        cursor.execute(f"PRAGMA index_list({quote_ident(table, dialect)})")
+        for name in [r[1] for r in cursor.fetchall()]:
+            cursor.execute(f"PRAGMA index_info({quote_ident(name, dialect)})")
+            indexes[name] = [r[2] or '' for r in sorted(cursor.fetchall())]
+    elif dialect == 'mysql':
+        cursor.execute(f'SHOW INDEX FROM {quote_ident(table, dialect)}')
+        desc = [d[0] for d in cursor.description]
+        for row in sorted((dict(zip(desc, r)) for r in cursor.fetchall()), key=lambda r: r['Seq_in_index']):
+            indexes.setdefault(row['Key_name'], []).append(row['Column_name'] or '')
+    else:
+        cursor.execute('''
+            SELECT i.indexrelid, array_position(i.indkey, a.attnum), a.attname FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+            WHERE i.indrelid = to_regclass(%s)''', (quote_ident(table, dialect),))
+        for index, _, column in sorted(cursor.fetchall()):
+            indexes.setdefault(index, []).append(column)
+        cursor.connection.rollback()
+    return [tuple(c.lower() for c in columns) for columns in indexes.values()]
+
+
+def index_name(table, columns):
+    name = re.sub(r'\W+', '_', f"idx_{table}_{'_'.join(columns)}").lower()
+    return name[:60]
+
+
+def create_index_sql(table, columns, dialect):
+    cols = ', '.join(quote_ident(c, dialect) for c in columns)
+    return f'CREATE INDEX {quote_ident(index_name(table, columns), dialect)} ON {quote_ident(table, dialect)} ({cols})'
+
+
+def advise(conn, entries, progress_callback=None, cancel_event=None):
+    """
+    分析语句并生成索引建议（在后台线程中调用）
+    :param entries: workload_of(conn) 的结果
+    :return: (建议列表（按得分从高到低），无法分析的语句 [(sql, 原因)])
+    """
+    dialect = dialect_of(conn)
+    explain = EXPLAINERS.get(dialect)
+    if explain is None:
+        raise ValueError(f'暂不支持该类型的索引分析: {conn["type"]}')
+    suggestions, skipped = {}, []
+    by_database = {}
+    for entry in entries:
+        by_database.setdefault(entry['database'], []).append(entry)
+    done = 0
+    for database, group in by_database.items():
+        client = create_client(conn, database=database)
+        meta = create_client(conn, database=database)  # get_table_schema 会自行连接、关闭，不能与 EXPLAIN 共用
+        columns_cache, indexes_cache, rows_cache = {}, {}, {}
+
+        def columns_of(table):
+            if table not in columns_cache:
+                schema = meta.get_table_schema(table)
+                columns_cache[table] = {(c.get('Field') or c.get('name') or '').lower() for c in schema}
+            return columns_cache[table]
+
+        try:
+            cursor = client.connect().cursor()
+            for entry in group:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise RuntimeError('分析已取消')
+                done += 1
+                if progress_callback:
+                    progress_callback(done)
+                parsed = parse_statement(entry['sql'])
+                candidates = candidate_indexes(parsed, columns_of)
+                if not candidates:
+                    continue
+                try:
+                    # EXPLAIN 输出中的表可能是别名，统一换成表名
+                    plan = {parsed['tables'].get(t, t).lower(): step
+                            for t, step in explain(cursor, entry['sql'], entry['params']).items()}
+                except Exception as e:
+                    skipped.append((entry['sql'], f'EXPLAIN 失败: {e}'))
+                    if dialect == 'postgres':
+                        client.conn.rollback()
+                    continue
+                for table, (columns, ordered) in candidates.items():
+                    step = plan.get(table.lower())
+                    if step is None or not (step['full_scan'] or (step['sort'] and ordered)):
+                        continue  # 已经走索引，或者候选索引解决不了排序
+                    if table not in indexes_cache:
+                        indexes_cache[table] = _existing_indexes(cursor, dialect, table)
+                    wanted = tuple(c.lower() for c in columns)
+                    if any(index[:len(wanted)] == wanted for index in indexes_cache[table]):
+                        continue  # 已有以这些列开头的索引
+                    if step['full_scan'] and any(index[:1] == wanted[:1] for index in indexes_cache[table]):
+                        continue  # 首列已有索引但优化器仍选择全表扫描，多半是选择性太低
+                    rows = step['rows']
+                    if rows is None:
+                        if table not in rows_cache:
+                            rows_cache[table] = _row_count(cursor, dialect, table)
+                        rows = rows_cache[table]
+                    key = (database, table, tuple(columns))
+                    s = suggestions.setdefault(key, {
+                        'database': database, 'table': table, 'columns': columns,
+                        'sql': create_index_sql(table, columns, dialect), 'reasons': set(),
+                        'count': 0, 'total_ms': 0.0, 'rows': rows, 'statements': []})
+                    s['reasons'].add('全表扫描' if step['full_scan'] else '额外排序')
+                    s['count'] += entry['count']
+                    avg_ms = entry['total_ms'] / entry['timed'] if entry['timed'] else 1.0
+                    s['total_ms'] += avg_ms * entry['count']
+                    s['statements'].append((entry['sql'], entry['params']))
+        finally:
+            client.close()
+            meta.close()
+    # 候选 (a) 是另一个候选 (a, b) 的前缀时，(a, b) 同样能服务这些查询，合并到较长的那个
+    for key in sorted(suggestions, key=lambda k: len(k[2])):
+        database, table, columns = key
+        longer = [s for k, s in suggestions.items()
+                  if k[:2] == (database, table) and len(k[2]) > len(columns) and k[2][:len(columns)] == columns]
+        if longer:
+            s, target = suggestions.pop(key), longer[0]
+            target['reasons'] |= s['reasons']
+            target['count'] += s['count']
+            target['total_ms'] += s['total_ms']
+            target['statements'] += s['statements']
+    result = []
+    for s in suggestions.values():
+        s['score'] = s['total_ms'] * math.log10(max(s['rows'] or 0, 10))
+        s['reasons'] = '、'.join(sorted(s['reasons']))
+        result.append(s)
+    result.sort(key=lambda s: s['score'], reverse=True)
+    return result, skipped
+
+
+def measure(conn, database, statements, repeat=3, cancel_event=None):
+    """
+    重新执行语句测量耗时（只执行 SELECT / WITH），读取全部结果行
+    :param statements: [(sql, params)]
+    :return: 各语句耗时的中位数（毫秒），跳过的语句为 None
+    """
+    timings = []
+    client = create_client(conn, database=database)
+    try:
+        for sql, params in statements:
+            if not re.match(r'\s*(SELECT|WITH)\b', sql, re.I):
+                timings.append(None)
+                continue
+            samples = []
+            for _ in range(repeat):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise RuntimeError('测量已取消')
+                cursor = client.stream_cursor()
+                started = time.perf_counter()
+                # 编辑器中的语句没有参数：不能传空元组，pymysql / psycopg2 仍会做 % 格式化，LIKE 'a%' 之类的字面量会报错
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                while cursor.fetchmany(5000):
+                    pass
+                samples.append((time.perf_counter() - started) * 1000)
+                cursor.close()
+            timings.append(statistics.median(samples))
+    finally:
+        client.close()
+    return timings
+
+
+def create_indexes(conn, suggestions):
+    """
+    依次执行建议中的 CREATE INDEX，返回 [(建议, 错误或 None)]
+    """
+    outcome = []
+    for s in suggestions:
+        client = create_client(conn, database=s['database'])
+        try:
+            dbconn = client.connect()
+            cursor = dbconn.cursor()
+            cursor.execute(s['sql'])
+            dbconn.commit()
+            outcome.append((s, None))
+        except Exception as e:
+            outcome.append((s, e))
+        finally:
+            client.close()
+    return outcome
@@ -0,0 +1,184 @@
+import os
+import re
+from db.client_factory import create_client, driver_of, CAP_READ_POOL
+from db.export_writers import quote_ident
+from db.query_builder import build_where
+
+# 大字段（TEXT/BLOB/JSON 等）延迟读取：
+# - 翻页时只取前 PREFIX_LENGTH 个字符（二进制列为字节）和值的字节数，不把整个值传到客户端
+# - 查看详情时按主键单独读取完整值（最多 DETAIL_LIMIT），保存到文件时按 CHUNK_SIZE 分段读取、边读边写
+# 截取时多取一个字符，取到的长度超过限制即说明值被截断，不需要再按字符计算总长度
+# （SQLite 的 length() 对文本要逐字符扫描，转为 BLOB 后取字节数则很快）
+
+PREFIX_LENGTH = 256
+DETAIL_LIMIT = 16 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+KIND_TEXT = 'text'
+KIND_BINARY = 'binary'
+
+# 按方言列出视为大字段的类型（小写、去掉长度等修饰后的类型名）
+_LARGE_TYPES = {
+    'mysql': {'text': KIND_TEXT, 'mediumtext': KIND_TEXT, 'longtext': KIND_TEXT, 'json': KIND_TEXT,
+              'blob': KIND_BINARY, 'mediumblob': KIND_BINARY, 'longblob': KIND_BINARY},
+    'postgres': {'text': KIND_TEXT, 'json': KIND_TEXT, 'jsonb': KIND_TEXT, 'xml': KIND_TEXT, 'bytea': KIND_BINARY},
+}
+
+
+def _sqlite_kind(type_name):
+    # SQLite 按声明类型中的关键字确定亲和性，VARCHAR 等短文本类型不算
+    if 'BLOB' in type_name.upper():
+        return KIND_BINARY
+    if re.search(r'TEXT|CLOB', type_name, re.I):
+        return KIND_TEXT
+    return None
+
+
+def large_columns(schema, dialect):
+    """
+    从 get_table_schema 的结果中找出大字段
+    :return: {列名: KIND_TEXT/KIND_BINARY}，按表中列的顺序
+    """
+    result = {}
+    for col in schema or []:
+        name = col.get('Field', col.get('name'))
+        type_name = str(col.get('Type', col.get('type')) or '')
+        if dialect == 'sqlite':
+            kind = _sqlite_kind(type_name)
+        else:
+            base = re.split(r'[\s(]', type_name.strip().lower(), 1)[0]
+            kind = _LARGE_TYPES.get(dialect, {}).get(base)
+        if name and kind:
+            result[name] = kind
+    return result
+
+
+def _substr(column, kind, dialect, start, length):
+    col = quote_ident(column, dialect)
+    start, length = int(start), int(length)
+    if dialect == 'postgres':
+        if kind == KIND_BINARY:
+            return f'substring({col} FROM {start} FOR {length})'
+        return f'substr({col}::text, {start}, {length})'
+    if dialect == 'mysql':
+        return f'SUBSTRING({col}, {start}, {length})'
+    return f'substr({col}, {start}, {length})'
+
+
+def _size(column, kind, dialect):
+    # 值的字节数
+    col = quote_ident(column, dialect)
+    if dialect == 'postgres':
+        return f'octet_length({col})' if kind == KIND_BINARY else f'octet_length({col}::text)'
+    if dialect == 'mysql':
+        return f'LENGTH({col})'
+    return f'length(CAST({col} AS BLOB))'
+
+
+def size_header(column):
+    return f'{column}__size'
+
+
+def is_truncated(value, limit=PREFIX_LENGTH):
+    return value is not None and len(value) > limit
+
+
+def select_list(columns, large, dialect, prefix=PREFIX_LENGTH):
+    """
+    分页查询的列清单：大字段只取前缀（多取一个字符用于判断是否截断），所有大字段的字节数依次追加在最后
+    :param columns: 表的全部列名（顺序与表头一致）
+    :param large: large_columns 的结果
+    """
+    items = []
+    for column in columns:
+        if column in large:
+            expr = _substr(column, large[column], dialect, 1, prefix + 1)
+            items.append(f'{expr} AS {quote_ident(column, dialect)}')
+        else:
+            items.append(quote_ident(column, dialect))
+    for column in columns:
+        if column in large:
+            items.append(f'{_size(column, large[column], dialect)} AS {quote_ident(size_header(column), dialect)}')
+    return ', '.join(items)
+
+
+def _cursor(client, conn):
+    return client.stream_cursor() if driver_of(conn).supports(CAP_READ_POOL) else client.connect().cursor()
+
+
+def _select_part(cursor, table_name, column, kind, dialect, key, start, length):
+    where, params = build_where([(pk, '=', value) for pk, value in key.items()], dialect)
+    sql = f'SELECT {_substr(column, kind, dialect, start, length)} FROM {quote_ident(table_name, dialect)}{where}'
+    cursor.execute(sql, params)
+    row = cursor.fetchone()
+    if row is None:
+        raise LookupError(f'未找到该行，可能已被删除: {key}')
+    value = row[0]
+    return bytes(value) if isinstance(value, memoryview) else value
+
+
+def read_value(conn, table_name, column, kind, key, limit=DETAIL_LIMIT):
+    """
+    按主键读取一个大字段的值（后台线程中调用）
+    :param key: {主键列: 值}
+    :param limit: 最多读取的长度（字符数，二进制为字节数）
+    :return: (值, 字节数, 是否完整)
+    """
+    dialect = driver_of(conn).dialect
+    client = create_client(conn)
+    try:
+        cursor = _cursor(client, conn)
+        where, params = build_where([(pk, '=', value) for pk, value in key.items()], dialect)
+        cursor.execute(f'SELECT {_size(column, kind, dialect)} FROM {quote_ident(table_name, dialect)}{where}',
+                       params)
+        row = cursor.fetchone()
+        if row is None:
+            raise LookupError(f'未找到该行，可能已被删除: {key}')
+        size = row[0]
+        if size is None:
+            return None, None, True
+        # 字符数不会超过字节数，字节数不超过限制时一次读完
+        value = _select_part(cursor, table_name, column, kind, dialect, key, 1, min(size, limit + 1))
+        if is_truncated(value, limit):
+            return value[:limit], size, False
+        return value, size, True
+    finally:
+        client.close()
+
+
+def save_value(conn, table_name, column, kind, key, path, chunk_size=CHUNK_SIZE, progress_callback=None,
+               cancel_event=None):
+    """
+    分段读取大字段并写入文件，内存中只保留一段；文本按 UTF-8 写出
+    :return: 写出的字节数
+    """
+    dialect = driver_of(conn).dialect
+    client = create_client(conn)
+    written = 0
+    try:
+        cursor = _cursor(client, conn)
+        with open(path, 'wb') as f:
+            start = 1
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise InterruptedError('已取消')
+                part = _select_part(cursor, table_name, column, kind, dialect, key, start, chunk_size)
+                if not part:
+                    break
+                data = part.encode('utf-8') if isinstance(part, str) else bytes(part)
+                f.write(data)
+                written += len(data)
+                if progress_callback is not None:
+                    progress_callback(written)
+                if len(part) < chunk_size:
+                    break
+                start += chunk_size
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    finally:
+        client.close()
+    return written
@@ -1,12 +1,14 @@
 import pymysql
+import pymysql.cursors
 
 class MySQLClient:
-    def __init__(self, host, port, user, password, database):
+    def __init__(self, host, port, user, password, database, connect_timeout=10):
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
+        self.connect_timeout = connect_timeout
         self.conn = None
 
     def connect(self):
@@ -16,15 +18,29 @@ class MySQLClient:
             user=self.user,
             password=self.password,
             database=self.database,
-            charset='utf8mb4'
+            charset='utf8mb4',
+            connect_timeout=self.connect_timeout
         )
         return self.conn
 
+    def stream_cursor(self):
+        # 无缓冲游标：结果逐批从服务器读取，不在客户端整体缓存
+        if not self.conn:
+            self.connect()
+        return self.conn.cursor(pymysql.cursors.SSCursor)
+
     def close(self):
         if self.conn:
             self.conn.close()
             self.conn = None
 
+    def ping(self):
+        self.conn.ping(reconnect=False)
+
+    def select_database(self, database):
+        self.conn.select_db(database)
+        self.database = database
+
     def test_connection(self):
         try:
             conn = self.connect()
@@ -35,7 +51,8 @@ class MySQLClient:
 
     def get_tables(self):
         try:
-            conn = self.connect()
+            # 已连接（如健康监控预热的连接）时直接复用
+            conn = self.conn or self.connect()
             with conn.cursor() as cursor:
                 cursor.execute("SHOW TABLES")
                 tables = [row[0] for row in cursor.fetchall()]
@@ -57,6 +74,55 @@ class MySQLClient:
         except Exception as e:
             return []
 
+    def get_indexed_columns(self, table_name):
+        """
+        返回作为某个索引首列的字段名集合（按该列排序/筛选时可以走索引）
+        """
+        try:
+            conn = self.connect()
+            with conn.cursor() as cursor:
+                cursor.execute(f"SHOW INDEX FROM `{table_name}`")
+                desc = [d[0] for d in cursor.description]
+                rows = [dict(zip(desc, row)) for row in cursor.fetchall()]
+            self.close()
+            return {r['Column_name'] for r in rows if r['Seq_in_index'] == 1 and r['Column_name']}
+        except Exception as e:
+            return set()
+
+    def get_primary_keys(self, table_name):
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"SHOW KEYS FROM `{table_name}` WHERE Key_name = 'PRIMARY'")
+                return [row[4] for row in cursor.fetchall()]
+        finally:
+            self.close()
+
+    def estimate_rows(self, table_name):
+        """
+        information_schema.TABLES 中的行数估计（InnoDB 为采样统计值）；视图等没有统计信息时返回 None
+        """
+        conn = self.conn or self.connect()
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT TABLE_ROWS FROM information_schema.TABLES '
+                           'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s', (table_name,))
+            row = cursor.fetchone()
+        if row is None or row[0] is None:
+            return None
+        return int(row[0])
+
+    def cancel(self):
+        # 另开一个连接执行 KILL QUERY，中断本连接上正在执行的语句
+        if self.conn is None:
+            return
+        killer = MySQLClient(self.host, self.port, self.user, self.password, self.database,
+                             connect_timeout=self.connect_timeout)
+        try:
+            with killer.connect().cursor() as cursor:
+                cursor.execute(f'KILL QUERY {int(self.conn.thread_id())}')
+        finally:
+            killer.close()
+
     def get_databases(self):
         try:
             conn = self.connect()
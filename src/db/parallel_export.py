@@ -0,0 +1,216 @@
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import signal
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from db.client_factory import create_client, dialect_of
+from db.export_writers import open_export_writer, export_cursor, quote_ident, export_path_suffix
+from db.query_builder import placeholder_of
+
+# 按整型主键范围切分的并行导出：
+# 每个工作进程使用独立连接导出一个 [lo, hi) 区间到分片文件，
+# 最后按顺序拼接（gzip/bz2/xz 均支持多段流直接拼接），或保留为分片
+
+# 整数类型（MySQL / PostgreSQL / SQLite 常见写法），只比较去掉长度和 UNSIGNED 等修饰后的类型名；
+# 不能用 'int' in 类型名判断，point / multipoint / interval 也含有 int
+SAMPLE_ROWS = 20000  # 'sample' 方式抽取的主键数
+
+_INTEGER_TYPES = {'int', 'integer', 'tinyint', 'smallint', 'mediumint', 'bigint', 'int2', 'int4', 'int8',
+                  'serial', 'smallserial', 'bigserial'}
+
+
+def is_integer_type(type_name):
+    words = [w for w in re.split(r'[\s(]+', str(type_name or '').lower()) if w and w != 'unsigned']
+    if words[:2] == ['big', 'int']:
+        return True  # SQLite 的 UNSIGNED BIG INT
+    return bool(words) and words[0] in _INTEGER_TYPES
+
+
+def find_integer_pk(conn, table_name, database=None):
+    """
+    返回可用于范围切分的整型主键列名；SQLite 表无整型主键时退化为 rowid。
+    找不到时返回 None。
+    """
+    client = create_client(conn, database=database)
+    schema = client.get_table_schema(table_name)
+    # get_table_schema 有两种格式：SHOW FULL COLUMNS 风格（Field/Type/Key）和 PRAGMA table_info 风格（name/type/pk）
+    pks = [(c.get('Field', c.get('name')), str(c.get('Type', c.get('type')) or ''))
+           for c in schema if c.get('Key') == 'PRI' or c.get('pk')]
+    if len(pks) == 1 and is_integer_type(pks[0][1]):
+        return pks[0][0]
+    if not pks and dialect_of(conn) == 'sqlite':
+        return 'rowid'
+    return None
+
+
+def _sample_keys(cursor, dialect, table, col, total):
+    """
+    随机抽取约 SAMPLE_ROWS 个主键值（已排序），不对整表排序：
+    PostgreSQL 用 TABLESAMPLE 按页抽样，MySQL / SQLite 按随机数过滤，只有抽中的主键传回客户端
+    """
+    fraction = min(1.0, SAMPLE_ROWS / total)
+    if dialect == 'postgres':
+        sql = f'SELECT {col} FROM {table} TABLESAMPLE SYSTEM ({fraction * 100:.6f})'
+    elif dialect == 'mysql':
+        sql = f'SELECT {col} FROM {table} WHERE RAND() < {fraction:.6f}'
+    else:
+        sql = f'SELECT {col} FROM {table} WHERE abs(random() % 1000000) < {int(fraction * 1000000)}'
+    cursor.execute(sql)
+    return sorted(row[0] for row in cursor.fetchall())
+
+
+def plan_partitions(conn, table_name, pk, partitions, strategy='minmax', database=None):
+    """
+    切分主键区间，返回 [(lo, hi), ...]，区间左闭右开，最后一个区间 hi 为 None 表示无上界。
+    :param strategy: 'minmax' 按最小/最大值等分；'sample' 按抽样主键的分位点等分行数（适合分布不均的主键）
+    """
+    dialect = dialect_of(conn)
+    table = quote_ident(table_name, dialect)
+    col = pk if pk == 'rowid' else quote_ident(pk, dialect)
+    client = create_client(conn, database=database)
+    try:
+        cursor = client.connect().cursor()
+        cursor.execute(f'SELECT MIN({col}), MAX({col}), COUNT(*) FROM {table}')
+        lo, hi, total = cursor.fetchone()
+        if lo is None:
+            return []
+        partitions = max(1, min(partitions, total))
+        sample = _sample_keys(cursor, dialect, table, col, total) if strategy == 'sample' and partitions > 1 else []
+        if len(sample) >= partitions:
+            bounds = [lo]
+            for i in range(1, partitions):
+                key = sample[i * len(sample) // partitions]
+                if key > bounds[-1]:
+                    bounds.append(key)
+        else:
+            # 按最小/最大值等分（抽样过少时同样退回此方式）
+            width = max(1, (hi - lo + 1) // partitions)
+            bounds = [lo + i * width for i in range(partitions)]
+        if dialect == 'postgres':
+            client.conn.rollback()
+    finally:
+        client.close()
+    return [(bounds[i], bounds[i + 1] if i + 1 < len(bounds) else None) for i in range(len(bounds))]
+
+
+def part_path(path, index, fmt, compression):
+    suffix = export_path_suffix(fmt, compression)
+    base = path[:-len(suffix)] if path.endswith(suffix) else path
+    return f'{base}.part{index + 1:03d}{suffix}'
+
+
+def export_partition(conn, table_name, pk, lo, hi, path, fmt, compression, index, progress_queue=None,
+                     database=None):
+    # 在子进程中执行，参数必须可序列化；先报告进程号，取消时由主进程结束该进程
+    if progress_queue is not None:
+        progress_queue.put(('pid', os.getpid()))
+    dialect = dialect_of(conn)
+    col = pk if pk == 'rowid' else quote_ident(pk, dialect)
+    placeholder = placeholder_of(dialect)
+    where = f'{col} >= {placeholder}'
+    params = [lo]
+    if hi is not None:
+        where += f' AND {col} < {placeholder}'
+        params.append(hi)
+    client = create_client(conn, database=database)
+    try:
+        cursor = client.stream_cursor()
+        cursor.execute(f'SELECT * FROM {quote_ident(table_name, dialect)} WHERE {where} ORDER BY {col}', params)
+        headers = [d[0] for d in cursor.description]
+        writer = open_export_writer(path, fmt, headers, compression, table_name=table_name,
+                                    dialect=dialect, header=(index == 0))
+        try:
+            def report(count):
+                if progress_queue is not None:
+                    progress_queue.put((index, count, False))
+            count = export_cursor(cursor, writer, progress_callback=report)
+        finally:
+            writer.close()
+    finally:
+        client.close()
+    if progress_queue is not None:
+        progress_queue.put((index, count, True))
+    return count
+
+
+def parallel_export(conn, table_name, path, fmt='csv', compression='', workers=4, strategy='minmax',
+                    keep_shards=False, database=None, progress_callback=None, cancel_event=None):
+    """
+    并行导出整张表。
+    :param database: 表所在的库，None 时使用连接配置中的库
+    :param progress_callback: 回调参数为 {'partition': 序号, 'rows': 已写行数, 'done': 是否完成, 'partitions': 分区数}
+    :return: (总行数, 输出文件列表)
+    """
+    pk = find_integer_pk(conn, table_name, database)
+    if pk is None:
+        raise ValueError(f'表[{table_name}]没有单列整型主键，无法并行导出')
+    ranges = plan_partitions(conn, table_name, pk, workers, strategy, database)
+    if not ranges:
+        ranges = [(0, None)]
+    paths = [part_path(path, i, fmt, compression) for i in range(len(ranges))]
+    manager = multiprocessing.Manager()
+    progress_queue = manager.Queue()
+    worker_pids = set()
+    total = 0
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(ranges)))
+    try:
+        pending = {
+            pool.submit(export_partition, conn, table_name, pk, lo, hi, paths[i], fmt, compression, i, progress_queue,
+                        database)
+            for i, (lo, hi) in enumerate(ranges)
+        }
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            if cancel_event is not None and cancel_event.is_set():
+                # 未开始的分区直接取消，正在导出的分区进程立即结束（见下方），分片文件统一删除
+                raise RuntimeError('导出已取消')
+            for future in done:
+                total += future.result()
+            _drain_progress(progress_queue, len(ranges), progress_callback, worker_pids)
+        _drain_progress(progress_queue, len(ranges), progress_callback, worker_pids)
+        pool.shutdown()
+    except BaseException:
+        _drain_progress(progress_queue, len(ranges), None, worker_pids)
+        pool.shutdown(wait=False, cancel_futures=True)
+        _kill_workers(worker_pids)
+        for p in paths:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        raise
+    finally:
+        manager.shutdown()
+    if keep_shards:
+        return total, paths
+    with open(path, 'wb') as out:
+        for p in paths:
+            with open(p, 'rb') as f:
+                shutil.copyfileobj(f, out, 1024 * 1024)
+            os.remove(p)
+    return total, [path]
+
+
+def _kill_workers(pids):
+    # 进程池没有公开的终止接口，按各分区报告的进程号结束仍在导出的工作进程
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass  # 已退出
+
+
+def _drain_progress(progress_queue, partitions, progress_callback, worker_pids):
+    while True:
+        try:
+            message = progress_queue.get_nowait()
+        except queue.Empty:
+            return
+        if message[0] == 'pid':
+            worker_pids.add(message[1])
+            continue
+        index, count, done = message
+        if progress_callback:
+            progress_callback({'partition': index, 'rows': count, 'done': done, 'partitions': partitions})
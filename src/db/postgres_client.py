@@ -0,0 +1,291 @@
+import itertools
+import re
+import psycopg2
+
+# PostgreSQL 客户端，接口与 MySQLClient / SQLiteClient 相同，另外：
+# - stream_cursor 使用命名（服务器端）游标，浏览/导出大表时按批从服务器读取
+# - copy_to / copy_from 使用 COPY ... TO STDOUT / FROM STDIN 导出导入 CSV，比逐行 INSERT/SELECT 快得多
+# - estimate_rows 读取 pg_class.reltuples，无需 COUNT(*) 扫表即可得到行数估计
+# 表名为当前 search_path 第一个模式（通常是 public）中的表
+
+STREAM_ITERSIZE = 5000
+_cursor_ids = itertools.count(1)
+
+
+def quote_pg(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class StreamCursor:
+    """
+    命名游标的包装：
+    - 命名游标只能用于查询，其他语句改用普通游标执行
+    - 命名游标在第一次取数前没有 description，execute 后先取一批，调用方可以立即读取列名
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._cursor = None
+        self._buffer = []
+
+    def execute(self, sql, params=None):
+        if re.match(r'\s*(SELECT|WITH|VALUES|TABLE)\b', sql, re.I):
+            self._cursor = self.conn.cursor(name=f'dbtool_stream_{next(_cursor_ids)}')
+            self._cursor.itersize = STREAM_ITERSIZE
+            self._cursor.execute(sql, params)
+            self._buffer = self._cursor.fetchmany(STREAM_ITERSIZE)
+        else:
+            self._cursor = self.conn.cursor()
+            self._cursor.execute(sql, params)
+            self._buffer = []
+
+    @property
+    def description(self):
+        return self._cursor.description if self._cursor is not None else None
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount if self._cursor is not None else -1
+
+    def fetchmany(self, size=STREAM_ITERSIZE):
+        if self._buffer:
+            rows, self._buffer = self._buffer[:size], self._buffer[size:]
+            if len(rows) < size:
+                rows += self._cursor.fetchmany(size - len(rows))
+            return rows
+        return self._cursor.fetchmany(size)
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchall(self):
+        rows, self._buffer = self._buffer, []
+        return rows + self._cursor.fetchall()
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany()
+            if not rows:
+                return
+            yield from rows
+
+    def close(self):
+        if self._cursor is not None:
+            self._cursor.close()
+
+
+class PostgresClient:
+    def __init__(self, host, port, user, password, database, connect_timeout=10):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database or 'postgres'
+        self.connect_timeout = connect_timeout
+        self.conn = None
+
+    def connect(self):
+        self.conn = psycopg2.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            dbname=self.database,
+            connect_timeout=self.connect_timeout
+        )
+        self.conn.set_client_encoding('UTF8')
+        return self.conn
+
+    def stream_cursor(self):
+        # 命名游标在服务器端保存结果，每次取一批；需要在事务中使用，关闭连接时一并释放
+        if not self.conn:
+            self.connect()
+        return StreamCursor(self.conn)
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def ping(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        self.conn.rollback()
+
+    def cancel(self):
+        # psycopg2 的 cancel 可在其他线程调用，向服务器发送取消请求
+        if self.conn is not None:
+            self.conn.cancel()
+
+    def test_connection(self):
+        try:
+            conn = self.connect()
+            self.close()
+            return True, '连接成功'
+        except Exception as e:
+            return False, f'连接失败: {e}'
+
+    def get_tables(self):
+        try:
+            conn = self.conn or self.connect()
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT tablename FROM pg_catalog.pg_tables "
+                               "WHERE schemaname = current_schema() ORDER BY tablename")
+                tables = [row[0] for row in cursor.fetchall()]
+            self.close()
+            return tables
+        except Exception as e:
+            return []
+
+    def get_databases(self):
+        try:
+            conn = self.connect()
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT datname FROM pg_catalog.pg_database "
+                               "WHERE NOT datistemplate AND datallowconn ORDER BY datname")
+                dbs = [row[0] for row in cursor.fetchall()]
+            self.close()
+            return dbs
+        except Exception as e:
+            return []
+
+    def get_table_schema(self, table_name):
+        """
+        返回字段名、类型、可空、主键、默认值、注释，键名与 MySQL 的 SHOW FULL COLUMNS 一致
+        """
+        try:
+            conn = self.connect()
+            with conn.cursor() as cursor:
+                cursor.execute('''
+                    SELECT a.attname AS "Field",
+                           format_type(a.atttypid, a.atttypmod) AS "Type",
+                           CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END AS "Null",
+                           CASE WHEN EXISTS (SELECT 1 FROM pg_index i WHERE i.indrelid = a.attrelid
+                                             AND i.indisprimary AND a.attnum = ANY(i.indkey))
+                                THEN 'PRI' ELSE '' END AS "Key",
+                           pg_get_expr(d.adbin, d.adrelid) AS "Default",
+                           col_description(a.attrelid, a.attnum) AS "Comment"
+                    FROM pg_attribute a
+                    LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+                    WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped
+                    ORDER BY a.attnum''', (quote_pg(table_name),))
+                desc = [d[0] for d in cursor.description]
+                columns = cursor.fetchall()
+            self.close()
+            return [dict(zip(desc, col)) for col in columns]
+        except Exception as e:
+            return []
+
+    def get_primary_keys(self, table_name):
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('''
+                    SELECT a.attname FROM pg_index i
+                    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                    WHERE i.indrelid = to_regclass(%s) AND i.indisprimary
+                    ORDER BY array_position(i.indkey, a.attnum)''', (quote_pg(table_name),))
+                return [row[0] for row in cursor.fetchall()]
+        finally:
+            self.close()
+
+    def get_indexed_columns(self, table_name):
+        """
+        返回作为某个索引首列的字段名集合
+        """
+        try:
+            conn = self.connect()
+            with conn.cursor() as cursor:
+                cursor.execute('''
+                    SELECT a.attname FROM pg_index i
+                    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+                    WHERE i.indrelid = to_regclass(%s)''', (quote_pg(table_name),))
+                columns = {row[0] for row in cursor.fetchall()}
+            self.close()
+            return columns
+        except Exception as e:
+            return set()
+
+    def estimate_rows(self, table_name):
+        """
+        pg_class.reltuples 中的行数估计（由 ANALYZE/VACUUM 更新）；从未分析过的表返回 None
+        """
+        conn = self.conn or self.connect()
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', (quote_pg(table_name),))
+            row = cursor.fetchone()
+        conn.rollback()
+        if row is None or row[0] is None or row[0] < 0:
+            return None
+        return int(row[0])
+
+    def copy_to(self, table_name, fileobj, header=True):
+        """
+        用 COPY TO STDOUT 把整张表以 CSV 写入 fileobj（二进制写入对象），返回行数
+        """
+        conn = self.conn or self.connect()
+        with conn.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote_pg(table_name)} TO STDOUT WITH (FORMAT csv, HEADER {'true' if header else 'false'}, "
+                "ENCODING 'UTF8')", fileobj)
+            count = cursor.rowcount
+        conn.rollback()
+        return count
+
+    def copy_from(self, table_name, fileobj, columns, header=True):
+        """
+        用 COPY FROM STDIN 把 CSV 数据导入表，整个导入在一个事务中，返回行数
+        :param columns: CSV 中各列对应的字段名
+        """
+        conn = self.conn or self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cols = ', '.join(quote_pg(c) for c in columns)
+                cursor.copy_expert(
+                    f"COPY {quote_pg(table_name)} ({cols}) FROM STDIN WITH (FORMAT csv, HEADER {'true' if header else 'false'}, "
+                    "ENCODING 'UTF8')", fileobj)
+                count = cursor.rowcount
+            conn.commit()
+            return count
+        except Exception:
+            conn.rollback()
+            raise
+
+    def insert_row(self, table, headers, values):
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cols = ','.join(quote_pg(h) for h in headers)
+                placeholders = ','.join(['%s'] * len(values))
+                sql = f"INSERT INTO {quote_pg(table)} ({cols}) VALUES ({placeholders})"
+                cursor.execute(sql, values)
+            conn.commit()
+        finally:
+            self.close()
+
+    def update_row(self, table, col, value, pk_dict):
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                set_part = f'{quote_pg(col)}=%s'
+                where_part = ' AND '.join(f'{quote_pg(k)}=%s' for k in pk_dict)
+                sql = f"UPDATE {quote_pg(table)} SET {set_part} WHERE {where_part}"
+                params = [value] + [pk_dict[k] for k in pk_dict]
+                cursor.execute(sql, params)
+            conn.commit()
+        finally:
+            self.close()
+
+    def delete_row(self, table, pk_dict):
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                where_part = ' AND '.join(f'{quote_pg(k)}=%s' for k in pk_dict)
+                sql = f"DELETE FROM {quote_pg(table)} WHERE {where_part}"
+                params = [pk_dict[k] for k in pk_dict]
+                cursor.execute(sql, params)
+            conn.commit()
+        finally:
+            self.close()
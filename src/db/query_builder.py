@@ -0,0 +1,82 @@
+from db.export_writers import quote_ident
+
+# 表数据浏览的筛选/排序条件 → 参数化 SQL。
+# 列名只能来自表头并经过转义，值一律作为参数传入，不拼接进 SQL。
+FILTER_OPERATORS = ['=', '!=', '>', '>=', '<', '<=', 'LIKE', 'NOT LIKE', 'IN', 'IS NULL', 'IS NOT NULL']
+NO_VALUE_OPERATORS = ('IS NULL', 'IS NOT NULL')
+
+
+def placeholder_of(dialect):
+    return '?' if dialect == 'sqlite' else '%s'
+
+
+def build_where(filters, dialect='mysql'):
+    """
+    :param filters: [(列名, 运算符, 值), ...]，多个条件之间为 AND；IN 的值用逗号分隔
+    :return: (' WHERE ...' 或 '', 参数列表)
+    """
+    ph = placeholder_of(dialect)
+    parts, params = [], []
+    for column, op, value in filters or []:
+        op = op.upper()
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f'不支持的运算符: {op}')
+        col = quote_ident(column, dialect)
+        if op in NO_VALUE_OPERATORS:
+            parts.append(f'{col} {op}')
+        elif op == 'IN':
+            items = [v.strip() for v in str(value).split(',') if v.strip()]
+            if not items:
+                raise ValueError(f'[{column}] IN 条件至少需要一个值')
+            parts.append(f"{col} IN ({', '.join([ph] * len(items))})")
+            params.extend(items)
+        else:
+            parts.append(f'{col} {op} {ph}')
+            params.append(value)
+    if not parts:
+        return '', []
+    return ' WHERE ' + ' AND '.join(parts), params
+
+
+def build_order_by(order_by, dialect='mysql'):
+    """
+    :param order_by: (列名, 'ASC'/'DESC') 或 None
+    """
+    if not order_by:
+        return ''
+    column, direction = order_by
+    direction = 'DESC' if str(direction).upper() == 'DESC' else 'ASC'
+    return f' ORDER BY {quote_ident(column, dialect)} {direction}'
+
+
+def build_page_query(table_name, dialect, page, page_size, filters=None, order_by=None, columns=None):
+    """
+    :param columns: 查询的列清单（已转义的 SQL 片段），None 表示 *
+    :return: (分页查询SQL, 参数, 计数SQL, 参数)
+    """
+    table = quote_ident(table_name, dialect)
+    where, params = build_where(filters, dialect)
+    ph = placeholder_of(dialect)
+    select_sql = f'SELECT {columns or "*"} FROM {table}{where}{build_order_by(order_by, dialect)} LIMIT {ph} OFFSET {ph}'
+    count_sql = f'SELECT COUNT(*) FROM {table}{where}'
+    return select_sql, params + [page_size, (page - 1) * page_size], count_sql, list(params)
+
+
+def build_keyset_query(table_name, dialect, key_column, after, page_size, filters=None, direction='ASC',
+                       columns=None):
+    """
+    按主键翻页：WHERE key > 上一页最后一个值 ORDER BY key LIMIT n，
+    有主键索引时每页的开销与页码无关（OFFSET 需要扫过前面所有行）
+    :param after: 上一页最后一行的主键值，None 表示第一页
+    :return: (SQL, 参数)
+    """
+    table = quote_ident(table_name, dialect)
+    where, params = build_where(filters, dialect)
+    direction = 'DESC' if str(direction).upper() == 'DESC' else 'ASC'
+    ph = placeholder_of(dialect)
+    if after is not None:
+        cond = f"{quote_ident(key_column, dialect)} {'<' if direction == 'DESC' else '>'} {ph}"
+        where = f'{where} AND {cond}' if where else f' WHERE {cond}'
+        params = params + [after]
+    sql = f'SELECT {columns or "*"} FROM {table}{where}{build_order_by((key_column, direction), dialect)} LIMIT {ph}'
+    return sql, params + [page_size]
@@ -0,0 +1,201 @@
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from db.utils import data_path
+
+# 查询历史：保存在本地 SQLite 库中，用 FTS5 全文索引支持快速搜索。
+# 写入由后台线程批量完成，执行SQL的线程只需把记录放入队列，不等待磁盘IO。
+# 某一批写入失败（磁盘满、库被锁等）只记录日志并丢弃该批，写线程继续工作，flush 不会因此永远等待。
+
+HISTORY_FILE = data_path('query_history.db')
+FLUSH_TIMEOUT = 2  # 界面线程等待落盘的最长秒数
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS history (
+        id INTEGER PRIMARY KEY,
+        executed_at REAL NOT NULL,
+        connection TEXT,
+        database TEXT,
+        sql TEXT NOT NULL,
+        duration_ms REAL,
+        rows INTEGER,
+        status TEXT,
+        error TEXT,
+        favorite INTEGER NOT NULL DEFAULT 0
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_history_time ON history(executed_at)',
+    'CREATE INDEX IF NOT EXISTS idx_history_favorite ON history(favorite)',
+]
+_FTS_SCHEMA = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+        sql, connection, content='history', content_rowid='id', tokenize='unicode61'
+    )''',
+    '''CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN
+        INSERT INTO history_fts(rowid, sql, connection) VALUES (new.id, new.sql, new.connection);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN
+        INSERT INTO history_fts(history_fts, rowid, sql, connection) VALUES ('delete', old.id, old.sql, old.connection);
+    END''',
+]
+_COLUMNS = ['id', 'executed_at', 'connection', 'database', 'sql', 'duration_ms', 'rows', 'status', 'error', 'favorite']
+_STOP = object()
+
+
+def _fts_query(text):
+    # 每个词按前缀匹配，词之间为 AND；用双引号包裹避免用户输入被当作FTS语法
+    terms = re.findall(r'\w+', text)
+    return ' '.join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
+class QueryHistory:
+    def __init__(self, path=HISTORY_FILE, batch_size=200):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._read_conn = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            for sql in _SCHEMA:
+                conn.execute(sql)
+            try:
+                for sql in _FTS_SCHEMA:
+                    conn.execute(sql)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # 部分 SQLite 编译版本不带 FTS5，退化为 LIKE 搜索
+                self.has_fts = False
+            conn.commit()
+        finally:
+            conn.close()
+        self._thread = threading.Thread(target=self._writer, name='query-history-writer', daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _writer(self):
+        conn = None
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                # 把队列中已有的记录一次写入
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    if conn is None:
+                        conn = self._connect()
+                    self._write_batch(conn, batch)
+                except Exception:
+                    log.exception('写入查询历史失败，丢弃 %d 条', len(batch))
+                finally:
+                    # 无论成功与否都要标记完成，否则 flush / join 会一直等待
+                    for _ in batch:
+                        self._queue.task_done()
+                if any(i is _STOP for i in batch):
+                    return
+        finally:
+            if conn is not None:
+                conn.close()
+
+    @staticmethod
+    def _write_batch(conn, batch):
+        records = [i for i in batch if i is not _STOP and not callable(i)]
+        try:
+            if records:
+                conn.executemany(
+                    'INSERT INTO history (executed_at, connection, database, sql, duration_ms, rows, status, error) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', records)
+            for op in (i for i in batch if callable(i)):
+                # 单个操作失败只回滚该操作，不影响同批的记录
+                conn.execute('SAVEPOINT history_op')
+                try:
+                    op(conn)
+                except Exception:
+                    conn.execute('ROLLBACK TO history_op')
+                    log.exception('查询历史操作失败')
+                conn.execute('RELEASE history_op')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def record(self, sql, connection='', database=None, duration_ms=None, rows=None, status='ok', error=None):
+        """
+        记录一条执行过的语句（立即返回，由后台线程写入）
+        """
+        self._queue.put((time.time(), connection, database, sql, duration_ms, rows, status,
+                         str(error) if error is not None else None))
+
+    def set_favorite(self, entry_id, favorite=True):
+        self._queue.put(lambda conn: conn.execute('UPDATE history SET favorite = ? WHERE id = ?',
+                                                  (1 if favorite else 0, entry_id)))
+
+    def delete(self, entry_id):
+        self._queue.put(lambda conn: conn.execute('DELETE FROM history WHERE id = ?', (entry_id,)))
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        """
+        等待已提交的写入完成，最多等待 timeout 秒（界面线程调用，不能无限期阻塞）
+        :return: 是否已全部写入
+        """
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def search(self, text='', favorites_only=False, limit=200):
+        """
+        按关键字搜索（匹配SQL与连接名），按时间倒序。
+        id 随写入递增，按 rowid 倒序可让 FTS5 直接从最新的匹配开始读取，取够 limit 条即停止
+        :return: [dict(id, executed_at, connection, database, sql, duration_ms, rows, status, error, favorite)]
+        """
+        if self._read_conn is None:
+            self._read_conn = self._connect()
+        cols = ', '.join('h.' + c for c in _COLUMNS)
+        where, params = [], []
+        if favorites_only:
+            where.append('h.favorite = 1')
+        query = _fts_query(text or '')
+        if query and self.has_fts:
+            sql = (f'SELECT {cols} FROM history_fts f JOIN history h ON h.id = f.rowid '
+                   f"WHERE history_fts MATCH ?{''.join(' AND ' + w for w in where)} "
+                   'ORDER BY f.rowid DESC LIMIT ?')
+            params = [query, limit]
+        else:
+            if text and text.strip():
+                where.append('(h.sql LIKE ? OR h.connection LIKE ?)')
+                params += [f'%{text.strip()}%'] * 2
+            sql = (f"SELECT {cols} FROM history h{' WHERE ' + ' AND '.join(where) if where else ''} "
+                   'ORDER BY h.id DESC LIMIT ?')
+            params.append(limit)
+        return [dict(zip(_COLUMNS, row)) for row in self._read_conn.execute(sql, params)]
+
+    def count(self):
+        if self._read_conn is None:
+            self._read_conn = self._connect()
+        return self._read_conn.execute('SELECT COUNT(*) FROM history').fetchone()[0]
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+        if self._read_conn is not None:
+            self._read_conn.close()
+            self._read_conn = None
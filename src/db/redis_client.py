@@ -0,0 +1,244 @@
+import base64
+import json
+import redis
+
+# Redis 客户端：
+# - 键浏览只用 SCAN（MATCH/COUNT）增量遍历，从不使用 KEYS，键空间再大也不会阻塞服务器
+# - 类型、TTL、内存占用按批通过 pipeline 读取，一批键只需一次往返
+# - 批量删除（UNLINK）和导出同样按批走 pipeline
+# database 为库编号（0-15），未填写时为 0
+
+SCAN_COUNT = 1000
+PIPELINE_BATCH = 500
+PREVIEW_LIMIT = 200  # 预览集合类型时最多读取的元素数
+
+
+def _text(value):
+    # 导出为 JSON：能按 UTF-8 解码的按文本保存，否则保存 base64
+    if isinstance(value, bytes):
+        try:
+            return value.decode('utf-8')
+        except UnicodeDecodeError:
+            return {'base64': base64.b64encode(value).decode('ascii')}
+    return value
+
+
+def _display(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='backslashreplace')
+    return str(value)
+
+
+class RedisClient:
+    def __init__(self, host, port, user, password, database, connect_timeout=10):
+        self.host = host
+        self.port = port
+        self.user = user or None
+        self.password = password or None
+        self.database = int(database or 0)
+        self.connect_timeout = connect_timeout
+        self.conn = None
+
+    def connect(self):
+        self.conn = redis.Redis(
+            host=self.host,
+            port=self.port,
+            username=self.user,
+            password=self.password,
+            db=self.database,
+            socket_connect_timeout=self.connect_timeout
+        )
+        self.conn.ping()
+        return self.conn
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def ping(self):
+        self.conn.ping()
+
+    def test_connection(self):
+        try:
+            self.connect()
+            self.close()
+            return True, '连接成功'
+        except Exception as e:
+            return False, f'连接失败: {e}'
+
+    def get_databases(self):
+        """
+        :return: [(库编号, 键数量)]，来自 INFO keyspace，只包含有键的库
+        """
+        conn = self.conn or self.connect()
+        info = conn.info('keyspace')
+        dbs = []
+        for name, stats in info.items():
+            if name.startswith('db'):
+                dbs.append((int(name[2:]), stats.get('keys', 0)))
+        return sorted(dbs)
+
+    def key_count(self):
+        conn = self.conn or self.connect()
+        return conn.dbsize()
+
+    def scan_keys(self, cursor=0, match='*', count=SCAN_COUNT, key_type=None, limit=500, max_calls=50):
+        """
+        从 cursor 开始增量扫描，收集到 limit 个键或调用 SCAN 达到 max_calls 次时返回，
+        MATCH 很稀疏时也不会长时间占用连接
+        :return: (下一个游标, 键列表)，游标为 0 表示已遍历完
+        """
+        conn = self.conn or self.connect()
+        keys = []
+        for _ in range(max_calls):
+            cursor, batch = conn.scan(cursor=cursor, match=match or '*', count=count, _type=key_type or None)
+            keys.extend(batch)
+            if cursor == 0 or len(keys) >= limit:
+                break
+        return cursor, keys
+
+    def iter_keys(self, match='*', count=SCAN_COUNT, key_type=None, cancel_event=None):
+        """
+        逐批返回匹配的键，直到遍历完整个键空间
+        """
+        cursor = 0
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise RuntimeError('已取消')
+            cursor, keys = self.scan_keys(cursor, match, count, key_type, limit=count, max_calls=1)
+            if keys:
+                yield keys
+            if cursor == 0:
+                return
+
+    def key_info(self, keys):
+        """
+        用 pipeline 按批读取类型、剩余过期时间（毫秒）和内存占用
+        :return: [{'key', 'type', 'ttl_ms', 'memory'}]，键已不存在时 type 为 'none'
+        """
+        conn = self.conn or self.connect()
+        result = []
+        for i in range(0, len(keys), PIPELINE_BATCH):
+            batch = keys[i:i + PIPELINE_BATCH]
+            pipe = conn.pipeline(transaction=False)
+            for key in batch:
+                pipe.type(key)
+                pipe.pttl(key)
+                pipe.memory_usage(key)
+            # MEMORY USAGE 可能被禁用（旧版本或 rename-command），单个命令出错不影响其他结果
+            replies = pipe.execute(raise_on_error=False)
+            for j, key in enumerate(batch):
+                key_type, ttl, memory = replies[j * 3:j * 3 + 3]
+                result.append({
+                    'key': key,
+                    'type': _display(key_type) if not isinstance(key_type, Exception) else '',
+                    'ttl_ms': ttl if isinstance(ttl, int) else None,
+                    'memory': memory if isinstance(memory, int) else None
+                })
+        return result
+
+    def get_value(self, key, key_type, limit=PREVIEW_LIMIT):
+        """
+        读取键的值用于预览，集合类型最多读取 limit 个元素，字符串最多读取 limit * 256 字节
+        :return: (值, 元素总数或字符串长度)
+        """
+        conn = self.conn or self.connect()
+        if key_type == 'string':
+            return conn.getrange(key, 0, limit * 256 - 1), conn.strlen(key)
+        if key_type == 'hash':
+            _, items = conn.hscan(key, 0, count=limit)
+            return items, conn.hlen(key)
+        if key_type == 'list':
+            return conn.lrange(key, 0, limit - 1), conn.llen(key)
+        if key_type == 'set':
+            _, items = conn.sscan(key, 0, count=limit)
+            return items, conn.scard(key)
+        if key_type == 'zset':
+            return conn.zrange(key, 0, limit - 1, withscores=True), conn.zcard(key)
+        if key_type == 'stream':
+            return conn.xrange(key, count=limit), conn.xlen(key)
+        return None, 0
+
+    def delete_keys(self, keys):
+        """
+        用 pipeline 按批 UNLINK（后台释放内存，不阻塞服务器），返回删除的键数
+        """
+        conn = self.conn or self.connect()
+        deleted = 0
+        for i in range(0, len(keys), PIPELINE_BATCH):
+            pipe = conn.pipeline(transaction=False)
+            pipe.unlink(*keys[i:i + PIPELINE_BATCH])
+            deleted += sum(pipe.execute())
+        return deleted
+
+    def delete_matching(self, match, key_type=None, progress_callback=None, cancel_event=None):
+        """
+        SCAN 匹配的键并按批删除，返回删除的键数
+        """
+        deleted = 0
+        for keys in self.iter_keys(match, key_type=key_type, cancel_event=cancel_event):
+            deleted += self.delete_keys(keys)
+            if progress_callback:
+                progress_callback(deleted)
+        return deleted
+
+    def _read_values(self, keys, types):
+        # 按类型读取完整值，一批键一次往返
+        pipe = self.conn.pipeline(transaction=False)
+        for key, key_type in zip(keys, types):
+            if key_type == 'string':
+                pipe.get(key)
+            elif key_type == 'hash':
+                pipe.hgetall(key)
+            elif key_type == 'list':
+                pipe.lrange(key, 0, -1)
+            elif key_type == 'set':
+                pipe.smembers(key)
+            elif key_type == 'zset':
+                pipe.zrange(key, 0, -1, withscores=True)
+            elif key_type == 'stream':
+                pipe.xrange(key)
+            else:
+                pipe.exists(key)
+        return pipe.execute(raise_on_error=False)
+
+    def export_matching(self, fileobj, match='*', key_type=None, progress_callback=None, cancel_event=None):
+        """
+        把匹配的键导出为 JSON Lines：每行 {"key", "type", "ttl_ms", "value"}
+        :param fileobj: 二进制写入对象
+        :return: 导出的键数
+        """
+        count = 0
+        for keys in self.iter_keys(match, key_type=key_type, cancel_event=cancel_event):
+            for i in range(0, len(keys), PIPELINE_BATCH):
+                batch = keys[i:i + PIPELINE_BATCH]
+                pipe = self.conn.pipeline(transaction=False)
+                for key in batch:
+                    pipe.type(key)
+                    pipe.pttl(key)
+                meta = pipe.execute()
+                types = [_display(t) for t in meta[0::2]]
+                values = self._read_values(batch, types)
+                lines = []
+                for key, t, ttl, value in zip(batch, types, meta[1::2], values):
+                    if t == 'none' or isinstance(value, Exception):
+                        continue  # 扫描后已过期或被删除
+                    if t == 'hash':
+                        value = {_display(k): _text(v) for k, v in value.items()}
+                    elif t in ('list', 'set'):
+                        value = [_text(v) for v in value]
+                    elif t == 'zset':
+                        value = [[_text(m), s] for m, s in value]
+                    elif t == 'stream':
+                        value = [[_display(i), {_display(k): _text(v) for k, v in f.items()}] for i, f in value]
+                    else:
+                        value = _text(value)
+                    lines.append(json.dumps({'key': _text(key), 'type': t, 'ttl_ms': ttl if ttl >= 0 else None,
+                                             'value': value}, ensure_ascii=False))
+                if lines:
+                    fileobj.write(('\n'.join(lines) + '\n').encode('utf-8'))
+                count += len(lines)
+                if progress_callback:
+                    progress_callback(count)
+        return count
@@ -0,0 +1,240 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from db.backup import MANIFEST_FILE, file_sha256
+from db.client_factory import create_client, dialect_of
+from db.export_writers import quote_ident, json_decode_value
+
+# 逻辑备份恢复：
+# 1. 建表时去掉二级索引和外键，只保留主键
+# 2. 多线程并行批量写入各表数据（SQLite 只有一个写入者，按表顺序写入）
+# 3. 数据写完后统一创建索引，最后添加外键、视图和触发器
+
+_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+_INDEX_LINE = re.compile(r'^(UNIQUE\s+KEY|UNIQUE\s+INDEX|KEY|INDEX|FULLTEXT\s+KEY|FULLTEXT\s+INDEX|SPATIAL\s+KEY|SPATIAL\s+INDEX)\b', re.I)
+_FK_LINE = re.compile(r'^CONSTRAINT\s+\S+\s+FOREIGN\s+KEY\b', re.I)
+
+
+def load_manifest(backup_dir):
+    path = os.path.join(backup_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'{backup_dir} 中没有 {MANIFEST_FILE}，不是有效的备份目录')
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def verify_backup(backup_dir, manifest):
+    """
+    校验数据文件的SHA-256，返回校验失败的表名列表
+    """
+    bad = []
+    for t in manifest['tables']:
+        path = os.path.join(backup_dir, t['data_file'])
+        if not os.path.exists(path) or file_sha256(path) != t['sha256']:
+            bad.append(t['name'])
+    return bad
+
+
+def split_mysql_ddl(table, ddl):
+    """
+    拆分 SHOW CREATE TABLE 的输出。
+    :return: (不含二级索引/外键的建表语句, 建索引语句或None, 加外键语句或None)
+    """
+    lines = ddl.splitlines()
+    # 分区表等在 ") ENGINE=..." 之后还有附加行
+    tail_idx = max(i for i, line in enumerate(lines) if line.startswith(')'))
+    head, body, tail = lines[0], lines[1:tail_idx], '\n'.join(lines[tail_idx:])
+    keep, indexes, fks = [], [], []
+    for line in body:
+        item = line.strip().rstrip(',')
+        if _INDEX_LINE.match(item):
+            indexes.append(item)
+        elif _FK_LINE.match(item):
+            fks.append(item)
+        else:
+            keep.append('  ' + item)
+    create = head + '\n' + ',\n'.join(keep) + '\n' + tail
+    name = quote_ident(table)
+    index_sql = f'ALTER TABLE {name} ' + ', '.join(f'ADD {i}' for i in indexes) if indexes else None
+    fk_sql = f'ALTER TABLE {name} ' + ', '.join(f'ADD {i}' for i in fks) if fks else None
+    return create, index_sql, fk_sql
+
+
+def _open_data(path):
+    opener = _OPENERS.get(os.path.splitext(path)[1], open)
+    return opener(path, 'rt', encoding='utf-8')
+
+
+def _iter_batches(path, columns, batch_size):
+    batch = []
+    with _open_data(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            obj = json.loads(line)
+            batch.append([json_decode_value(obj.get(c)) for c in columns])
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _load_table(conn, database, backup_dir, table, batch_size, report, cancel_event, dbconn=None):
+    dialect = dialect_of(conn)
+    columns = table['columns']
+    placeholder = '%s' if dialect == 'mysql' else '?'
+    sql = (f"INSERT INTO {quote_ident(table['name'], dialect)} "
+           f"({', '.join(quote_ident(c, dialect) for c in columns)}) "
+           f"VALUES ({', '.join([placeholder] * len(columns))})")
+    client = None
+    if dbconn is None:
+        client = create_client(conn, database=database)
+        dbconn = client.connect()
+    try:
+        cursor = dbconn.cursor()
+        if dialect == 'mysql':
+            cursor.execute('SET SESSION foreign_key_checks = 0')
+            cursor.execute('SET SESSION unique_checks = 0')
+        count = 0
+        for batch in _iter_batches(os.path.join(backup_dir, table['data_file']), columns, batch_size):
+            if cancel_event is not None and cancel_event.is_set():
+                raise RuntimeError('恢复已取消')
+            # pymysql 会把 executemany 的 INSERT 改写为多行 VALUES
+            cursor.executemany(sql, batch)
+            count += len(batch)
+            if dialect == 'mysql':
+                dbconn.commit()
+            report('data', table['name'], count)
+        dbconn.commit()
+        return count
+    finally:
+        if client is not None:
+            client.close()
+
+
+def restore_backup(conn, backup_dir, database=None, workers=4, batch_size=2000, drop_existing=False,
+                   verify=True, progress_callback=None, cancel_event=None):
+    """
+    将备份目录恢复到目标连接。
+    :param progress_callback: 回调参数为 {'phase', 'table', 'rows', 'tables_done', 'tables_total'}
+    :return: {表名: 行数}
+    """
+    manifest = load_manifest(backup_dir)
+    dialect = dialect_of(conn)
+    if manifest['source']['dialect'] != dialect:
+        raise ValueError(f"备份来源为 {manifest['source']['type']}，不能恢复到 {conn['type']}")
+    if verify:
+        bad = verify_backup(backup_dir, manifest)
+        if bad:
+            raise ValueError(f"以下表的数据文件校验失败: {', '.join(bad)}")
+    tables = manifest['tables']
+    lock = threading.Lock()
+    done = []
+
+    def report(phase, table, rows=0, finished=False):
+        with lock:
+            if finished:
+                done.append(table)
+            if progress_callback:
+                progress_callback({'phase': phase, 'table': table, 'rows': rows,
+                                   'tables_done': len(done), 'tables_total': len(tables)})
+
+    if dialect == 'mysql':
+        return _restore_mysql(conn, backup_dir, manifest, database, workers, batch_size,
+                              drop_existing, report, cancel_event)
+    return _restore_sqlite(conn, backup_dir, manifest, batch_size, drop_existing, report, cancel_event)
+
+
+def _restore_mysql(conn, backup_dir, manifest, database, workers, batch_size, drop_existing, report, cancel_event):
+    database = database or conn.get('database') or manifest['source']['database']
+    client = create_client(conn, database=None)
+    dbconn = client.connect()
+    deferred_indexes, deferred_fks = [], []
+    try:
+        with dbconn.cursor() as cursor:
+            cursor.execute(f'CREATE DATABASE IF NOT EXISTS {quote_ident(database)}')
+            cursor.execute(f'USE {quote_ident(database)}')
+            cursor.execute('SET SESSION foreign_key_checks = 0')
+            for t in manifest['tables']:
+                if drop_existing:
+                    cursor.execute(f"DROP TABLE IF EXISTS {quote_ident(t['name'])}")
+                create, index_sql, fk_sql = split_mysql_ddl(t['name'], t['ddl'])
+                cursor.execute(create)
+                if index_sql:
+                    deferred_indexes.append((t['name'], index_sql))
+                if fk_sql:
+                    deferred_fks.append((t['name'], fk_sql))
+                report('schema', t['name'])
+        dbconn.commit()
+    finally:
+        client.close()
+
+    counts = {}
+    # 大表先开始，缩短整体耗时
+    ordered = sorted(manifest['tables'], key=lambda t: t.get('bytes', 0), reverse=True)
+
+    def job(t):
+        count = _load_table(conn, database, backup_dir, t, batch_size, report, cancel_event)
+        report('data', t['name'], count, finished=True)
+        return t['name'], count
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for future in as_completed([pool.submit(job, t) for t in ordered]):
+            name, count = future.result()
+            counts[name] = count
+
+    # 索引可以按表并行创建，外键依赖被引用表的索引，放到最后
+    def run_ddl(item):
+        name, sql = item
+        c = create_client(conn, database=database)
+        try:
+            with c.connect().cursor() as cursor:
+                cursor.execute('SET SESSION foreign_key_checks = 0')
+                cursor.execute(sql)
+        finally:
+            c.close()
+        report('index', name)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for future in as_completed([pool.submit(run_ddl, item) for item in deferred_indexes]):
+            future.result()
+    for item in deferred_fks:
+        run_ddl(item)
+    return counts
+
+
+def _restore_sqlite(conn, backup_dir, manifest, batch_size, drop_existing, report, cancel_event):
+    client = create_client(conn)
+    dbconn = client.connect()
+    counts = {}
+    try:
+        dbconn.execute('PRAGMA foreign_keys = OFF')
+        dbconn.execute('PRAGMA synchronous = OFF')
+        for t in manifest['tables']:
+            if drop_existing:
+                dbconn.execute(f"DROP TABLE IF EXISTS {quote_ident(t['name'], 'sqlite')}")
+            dbconn.execute(t['ddl'])
+            report('schema', t['name'])
+        dbconn.commit()
+        # SQLite 只允许一个写入者，逐表在单个事务中写入
+        for t in manifest['tables']:
+            counts[t['name']] = _load_table(conn, None, backup_dir, t, batch_size, report, cancel_event, dbconn=dbconn)
+            report('data', t['name'], counts[t['name']], finished=True)
+        for t in manifest['tables']:
+            for sql in t['indexes']:
+                dbconn.execute(sql)
+            if t['indexes']:
+                report('index', t['name'])
+        for sql in manifest.get('others', []):
+            dbconn.execute(sql)
+        dbconn.commit()
+        dbconn.execute('PRAGMA synchronous = FULL')
+    finally:
+        client.close()
+    return counts
@@ -0,0 +1,441 @@
+import datetime
+import decimal
+import numpy as np
+
+# 按列存储的查询结果容器：
+# - 数值/布尔/日期列使用定长NumPy数组
+# - 字符串/二进制/DECIMAL列使用 offsets + 连续字节缓冲区
+# - NULL 使用位图记录（无NULL时不分配）
+# - 带时区的 datetime 存为文本：datetime64 没有时区，转换会丢掉偏移量
+# 相比 list[tuple] 每个单元格可节省约 50~100 字节的Python对象开销
+
+_NUMPY_KINDS = {
+    'int': np.int64,
+    'float': np.float64,
+    'bool': np.bool_,
+    'datetime': 'datetime64[us]',
+    'date': 'datetime64[D]',
+}
+_BUFFER_KINDS = ('str', 'bytes', 'decimal')
+# 文本列字典编码时定长字节矩阵的最大字节数，超出后逐行处理
+DICT_ENCODE_BUDGET = 256 * 1024 * 1024
+
+
+def _kind_of(value):
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, decimal.Decimal):
+        return 'decimal'
+    if isinstance(value, datetime.datetime):
+        return 'datetime' if value.tzinfo is None else 'str'
+    if isinstance(value, datetime.date):
+        return 'date'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return 'bytes'
+    return 'str'
+
+
+_TYPE_KINDS = {
+    bool: 'bool',
+    int: 'int',
+    float: 'float',
+    decimal.Decimal: 'decimal',
+    datetime.datetime: 'datetime',
+    datetime.date: 'date',
+    bytes: 'bytes',
+    bytearray: 'bytes',
+    str: 'str',
+}
+
+
+def _batch_kinds(values):
+    # 先按类型去重再映射，避免对每个值做isinstance判断
+    kinds = set()
+    for t in {type(v) for v in values}:
+        if t is type(None):
+            continue
+        if t is datetime.datetime:
+            # 同一列中可能同时有带时区和不带时区的值
+            kinds.update('datetime' if v.tzinfo is None else 'str' for v in values if type(v) is t)
+            continue
+        kind = _TYPE_KINDS.get(t)
+        if kind is None:
+            kind = next((_kind_of(v) for v in values if type(v) is t), 'str')
+        kinds.add(kind)
+    return kinds
+
+
+def _merge_kinds(kinds):
+    if not kinds:
+        return None
+    if len(kinds) == 1:
+        return next(iter(kinds))
+    if kinds <= {'int', 'float', 'bool'}:
+        return 'float'
+    if kinds <= {'int', 'decimal', 'bool'}:
+        return 'decimal'
+    return 'str'
+
+
+class _GrowableArray:
+    def __init__(self, dtype, capacity=1024):
+        self._data = np.empty(capacity, dtype=dtype)
+        self.length = 0
+
+    def _reserve(self, extra):
+        need = self.length + extra
+        if need > len(self._data):
+            cap = max(need, len(self._data) * 2)
+            new_data = np.empty(cap, dtype=self._data.dtype)
+            new_data[:self.length] = self._data[:self.length]
+            self._data = new_data
+
+    def extend(self, values):
+        self._reserve(len(values))
+        self._data[self.length:self.length + len(values)] = values
+        self.length += len(values)
+
+    def view(self):
+        return self._data[:self.length]
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+
+class _NullBitmap:
+    def __init__(self):
+        self._bits = None
+
+    def set_nulls(self, positions, length):
+        if not len(positions):
+            return
+        size = (length + 7) // 8
+        if self._bits is None:
+            self._bits = np.zeros(max(size, 128), dtype=np.uint8)
+        elif size > len(self._bits):
+            bits = np.zeros(max(size, len(self._bits) * 2), dtype=np.uint8)
+            bits[:len(self._bits)] = self._bits
+            self._bits = bits
+        np.bitwise_or.at(self._bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+    def is_null(self, i):
+        if self._bits is None or (i >> 3) >= len(self._bits):
+            return False
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def mask(self, start, stop):
+        if self._bits is None:
+            return np.zeros(stop - start, dtype=bool)
+        bits = np.unpackbits(self._bits[start >> 3:(stop + 7) >> 3], bitorder='little')
+        offset = start & 7
+        mask = bits[offset:offset + (stop - start)].astype(bool)
+        if len(mask) < stop - start:
+            mask = np.concatenate([mask, np.zeros(stop - start - len(mask), dtype=bool)])
+        return mask
+
+    @property
+    def nbytes(self):
+        return 0 if self._bits is None else self._bits.nbytes
+
+
+class _ArrayColumn:
+    def __init__(self, kind):
+        self.kind = kind
+        self.values = _GrowableArray(_NUMPY_KINDS[kind])
+        self.nulls = _NullBitmap()
+
+    def __len__(self):
+        return self.values.length
+
+    def append(self, values):
+        start = self.values.length
+        null_pos = [i for i, v in enumerate(values) if v is None]
+        if null_pos:
+            fill = 0 if self.kind in ('int', 'float', 'bool') else None
+            values = [fill if v is None else v for v in values]
+        if self.kind in ('datetime', 'date'):
+            arr = np.array(values, dtype=_NUMPY_KINDS[self.kind])
+        else:
+            arr = np.fromiter(values, dtype=_NUMPY_KINDS[self.kind], count=len(values))
+        self.values.extend(arr)
+        self.nulls.set_nulls(np.asarray(null_pos, dtype=np.int64) + start, self.values.length)
+
+    def value(self, i):
+        if self.nulls.is_null(i):
+            return None
+        return self.values.view()[i].item()
+
+    def array(self, start, stop):
+        return self.values.view()[start:stop]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.nulls.nbytes
+
+
+class _BufferColumn:
+    def __init__(self, kind):
+        self.kind = kind
+        self.offsets = _GrowableArray(np.int64)
+        self.offsets.extend(np.zeros(1, dtype=np.int64))
+        self.data = bytearray()
+        self.nulls = _NullBitmap()
+
+    def __len__(self):
+        return self.offsets.length - 1
+
+    def _encode(self, v):
+        if v is None:
+            return b''
+        if self.kind == 'bytes':
+            return bytes(v) if not isinstance(v, str) else v.encode('utf-8')
+        if isinstance(v, (bytes, bytearray, memoryview)):
+            return bytes(v)
+        return str(v).encode('utf-8')
+
+    def append(self, values):
+        start = len(self)
+        encoded = [self._encode(v) for v in values]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        self.offsets.extend(self.offsets.view()[-1] + np.cumsum(lengths))
+        self.data += b''.join(encoded)
+        null_pos = np.asarray([i for i, v in enumerate(values) if v is None], dtype=np.int64)
+        self.nulls.set_nulls(null_pos + start, len(self))
+
+    def raw(self, i):
+        offsets = self.offsets.view()
+        return bytes(self.data[offsets[i]:offsets[i + 1]])
+
+    def value(self, i):
+        if self.nulls.is_null(i):
+            return None
+        raw = self.raw(i)
+        if self.kind == 'bytes':
+            return raw
+        text = raw.decode('utf-8', errors='replace')
+        if self.kind == 'decimal':
+            return decimal.Decimal(text)
+        return text
+
+    def array(self, start, stop):
+        return np.array([self.value(i) for i in range(start, stop)], dtype=object)
+
+    def dictionary_encode(self):
+        """
+        返回 (codes, uniques)：uniques 为升序排列的不同值，codes[i] 为第 i 行值在 uniques 中的位置，NULL 为 -1。
+        文本按UTF-8字节比较与按字符比较顺序一致，可直接在定长字节矩阵上用 np.unique 完成；
+        过长的文本或 DECIMAL 列逐行处理。
+        """
+        n = len(self)
+        nulls = self.nulls.mask(0, n)
+        offsets = self.offsets.view()
+        lengths = np.diff(offsets)
+        width = int(lengths.max()) if n else 0
+        if self.kind == 'str' and 0 < width and n * width <= DICT_ENCODE_BUDGET:
+            buf = np.frombuffer(bytes(self.data), dtype=np.uint8)
+            matrix = np.zeros((n, width), dtype=np.uint8)
+            rows = np.repeat(np.arange(n), lengths)
+            cols = np.arange(len(buf)) - np.repeat(offsets[:-1], lengths)
+            matrix[rows, cols] = buf
+            uniq, codes = np.unique(matrix.view(f'S{width}').ravel(), return_inverse=True)
+            values = [u.decode('utf-8', errors='replace') for u in uniq.tolist()]
+            codes = codes.astype(np.int64).ravel()
+            if nulls.any():
+                # NULL 与空字符串在缓冲区中都是空串，重新按非NULL行统计空串是否出现
+                empty_used = bool(values) and values[0] == '' and bool(((codes == 0) & ~nulls).any())
+                if values and values[0] == '' and not empty_used:
+                    values = values[1:]
+                    codes = codes - 1
+                codes[nulls] = -1
+            return codes, values
+        raws = [None if nulls[i] else self.value(i) for i in range(n)]
+        values = sorted({v for v in raws if v is not None})
+        index = {v: i for i, v in enumerate(values)}
+        codes = np.fromiter((-1 if v is None else index[v] for v in raws), dtype=np.int64, count=n)
+        return codes, values
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + len(self.data) + self.nulls.nbytes
+
+
+def _new_column(kind):
+    if kind in _BUFFER_KINDS:
+        return _BufferColumn(kind)
+    return _ArrayColumn(kind)
+
+
+class ColumnarResult:
+    """按列存储的结果集，供SQL编辑器、数据浏览、可视化共用"""
+
+    def __init__(self, headers):
+        self.headers = list(headers)
+        self._columns = [None] * len(self.headers)
+        self._length = 0
+
+    @classmethod
+    def from_rows(cls, headers, rows):
+        result = cls(headers)
+        result.append_rows(rows)
+        return result
+
+    @classmethod
+    def from_cursor(cls, cursor, batch_size=10000):
+        headers = [d[0] for d in cursor.description]
+        result = cls(headers)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            result.append_rows(rows)
+        return result
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        for col_idx, values in enumerate(zip(*rows)):
+            self._append_column(col_idx, list(values))
+        self._length += len(rows)
+
+    def _append_column(self, col_idx, values):
+        col = self._columns[col_idx]
+        batch_kind = _merge_kinds(_batch_kinds(values))
+        if col is None:
+            if batch_kind is None:
+                # 尚未遇到非NULL值，先占位为字符串列，后续按需转换
+                col = _new_column('str')
+                col.pending_nulls = True
+            else:
+                col = _new_column(batch_kind)
+            col.append([None] * self._length)
+            self._columns[col_idx] = col
+        elif batch_kind is not None:
+            if getattr(col, 'pending_nulls', False):
+                col = self._convert(col, batch_kind)
+            elif batch_kind != col.kind:
+                col = self._convert(col, _merge_kinds({col.kind, batch_kind}))
+            self._columns[col_idx] = col
+        try:
+            col.append(values)
+        except (OverflowError, TypeError, ValueError):
+            # 超出int64范围等情况降级为按文本存储
+            col = self._convert(col, 'decimal' if col.kind == 'int' else 'str')
+            self._columns[col_idx] = col
+            col.append(values)
+
+    def _convert(self, col, kind):
+        if col.kind == kind and not getattr(col, 'pending_nulls', False):
+            return col
+        new_col = _new_column(kind)
+        n = len(col)
+        if n:
+            values = [col.value(i) for i in range(n)]
+            if kind == 'float':
+                values = [None if v is None else float(v) for v in values]
+            new_col.append(values)
+        return new_col
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def row_count(self):
+        return self._length
+
+    @property
+    def column_count(self):
+        return len(self.headers)
+
+    def column_kind(self, col):
+        column = self._columns[col]
+        if column is None or getattr(column, 'pending_nulls', False):
+            return None
+        return column.kind
+
+    def value(self, row, col):
+        column = self._columns[col]
+        if column is None:
+            return None
+        return column.value(row)
+
+    def row(self, row):
+        return tuple(self.value(row, c) for c in range(len(self.headers)))
+
+    def rows(self, start=0, stop=None):
+        stop = self._length if stop is None else min(stop, self._length)
+        for r in range(start, stop):
+            yield self.row(r)
+
+    def column_array(self, col, start=0, stop=None):
+        """
+        返回 (values, null_mask)。数值/日期列直接返回底层数组视图（零拷贝），
+        文本类列返回解码后的object数组。
+        """
+        stop = self._length if stop is None else min(stop, self._length)
+        column = self._columns[col]
+        if column is None:
+            return np.empty(0, dtype=object), np.zeros(0, dtype=bool)
+        return column.array(start, stop), column.nulls.mask(start, stop)
+
+    def dictionary_encode(self, col):
+        """
+        文本类列的有序字典编码，返回 (codes, uniques, null_mask)，用于排序和筛选
+        """
+        column = self._columns[col]
+        if column is None or not isinstance(column, _BufferColumn):
+            raise TypeError(f'第{col + 1}列不是文本类列')
+        codes, uniques = column.dictionary_encode()
+        return codes, uniques, column.nulls.mask(0, self._length)
+
+    def slice(self, start, stop):
+        return ResultSlice(self, start, stop)
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self._columns if c is not None)
+
+
+class ResultSlice:
+    """结果集的只读窗口，不复制任何数据"""
+
+    def __init__(self, result, start, stop):
+        self.result = result
+        self.headers = result.headers
+        self.start = max(0, start)
+        self.stop = max(self.start, min(stop, len(result)))
+
+    def __len__(self):
+        return self.stop - self.start
+
+    @property
+    def row_count(self):
+        return len(self)
+
+    @property
+    def column_count(self):
+        return len(self.headers)
+
+    def column_kind(self, col):
+        return self.result.column_kind(col)
+
+    def value(self, row, col):
+        return self.result.value(self.start + row, col)
+
+    def row(self, row):
+        return self.result.row(self.start + row)
+
+    def rows(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        return self.result.rows(self.start + start, self.start + stop)
+
+    def column_array(self, col, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        return self.result.column_array(col, self.start + start, self.start + stop)
+
+    def slice(self, start, stop):
+        return ResultSlice(self.result, self.start + start, self.start + min(stop, len(self)))
@@ -0,0 +1,156 @@
+import bisect
+import datetime
+import decimal
+import re
+import numpy as np
+from db.query_builder import NO_VALUE_OPERATORS
+
+# 对已加载结果的本地排序/筛选，不重新查询服务器：
+# - 数值/日期列直接在底层NumPy数组上 argsort / 比较
+# - 文本类列先编码为有序字典序号（序号大小与值大小一致），再对int64序号数组操作
+# 结果是一个行号排列（permutation），由表格模型按此顺序取行，不复制数据
+
+
+class ResultView:
+    def __init__(self, result):
+        self.result = result
+        self._keys = {}  # 列号 -> (键数组, NULL掩码, 有序唯一值列表或None)
+
+    def _column_keys(self, col):
+        cached = self._keys.get(col)
+        if cached is not None:
+            return cached
+        kind = self.result.column_kind(col)
+        if kind is None:
+            n = len(self.result)
+            cached = (np.zeros(n, dtype=np.int64), np.ones(n, dtype=bool), [])
+        elif kind in ('str', 'bytes', 'decimal'):
+            codes, uniques, nulls = self.result.dictionary_encode(col)
+            cached = (codes, nulls, uniques)
+        else:
+            values, nulls = self.result.column_array(col)
+            cached = (values, nulls, None)
+        self._keys[col] = cached
+        return cached
+
+    @property
+    def nbytes(self):
+        # 已缓存的排序键（文本列的唯一值列表不计）
+        return sum(keys.nbytes + nulls.nbytes for keys, nulls, _ in self._keys.values())
+
+    def _parse(self, col, text):
+        kind = self.result.column_kind(col)
+        try:
+            return self._parse_kind(kind, text)
+        except (ValueError, TypeError, decimal.InvalidOperation):
+            raise ValueError(f'[{self.result.headers[col]}] 的值 {text!r} 无法按 {kind} 类型解析')
+
+    @staticmethod
+    def _parse_kind(kind, text):
+        if kind == 'int':
+            number = decimal.Decimal(text)
+            return int(number) if number == number.to_integral_value() else float(number)
+        if kind == 'float':
+            return float(text)
+        if kind == 'bool':
+            return text.strip().lower() in ('1', 'true', 't', 'yes')
+        if kind == 'datetime':
+            return np.datetime64(datetime.datetime.fromisoformat(text.strip()), 'us')
+        if kind == 'date':
+            return np.datetime64(text.strip()[:10], 'D')
+        if kind == 'decimal':
+            return decimal.Decimal(text)
+        if kind == 'bytes':
+            return text.encode('utf-8')
+        return text
+
+    def filter_mask(self, col, op, value):
+        """
+        :param op: 与服务器端筛选相同的运算符（见 query_builder.FILTER_OPERATORS）
+        :return: 布尔掩码
+        """
+        keys, nulls, uniques = self._column_keys(col)
+        op = op.upper()
+        if op == 'IS NULL':
+            return nulls.copy()
+        if op == 'IS NOT NULL':
+            return ~nulls
+        if op in ('LIKE', 'NOT LIKE'):
+            mask = self._like_mask(keys, nulls, uniques, value)
+            return (~mask & ~nulls) if op == 'NOT LIKE' else mask
+        if op == 'IN':
+            items = [self._parse(col, v.strip()) for v in str(value).split(',') if v.strip()]
+            if uniques is not None:
+                targets = [i for i in (self._code_of(uniques, v) for v in items) if i is not None]
+                return np.isin(keys, np.asarray(targets, dtype=np.int64)) & ~nulls
+            return np.isin(keys, np.asarray(items, dtype=keys.dtype)) & ~nulls
+        target = self._parse(col, value)
+        if uniques is not None:
+            # 在有序唯一值中定位，把比较转换为对序号的比较
+            left = bisect.bisect_left(uniques, target)
+            right = bisect.bisect_right(uniques, target)
+            found = left < right
+            bounds = {
+                '=': (keys == left) if found else np.zeros(len(keys), dtype=bool),
+                '!=': (keys != left) if found else np.ones(len(keys), dtype=bool),
+                '>': keys >= right,
+                '>=': keys >= left,
+                '<': keys < left,
+                '<=': keys < right,
+            }
+        else:
+            bounds = {
+                '=': keys == target, '!=': keys != target, '>': keys > target,
+                '>=': keys >= target, '<': keys < target, '<=': keys <= target,
+            }
+        if op not in bounds:
+            raise ValueError(f'不支持的运算符: {op}')
+        return bounds[op] & ~nulls
+
+    @staticmethod
+    def _code_of(uniques, value):
+        i = bisect.bisect_left(uniques, value)
+        return i if i < len(uniques) and uniques[i] == value else None
+
+    @staticmethod
+    def _like_mask(keys, nulls, uniques, pattern):
+        # SQL LIKE：% 任意长度，_ 单个字符；只对唯一值做匹配，再按序号查表
+        regex = re.compile(''.join('.*' if ch == '%' else '.' if ch == '_' else re.escape(ch)
+                                   for ch in str(pattern)) + r'\Z', re.S | re.I)
+        if uniques is None:
+            uniques, keys = np.unique(keys, return_inverse=True)
+        # 二进制值按 UTF-8 解码后匹配，而不是匹配 b'..' 形式的 repr
+        matched = np.fromiter((bool(regex.match(v.decode('utf-8', 'replace') if isinstance(v, bytes) else str(v)))
+                               for v in uniques), dtype=bool, count=len(uniques))
+        if not len(matched):
+            return np.zeros(len(keys), dtype=bool)
+        return matched[np.where(keys < 0, 0, keys)] & ~nulls
+
+    def apply(self, filters=None, order_by=None):
+        """
+        :param filters: [(列号, 运算符, 值文本), ...]，条件之间为 AND
+        :param order_by: (列号, 'ASC'/'DESC') 或 None；NULL 始终排在最后
+        :return: 行号数组；没有筛选和排序时返回 None 表示原始顺序
+        """
+        if not filters and not order_by:
+            return None
+        n = len(self.result)
+        if filters:
+            mask = np.ones(n, dtype=bool)
+            for col, op, value in filters:
+                mask &= self.filter_mask(col, op, value)
+            indices = np.flatnonzero(mask)
+        else:
+            indices = np.arange(n, dtype=np.int64)
+        if order_by:
+            col, direction = order_by
+            keys, nulls, _ = self._column_keys(col)
+            sub_keys, sub_nulls = keys[indices], nulls[indices]
+            if str(direction).upper() == 'DESC':
+                # 对倒序数组做稳定排序再整体翻转：键降序，相同键仍保持原来的先后顺序
+                order = (len(sub_keys) - 1 - np.argsort(sub_keys[::-1], kind='stable'))[::-1]
+            else:
+                order = np.argsort(sub_keys, kind='stable')
+            order_nulls = sub_nulls[order]
+            indices = indices[np.concatenate([order[~order_nulls], order[order_nulls]])]
+        return indices
@@ -0,0 +1,265 @@
+import bisect
+import re
+import threading
+from db.client_factory import create_client, dialect_of
+from db.export_writers import quote_ident
+
+# SQL自动补全用的内存索引：
+# 关键字、库名、表名、列名分别保存为按小写排序的列表，前缀查找用二分定位，
+# 不随按键访问服务器。元数据在后台线程读取，刷新时只重新读取结构发生变化的表。
+
+SQL_KEYWORDS = [
+    'ADD', 'ALL', 'ALTER', 'AND', 'AS', 'ASC', 'AVG', 'BETWEEN', 'BY', 'CASE', 'COUNT', 'CREATE', 'CROSS',
+    'DATABASE', 'DEFAULT', 'DELETE', 'DESC', 'DISTINCT', 'DROP', 'ELSE', 'END', 'EXISTS', 'EXPLAIN', 'FROM',
+    'FULL', 'GROUP', 'HAVING', 'IN', 'INDEX', 'INNER', 'INSERT', 'INTO', 'IS', 'JOIN', 'KEY', 'LEFT', 'LIKE',
+    'LIMIT', 'MAX', 'MIN', 'NOT', 'NULL', 'OFFSET', 'ON', 'OR', 'ORDER', 'OUTER', 'PRIMARY', 'REPLACE', 'RIGHT',
+    'SELECT', 'SET', 'SHOW', 'SUM', 'TABLE', 'TABLES', 'THEN', 'TRUNCATE', 'UNION', 'UNIQUE', 'UPDATE', 'USE',
+    'USING', 'VALUES', 'VIEW', 'WHEN', 'WHERE', 'WITH',
+]
+SQL_KEYWORDS_SET = set(SQL_KEYWORDS)
+
+# 这些关键字之后应补全表名
+_TABLE_CONTEXT = {'FROM', 'JOIN', 'INTO', 'UPDATE', 'TABLE', 'DESCRIBE', 'DESC', 'TRUNCATE'}
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+([`"\w.]+)(?:\s+(?:AS\s+)?([`"\w]+))?', re.I)
+_WORD_BEFORE = re.compile(r'([`"\w]+)\s*$')
+
+
+class _SortedNames:
+    """按小写排序的名字列表，支持 O(log n) 前缀查找"""
+
+    def __init__(self, names=()):
+        pairs = sorted({(n.lower(), n) for n in names})
+        self._keys = [k for k, _ in pairs]
+        self._names = [n for _, n in pairs]
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def prefix(self, prefix, limit=50):
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._keys, prefix)
+        result = []
+        for i in range(start, len(self._keys)):
+            if not self._keys[i].startswith(prefix) or len(result) >= limit:
+                break
+            result.append(self._names[i])
+        return result
+
+
+def _strip_quotes(name):
+    return name.strip('`"')
+
+
+class SchemaIndex:
+    def __init__(self, dialect='mysql'):
+        self.dialect = dialect
+        self.keywords = _SortedNames(SQL_KEYWORDS)
+        self._lock = threading.Lock()
+        self._databases = _SortedNames()
+        self._tables = {}  # 库名 -> _SortedNames
+        self._columns = {}  # (库名, 表名小写) -> _SortedNames
+        self._signatures = {}  # (库名, 表名) -> 结构签名，用于增量刷新
+        self._all_columns = _SortedNames()
+        self.default_database = None
+        self.ready = False
+
+    def set_databases(self, names):
+        self._databases = _SortedNames(names)
+
+    def update_database(self, database, tables):
+        """
+        :param tables: {表名: (签名, [列名, ...])}，整体替换该库的表清单
+        """
+        with self._lock:
+            columns = {k: v for k, v in self._columns.items() if k[0] != database}
+            signatures = {k: v for k, v in self._signatures.items() if k[0] != database}
+            for name, (signature, cols) in tables.items():
+                columns[(database, name.lower())] = _SortedNames(cols)
+                signatures[(database, name)] = signature
+            self._columns = columns
+            self._signatures = signatures
+            self._tables = dict(self._tables, **{database: _SortedNames(tables)})
+            self._all_columns = _SortedNames({c for names in columns.values() for c in names})
+        self.ready = True
+
+    def signatures(self, database):
+        return {t: s for (db, t), s in self._signatures.items() if db == database}
+
+    def columns_of(self, database, table):
+        return self._columns.get((database, table.lower()), _SortedNames()).prefix('', limit=10 ** 6)
+
+    def tables(self, prefix='', database=None, limit=50):
+        names = self._tables.get(database if database is not None else self.default_database)
+        return names.prefix(prefix, limit) if names else []
+
+    def databases(self, prefix='', limit=50):
+        return self._databases.prefix(prefix, limit)
+
+    def _resolve_table(self, name):
+        # 支持 库名.表名
+        name = _strip_quotes(name)
+        if '.' in name:
+            db, table = name.split('.', 1)
+            return _strip_quotes(db), _strip_quotes(table)
+        return self.default_database, name
+
+    def complete(self, text_before, statement='', limit=50):
+        """
+        :param text_before: 光标前的文本
+        :param statement: 光标所在的整条语句，用于解析表别名
+        :return: (当前正在输入的前缀, 候选列表)
+        """
+        m = re.search(r'([`"\w]+)\.([`"\w]*)$', text_before)
+        if m:
+            qualifier, prefix = _strip_quotes(m.group(1)), _strip_quotes(m.group(2))
+            return prefix, self._complete_qualified(qualifier, prefix, statement, limit)
+        m = re.search(r'[`"\w]*$', text_before)
+        prefix = _strip_quotes(m.group(0))
+        before = _WORD_BEFORE.search(text_before[:m.start()])
+        previous = before.group(1).upper() if before else ''
+        if previous == 'USE':
+            return prefix, self.databases(prefix, limit)
+        if previous in _TABLE_CONTEXT:
+            return prefix, (self.tables(prefix, limit=limit) + self.databases(prefix, limit))[:limit]
+        if not prefix:
+            return prefix, []
+        result = self.keywords.prefix(prefix, limit)
+        # 优先语句中已引用表的列，其次全部表名和列名
+        for db, table in self._referenced_tables(statement).values():
+            cols = self._columns.get((db, table.lower()))
+            if cols:
+                result.extend(cols.prefix(prefix, limit))
+        result.extend(self.tables(prefix, limit=limit))
+        result.extend(self._all_columns.prefix(prefix, limit))
+        seen = set()
+        unique = [x for x in result if not (x in seen or seen.add(x))]
+        return prefix, unique[:limit]
+
+    def _complete_qualified(self, qualifier, prefix, statement, limit):
+        refs = self._referenced_tables(statement)
+        target = refs.get(qualifier.lower())
+        if target is None and (self.default_database, qualifier.lower()) in self._columns:
+            target = (self.default_database, qualifier)
+        if target is not None:
+            cols = self._columns.get((target[0], target[1].lower()))
+            return cols.prefix(prefix, limit) if cols else []
+        # 库名.表名
+        if qualifier in self._tables:
+            return self.tables(prefix, database=qualifier, limit=limit)
+        return []
+
+    def _referenced_tables(self, statement):
+        """
+        :return: {别名或表名小写: (库名, 表名)}
+        """
+        refs = {}
+        for m in _TABLE_REF.finditer(statement or ''):
+            db, table = self._resolve_table(m.group(1))
+            refs[table.lower()] = (db, table)
+            alias = m.group(2)
+            if alias and alias.upper() not in SQL_KEYWORDS_SET:
+                refs[_strip_quotes(alias).lower()] = (db, table)
+        return refs
+
+
+def _read_mysql(client, database, known):
+    """
+    :param known: {表名: 签名}，签名未变的表复用已有列清单
+    :return: ({表名: (签名, 列名列表或None)}, 库名列表)
+    """
+    with client.conn.cursor() as cursor:
+        cursor.execute('SHOW DATABASES')
+        databases = [r[0] for r in cursor.fetchall()]
+        # ALTER TABLE 不一定改变 CREATE_TIME（如 8.0 的 INSTANT 加列），签名中加入列数和列名的校验和
+        cursor.execute(
+            'SELECT t.TABLE_NAME, CONCAT_WS(\'|\', t.CREATE_TIME, t.TABLE_TYPE, c.n, c.h) '
+            'FROM information_schema.TABLES t LEFT JOIN ('
+            '  SELECT TABLE_NAME, COUNT(*) AS n, SUM(CRC32(CONCAT_WS(\':\', ORDINAL_POSITION, COLUMN_NAME))) AS h '
+            '  FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = %s GROUP BY TABLE_NAME'
+            ') c ON c.TABLE_NAME = t.TABLE_NAME '
+            'WHERE t.TABLE_SCHEMA = %s', (database, database))
+        tables = {name: sig for name, sig in cursor.fetchall()}
+        changed = [t for t, sig in tables.items() if known.get(t) != sig]
+        columns = {t: [] for t in changed}
+        if changed:
+            # 全量构建时一次读取整个库的列；增量时只读取变化的表
+            if len(changed) == len(tables):
+                cursor.execute(
+                    'SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS '
+                    'WHERE TABLE_SCHEMA = %s ORDER BY TABLE_NAME, ORDINAL_POSITION', (database,))
+            else:
+                cursor.execute(
+                    'SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS '
+                    f"WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({', '.join(['%s'] * len(changed))}) "
+                    'ORDER BY TABLE_NAME, ORDINAL_POSITION', [database] + changed)
+            for table, column in cursor.fetchall():
+                columns.setdefault(table, []).append(column)
+    return {t: (sig, columns.get(t)) for t, sig in tables.items()}, databases
+
+
+def _read_sqlite(client, database, known):
+    cursor = client.conn.cursor()
+    cursor.execute("SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'")
+    tables = {name: sql or '' for name, sql in cursor.fetchall()}
+    result = {}
+    for name, sig in tables.items():
+        if known.get(name) == sig:
+            result[name] = (sig, None)
+            continue
+        cursor.execute(f"PRAGMA table_info({quote_ident(name, 'sqlite')})")
+        result[name] = (sig, [r[1] for r in cursor.fetchall()])
+    return result, []
+
+
+def _read_postgres(client, database, known):
+    # 一次查询读取当前模式下所有表的列，列清单本身作为签名
+    with client.conn.cursor() as cursor:
+        cursor.execute("SELECT datname FROM pg_catalog.pg_database WHERE NOT datistemplate AND datallowconn")
+        databases = [r[0] for r in cursor.fetchall()]
+        cursor.execute(
+            'SELECT table_name, column_name FROM information_schema.columns '
+            'WHERE table_schema = current_schema() ORDER BY table_name, ordinal_position')
+        columns = {}
+        for table, column in cursor.fetchall():
+            columns.setdefault(table, []).append(column)
+    client.conn.rollback()
+    return {t: ('|'.join(cols), cols) for t, cols in columns.items()}, databases
+
+
+# reader(client, 库名, 已知签名)；不在表中的方言（如插件驱动）不提供补全
+READERS = {'mysql': _read_mysql, 'sqlite': _read_sqlite, 'postgres': _read_postgres}
+
+
+def refresh_schema_index(conn, index=None, database=None):
+    """
+    构建或增量刷新连接的补全索引（在后台线程中调用）。
+    :param index: 已有索引，为 None 时新建
+    :return: SchemaIndex；不支持的方言返回空索引
+    """
+    dialect = dialect_of(conn)
+    index = index or SchemaIndex(dialect)
+    reader = READERS.get(dialect)
+    if reader is None:
+        return index
+    if dialect == 'postgres':
+        database = database or conn.get('database') or 'postgres'
+    else:
+        database = database or (conn.get('database') if dialect == 'mysql' else 'main')
+    known = index.signatures(database)
+    client = create_client(conn, database=database if dialect != 'sqlite' else None)
+    client.connect()
+    try:
+        tables, databases = reader(client, database, known)
+    finally:
+        client.close()
+    merged = {}
+    for name, (sig, cols) in tables.items():
+        merged[name] = (sig, cols if cols is not None else index.columns_of(database, name))
+    if databases:
+        index.set_databases(databases)
+    index.default_database = database
+    index.update_database(database, merged)
+    return index
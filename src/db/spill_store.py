@@ -0,0 +1,255 @@
+import datetime
+import decimal
+import mmap
+import os
+import struct
+import tempfile
+from collections import OrderedDict
+from db.result_buffer import ColumnarResult
+
+# 结果集超过内存预算后溢写到临时文件：
+# - 索引文件：每行一个定长 int64，记录该行在数据文件中的起始偏移
+# - 数据文件：逐行顺序编码的单元格（类型标记 + 内容）
+# 读取时通过 mmap 按需解码，常驻内存只有少量行缓存
+SPILL_MEMORY_BUDGET = 256 * 1024 * 1024
+
+_TAG_NULL = 0
+_TAG_INT = 1
+_TAG_FLOAT = 2
+_TAG_STR = 3
+_TAG_BYTES = 4
+_TAG_BOOL = 5
+_TAG_DECIMAL = 6
+_TAG_DATETIME = 7
+_TAG_DATE = 8
+
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+_LEN = struct.Struct('<I')
+_OFFSET = struct.Struct('<q')
+
+
+def _encode_value(v, out):
+    if v is None:
+        out.append(_TAG_NULL)
+    elif isinstance(v, bool):
+        out.append(_TAG_BOOL)
+        out.append(1 if v else 0)
+    elif isinstance(v, int) and -(1 << 63) <= v < (1 << 63):
+        out.append(_TAG_INT)
+        out += _INT.pack(v)
+    elif isinstance(v, float):
+        out.append(_TAG_FLOAT)
+        out += _FLOAT.pack(v)
+    elif isinstance(v, (bytes, bytearray, memoryview)):
+        out.append(_TAG_BYTES)
+        out += _LEN.pack(len(v))
+        out += v
+    else:
+        if isinstance(v, (decimal.Decimal, int)):
+            tag, raw = _TAG_DECIMAL, str(v)
+        elif isinstance(v, datetime.datetime):
+            tag, raw = _TAG_DATETIME, v.isoformat()
+        elif isinstance(v, datetime.date):
+            tag, raw = _TAG_DATE, v.isoformat()
+        else:
+            tag, raw = _TAG_STR, str(v)
+        raw = raw.encode('utf-8')
+        out.append(tag)
+        out += _LEN.pack(len(raw))
+        out += raw
+
+
+def _decode_row(buf, pos, ncols):
+    row = []
+    for _ in range(ncols):
+        tag = buf[pos]
+        pos += 1
+        if tag == _TAG_NULL:
+            row.append(None)
+        elif tag == _TAG_INT:
+            row.append(_INT.unpack_from(buf, pos)[0])
+            pos += 8
+        elif tag == _TAG_FLOAT:
+            row.append(_FLOAT.unpack_from(buf, pos)[0])
+            pos += 8
+        elif tag == _TAG_BOOL:
+            row.append(bool(buf[pos]))
+            pos += 1
+        else:
+            size = _LEN.unpack_from(buf, pos)[0]
+            pos += 4
+            raw = buf[pos:pos + size]
+            pos += size
+            if tag == _TAG_BYTES:
+                row.append(bytes(raw))
+                continue
+            text = bytes(raw).decode('utf-8', errors='replace')
+            if tag == _TAG_DECIMAL:
+                row.append(decimal.Decimal(text))
+            elif tag == _TAG_DATETIME:
+                row.append(datetime.datetime.fromisoformat(text))
+            elif tag == _TAG_DATE:
+                row.append(datetime.date.fromisoformat(text))
+            else:
+                row.append(text)
+    return tuple(row)
+
+
+class SpillResult:
+    """溢写到磁盘的结果集，接口与 ColumnarResult 的行访问部分一致"""
+
+    def __init__(self, headers, directory=None, cache_rows=512):
+        self.headers = list(headers)
+        self._length = 0
+        self._data_size = 0
+        fd, self.data_path = tempfile.mkstemp(prefix='dbtool_spill_', suffix='.dat', dir=directory)
+        self._data_file = os.fdopen(fd, 'w+b')
+        fd, self.index_path = tempfile.mkstemp(prefix='dbtool_spill_', suffix='.idx', dir=directory)
+        self._index_file = os.fdopen(fd, 'w+b')
+        self._data_map = None
+        self._index_map = None
+        self._mapped_rows = 0
+        self._cache = OrderedDict()
+        self._cache_rows = cache_rows
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        ncols = len(self.headers)
+        data = bytearray()
+        index = bytearray()
+        for row in rows:
+            index += _OFFSET.pack(self._data_size + len(data))
+            for c in range(ncols):
+                _encode_value(row[c], data)
+        self._data_file.write(data)
+        self._index_file.write(index)
+        self._data_size += len(data)
+        self._length += len(rows)
+
+    def _ensure_mapped(self, row):
+        if row < self._mapped_rows:
+            return
+        # 文件持续增长，需要时重新映射
+        self._data_file.flush()
+        self._index_file.flush()
+        self._unmap()
+        if self._length == 0:
+            return
+        self._index_map = mmap.mmap(self._index_file.fileno(), self._length * _OFFSET.size, access=mmap.ACCESS_READ)
+        self._data_map = mmap.mmap(self._data_file.fileno(), self._data_size, access=mmap.ACCESS_READ)
+        self._mapped_rows = self._length
+
+    def _unmap(self):
+        for m in (self._index_map, self._data_map):
+            if m is not None:
+                m.close()
+        self._index_map = None
+        self._data_map = None
+        self._mapped_rows = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def row_count(self):
+        return self._length
+
+    @property
+    def column_count(self):
+        return len(self.headers)
+
+    def column_kind(self, col):
+        return None
+
+    def row(self, row):
+        cached = self._cache.get(row)
+        if cached is not None:
+            self._cache.move_to_end(row)
+            return cached
+        if not 0 <= row < self._length:
+            raise IndexError(row)
+        self._ensure_mapped(row)
+        pos = _OFFSET.unpack_from(self._index_map, row * _OFFSET.size)[0]
+        values = _decode_row(self._data_map, pos, len(self.headers))
+        self._cache[row] = values
+        if len(self._cache) > self._cache_rows:
+            self._cache.popitem(last=False)
+        return values
+
+    def value(self, row, col):
+        return self.row(row)[col]
+
+    def rows(self, start=0, stop=None):
+        stop = self._length if stop is None else min(stop, self._length)
+        for r in range(start, stop):
+            yield self.row(r)
+
+    @property
+    def nbytes(self):
+        # 只统计常驻内存部分，磁盘数据由操作系统页缓存按需换入换出
+        return len(self._cache) * len(self.headers) * 16
+
+    @property
+    def disk_bytes(self):
+        return self._data_size + self._length * _OFFSET.size
+
+    def drop_cache(self):
+        self._cache.clear()
+
+    def close(self):
+        self._cache.clear()
+        self._unmap()
+        for f, path in ((self._data_file, self.data_path), (self._index_file, self.index_path)):
+            if f is None:
+                continue
+            f.close()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._data_file = None
+        self._index_file = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def collect_result(cursor, memory_budget=SPILL_MEMORY_BUDGET, batch_size=10000):
+    """
+    分批读取游标结果，超过内存预算时转为磁盘溢写。
+    :return: ColumnarResult 或 SpillResult
+    """
+    result = ColumnarResult([d[0] for d in cursor.description])
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        result.append_rows(rows)
+        if isinstance(result, ColumnarResult) and result.nbytes > memory_budget:
+            result = spill_result(result, batch_size)
+    return result
+
+
+def spill_result(result, batch_size=10000):
+    """
+    把内存中的结果集整体写到磁盘，返回 SpillResult（原结果不变）
+    """
+    spill = SpillResult(result.headers)
+    for start in range(0, len(result), batch_size):
+        spill.append_rows(list(result.rows(start, start + batch_size)))
+    return spill
+
+
+def load_spilled(spill, batch_size=10000):
+    """
+    把溢写的结果重新读回内存，返回 ColumnarResult
+    """
+    result = ColumnarResult(spill.headers)
+    for start in range(0, len(spill), batch_size):
+        result.append_rows(list(spill.rows(start, start + batch_size)))
+    return result
@@ -1,18 +1,101 @@
+import os
+import re
 import sqlite3
+from urllib.request import pathname2url
+
+# 性能配置：保存在连接配置中（profile / pragmas / read_only），每次建立连接时执行对应的 PRAGMA
+# - journal_mode=WAL：读写互不阻塞，提交只追加日志；该设置保存在数据库文件中，对其他程序同样生效
+# - synchronous=NORMAL：WAL 下只在检查点时 fsync，断电可能丢失最近的事务但不会损坏数据库；OFF 完全不 fsync
+# - cache_size：负数为 KiB（默认约 2 MB）；mmap_size：字节，读取直接映射文件，减少系统调用和内存拷贝
+# - temp_store=MEMORY：排序、临时索引放在内存
+# - 只读：以 mode=ro 的 URI 打开，文件不存在时报错而不是新建，所有写操作都会失败
+# 读取（stream_cursor）和单行增删改经由 db.sqlite_pool 的只读连接池和写线程，connect() 仍返回独立连接
+PRAGMA_NAMES = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+TEMP_STORES = ('DEFAULT', 'FILE', 'MEMORY')
+
+DEFAULT_PROFILE = '默认'
+PROFILES = {
+    DEFAULT_PROFILE: {'pragmas': {}, 'read_only': False},
+    '均衡': {'pragmas': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'cache_size': -64 * 1024,
+                       'mmap_size': 256 * 1024 * 1024, 'temp_store': 'MEMORY'}, 'read_only': False},
+    '批量导入': {'pragmas': {'journal_mode': 'WAL', 'synchronous': 'OFF', 'cache_size': -256 * 1024,
+                         'mmap_size': 256 * 1024 * 1024, 'temp_store': 'MEMORY'}, 'read_only': False},
+    '只读浏览': {'pragmas': {'cache_size': -128 * 1024, 'mmap_size': 1024 * 1024 * 1024, 'temp_store': 'MEMORY'},
+             'read_only': True},
+}
+
+
+def readonly_uri(path):
+    return 'file:' + pathname2url(os.path.abspath(path)) + '?mode=ro'
+
+
+def apply_pragmas(conn, pragmas, read_only=False):
+    """
+    在连接上执行性能相关的 PRAGMA；名称和取值都经过校验，不会拼接任意文本
+    """
+    for name, value in (pragmas or {}).items():
+        if name not in PRAGMA_NAMES:
+            raise ValueError(f'不支持的 PRAGMA: {name}')
+        if name == 'journal_mode' and read_only:
+            continue  # 只读连接不能修改日志模式
+        if isinstance(value, str) and not re.fullmatch(r'[A-Za-z]+', value):
+            raise ValueError(f'PRAGMA {name} 的值无效: {value}')
+        conn.execute(f'PRAGMA {name} = {value if isinstance(value, str) else int(value)}').fetchall()
+
 
 class SQLiteClient:
-    def __init__(self, db_path):
+    def __init__(self, db_path, pragmas=None, read_only=False):
+        """
+        :param pragmas: {PRAGMA 名: 值}，见 PRAGMA_NAMES
+        :param read_only: 以只读 URI 打开
+        """
         self.db_path = db_path
+        self.pragmas = pragmas or {}
+        self.read_only = read_only
         self.conn = None
+        self.reader = None  # 从连接池借来的只读连接
+        self._cursors = []  # 在 reader 上打开的游标，归还前关闭
 
     def connect(self):
-        self.conn = sqlite3.connect(self.db_path)
+        # timeout 即 busy_timeout：数据库被写线程或其他程序锁住时等待而不是立即报 database is locked
+        from db.sqlite_pool import BUSY_TIMEOUT
+        if self.read_only:
+            self.conn = sqlite3.connect(readonly_uri(self.db_path), uri=True, timeout=BUSY_TIMEOUT)
+        else:
+            self.conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT)
+        try:
+            apply_pragmas(self.conn, self.pragmas, self.read_only)
+        except Exception:
+            self.conn.close()
+            self.conn = None
+            raise
         return self.conn
 
+    def pool(self):
+        from db.sqlite_pool import get_pool
+        return get_pool(self.db_path, self.pragmas, self.read_only)
+
+    def stream_cursor(self):
+        # 只读查询：从连接池借一个只读连接，close() 时归还；sqlite3 游标本身按需逐行读取
+        if self.reader is None:
+            self.reader = self.pool().acquire_reader()
+        cursor = self.reader.cursor()
+        self._cursors.append(cursor)
+        return cursor
+
     def close(self):
         if self.conn:
             self.conn.close()
             self.conn = None
+        # 没读完的语句会一直持有共享锁（WAL 下为读快照），归还连接前先关闭游标
+        cursors, self._cursors = self._cursors, []
+        for cursor in cursors:
+            cursor.close()
+        reader, self.reader = self.reader, None
+        if reader is not None:
+            self.pool().release_reader(reader)
 
     def test_connection(self):
         try:
@@ -24,7 +107,7 @@ class SQLiteClient:
 
     def get_tables(self):
         try:
-            conn = self.connect()
+            conn = self.conn or self.connect()
             cursor = conn.cursor()
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
             tables = [row[0] for row in cursor.fetchall()]
@@ -46,39 +129,86 @@ class SQLiteClient:
         except Exception as e:
             return []
 
-    def insert_row(self, table, headers, values):
-        conn = self.connect()
+    def get_indexed_columns(self, table_name):
+        """
+        返回作为某个索引首列的字段名集合；INTEGER PRIMARY KEY 是 rowid 的别名，同样视为有索引
+        """
         try:
+            conn = self.connect()
             cursor = conn.cursor()
-            cols = ','.join(f'"{h}"' for h in headers)
-            placeholders = ','.join(['?'] * len(values))
-            sql = f'INSERT INTO "{table}" ({cols}) VALUES ({placeholders})'
-            cursor.execute(sql, values)
-            conn.commit()
-        finally:
+            cursor.execute(f"PRAGMA table_info('{table_name}')")
+            pks = [row for row in cursor.fetchall() if row[5]]
+            columns = {'rowid'}
+            if len(pks) == 1 and pks[0][2].upper() == 'INTEGER':
+                columns.add(pks[0][1])
+            cursor.execute(f"PRAGMA index_list('{table_name}')")
+            for index in [row[1] for row in cursor.fetchall()]:
+                cursor.execute(f"PRAGMA index_info('{index}')")
+                columns.update(row[2] for row in cursor.fetchall() if row[0] == 0 and row[2])
             self.close()
+            return columns
+        except Exception as e:
+            return set()
 
-    def update_row(self, table, col, value, pk_dict):
+    def get_primary_keys(self, table_name):
         conn = self.connect()
         try:
             cursor = conn.cursor()
-            set_part = f'"{col}"=?'
-            where_part = ' AND '.join(f'"{k}"=?' for k in pk_dict)
-            sql = f'UPDATE "{table}" SET {set_part} WHERE {where_part}'
-            params = [value] + [pk_dict[k] for k in pk_dict]
-            cursor.execute(sql, params)
-            conn.commit()
+            cursor.execute(f"PRAGMA table_info('{table_name}')")
+            # 第6列为主键中的序号（从1开始），0 表示不是主键
+            return [row[1] for row in sorted((r for r in cursor.fetchall() if r[5]), key=lambda r: r[5])]
         finally:
             self.close()
 
+    def cancel(self):
+        # sqlite3 的 interrupt 可在其他线程调用
+        for conn in (self.conn, self.reader):
+            if conn is not None:
+                conn.interrupt()
+
+    # 单行增删改交给写线程，多个标签页同时提交时合并到同一个事务
+    @staticmethod
+    def _insert_sql(table, headers, values):
+        cols = ','.join(f'"{h}"' for h in headers)
+        placeholders = ','.join(['?'] * len(values))
+        return f'INSERT INTO "{table}" ({cols}) VALUES ({placeholders})', list(values)
+
+    @staticmethod
+    def _update_sql(table, col, value, pk_dict):
+        set_part = f'"{col}"=?'
+        where_part = ' AND '.join(f'"{k}"=?' for k in pk_dict)
+        return f'UPDATE "{table}" SET {set_part} WHERE {where_part}', [value] + [pk_dict[k] for k in pk_dict]
+
+    @staticmethod
+    def _delete_sql(table, pk_dict):
+        where_part = ' AND '.join(f'"{k}"=?' for k in pk_dict)
+        return f'DELETE FROM "{table}" WHERE {where_part}', [pk_dict[k] for k in pk_dict]
+
+    def insert_row(self, table, headers, values):
+        self.pool().execute(*self._insert_sql(table, headers, values))
+
+    def update_row(self, table, col, value, pk_dict):
+        self.pool().execute(*self._update_sql(table, col, value, pk_dict))
+
     def delete_row(self, table, pk_dict):
-        conn = self.connect()
-        try:
-            cursor = conn.cursor()
-            where_part = ' AND '.join(f'"{k}"=?' for k in pk_dict)
-            sql = f'DELETE FROM "{table}" WHERE {where_part}'
-            params = [pk_dict[k] for k in pk_dict]
-            cursor.execute(sql, params)
-            conn.commit()
-        finally:
-            self.close() 
\ No newline at end of file
+        self.pool().execute(*self._delete_sql(table, pk_dict))
+
+    def apply_changes(self, table, headers, inserts, updates, deletes):
+        """
+        表格编辑的全部修改作为一个写操作提交：一个事务、一次等待写线程，任一行失败则全部回滚
+        :param inserts: [(行号, 值列表)]
+        :param updates: [(行号, 列名, 新值, 主键字典)]
+        :param deletes: [(行号, 主键字典)]
+        """
+        statements = [(f'新增第{row + 1}行', self._insert_sql(table, headers, values)) for row, values in inserts]
+        statements += [(f'修改第{row + 1}行', self._update_sql(table, col, value, pk)) for row, col, value, pk in updates]
+        statements += [(f'删除第{row + 1}行', self._delete_sql(table, pk)) for row, pk in deletes]
+
+        def write(conn):
+            for label, (sql, params) in statements:
+                try:
+                    conn.execute(sql, params)
+                except sqlite3.Error as e:
+                    raise type(e)(f'{label}: {e}') from e
+
+        self.pool().write(write)
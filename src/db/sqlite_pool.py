@@ -0,0 +1,349 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from db.sqlite_client import readonly_uri, apply_pragmas
+
+# SQLite 访问层：每个数据库文件一个 SQLitePool，同一文件的浏览、导出、可视化、表格编辑共用
+# - 读：只读连接池（最多 MAX_READERS 个）；WAL 模式下读取不会被写入阻塞，也不会阻塞写入，
+#   其他日志模式下提交需要等正在进行的读取结束（由 busy_timeout 和提交重试处理）
+# - 写：一个专用写线程按顺序执行队列中的写操作；队列中积压的多个小写操作合并到同一个事务提交，
+#   每个操作包在 SAVEPOINT 中，单个失败只回滚它自己
+# - 数据库被其他程序锁住时先由 busy_timeout 等待，仍然失败再退避重试 BUSY_RETRIES 次
+# - 记录借用读连接和获取写锁的等待时间，用于在界面上显示锁等待情况
+# 日志模式只按连接配置设置（如“均衡”配置为 WAL），连接池不会自行修改数据库文件的日志模式
+
+MAX_READERS = 4
+BUSY_TIMEOUT = 5.0  # 秒
+BUSY_RETRIES = 3
+WRITE_BATCH_MAX = 200  # 一个事务最多合并的写操作数
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # 子进程（如并行导出的进程池）不能使用父进程的连接和写线程，各自重新建立
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _is_busy(error):
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in str(error) or 'busy' in str(error))
+
+
+class _WriteJob:
+    def __init__(self, func):
+        self.func = func
+        self.future = Future()
+
+
+class SQLitePool:
+    def __init__(self, db_path, pragmas=None, read_only=False, max_readers=MAX_READERS, busy_timeout=BUSY_TIMEOUT):
+        """
+        :param pragmas: 连接配置中的 PRAGMA，读写连接都会执行（只读连接跳过 journal_mode）
+        :param read_only: 只读连接池不启动写线程，写操作直接报错
+        """
+        self.db_path = db_path
+        self.pragmas = dict(pragmas or {})
+        self.read_only = read_only
+        self.max_readers = max_readers
+        self.busy_timeout = busy_timeout
+        self._idle = queue.LifoQueue()  # 空闲的读连接，后进先出，尽量复用缓存较热的连接
+        self._reader_count = 0
+        self._lock = threading.Lock()
+        self._stats = {'reads': 0, 'read_wait_ms': 0.0, 'read_wait_max_ms': 0.0,
+                       'writes': 0, 'write_errors': 0, 'transactions': 0, 'lock_wait_ms': 0.0,
+                       'lock_wait_max_ms': 0.0, 'busy_retries': 0}
+        self._queue = queue.Queue()
+        self._ready = threading.Event()
+        self._writer_error = None
+        self._closed = False
+        if read_only:
+            self._writer = None
+            self._ready.set()
+        else:
+            self._writer = threading.Thread(target=self._write_loop, name=f'sqlite-writer:{os.path.basename(db_path)}',
+                                            daemon=True)
+            self._writer.start()
+
+    # ---- 读 ----
+
+    def _open_reader(self):
+        conn = sqlite3.connect(readonly_uri(self.db_path), uri=True, timeout=self.busy_timeout,
+                               check_same_thread=False)
+        try:
+            apply_pragmas(conn, self.pragmas, read_only=True)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def acquire_reader(self):
+        """
+        借出一个只读连接，用完后必须 release_reader；连接数已满时等待其他读取归还
+        """
+        # 写线程先打开数据库并按配置设置日志模式，读连接随后打开
+        self._ready.wait()
+        started = time.perf_counter()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._reader_count < self.max_readers:
+                    self._reader_count += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    conn = self._open_reader()
+                except Exception:
+                    with self._lock:
+                        self._reader_count -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        waited = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats['reads'] += 1
+            self._stats['read_wait_ms'] += waited
+            self._stats['read_wait_max_ms'] = max(self._stats['read_wait_max_ms'], waited)
+        return conn
+
+    def release_reader(self, conn):
+        if self._closed:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()  # 不让未结束的读事务一直占着 WAL 快照，阻止检查点
+        self._idle.put(conn)
+
+    @contextmanager
+    def reader(self):
+        conn = self.acquire_reader()
+        try:
+            yield conn
+        finally:
+            self.release_reader(conn)
+
+    # ---- 写 ----
+
+    def submit(self, func):
+        """
+        把写操作放入写线程队列
+        :param func: func(conn)，在写线程的事务中执行，不能自行 commit/rollback
+        :return: concurrent.futures.Future，结果为 func 的返回值
+        """
+        if self.read_only:
+            raise sqlite3.OperationalError('只读连接不能写入')
+        if self._closed:
+            raise sqlite3.OperationalError('连接池已关闭')
+        job = _WriteJob(func)
+        self._queue.put(job)
+        return job.future
+
+    def write(self, func):
+        return self.submit(func).result()
+
+    def execute(self, sql, params=()):
+        """
+        执行一条写语句并等待提交，返回影响的行数
+        """
+        return self.write(lambda conn: conn.execute(sql, params).rowcount)
+
+    def _open_writer(self):
+        # isolation_level=None：事务由写线程显式 BEGIN/COMMIT
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+        try:
+            apply_pragmas(conn, self.pragmas)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _write_loop(self):
+        try:
+            conn = self._open_writer()
+        except Exception as e:
+            conn = None
+            self._writer_error = e
+        self._ready.set()
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    return
+                batch = [job]
+                stop = False
+                # 执行上一个事务期间积压的写操作合并提交
+                while len(batch) < WRITE_BATCH_MAX:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stop = True
+                        break
+                    batch.append(job)
+                if conn is None:
+                    for job in batch:
+                        job.future.set_exception(self._writer_error)
+                else:
+                    self._run_batch(conn, batch)
+                if stop:
+                    return
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _begin(self, conn):
+        # BEGIN IMMEDIATE 立即取得写锁，锁等待集中在这里而不是事务中途
+        self._retry_busy(conn, 'BEGIN IMMEDIATE')
+
+    def _commit(self, conn):
+        # 非 WAL 模式下提交要等所有读取释放共享锁，超时后重试，事务仍然有效
+        self._retry_busy(conn, 'COMMIT')
+
+    def _retry_busy(self, conn, sql):
+        started = time.perf_counter()
+        retries = 0
+        try:
+            while True:
+                try:
+                    conn.execute(sql)
+                    return
+                except sqlite3.OperationalError as e:
+                    if not _is_busy(e) or retries >= BUSY_RETRIES:
+                        raise
+                    retries += 1
+                    time.sleep(0.05 * 2 ** retries)
+        finally:
+            waited = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._stats['busy_retries'] += retries
+                self._stats['lock_wait_ms'] += waited
+                self._stats['lock_wait_max_ms'] = max(self._stats['lock_wait_max_ms'], waited)
+
+    def _run_batch(self, conn, batch):
+        try:
+            self._begin(conn)
+        except Exception as e:
+            for job in batch:
+                job.future.set_exception(e)
+            with self._lock:
+                self._stats['write_errors'] += len(batch)
+            return
+        results = []
+        for job in batch:
+            conn.execute('SAVEPOINT job')
+            try:
+                results.append((job, job.func(conn), None))
+                conn.execute('RELEASE job')
+            except Exception as e:
+                conn.execute('ROLLBACK TO job')
+                conn.execute('RELEASE job')
+                results.append((job, None, e))
+        try:
+            self._commit(conn)
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            results = [(job, None, e) for job, _, _ in results]
+        errors = sum(1 for _, _, error in results if error is not None)
+        with self._lock:
+            self._stats['transactions'] += 1
+            self._stats['writes'] += len(results) - errors
+            self._stats['write_errors'] += errors
+        for job, result, error in results:
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    # ---- 状态 ----
+
+    def metrics(self):
+        """
+        :return: 读取次数、借用读连接的等待时间、写入次数、事务数、写锁等待时间、忙重试次数、队列长度等
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['readers'] = self._reader_count
+        stats['queued_writes'] = self._queue.qsize()
+        return stats
+
+    def close(self):
+        # 等待队列中已提交的写操作完成后关闭
+        self._closed = True
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def _pool_key(db_path, pragmas, read_only):
+    return os.path.abspath(db_path), tuple(sorted((pragmas or {}).items())), bool(read_only)
+
+
+def get_pool(db_path, pragmas=None, read_only=False):
+    """
+    取得（必要时创建）数据库文件对应的连接池，同一文件、同一配置的连接共用一个
+    """
+    key = _pool_key(db_path, pragmas, read_only)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SQLitePool(db_path, pragmas, read_only)
+        return pool
+
+
+def pool_metrics(db_path):
+    """
+    :return: 该文件各连接池 metrics 的合计，尚未建立连接池时返回 None
+    """
+    path = os.path.abspath(db_path)
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if key[0] == path]
+    if not pools:
+        return None
+    total = {}
+    for pool in pools:
+        for name, value in pool.metrics().items():
+            if name.endswith('_max_ms'):
+                total[name] = max(total.get(name, 0), value)
+            else:
+                total[name] = total.get(name, 0) + value
+    return total
+
+
+def prune_pools(connections):
+    """
+    关闭不再被任何连接配置使用的连接池（连接被编辑或删除后调用），释放其写线程和读连接
+    :param connections: 当前使用连接池的连接配置
+    """
+    keep = {_pool_key(c['db_path'], c.get('pragmas'), c.get('read_only', False)) for c in connections}
+    with _pools_lock:
+        stale = [_pools.pop(key) for key in list(_pools) if key not in keep]
+    for pool in stale:
+        pool.close()
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
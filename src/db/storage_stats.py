@@ -0,0 +1,155 @@
+import threading
+import time
+from db.client_factory import create_client, dialect_of
+from db.health_monitor import profile_key
+
+# 库级存储占用统计：每张表的数据大小、索引大小、行数估计、平均行长、碎片率和空闲空间
+# - MySQL：information_schema.TABLES（DATA_FREE 为已分配未使用的空间）与 STATISTICS（索引数）
+# - SQLite：dbstat 虚拟表按页汇总，索引按 sqlite_master.tbl_name 归到所属的表；
+#   表内空闲为页内未使用的字节，库级空闲页来自 freelist_count
+# - PostgreSQL：pg_relation_size / pg_indexes_size，碎片率用死元组比例近似（需 VACUUM 回收）
+# 统计在后台读取，结果按 (连接, 库) 缓存并记录统计时间，需要时手动刷新
+
+STAT_COLUMNS = ['table', 'rows', 'avg_row_length', 'data_bytes', 'index_bytes', 'total_bytes', 'free_bytes',
+                'fragmentation', 'indexes']
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _row(table, rows, data, index, free, indexes, avg=None, fragmentation=None, free_in_size=False):
+    """
+    :param free_in_size: free 已包含在 data/index 中（SQLite dbstat 的 unused 是 pgsize 的一部分），
+                         否则为额外分配的空间（MySQL DATA_FREE）
+    """
+    data, index = data or 0, index or 0
+    if avg is None and rows:
+        avg = data / rows
+    allocated = data + index if free_in_size else data + index + (free or 0)
+    if fragmentation is None and free is not None and allocated:
+        fragmentation = free / allocated
+    return {'table': table, 'rows': rows, 'avg_row_length': avg, 'data_bytes': data, 'index_bytes': index,
+            'total_bytes': data + index, 'free_bytes': free, 'fragmentation': fragmentation, 'indexes': indexes}
+
+
+def _read_mysql(client, database):
+    with client.conn.cursor() as cursor:
+        cursor.execute(
+            'SELECT TABLE_NAME, COUNT(DISTINCT INDEX_NAME) FROM information_schema.STATISTICS '
+            'WHERE TABLE_SCHEMA = %s GROUP BY TABLE_NAME', (database,))
+        index_counts = dict(cursor.fetchall())
+        cursor.execute(
+            'SELECT TABLE_NAME, TABLE_ROWS, AVG_ROW_LENGTH, DATA_LENGTH, INDEX_LENGTH, DATA_FREE '
+            "FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_TYPE = 'BASE TABLE'", (database,))
+        rows = [_row(name, table_rows, data, index, free, index_counts.get(name, 0), avg)
+                for name, table_rows, avg, data, index, free in cursor.fetchall()]
+    return rows, {}
+
+
+def _read_sqlite(client, database):
+    cursor = client.conn.cursor()
+    cursor.execute("SELECT name, type, tbl_name FROM sqlite_master WHERE type IN ('table', 'index')")
+    owner, index_counts = {}, {}
+    for name, kind, table in cursor.fetchall():
+        owner[name] = table
+        if kind == 'index':
+            index_counts[table] = index_counts.get(table, 0) + 1
+    try:
+        # 叶子页上的单元数即行数；payload 为记录本身的字节数
+        cursor.execute("""
+            SELECT name, SUM(pgsize), SUM(unused), SUM(CASE WHEN pagetype = 'leaf' THEN ncell ELSE 0 END),
+                   SUM(payload)
+            FROM dbstat GROUP BY name""")
+    except Exception as e:
+        raise RuntimeError(f'当前 SQLite 未启用 dbstat 虚拟表，无法统计存储占用: {e}')
+    stats = {}
+    for name, size, unused, cells, payload in cursor.fetchall():
+        table = owner.get(name, name)
+        entry = stats.setdefault(table, {'data': 0, 'index': 0, 'free': 0, 'rows': None, 'payload': 0})
+        entry['free'] += unused or 0
+        if name == table:
+            entry['data'] += size or 0
+            entry['rows'] = cells
+            entry['payload'] += payload or 0
+        else:
+            entry['index'] += size or 0  # 索引及 sqlite_autoindex_*
+    cursor.execute('PRAGMA page_size')
+    page_size = cursor.fetchone()[0]
+    cursor.execute('PRAGMA freelist_count')
+    free_pages = cursor.fetchone()[0]
+    cursor.execute('PRAGMA page_count')
+    page_count = cursor.fetchone()[0]
+    rows = []
+    for table, s in stats.items():
+        if table.startswith('sqlite_') or table not in owner:
+            continue
+        avg = s['payload'] / s['rows'] if s['rows'] else None
+        rows.append(_row(table, s['rows'], s['data'], s['index'], s['free'], index_counts.get(table, 0), avg,
+                         free_in_size=True))
+    summary = {'free_pages': free_pages, 'free_bytes': free_pages * page_size, 'file_bytes': page_count * page_size}
+    return rows, summary
+
+
+def _read_postgres(client, database):
+    with client.conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT c.relname, c.reltuples::bigint, pg_relation_size(c.oid), pg_indexes_size(c.oid),
+                   (SELECT COUNT(*) FROM pg_index i WHERE i.indrelid = c.oid),
+                   s.n_live_tup, s.n_dead_tup
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')""")
+        result = cursor.fetchall()
+    client.conn.rollback()
+    rows = []
+    for name, reltuples, data, index, indexes, live, dead in result:
+        estimate = reltuples if reltuples is not None and reltuples >= 0 else live
+        fragmentation = dead / (live + dead) if live is not None and dead and live + dead else None
+        rows.append(_row(name, estimate, data, index, None, indexes, fragmentation=fragmentation))
+    return rows, {}
+
+
+READERS = {'mysql': _read_mysql, 'sqlite': _read_sqlite, 'postgres': _read_postgres}
+
+
+def supports_storage_stats(conn):
+    try:
+        return dialect_of(conn) in READERS
+    except ValueError:
+        return False
+
+
+def read_storage_stats(conn, database=None):
+    """
+    读取库中各表的存储占用（在后台线程中调用），结果写入缓存
+    :return: {'tables': [dict(STAT_COLUMNS)], 'summary': {...}, 'computed_at': 时间戳, 'elapsed_ms': 耗时}
+    """
+    dialect = dialect_of(conn)
+    reader = READERS.get(dialect)
+    if reader is None:
+        raise ValueError(f'暂不支持该类型的存储统计: {conn["type"]}')
+    if dialect == 'mysql':
+        database = database or conn.get('database')
+    started = time.perf_counter()
+    client = create_client(conn, database=database if dialect != 'sqlite' else None)
+    client.connect()
+    try:
+        tables, summary = reader(client, database)
+    finally:
+        client.close()
+    stats = {'tables': sorted(tables, key=lambda r: r['total_bytes'], reverse=True), 'summary': summary,
+             'computed_at': time.time(), 'elapsed_ms': (time.perf_counter() - started) * 1000}
+    with _cache_lock:
+        _cache[(profile_key(conn), database)] = stats
+    return stats
+
+
+def cached_storage_stats(conn, database=None):
+    """
+    :return: 上次 read_storage_stats 的结果，没有时返回 None
+    """
+    if dialect_of(conn) == 'mysql':
+        database = database or conn.get('database')
+    with _cache_lock:
+        return _cache.get((profile_key(conn), database))
@@ -0,0 +1,223 @@
+import datetime
+import decimal
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from db.client_factory import create_client, dialect_of
+from db.export_writers import quote_ident, sql_literal
+from db.parallel_export import find_integer_pk
+from db.transfer import get_column_defs
+
+# 基于分块校验和的表数据对比：
+# 按主键区间分块，两端各自计算 (行数, 哈希)；只有不一致的块才继续细分，
+# 细分到足够小后再逐行拉取对比，并生成让目标表与源表一致的同步脚本。
+# 两端都是MySQL时在服务器上用 BIT_XOR(CRC32(CONCAT_WS(...))) 计算；
+# 其他组合的值表示不一致（如 DECIMAL '1.50' 与 REAL 1.5），改为在客户端归一化后计算同样的哈希。
+SPLIT_FANOUT = 8
+
+
+def _normalize(value):
+    if value is None:
+        return '\x00N'
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float, decimal.Decimal)):
+        d = decimal.Decimal(str(value)) if isinstance(value, float) else decimal.Decimal(value)
+        if d == d.to_integral_value():
+            return str(int(d))
+        return format(d.normalize(), 'f')
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(' ')
+    return str(value)
+
+
+def row_key(row):
+    return tuple(_normalize(v) for v in row)
+
+
+def _row_hash(row):
+    return zlib.crc32('\x1f'.join(row_key(row)).encode('utf-8'))
+
+
+class _Side:
+    def __init__(self, conn, table, database, pk, columns):
+        self.conn = conn
+        self.dialect = dialect_of(conn)
+        self.table = quote_ident(table, self.dialect)
+        self.database = database
+        self.pk = quote_ident(pk, self.dialect)
+        self.columns = columns
+        self.placeholder = '%s' if self.dialect == 'mysql' else '?'
+        self._local = threading.local()
+        self._clients = []
+        self._lock = threading.Lock()
+
+    def cursor(self):
+        # 每个工作线程复用自己的连接
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = create_client(self.conn, database=self.database)
+            client.connect()
+            self._local.client = client
+            with self._lock:
+                self._clients.append(client)
+        return client.conn.cursor()
+
+    def _where(self, lo, hi):
+        return f'{self.pk} >= {self.placeholder} AND {self.pk} < {self.placeholder}', (lo, hi)
+
+    def bounds(self):
+        cursor = self.cursor()
+        cursor.execute(f'SELECT MIN({self.pk}), MAX({self.pk}) FROM {self.table}')
+        return cursor.fetchone()
+
+    def server_checksum(self, lo, hi):
+        cols = ', '.join(quote_ident(c, 'mysql') for c in self.columns)
+        nulls = ', '.join(f'ISNULL({quote_ident(c, "mysql")})' for c in self.columns)
+        where, params = self._where(lo, hi)
+        cursor = self.cursor()
+        cursor.execute(
+            f"SELECT COUNT(*), COALESCE(BIT_XOR(CAST(CRC32(CONCAT_WS('#', {cols}, {nulls})) AS UNSIGNED)), 0) "
+            f"FROM {self.table} WHERE {where}", params)
+        count, checksum = cursor.fetchone()
+        return int(count), int(checksum)
+
+    def client_checksum(self, lo, hi):
+        count, checksum = 0, 0
+        for row in self.fetch_rows(lo, hi):
+            count += 1
+            checksum ^= _row_hash(row)
+        return count, checksum
+
+    def fetch_rows(self, lo, hi):
+        cols = ', '.join(quote_ident(c, self.dialect) for c in self.columns)
+        where, params = self._where(lo, hi)
+        cursor = self.cursor()
+        cursor.execute(f'SELECT {cols} FROM {self.table} WHERE {where} ORDER BY {self.pk}', params)
+        while True:
+            rows = cursor.fetchmany(5000)
+            if not rows:
+                break
+            yield from rows
+
+    def close(self):
+        for client in self._clients:
+            try:
+                client.close()
+            except Exception:
+                # sqlite3 连接只能在创建它的线程中关闭，交给垃圾回收
+                pass
+
+
+def compare_tables(src_conn, src_table, dst_conn, dst_table=None, src_database=None, dst_database=None,
+                   chunks=16, leaf_rows=1000, workers=4, progress_callback=None, cancel_event=None):
+    """
+    对比源表与目标表。
+    :param progress_callback: 回调参数为 {'checked': 已检查块数, 'mismatched': 不一致块数, 'pending': 待检查块数}
+    :return: {'pk', 'columns', 'only_in_source', 'only_in_target', 'changed', 'chunks_checked', 'chunks_mismatched', 'mode'}
+    """
+    dst_table = dst_table or src_table
+    pk = find_integer_pk(src_conn, src_table, src_database)
+    if pk is None or pk == 'rowid':
+        raise ValueError(f'表[{src_table}]没有单列整型主键，无法分块对比')
+    src_cols = [c['name'] for c in get_column_defs(src_conn, src_table, src_database)]
+    dst_cols = {c['name'] for c in get_column_defs(dst_conn, dst_table, dst_database)}
+    missing = [c for c in src_cols if c not in dst_cols]
+    if missing:
+        raise ValueError(f"目标表缺少字段: {', '.join(missing)}")
+    src = _Side(src_conn, src_table, src_database, pk, src_cols)
+    dst = _Side(dst_conn, dst_table, dst_database, pk, src_cols)
+    server_side = src.dialect == dst.dialect == 'mysql'
+    pk_pos = src_cols.index(pk)
+    result = {'pk': pk, 'columns': src_cols, 'only_in_source': [], 'only_in_target': [], 'changed': [],
+              'chunks_checked': 0, 'chunks_mismatched': 0, 'mode': 'server' if server_side else 'client'}
+    lock = threading.Lock()
+
+    def checksum(side, lo, hi):
+        return side.server_checksum(lo, hi) if server_side else side.client_checksum(lo, hi)
+
+    def diff_rows(lo, hi):
+        src_rows = {row[pk_pos]: row for row in src.fetch_rows(lo, hi)}
+        only_target, changed = [], []
+        for row in dst.fetch_rows(lo, hi):
+            other = src_rows.pop(row[pk_pos], None)
+            if other is None:
+                only_target.append(row)
+            elif row_key(other) != row_key(row):
+                changed.append((other, row))
+        return list(src_rows.values()), only_target, changed
+
+    def check(lo, hi):
+        # 返回需要继续细分的子区间
+        src_sum = checksum(src, lo, hi)
+        dst_sum = checksum(dst, lo, hi)
+        if src_sum == dst_sum:
+            return False, []
+        if hi - lo <= leaf_rows or max(src_sum[0], dst_sum[0]) <= leaf_rows:
+            only_src, only_dst, changed = diff_rows(lo, hi)
+            with lock:
+                result['only_in_source'].extend(only_src)
+                result['only_in_target'].extend(only_dst)
+                result['changed'].extend(changed)
+            return True, []
+        step = max(1, (hi - lo + SPLIT_FANOUT - 1) // SPLIT_FANOUT)
+        return True, [(a, min(a + step, hi)) for a in range(lo, hi, step)]
+
+    try:
+        bounds = [b for b in (src.bounds() + dst.bounds()) if b is not None]
+        if not bounds:
+            return result
+        lo, hi = min(bounds), max(bounds) + 1
+        step = max(1, (hi - lo + chunks - 1) // max(1, chunks))
+        ranges = [(a, min(a + step, hi)) for a in range(lo, hi, step)]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            pending = {pool.submit(check, a, b) for a, b in ranges}
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    for future in pending:
+                        future.cancel()
+                    raise RuntimeError('对比已取消')
+                for future in done:
+                    mismatched, children = future.result()
+                    result['chunks_checked'] += 1
+                    result['chunks_mismatched'] += int(mismatched)
+                    pending |= {pool.submit(check, a, b) for a, b in children}
+                if progress_callback:
+                    progress_callback({'checked': result['chunks_checked'],
+                                       'mismatched': result['chunks_mismatched'], 'pending': len(pending)})
+    finally:
+        src.close()
+        dst.close()
+    for key in ('only_in_source', 'only_in_target'):
+        result[key].sort(key=lambda r: r[pk_pos])
+    result['changed'].sort(key=lambda pair: pair[0][pk_pos])
+    return result
+
+
+def generate_sync_script(diff, dst_table, dialect):
+    """
+    生成使目标表与源表一致的SQL脚本
+    """
+    table = quote_ident(dst_table, dialect)
+    columns = diff['columns']
+    pk = diff['pk']
+    pk_pos = columns.index(pk)
+    pk_col = quote_ident(pk, dialect)
+    cols = ', '.join(quote_ident(c, dialect) for c in columns)
+    lines = []
+    for row in diff['only_in_target']:
+        lines.append(f'DELETE FROM {table} WHERE {pk_col} = {sql_literal(row[pk_pos], dialect)};')
+    for src_row, dst_row in diff['changed']:
+        sets = ', '.join(
+            f'{quote_ident(c, dialect)} = {sql_literal(src_row[i], dialect)}'
+            for i, c in enumerate(columns)
+            if i != pk_pos and _normalize(src_row[i]) != _normalize(dst_row[i])
+        )
+        lines.append(f'UPDATE {table} SET {sets} WHERE {pk_col} = {sql_literal(src_row[pk_pos], dialect)};')
+    for row in diff['only_in_source']:
+        values = ', '.join(sql_literal(v, dialect) for v in row)
+        lines.append(f'INSERT INTO {table} ({cols}) VALUES ({values});')
+    return '\n'.join(lines) + ('\n' if lines else '')
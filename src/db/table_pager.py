@@ -0,0 +1,86 @@
+import time
+from db.client_factory import create_client, driver_of, CAP_KEYSET_PAGING, CAP_ROW_ESTIMATE, CAP_READ_POOL
+from db.query_builder import build_page_query, build_keyset_query
+from db.index_advisor import record_query
+from db.large_values import select_list
+
+# 表数据分页读取，按驱动能力选择最快的方式：
+# - 单列主键且未按其他列排序时按主键翻页（keyset），连续翻页不再 OFFSET 扫过前面的行
+# - 跳页时用 OFFSET 读取该页，并记住页尾主键，之后的相邻页仍走 keyset
+# - 不带筛选时，行数估计不低于 ESTIMATE_MIN_ROWS 的大表直接用估计值作为总数，避免每次翻页 COUNT(*) 全表
+# - 给出大字段时只取其前缀，各大字段的完整长度追加在每行末尾（见 db.large_values）
+
+ESTIMATE_MIN_ROWS = 100000
+
+
+class TablePager:
+    def __init__(self, conn, table_name, pk_fields=None, columns=None, large_columns=None):
+        """
+        :param columns: 表的全部列名，与 large_columns 一起提供时按列清单查询
+        :param large_columns: {列名: 类型}，见 large_values.large_columns
+        """
+        self.conn = conn
+        self.table_name = table_name
+        self.driver = driver_of(conn)
+        self.columns = select_list(columns, large_columns, self.driver.dialect) if columns and large_columns else None
+        pk_fields = pk_fields or []
+        self.key_column = pk_fields[0] if len(pk_fields) == 1 and self.driver.supports(CAP_KEYSET_PAGING) else None
+        self._boundaries = {}  # {页码: 该页最后一行的主键值}
+        self._boundary_state = None  # 页尾主键对应的筛选条件、方向和页大小，任一变化时清空
+
+    def __call__(self, page, page_size, filters=None, order_by=None):
+        """
+        与 TableDataViewer 的 fetch_page_callback 相同
+        :return: (行, 总行数)
+        """
+        client = create_client(self.conn)
+        try:
+            # 有只读连接池的驱动（SQLite）从池中借连接，翻页不会与正在提交的修改互相锁住
+            cursor = client.stream_cursor() if self.driver.supports(CAP_READ_POOL) else client.connect().cursor()
+            rows = self._fetch_rows(cursor, page, page_size, filters, order_by)
+            return rows, self._count(client, cursor, filters)
+        finally:
+            client.close()
+
+    def _fetch_rows(self, cursor, page, page_size, filters, order_by):
+        dialect = self.driver.dialect
+        key = self.key_column
+        if key is None or (order_by and order_by[0] != key):
+            select_sql, params, _, _ = build_page_query(self.table_name, dialect, page, page_size, filters, order_by,
+                                                        self.columns)
+            return self._execute(cursor, select_sql, params, filters or order_by)
+        direction = order_by[1] if order_by else 'ASC'
+        state = (tuple(filters or ()), direction, page_size)
+        if state != self._boundary_state:
+            self._boundaries = {}
+            self._boundary_state = state
+        after = self._boundaries.get(page - 1)
+        if page == 1 or after is not None:
+            select_sql, params = build_keyset_query(self.table_name, dialect, key, after, page_size, filters, direction,
+                                                    self.columns)
+        else:
+            select_sql, params, _, _ = build_page_query(self.table_name, dialect, page, page_size, filters,
+                                                        (key, direction), self.columns)
+        rows = self._execute(cursor, select_sql, params, filters)
+        if rows:
+            index = [d[0] for d in cursor.description].index(key)
+            self._boundaries[page] = rows[-1][index]
+        return rows
+
+    def _execute(self, cursor, sql, params, record):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        if record:
+            # 带筛选/排序的翻页记入索引建议的分析范围（按主键翻页本身已走主键索引）
+            record_query(self.conn, sql, params, (time.perf_counter() - started) * 1000)
+        return rows
+
+    def _count(self, client, cursor, filters):
+        if not filters and self.driver.supports(CAP_ROW_ESTIMATE):
+            estimate = client.estimate_rows(self.table_name)
+            if estimate is not None and estimate >= ESTIMATE_MIN_ROWS:
+                return estimate
+        _, _, count_sql, count_params = build_page_query(self.table_name, self.driver.dialect, 1, 1, filters)
+        cursor.execute(count_sql, count_params)
+        return cursor.fetchone()[0]
@@ -0,0 +1,177 @@
+import datetime
+import decimal
+import queue
+import re
+import threading
+import time
+from db.client_factory import create_client, dialect_of
+from db.export_writers import quote_ident
+
+# 跨库表传输：读取线程从源表流式取数放入有界队列，写入方批量写入目标表，
+# 两端并行执行，队列满时读取方自动等待，内存占用只与 批大小 x 队列长度 有关
+
+_SENTINEL = object()
+
+
+def get_column_defs(conn, table_name, database=None):
+    """
+    统一两种后端的字段描述：[{'name', 'type', 'nullable', 'pk'}]
+    """
+    client = create_client(conn, database=database)
+    schema = client.get_table_schema(table_name)
+    if not schema:
+        raise ValueError(f'无法读取表[{table_name}]的结构')
+    if dialect_of(conn) == 'mysql':
+        return [{'name': c['Field'], 'type': c['Type'], 'nullable': c['Null'] == 'YES', 'pk': c['Key'] == 'PRI'}
+                for c in schema]
+    return [{'name': c['name'], 'type': c['type'] or '', 'nullable': not c['notnull'], 'pk': bool(c['pk'])}
+            for c in schema]
+
+
+def _mysql_to_sqlite(t):
+    t = t.lower()
+    if 'int' in t:
+        return 'INTEGER'
+    if t.startswith(('decimal', 'numeric')):
+        return 'NUMERIC'
+    if t.startswith(('float', 'double', 'real')):
+        return 'REAL'
+    if 'blob' in t or 'binary' in t:
+        return 'BLOB'
+    return 'TEXT'
+
+
+def _sqlite_to_mysql(t, pk):
+    # 参考 SQLite 类型亲和性规则
+    u = t.upper()
+    if 'INT' in u:
+        return 'BIGINT'
+    if any(k in u for k in ('CHAR', 'CLOB', 'TEXT')):
+        m = re.search(r'VARCHAR\s*\((\d+)\)', u)
+        if m:
+            return f'VARCHAR({m.group(1)})'
+        return 'VARCHAR(255)' if pk else 'LONGTEXT'
+    if 'BLOB' in u or not u:
+        return 'VARBINARY(255)' if pk else 'LONGBLOB'
+    if any(k in u for k in ('REAL', 'FLOA', 'DOUB')):
+        return 'DOUBLE'
+    if u.startswith(('DECIMAL', 'NUMERIC')) and '(' in u:
+        return u
+    if u in ('DATE', 'DATETIME', 'TIMESTAMP', 'TIME', 'BOOLEAN'):
+        return u
+    return 'DECIMAL(38,10)'
+
+
+def map_column_type(col_type, src_dialect, dst_dialect, pk=False):
+    if src_dialect == dst_dialect:
+        return col_type
+    if dst_dialect == 'sqlite':
+        return _mysql_to_sqlite(col_type)
+    return _sqlite_to_mysql(col_type, pk)
+
+
+def build_create_table(table_name, columns, src_dialect, dst_dialect):
+    defs = []
+    for c in columns:
+        line = f"{quote_ident(c['name'], dst_dialect)} {map_column_type(c['type'], src_dialect, dst_dialect, c['pk'])}"
+        if not c['nullable']:
+            line += ' NOT NULL'
+        defs.append(line)
+    pks = [quote_ident(c['name'], dst_dialect) for c in columns if c['pk']]
+    if pks:
+        defs.append(f"PRIMARY KEY ({', '.join(pks)})")
+    return f"CREATE TABLE IF NOT EXISTS {quote_ident(table_name, dst_dialect)} (\n  " + ',\n  '.join(defs) + '\n)'
+
+
+def _sqlite_value(v):
+    # sqlite3 不能直接绑定 Decimal / timedelta 等类型
+    if isinstance(v, decimal.Decimal):
+        return str(v)
+    if isinstance(v, (datetime.date, datetime.time, datetime.timedelta)):
+        return str(v)
+    return v
+
+
+def transfer_table(src_conn, src_table, dst_conn, dst_table=None, create_table=True, batch_size=2000,
+                   queue_size=8, src_database=None, dst_database=None, progress_callback=None,
+                   cancel_event=None):
+    """
+    将源表数据直接写入目标连接。
+    :param progress_callback: 回调参数为 {'rows': 已写行数, 'rows_per_sec': 速率, 'elapsed': 秒}
+    :return: 写入行数
+    """
+    dst_table = dst_table or src_table
+    src_dialect = dialect_of(src_conn)
+    dst_dialect = dialect_of(dst_conn)
+    columns = get_column_defs(src_conn, src_table, src_database)
+    names = [c['name'] for c in columns]
+
+    dst_client = create_client(dst_conn, database=dst_database)
+    dst = dst_client.connect()
+    try:
+        cursor = dst.cursor()
+        if create_table:
+            cursor.execute(build_create_table(dst_table, columns, src_dialect, dst_dialect))
+            dst.commit()
+        placeholder = '%s' if dst_dialect == 'mysql' else '?'
+        insert_sql = (f"INSERT INTO {quote_ident(dst_table, dst_dialect)} "
+                      f"({', '.join(quote_ident(n, dst_dialect) for n in names)}) "
+                      f"VALUES ({', '.join([placeholder] * len(names))})")
+
+        batches = queue.Queue(maxsize=max(1, queue_size))
+        stop = threading.Event()
+
+        def reader():
+            src_client = create_client(src_conn, database=src_database)
+            try:
+                src_cursor = src_client.stream_cursor()
+                cols = ', '.join(quote_ident(n, src_dialect) for n in names)
+                src_cursor.execute(f'SELECT {cols} FROM {quote_ident(src_table, src_dialect)}')
+                while not stop.is_set():
+                    rows = src_cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    batches.put(rows)
+                batches.put(_SENTINEL)
+            except Exception as e:
+                batches.put(e)
+            finally:
+                src_client.close()
+
+        thread = threading.Thread(target=reader, name='transfer-reader', daemon=True)
+        thread.start()
+        start = time.perf_counter()
+        total = 0
+        try:
+            if dst_dialect == 'mysql':
+                cursor.execute('SET SESSION foreign_key_checks = 0')
+            while True:
+                item = batches.get()
+                if item is _SENTINEL:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if cancel_event is not None and cancel_event.is_set():
+                    raise RuntimeError('传输已取消')
+                if dst_dialect == 'sqlite':
+                    item = [tuple(_sqlite_value(v) for v in row) for row in item]
+                cursor.executemany(insert_sql, item)
+                if dst_dialect == 'mysql':
+                    dst.commit()
+                total += len(item)
+                if progress_callback:
+                    elapsed = time.perf_counter() - start
+                    progress_callback({'rows': total, 'elapsed': elapsed,
+                                       'rows_per_sec': total / elapsed if elapsed else 0})
+            dst.commit()
+        finally:
+            stop.set()
+            # 让读取线程从阻塞的 put 中退出
+            while thread.is_alive():
+                try:
+                    batches.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+    finally:
+        dst_client.close()
+    return total
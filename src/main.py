@@ -3,21 +3,61 @@ from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QAction, QTabWidget, QTreeWidget, QTreeWidgetItem, QSplitter, QWidget, QVBoxLayout, QLabel, QStatusBar,
     QPushButton, QHBoxLayout, QMenu, QMessageBox, QTableWidget, QTableWidgetItem, QComboBox, QInputDialog, QFileDialog, QTextEdit, QDialog, QDialogButtonBox
 )
-from PyQt5.QtCore import Qt, QPoint, QEvent
+from PyQt5.QtCore import Qt, QPoint, QEvent, pyqtSignal
 from PyQt5.QtGui import QIcon
-from db.connection_manager import ConnectionManager, KEY_FILE
+from PyQt5 import sip
+from db.connection_manager import ConnectionManager, KEY_FILE, CONNECTIONS_FILE
 from ui.connection_dialog import ConnectionDialog
 from ui.sql_editor import SQLEditor
 from ui.visualize_dialog import VisualizeDialog
 from ui.table_data_viewer import TableDataViewer
 from ui.master_password_dialog import MasterPasswordDialog
+from ui.job_scheduler import JobScheduler, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BULK
+from ui.jobs_dock import JobsDock
+from ui.parallel_export_dialog import ParallelExportDialog
+from ui.backup_dialog import BackupDialog, RestoreDialog
+from ui.transfer_dialog import TransferDialog
+from ui.table_diff_view import TableDiffDialog, TableDiffResultWidget
+from ui.history_panel import HistoryPanel
+from ui.fanout_view import FanoutDialog, FanoutResultWidget
+from ui.redis_key_browser import RedisKeyBrowser
+from ui.index_advisor_view import IndexAdvisorWidget
+from ui.storage_view import StorageStatsWidget, format_bytes
+from ui.memory_governor import MemoryGovernor
 import csv
 import json
 import shutil
 from datetime import datetime
 import os
+import re
+import time
 import traceback
+import itertools
+import multiprocessing
 from db.utils import resource_path
+from db.result_buffer import ColumnarResult
+from db.spill_store import collect_result
+from db.large_values import large_columns
+from db.export_writers import EXPORT_FORMATS, COMPRESSIONS, detect_format, export_path_suffix, open_export_stream, open_export_writer, export_cursor, quote_ident
+from db.client_factory import (create_client, dialect_of, driver_of, get_driver, supports, load_plugins, CAP_SQL,
+                               CAP_DATABASES, CAP_SERVER_CURSOR, CAP_BULK_LOAD, CAP_BULK_TOOLS, CAP_KEY_BROWSER,
+                               CAP_READ_POOL, register_client)
+from db.table_pager import TablePager
+from db.parallel_export import parallel_export
+from db.backup import backup_database
+from db.restore import restore_backup
+from db.transfer import transfer_table
+from db.table_diff import compare_tables, generate_sync_script
+from db.query_builder import placeholder_of
+from db.schema_index import refresh_schema_index
+from db.query_history import QueryHistory
+from db.fanout import fanout_query
+from db.health_monitor import HealthMonitor, profile_key
+from db.sqlite_pool import pool_metrics, close_pools, prune_pools
+from db.index_advisor import record_query, SUPPORTED_DIALECTS as ADVISOR_DIALECTS
+from db.storage_stats import supports_storage_stats
+
+IMPORT_BATCH_SIZE = 5000  # CSV 导入每批插入的行数
 
 class WelcomeWidget(QWidget):
     def __init__(self, tab_widget, parent=None):
@@ -45,15 +85,28 @@ class WelcomeWidget(QWidget):
         idx = self.tab_widget.indexOf(self)
         if idx != -1:
             self.tab_widget.removeTab(idx)
+            self.deleteLater()
 
 class MainWindow(QMainWindow):
+    health_changed = pyqtSignal(object, object)  # 连接标识, 状态；由健康监控线程发出
+
     def __init__(self):
         super().__init__()
         self.setWindowIcon(QIcon(resource_path('res/img/favicon.ico')))
+        plugin_errors = load_plugins()  # 第三方驱动插件，需在读取连接和构建界面之前注册
         self._init_conn_manager()
+        self.scheduler = JobScheduler(max_workers=max(4, min(8, os.cpu_count() or 4)))  # 所有后台任务统一调度
+        self._schema_indexes = {}  # (连接序号, 库名) -> SchemaIndex，供SQL编辑器补全
+        self._schema_loading = set()
+        self.history = QueryHistory()
+        self.health = HealthMonitor(on_status=self.health_changed.emit)
+        self.health_changed.connect(self.on_health_changed)
         self.setWindowTitle('数据库管理工具')
         self.resize(1200, 800)
         self.init_ui()
+        for name, error in plugin_errors:
+            self.log_message(f'加载驱动插件[{name}]失败: {error}')
+        self.prewarm_connections()
 
     def _init_conn_manager(self):
         self.conn_manager = ConnectionManager()
@@ -91,9 +144,16 @@ class MainWindow(QMainWindow):
         open_sql_action = QAction(QIcon(), '打开SQL编辑器', self)
         open_sql_action.setShortcut('Ctrl+T')
         open_sql_action.triggered.connect(self.open_sql_editor_tab)
+        history_action = QAction(QIcon(), '查询历史', self)
+        history_action.setShortcut('Ctrl+H')
+        history_action.triggered.connect(self.open_history_tab)
         db_menu.addAction(new_conn_action)
         db_menu.addAction(open_sql_action)
         db_menu.addAction(refresh_conn_action)
+        db_menu.addAction(history_action)
+        fanout_action = QAction(QIcon(), '多连接执行', self)
+        fanout_action.triggered.connect(self.run_fanout_query)
+        db_menu.addAction(fanout_action)
 
         # 主题菜单
         theme_menu = menubar.addMenu('主题')
@@ -126,6 +186,16 @@ class MainWindow(QMainWindow):
         # 状态栏
         self.setStatusBar(QStatusBar(self))
         self.statusBar().showMessage('准备就绪')
+        self.memory_label = QLabel('')
+        self.statusBar().addPermanentWidget(self.memory_label)
+
+        # 后台任务面板，默认隐藏
+        self.jobs_dock = JobsDock(self.scheduler, self)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.jobs_dock)
+        self.jobs_dock.hide()
+        jobs_action = self.jobs_dock.toggleViewAction()
+        jobs_action.setShortcut('Ctrl+J')
+        db_menu.addAction(jobs_action)
 
         # 左侧：数据库对象树 + 新建连接按钮
         left_widget = QWidget()
@@ -150,6 +220,9 @@ class MainWindow(QMainWindow):
         self.tabs.setMovable(True)
         self.tabs.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tabs.customContextMenuRequested.connect(self.show_tab_context_menu)
+        # 各标签页持有的结果数据超出预算时，让最久未使用的标签页休眠
+        self.memory_governor = MemoryGovernor(self.tabs, parent=self)
+        self.memory_governor.usage_changed.connect(self.update_memory_label)
         self.tabs.addTab(WelcomeWidget(self.tabs), '欢迎')
         self.add_sql_editor_tab()
 
@@ -172,31 +245,163 @@ class MainWindow(QMainWindow):
         self.db_tree.clear()
         for idx, conn in enumerate(self.conn_manager.get_connections()):
             label = f"[{conn['type']}] "
-            if conn['type'] == 'MySQL':
-                from db.mysql_client import MySQLClient
-                client = MySQLClient(
-                    host=conn['host'],
-                    port=conn['port'],
-                    user=conn['user'],
-                    password=conn['password'],
-                    database=conn['database']
-                )
+            driver = get_driver(conn['type'])
+            if driver is None:
+                # 插件驱动未安装或加载失败
+                item = QTreeWidgetItem(self.db_tree, [f'{label}(未安装驱动)'])
+                item.setData(0, Qt.UserRole, {'conn_idx': idx, 'missing_driver': True})
+                continue
+            if driver.supports(CAP_DATABASES):
+                status = self.health.status(conn)
                 # 判断是否指定了database
                 if conn.get('database'):
-                    dbs = [conn['database']]
-                else:
-                    dbs = client.get_databases()
-                for dbname in dbs:
-                    db_item = QTreeWidgetItem(self.db_tree, [f"{label}{dbname}"])
-                    db_item.setData(0, Qt.UserRole, {'conn_idx': idx, 'database': dbname})
-                    db_item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
-            elif conn['type'] == 'SQLite':
-                label += conn['db_path']
+                    self.add_database_items(None, idx, label, [conn['database']])
+                    continue
+                item = QTreeWidgetItem(self.db_tree, [f"{label}{driver.label(conn)}"])
+                item.setData(0, Qt.UserRole + 2, item.text(0))
+                if status and status['up'] is False:
+                    # 已知离线时不再等待连接超时，恢复在线后自动刷新
+                    item.setData(0, Qt.UserRole, {'conn_idx': idx, 'offline': True})
+                    self.decorate_tree_item(item)
+                    continue
+                item.setData(0, Qt.UserRole, {'conn_idx': idx, 'databases': True})
+                self.load_tree_databases(item, conn, label)
+            elif driver.supports(CAP_KEY_BROWSER):
+                # 键在“浏览键”标签页中按 SCAN 增量加载，树中只显示库节点
+                label += driver.label(conn)
+                item = QTreeWidgetItem(self.db_tree, [label])
+                item.setData(0, Qt.UserRole, {'conn_idx': idx, 'keys': True})
+                item.setData(0, Qt.UserRole + 2, label)
+                self.decorate_tree_item(item)
+            elif driver.supports(CAP_SQL):
+                label += driver.label(conn)
                 item = QTreeWidgetItem(self.db_tree, [label])
                 item.setData(0, Qt.UserRole, idx)
+                item.setData(0, Qt.UserRole + 2, label)
                 item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+                self.decorate_tree_item(item)
         self.db_tree.expandAll()
 
+    def add_database_items(self, placeholder, conn_idx, label, dbs):
+        """
+        添加库节点；placeholder 为读取库列表期间显示的连接节点，库节点插入在它的位置并移除它
+        """
+        index = self.db_tree.indexOfTopLevelItem(placeholder) if placeholder is not None else -1
+        if placeholder is not None:
+            self.db_tree.takeTopLevelItem(index)
+        for i, dbname in enumerate(dbs):
+            db_item = QTreeWidgetItem([f"{label}{dbname}"])
+            if index < 0:
+                self.db_tree.addTopLevelItem(db_item)
+            else:
+                self.db_tree.insertTopLevelItem(index + i, db_item)
+            db_item.setData(0, Qt.UserRole, {'conn_idx': conn_idx, 'database': dbname})
+            db_item.setData(0, Qt.UserRole + 2, db_item.text(0))
+            db_item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+            self.decorate_tree_item(db_item)
+
+    def load_tree_databases(self, item, conn, label):
+        """
+        在后台读取库列表，与读取表清单相同：加载期间连接节点显示“加载中”，读取完成后替换为各库节点
+        """
+        item.setData(0, Qt.UserRole + 1, True)
+        self.decorate_tree_item(item)
+        conn_idx = item.data(0, Qt.UserRole)['conn_idx']
+
+        def load():
+            # 先单独连接一次，服务器不可用时报错而不是显示空的库列表（get_databases 出错时返回空列表）
+            client = create_client(conn)
+            try:
+                client.connect()
+            finally:
+                client.close()
+            return create_client(conn).get_databases()
+
+        def on_finished(result, error):
+            if sip.isdeleted(item):
+                return  # 加载期间连接树已刷新
+            item.setData(0, Qt.UserRole + 1, False)
+            if error is not None:
+                item.setData(0, Qt.UserRole, {'conn_idx': conn_idx, 'offline': True})
+                self.decorate_tree_item(item)
+                self.health.check_now(conn)
+                self.log_message(f'读取数据库列表失败: {error}')
+                return
+            self.add_database_items(item, conn_idx, label, result)
+
+        job = self.scheduler.submit(load, conn=conn, title=f'读取数据库列表[{driver_of(conn).label(conn)}]',
+                                    priority=PRIORITY_INTERACTIVE)
+        job.finished.connect(on_finished)
+
+    def prewarm_connections(self):
+        # 解锁后为最近使用的连接预先建立连接并开始定时检测
+        for idx in self.conn_manager.recent_connections():
+            conn = self.conn_manager.get_connection(idx)
+            if get_driver(conn['type']) is not None:
+                self.health.watch(conn)
+
+    def touch_connection(self, conn_idx):
+        """
+        记录连接被使用：更新最近使用时间，并加入健康监控
+        """
+        conn = self.conn_manager.get_connection(conn_idx)
+        if conn:
+            self.conn_manager.mark_used(conn_idx)
+            self.health.watch(conn)
+
+    def decorate_tree_item(self, item):
+        """
+        在连接树顶层节点上显示加载状态、在线状态和延迟
+        UserRole+1: 正在加载表清单；UserRole+2: 不含状态的节点文字
+        """
+        base = item.data(0, Qt.UserRole + 2)
+        if base is None:
+            return
+        conn = self.conn_manager.get_connection(self.get_conn_index(item.data(0, Qt.UserRole)))
+        status = self.health.status(conn) if conn else None
+        text = base
+        if item.data(0, Qt.UserRole + 1):
+            text += ' (加载中...)'
+        if status is None or status['up'] is None:
+            item.setToolTip(0, '')
+            item.setData(0, Qt.ForegroundRole, None)
+        elif status['up']:
+            latency = status['latency_ms']
+            text += f" · {latency:.1f}ms" if latency < 10 else f" · {latency:.0f}ms"
+            tip = f"在线，延迟 {status['latency_ms']:.1f} ms"
+            stats = pool_metrics(conn['db_path']) if supports(conn, CAP_READ_POOL) else None
+            if stats:
+                tip += (f"\n读取 {stats['reads']} 次，等待读连接最长 {stats['read_wait_max_ms']:.0f} ms"
+                        f"\n写入 {stats['writes']} 次（{stats['transactions']} 个事务），"
+                        f"写锁等待共 {stats['lock_wait_ms']:.0f} ms、最长 {stats['lock_wait_max_ms']:.0f} ms，"
+                        f"忙重试 {stats['busy_retries']} 次")
+            item.setToolTip(0, tip)
+            item.setData(0, Qt.ForegroundRole, None)
+        else:
+            text += ' · 离线'
+            retry = max(0, status['next_check'] - time.time())
+            item.setToolTip(0, f"离线：{status['error']}\n{retry:.0f} 秒后重试（点击立即重试）")
+            item.setForeground(0, Qt.red)
+        item.setText(0, text)
+
+    def on_health_changed(self, key, status):
+        need_refresh = False
+        for i in range(self.db_tree.topLevelItemCount()):
+            item = self.db_tree.topLevelItem(i)
+            conn = self.conn_manager.get_connection(self.get_conn_index(item.data(0, Qt.UserRole)))
+            if not conn or profile_key(conn) != key:
+                continue
+            data = item.data(0, Qt.UserRole)
+            if status['up'] and isinstance(data, dict) and data.get('offline'):
+                need_refresh = True
+            self.decorate_tree_item(item)
+        if status['changed'] and status['up'] is False:
+            name = next((driver_of(c).label(c) for c in self.conn_manager.get_connections()
+                         if get_driver(c['type']) is not None and profile_key(c) == key), key[1])
+            self.log_message(f"连接不可用: {name} - {status['error']}")
+        if need_refresh:
+            self.refresh_db_tree()
+
     def get_conn_index(self, idx):
         if idx is None:
             return None
@@ -213,6 +418,14 @@ class MainWindow(QMainWindow):
                 self.current_db = dbname
             self.show_table_schema(self.get_conn_index(idx), idx['table'])
             return
+        if isinstance(idx, dict) and idx.get('offline'):
+            conn = self.conn_manager.get_connection(idx['conn_idx'])
+            if conn:
+                self.health.check_now(conn)
+            return
+        if isinstance(idx, dict) and idx.get('keys'):
+            self.open_redis_browser(idx['conn_idx'])
+            return
         # 只为数据库节点加载表列表，且只加载一次
         if isinstance(idx, dict) and 'conn_idx' in idx and 'database' in idx:
             if item.childCount() > 0:
@@ -220,51 +433,112 @@ class MainWindow(QMainWindow):
             conn = self.conn_manager.get_connection(self.get_conn_index(idx['conn_idx']))
             if not conn:
                 return
-            from db.mysql_client import MySQLClient
-            client = MySQLClient(
-                host=conn['host'],
-                port=conn['port'],
-                user=conn['user'],
-                password=conn['password'],
-                database=idx['database']
-            )
-            tables = client.get_tables()
-            for t in tables:
-                table_item = QTreeWidgetItem(item, [t])
-                table_item.setData(0, Qt.UserRole, {'conn_idx': idx['conn_idx'], 'table': t, 'database': idx['database']})
-            item.setExpanded(True)
+
+            def on_loaded(tables):
+                for t in tables:
+                    table_item = QTreeWidgetItem(item, [t])
+                    table_item.setData(0, Qt.UserRole, {'conn_idx': idx['conn_idx'], 'table': t, 'database': idx['database']})
+                item.setExpanded(True)
+
+            self.load_tree_tables(item, conn, idx['database'], on_loaded)
             self.current_db = idx['database']
             for i in range(self.tabs.count()):
                 w = self.tabs.widget(i)
                 if hasattr(w, 'current_db_label'):
                     w.current_db_label.setText(f'当前数据库：{idx["database"]}')
                     w.current_db = idx['database']
+                    self.load_schema_index(w)
             return
         # 其他节点逻辑保持不变
         if isinstance(idx, int) and item.childCount() == 0:
             conn = self.conn_manager.get_connection(self.get_conn_index(idx))
-            if not conn:
+            if not supports(conn, CAP_SQL):
                 return
-            if conn['type'] == 'MySQL':
-                from db.mysql_client import MySQLClient
-                client = MySQLClient(
-                    host=conn['host'],
-                    port=conn['port'],
-                    user=conn['user'],
-                    password=conn['password'],
-                    database=conn['database']
-                )
-                tables = client.get_tables()
-            elif conn['type'] == 'SQLite':
-                from db.sqlite_client import SQLiteClient
-                client = SQLiteClient(conn['db_path'])
-                tables = client.get_tables()
-            else:
-                tables = []
-            for t in tables:
-                table_item = QTreeWidgetItem(item, [t])
-                table_item.setData(0, Qt.UserRole, {'conn_idx': idx, 'table': t})
-            item.setExpanded(True)
+
+            def on_loaded(tables):
+                for t in tables:
+                    table_item = QTreeWidgetItem(item, [t])
+                    table_item.setData(0, Qt.UserRole, {'conn_idx': idx, 'table': t})
+                item.setExpanded(True)
+
+            self.load_tree_tables(item, conn, None, on_loaded)
+
+    def load_tree_tables(self, item, conn, database, on_loaded):
+        """
+        在后台读取表清单后回调 on_loaded(tables)，加载期间节点显示“加载中”，重复点击不会重复读取
+        """
+        if item.data(0, Qt.UserRole + 1):
+            return
+        item.setData(0, Qt.UserRole + 1, True)
+        self.decorate_tree_item(item)
+        self.touch_connection(self.get_conn_index(item.data(0, Qt.UserRole)))
+
+        def load():
+            # 优先使用健康监控预热好的连接；先单独连接，服务器不可用时报错而不是显示空表清单
+            client = register_client(conn, self.health.take_client(conn, database)) or create_client(conn, database=database)
+            if client.conn is None:
+                client.connect()
+            return client.get_tables()
+
+        def on_finished(result, error):
+            if sip.isdeleted(item):
+                return  # 加载期间连接树已刷新
+            item.setData(0, Qt.UserRole + 1, False)
+            self.decorate_tree_item(item)
+            if error is not None:
+                self.health.check_now(conn)
+                self.log_message(f'读取表清单失败: {error}')
+                return
+            on_loaded(result)
+
+        job = self.scheduler.submit(load, conn=conn,
+                                    title=f'读取表清单[{database or conn.get("database") or conn.get("db_path", "")}]',
+                                    priority=PRIORITY_INTERACTIVE)
+        job.finished.connect(on_finished)
+
+    def open_redis_browser(self, conn_idx):
+        conn = self.conn_manager.get_connection(conn_idx)
+        if not conn:
+            return
+        tab_title = f"键:{driver_of(conn).label(conn)}"
+        if self.switch_to_tab(tab_title):
+            return
+        self.touch_connection(conn_idx)
+        try:
+            widget = RedisKeyBrowser(conn, self.scheduler, self)
+        except Exception as e:
+            self.log_message(f'打开键浏览失败: {e}')
+            return
+        self.tabs.addTab(widget, tab_title)
+        self.tabs.setCurrentWidget(widget)
+
+    def open_index_advisor(self, conn_idx):
+        conn = self.conn_manager.get_connection(conn_idx)
+        if not conn:
+            return
+        label = driver_of(conn).label(conn)
+        tab_title = f'索引建议:{label}'
+        if self.switch_to_tab(tab_title):
+            return
+        widget = IndexAdvisorWidget(conn, label, self.scheduler, self)
+        self.tabs.addTab(widget, tab_title)
+        self.tabs.setCurrentWidget(widget)
+
+    def open_storage_stats(self, idx):
+        conn = self.conn_manager.get_connection(self.get_conn_index(idx))
+        if not conn:
+            return
+        database = idx.get('database') if isinstance(idx, dict) else None
+        if supports(conn, CAP_DATABASES) and not (database or conn.get('database')):
+            QMessageBox.warning(self, '存储占用', '请在具体数据库节点上查看')
+            return
+        title = database or conn.get('database') or conn.get('db_path', '')
+        tab_title = f'存储:{title}'
+        if self.switch_to_tab(tab_title):
+            return
+        widget = StorageStatsWidget(conn, database, self.scheduler, self)
+        self.tabs.addTab(widget, tab_title)
+        self.tabs.setCurrentWidget(widget)
 
     def switch_to_tab(self, tab_title):
         for i in range(self.tabs.count()):
@@ -278,27 +552,12 @@ class MainWindow(QMainWindow):
         # 若tab已存在，先关闭再新建，确保每次都刷新
         for i in range(self.tabs.count()):
             if self.tabs.tabText(i) == tab_title:
-                self.tabs.removeTab(i)
+                self.close_tab(i)
                 break
         conn = self.conn_manager.get_connection(self.get_conn_index(conn_idx))
         if not conn:
             return
-        if conn['type'] == 'MySQL':
-            from db.mysql_client import MySQLClient
-            client = MySQLClient(
-                host=conn['host'],
-                port=conn['port'],
-                user=conn['user'],
-                password=conn['password'],
-                database=conn['database']
-            )
-            schema = client.get_table_schema(table_name)
-        elif conn['type'] == 'SQLite':
-            from db.sqlite_client import SQLiteClient
-            client = SQLiteClient(conn['db_path'])
-            schema = client.get_table_schema(table_name)
-        else:
-            schema = []
+        schema = create_client(conn).get_table_schema(table_name) if supports(conn, CAP_SQL) else []
         # 展示到新标签页
         tab = QTableWidget()
         if schema:
@@ -316,7 +575,7 @@ class MainWindow(QMainWindow):
         self.tabs.setCurrentWidget(tab)
 
     def add_connection(self):
-        dlg = ConnectionDialog(self)
+        dlg = ConnectionDialog(self, scheduler=self.scheduler)
         if dlg.exec_() == dlg.Accepted and dlg.conn_info:
             self.conn_manager.add_connection(dlg.conn_info)
             self.refresh_db_tree()
@@ -330,51 +589,75 @@ class MainWindow(QMainWindow):
         menu = QMenu(self)
         # 判断是否为表节点
         is_table = isinstance(idx, dict) and 'conn_idx' in idx and 'table' in idx
+        is_keys = isinstance(idx, dict) and idx.get('keys')
+        conn = self.conn_manager.get_connection(self.get_conn_index(idx))
+        # 并行导出、传输、对比、备份只对声明了 CAP_BULK_TOOLS 的驱动开放
+        bulk = supports(conn, CAP_BULK_TOOLS)
+        parallel_export_action = transfer_action = compare_action = None
         if is_table:
             view_action = menu.addAction('查看数据')
             export_action = menu.addAction('导出数据')
+            if bulk:
+                parallel_export_action = menu.addAction('并行导出')
             import_action = menu.addAction('导入数据')
             visualize_action = menu.addAction('可视化')
+            if bulk:
+                transfer_action = menu.addAction('传输到其他连接')
+                compare_action = menu.addAction('数据对比')
             menu.addSeparator()
+        browse_keys_action = menu.addAction('浏览键') if is_keys else None
         edit_action = menu.addAction('编辑') if not is_table else None
         delete_action = menu.addAction('删除') if not is_table else None
         test_action = menu.addAction('测试连接') if not is_table else None
+        backup_db_action = menu.addAction('备份数据库') if not is_table and bulk else None
+        advisor_action = None
+        if not is_table and supports(conn, CAP_SQL) and dialect_of(conn) in ADVISOR_DIALECTS:
+            advisor_action = menu.addAction('索引建议')
+        storage_action = menu.addAction('存储占用') if not is_table and supports_storage_stats(conn) else None
         action = menu.exec_(self.db_tree.viewport().mapToGlobal(pos))
+        if action is None:
+            return
         if is_table:
             if action == view_action:
                 self.view_table_data(self.get_conn_index(idx), idx['table'])
             elif action == export_action:
                 self.export_table_to_csv(self.get_conn_index(idx), idx['table'])
+            elif action == parallel_export_action:
+                self.parallel_export_table(idx, idx['table'])
             elif action == import_action:
                 self.import_table_from_csv(self.get_conn_index(idx), idx['table'])
             elif action == visualize_action:
                 self.visualize_table(self.get_conn_index(idx), idx['table'])
+            elif action == transfer_action:
+                self.transfer_table_data(idx, idx['table'])
+            elif action == compare_action:
+                self.compare_table_data(idx, idx['table'])
         else:
-            if action == edit_action:
+            if action == browse_keys_action:
+                self.open_redis_browser(self.get_conn_index(idx))
+            elif action == edit_action:
                 self.edit_connection(self.get_conn_index(idx))
             elif action == delete_action:
                 self.delete_connection(self.get_conn_index(idx))
             elif action == test_action:
                 self.test_connection(self.get_conn_index(idx))
+            elif action == backup_db_action:
+                self.backup_database(idx)
+            elif action == advisor_action:
+                self.open_index_advisor(self.get_conn_index(idx))
+            elif action == storage_action:
+                self.open_storage_stats(idx)
 
     def edit_connection(self, idx):
         conn = self.conn_manager.get_connection(self.get_conn_index(idx))
         if not conn:
             return
-        dlg = ConnectionDialog(self)
+        dlg = ConnectionDialog(self, scheduler=self.scheduler)
         # 预填充数据
-        if conn['type'] == 'MySQL':
-            dlg.type_combo.setCurrentText('MySQL')
-            dlg.host_edit.setText(conn.get('host', ''))
-            dlg.port_edit.setText(str(conn.get('port', '3306')))
-            dlg.user_edit.setText(conn.get('user', ''))
-            dlg.pwd_edit.setText(conn.get('password', ''))
-            dlg.db_edit.setText(conn.get('database', ''))
-        elif conn['type'] == 'SQLite':
-            dlg.type_combo.setCurrentText('SQLite')
-            dlg.sqlite_path_edit.setText(conn.get('db_path', ''))
+        dlg.set_connection_info(conn)
         if dlg.exec_() == dlg.Accepted and dlg.conn_info:
             self.conn_manager.update_connection(idx, dlg.conn_info)
+            self.prune_connection_pools()
             self.refresh_db_tree()
             self.log_message('连接编辑成功')
 
@@ -382,29 +665,22 @@ class MainWindow(QMainWindow):
         reply = QMessageBox.question(self, '确认删除', '确定要删除该连接吗？', QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
             self.conn_manager.remove_connection(idx)
+            self.prune_connection_pools()
             self.refresh_db_tree()
             self.log_message('连接删除成功')
 
+    def prune_connection_pools(self):
+        # 编辑或删除连接后，旧配置的 SQLite 连接池不会再被使用，立即关闭其写线程和读连接
+        prune_pools([c for c in self.conn_manager.get_connections() if supports(c, CAP_READ_POOL)])
+
     def test_connection(self, idx):
         conn = self.conn_manager.get_connection(self.get_conn_index(idx))
         if not conn:
             return
-        if conn['type'] == 'MySQL':
-            from db.mysql_client import MySQLClient
-            client = MySQLClient(
-                host=conn['host'],
-                port=conn['port'],
-                user=conn['user'],
-                password=conn['password'],
-                database=conn['database']
-            )
-            ok, msg = client.test_connection()
-        elif conn['type'] == 'SQLite':
-            from db.sqlite_client import SQLiteClient
-            client = SQLiteClient(conn['db_path'])
-            ok, msg = client.test_connection()
-        else:
-            ok, msg = False, '暂不支持该类型'
+        try:
+            ok, msg = create_client(conn).test_connection()
+        except ValueError as e:
+            ok, msg = False, str(e)
         QMessageBox.information(self, '测试连接', msg)
         self.log_message(f'测试连接{"成功" if ok else "失败"}: {msg}')
 
@@ -412,7 +688,7 @@ class MainWindow(QMainWindow):
         tab_title = 'SQL编辑器'
         if self.switch_to_tab(tab_title):
             return
-        editor = SQLEditor()
+        editor = SQLEditor(scheduler=self.scheduler)
         db_label = QLabel('当前数据库：')
         editor.current_db_label = db_label
         conn_select_layout = QHBoxLayout()
@@ -421,12 +697,12 @@ class MainWindow(QMainWindow):
         conn_combo = QComboBox()
         conn_list = self.conn_manager.get_connections()
         for idx, conn in enumerate(conn_list):
-            if conn['type'] == 'MySQL':
-                label = f"[{conn['type']}] {conn['user']}@{conn['host']}:{conn['port']}/{conn['database']}"
-            elif conn['type'] == 'SQLite':
-                label = f"[{conn['type']}] {conn['db_path']}"
-            else:
-                label = f"[{conn['type']}]"
+            # 只列出支持SQL的连接
+            if not supports(conn, CAP_SQL):
+                continue
+            label = f"[{conn['type']}] {driver_of(conn).label(conn)}"
+            if supports(conn, CAP_DATABASES):
+                label += f"/{conn['database']}"
             conn_combo.addItem(label, idx)
         editor.conn_combo = conn_combo
         conn_select_layout.addWidget(conn_combo)
@@ -435,13 +711,13 @@ class MainWindow(QMainWindow):
         editor.layout().insertLayout(0, conn_select_layout)
         editor.current_db = None
         def update_conn_combo_database(dbname):
-            # 只对MySQL类型生效
+            # 只对有多个库的连接生效
             idx = conn_combo.currentIndex()
             if idx < 0:
                 return
-            conn = self.conn_manager.get_connections()[idx]
-            if conn['type'] == 'MySQL':
-                label = f"[{conn['type']}] {conn['user']}@{conn['host']}:{conn['port']}/{dbname}"
+            conn = self.conn_manager.get_connection(conn_combo.currentData())
+            if supports(conn, CAP_DATABASES):
+                label = f"[{conn['type']}] {driver_of(conn).label(conn)}/{dbname}"
                 conn_combo.setItemText(idx, label)
         def exec_sql():
             if conn_combo.count() == 0:
@@ -473,94 +749,123 @@ class MainWindow(QMainWindow):
                 editor.result_label.setText('未选择连接')
                 editor.set_result([],[])
                 return
-            # 自动加USE语句（仅MySQL）
-            sql_to_run = sql
-            if conn['type'] == 'MySQL' and hasattr(editor, 'current_db') and editor.current_db:
-                # 若SQL本身未以USE开头，则加上
-                if not sql.strip().lower().startswith('use '):
-                    sql_to_run = f"USE `{editor.current_db}`;\n" + sql
-            else:
-                sql_to_run = sql
-            sql_statements = [s.strip() for s in sql_to_run.split(';') if s.strip()]
+            self.touch_connection(conn_idx)
+            sql_statements = [s.strip() for s in sql.split(';') if s.strip()]
+            def record_history(statement, started, rows=None, error=None):
+                # 只放入队列，由后台线程写入历史库
+                duration_ms = (time.perf_counter() - started) * 1000
+                self.history.record(statement, conn_combo.currentText(), editor.current_db, duration_ms, rows,
+                                    'error' if error is not None else 'ok', error)
+                if error is None:
+                    # 供索引建议分析
+                    record_query(conn, statement, duration_ms=duration_ms, database=editor.current_db)
             try:
-                if conn['type'] == 'MySQL':
-                    from db.mysql_client import MySQLClient
-                    client = MySQLClient(
-                        host=conn['host'],
-                        port=conn['port'],
-                        user=conn['user'],
-                        password=conn['password'],
-                        database=conn['database']
-                    )
-                    dbconn = client.connect()
-                    cursor = dbconn.cursor()
-                    last_result = None
-                    for i, statement in enumerate(sql_statements):
-                        try:
-                            if statement.strip().lower().startswith('use '):
-                                dbname = statement.strip()[4:].strip(' ;')
-                                cursor.execute(statement)
-                                editor.current_db = dbname
-                                db_label.setText(f'当前数据库：{dbname}')
-                                update_conn_combo_database(dbname)
-                                continue
-                            cursor.execute(statement)
-                            if cursor.description:
-                                headers = [d[0] for d in cursor.description]
-                                rows = cursor.fetchall()
-                                last_result = (headers, rows, f'第{i+1}条: 共{len(rows)}行')
-                            else:
-                                dbconn.commit()
-                                last_result = ([], [], f'第{i+1}条: 执行成功，无返回结果')
-                        except Exception as e:
-                            editor.result_label.setText(f'第{i+1}条SQL执行出错: {e}')
-                            editor.set_result([],[])
-                            client.close()
-                            return
-                    if last_result:
-                        headers, rows, msg = last_result
-                        editor.set_result(headers, rows)
-                        editor.result_label.setText(msg)
-                    client.close()
-                elif conn['type'] == 'SQLite':
-                    from db.sqlite_client import SQLiteClient
-                    client = SQLiteClient(conn['db_path'])
-                    dbconn = client.connect()
-                    cursor = dbconn.cursor()
-                    last_result = None
-                    for i, statement in enumerate(sql_statements):
-                        try:
-                            cursor.execute(statement)
-                            if cursor.description:
-                                headers = [d[0] for d in cursor.description]
-                                rows = cursor.fetchall()
-                                last_result = (headers, rows, f'第{i+1}条: 共{len(rows)}行')
-                            else:
-                                dbconn.commit()
-                                last_result = ([], [], f'第{i+1}条: 执行成功，无返回结果')
-                        except Exception as e:
-                            editor.result_label.setText(f'第{i+1}条SQL执行出错: {e}')
-                            editor.set_result([],[])
-                            client.close()
-                            return
-                    if last_result:
-                        headers, rows, msg = last_result
-                        editor.set_result(headers, rows)
-                        editor.result_label.setText(msg)
-                    client.close()
-                else:
+                driver = driver_of(conn)
+                if not driver.supports(CAP_SQL):
                     editor.result_label.setText('暂不支持该类型')
                     editor.set_result([],[])
+                    return
+                # 有多个库的连接直接连到当前选中的库（PostgreSQL 不支持 USE 切换）
+                client = create_client(conn, database=editor.current_db if driver.supports(CAP_DATABASES) else None)
+                # 服务器端游标逐批拉取结果，超大结果集可溢写到磁盘
+                cursor = client.stream_cursor() if driver.supports(CAP_SERVER_CURSOR) else client.connect().cursor()
+                dbconn = client.conn
+                last_result = None
+                for i, statement in enumerate(sql_statements):
+                    started = time.perf_counter()
+                    try:
+                        if driver.dialect == 'mysql' and statement.lower().startswith('use '):
+                            dbname = statement[4:].strip(' ;`')
+                            cursor.execute(statement)
+                            editor.current_db = dbname
+                            db_label.setText(f'当前数据库：{dbname}')
+                            update_conn_combo_database(dbname)
+                            self.load_schema_index(editor)
+                            continue
+                        cursor.execute(statement)
+                        if cursor.description:
+                            result = collect_result(cursor)
+                            last_result = (result.headers, result, f'第{i+1}条: 共{len(result)}行')
+                            record_history(statement, started, len(result))
+                        else:
+                            dbconn.commit()
+                            last_result = ([], [], f'第{i+1}条: 执行成功，无返回结果')
+                            record_history(statement, started, cursor.rowcount)
+                    except Exception as e:
+                        record_history(statement, started, error=e)
+                        editor.result_label.setText(f'第{i+1}条SQL执行出错: {e}')
+                        editor.set_result([],[])
+                        client.close()
+                        return
+                if last_result:
+                    headers, rows, msg = last_result
+                    editor.set_result(headers, rows)
+                    editor.result_label.setText(msg)
+                client.close()
             except Exception as e:
                 editor.result_label.setText(f'执行出错: {e}')
                 editor.set_result([],[])
+            # 执行过DDL时增量刷新补全索引
+            if any(re.match(r'(create|alter|drop|rename)\b', st, re.I) for st in sql_statements):
+                self.load_schema_index(editor, refresh=True)
             self.log_message('SQL执行成功')
         editor.exec_btn.clicked.connect(exec_sql)
+        conn_combo.currentIndexChanged.connect(lambda _: self.load_schema_index(editor))
         self.tabs.addTab(editor, tab_title)
         self.tabs.setCurrentWidget(editor)
+        self.load_schema_index(editor)
+
+    def load_schema_index(self, editor, refresh=False):
+        """
+        为SQL编辑器设置补全索引；索引按 (连接, 库) 缓存，在后台线程中构建或增量刷新
+        """
+        conn_idx = editor.conn_combo.currentData()
+        conn = self.conn_manager.get_connection(conn_idx) if conn_idx is not None else None
+        driver = get_driver(conn['type']) if conn else None
+        editor.set_dialect(driver.dialect if driver else None)
+        if not supports(conn, CAP_SQL):
+            editor.set_schema_index(None)
+            return
+        database = editor.current_db if supports(conn, CAP_DATABASES) else None
+        key = (conn_idx, database or conn.get('database'))
+        index = self._schema_indexes.get(key)
+        if index is not None:
+            editor.set_schema_index(index)
+            if not refresh:
+                return
+        if key in self._schema_loading:
+            return
+        self._schema_loading.add(key)
+
+        def on_finished(result, error):
+            self._schema_loading.discard(key)
+            if error is not None:
+                self.log_message(f'读取补全信息失败: {error}')
+                return
+            self._schema_indexes[key] = result
+            # 编辑器可能已切换到其他连接
+            if editor.conn_combo.currentData() == conn_idx:
+                editor.set_schema_index(result)
+
+        job = self.scheduler.submit(refresh_schema_index, conn, index, database, conn=conn,
+                                    title=f'读取补全信息[{key[1] or conn.get("db_path", "")}]')
+        job.finished.connect(on_finished)
 
     def close_tab(self, index):
+        widget = self.tabs.widget(index)
+        if hasattr(widget, 'release_result'):
+            widget.release_result()
+        self.memory_governor.forget(widget)
         self.tabs.removeTab(index)
+        # removeTab 不会销毁控件，不释放的话关闭的标签页会一直占着内存
+        widget.deleteLater()
+        self.memory_governor.check()
+
+    def update_memory_label(self, used, budget, hibernated):
+        text = f'结果内存 {format_bytes(used)} / {format_bytes(budget)}'
+        if hibernated:
+            text += f'（{hibernated} 个标签页已休眠）'
+        self.memory_label.setText(text)
 
     def show_tab_context_menu(self, pos):
         tab_index = self.tabs.tabBar().tabAt(pos)
@@ -576,7 +881,7 @@ class MainWindow(QMainWindow):
         elif action == close_others_action:
             for i in reversed(range(self.tabs.count())):
                 if i != tab_index and i != 0:
-                    self.tabs.removeTab(i)
+                    self.close_tab(i)
         elif action == rename_action:
             old_name = self.tabs.tabText(tab_index)
             new_name, ok = QInputDialog.getText(self, '重命名标签页', '新名称：', text=old_name)
@@ -630,54 +935,196 @@ class MainWindow(QMainWindow):
             self.log_message('连接信息无效')
             QMessageBox.warning(self, '导出失败', '连接信息无效')
             return
-        path, _ = QFileDialog.getSaveFileName(self, f'导出表[{table_name}]为CSV', f'{table_name}.csv', 'CSV Files (*.csv)')
-        if not path:
-            self.log_message('未选择导出路径')
-            QMessageBox.information(self, '导出取消', '未选择导出路径')
+        target = self._ask_export_path(table_name)
+        if not target:
             return
-        try:
-            if conn['type'] == 'MySQL':
-                from db.mysql_client import MySQLClient
-                client = MySQLClient(
-                    host=conn['host'],
-                    port=conn['port'],
-                    user=conn['user'],
-                    password=conn['password'],
-                    database=conn['database']
-                )
-                dbconn = client.connect()
-                cursor = dbconn.cursor()
-                cursor.execute(f'SELECT * FROM `{table_name}`')
-                rows = cursor.fetchall()
-                headers = [d[0] for d in cursor.description]
-                client.close()
-            elif conn['type'] == 'SQLite':
-                from db.sqlite_client import SQLiteClient
-                client = SQLiteClient(conn['db_path'])
-                dbconn = client.connect()
-                cursor = dbconn.cursor()
-                cursor.execute(f'SELECT * FROM "{table_name}"')
-                rows = cursor.fetchall()
+        path, fmt, compression = target
+        if not supports(conn, CAP_SQL):
+            self.log_message('暂不支持该类型')
+            QMessageBox.warning(self, '导出失败', '暂不支持该类型')
+            return
+
+        def do_export(progress_callback=None, cancel_event=None):
+            client = create_client(conn)
+            dialect = dialect_of(conn)
+            if fmt == 'csv' and supports(conn, CAP_BULK_LOAD):
+                # 支持批量装载的驱动（如 PostgreSQL 的 COPY TO STDOUT）由服务器直接生成 CSV
+                try:
+                    stream = open_export_stream(path, compression)
+                    try:
+                        stream.write('\ufeff'.encode('utf-8'))
+                        return client.copy_to(table_name, stream)
+                    finally:
+                        stream.close()
+                finally:
+                    client.close()
+            # 流式游标，边取边写
+            cursor = client.stream_cursor()
+            cursor.execute(f'SELECT * FROM {quote_ident(table_name, dialect)}')
+            try:
                 headers = [d[0] for d in cursor.description]
+                if not headers:
+                    return None
+                writer = open_export_writer(path, fmt, headers, compression, table_name=table_name, dialect=dialect)
+                try:
+                    return export_cursor(cursor, writer, progress_callback=progress_callback, cancel_event=cancel_event)
+                finally:
+                    writer.close()
+            finally:
                 client.close()
-            else:
-                self.log_message('暂不支持该类型')
-                QMessageBox.warning(self, '导出失败', '暂不支持该类型')
-                return
-            if not headers:
+
+        def on_progress(count):
+            self.statusBar().showMessage(f'正在导出表[{table_name}]: 已写出 {count} 行')
+
+        def on_finished(result, error):
+            if error is not None:
+                self.log_message(f'导出失败: {error}')
+                QMessageBox.critical(self, '导出失败', str(error))
+            elif result is None:
                 self.log_message('表无字段，无法导出')
                 QMessageBox.information(self, '导出提示', '表无字段，无法导出')
+            else:
+                self.log_message(f'表[{table_name}]已成功导出到 {path}，共{result}行')
+                QMessageBox.information(self, '导出成功', f'表[{table_name}]已成功导出到\n{path}\n共{result}行')
+
+        job = self.scheduler.submit(do_export, conn=conn, title=f'导出[{table_name}]', priority=PRIORITY_BULK,
+                                    with_progress=True, with_cancel=True)
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
+
+    def _ask_export_path(self, table_name):
+        # 文件类型过滤器：格式 x 压缩方式
+        filters = []
+        filter_map = {}
+        for fmt, (label, ext, _) in EXPORT_FORMATS.items():
+            for compression, (cext, _) in COMPRESSIONS.items():
+                name = f'{label} (*{ext}{cext})' if not compression else f'{label} {compression} (*{ext}{cext})'
+                filters.append(name)
+                filter_map[name] = (fmt, compression)
+        path, selected = QFileDialog.getSaveFileName(self, f'导出表[{table_name}]', f'{table_name}.csv', ';;'.join(filters))
+        if not path:
+            self.log_message('未选择导出路径')
+            QMessageBox.information(self, '导出取消', '未选择导出路径')
+            return None
+        fmt, compression = detect_format(path)
+        if fmt is None:
+            fmt, compression = filter_map.get(selected, ('csv', ''))
+            path += export_path_suffix(fmt, compression)
+        return path, fmt, compression
+
+    def parallel_export_table(self, idx, table_name):
+        conn = self.conn_manager.get_connection(self.get_conn_index(idx))
+        if not conn:
+            self.log_message('连接信息无效')
+            QMessageBox.warning(self, '导出失败', '连接信息无效')
+            return
+        dlg = ParallelExportDialog(table_name, self)
+        if dlg.exec_() != dlg.Accepted:
+            return
+        options = dlg.get_options()
+        target = self._ask_export_path(table_name)
+        if not target:
+            return
+        path, fmt, compression = target
+        partition_rows = {}
+
+        def on_progress(info):
+            partition_rows[info['partition']] = (info['rows'], info['done'])
+            parts = ' | '.join(
+                f"分区{i + 1}: {rows}行{'✓' if done else ''}"
+                for i, (rows, done) in sorted(partition_rows.items())
+            )
+            self.statusBar().showMessage(f'并行导出[{table_name}] {parts}')
+            job.update_rows(sum(rows for rows, _ in partition_rows.values()))
+
+        def on_finished(result, error):
+            if error is not None:
+                self.log_message(f'导出失败: {error}')
+                QMessageBox.critical(self, '导出失败', str(error))
                 return
-            with open(path, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-                if rows:
-                    writer.writerows(rows)
-            self.log_message(f'表[{table_name}]已成功导出到 {path}')
-            QMessageBox.information(self, '导出成功', f'表[{table_name}]已成功导出到\n{path}')
-        except Exception as e:
-            self.log_message(f'导出失败: {e}')
-            QMessageBox.critical(self, '导出失败', str(e))
+            total, paths = result
+            self.log_message(f'表[{table_name}]并行导出完成，共{total}行')
+            QMessageBox.information(self, '导出成功', f'表[{table_name}]已导出，共{total}行\n' + '\n'.join(paths))
+
+        # 从库节点下选择的表：分区和各工作进程都连接到该库
+        database = idx.get('database') if isinstance(idx, dict) else None
+        job = self.scheduler.submit(parallel_export, conn, table_name, path, fmt, compression, database=database,
+                                    conn=conn, title=f'并行导出[{table_name}]', priority=PRIORITY_BULK,
+                                    with_progress=True, with_cancel=True, **options)
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
+
+    def transfer_table_data(self, idx, table_name):
+        conn = self.conn_manager.get_connection(self.get_conn_index(idx))
+        if not conn:
+            self.log_message('连接信息无效')
+            return
+        dlg = TransferDialog(table_name, self.conn_manager.get_connections(), self)
+        if dlg.exec_() != dlg.Accepted:
+            return
+        options = dlg.get_options()
+        dst_conn = self.conn_manager.get_connection(options.pop('conn_idx'))
+        src_database = idx.get('database') if isinstance(idx, dict) else None
+
+        def on_progress(info):
+            self.statusBar().showMessage(
+                f"正在传输[{table_name}]: {info['rows']} 行, {info['rows_per_sec']:.0f} 行/秒")
+
+        def on_finished(result, error):
+            if error is not None:
+                self.log_message(f'传输失败: {error}')
+                QMessageBox.critical(self, '传输失败', str(error))
+                return
+            self.log_message(f"表[{table_name}]已传输到[{options['dst_table']}]，共{result}行")
+            QMessageBox.information(self, '传输成功', f"表[{table_name}]已传输到[{options['dst_table']}]，共{result}行")
+
+        job = self.scheduler.submit(transfer_table, conn, table_name, dst_conn, src_database=src_database, conn=conn,
+                                    title=f'传输[{table_name}]', priority=PRIORITY_BULK,
+                                    with_progress=True, with_cancel=True, **options)
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
+
+    def compare_table_data(self, idx, table_name):
+        conn = self.conn_manager.get_connection(self.get_conn_index(idx))
+        if not conn:
+            self.log_message('连接信息无效')
+            return
+        dlg = TableDiffDialog(table_name, self.conn_manager.get_connections(), self)
+        if dlg.exec_() != dlg.Accepted:
+            return
+        options = dlg.get_options()
+        dst_conn = self.conn_manager.get_connection(options.pop('conn_idx'))
+        src_database = idx.get('database') if isinstance(idx, dict) else None
+        dst_table = options['dst_table']
+
+        def do_compare(progress_callback=None, cancel_event=None):
+            diff = compare_tables(conn, table_name, dst_conn, src_database=src_database,
+                                  progress_callback=progress_callback, cancel_event=cancel_event, **options)
+            return diff, generate_sync_script(diff, dst_table, dialect_of(dst_conn))
+
+        def on_progress(info):
+            self.statusBar().showMessage(
+                f"正在对比[{table_name}]: 已检查 {info['checked']} 块, 不一致 {info['mismatched']} 块, 待检查 {info['pending']} 块")
+
+        def on_finished(result, error):
+            if error is not None:
+                self.log_message(f'对比失败: {error}')
+                QMessageBox.critical(self, '对比失败', str(error))
+                return
+            diff, script = result
+            summary = (f"源表[{table_name}] 与 目标表[{dst_table}] 对比完成（{'服务器端' if diff['mode'] == 'server' else '客户端'}校验）：\n"
+                       f"检查 {diff['chunks_checked']} 块，不一致 {diff['chunks_mismatched']} 块；"
+                       f"仅源表存在 {len(diff['only_in_source'])} 行，仅目标表存在 {len(diff['only_in_target'])} 行，"
+                       f"内容不同 {len(diff['changed'])} 行")
+            widget = TableDiffResultWidget(summary, script)
+            self.tabs.addTab(widget, f'对比:{table_name}')
+            self.tabs.setCurrentWidget(widget)
+            self.log_message('数据对比完成')
+
+        job = self.scheduler.submit(do_compare, conn=conn, title=f'数据对比[{table_name}]', priority=PRIORITY_BULK,
+                                    with_progress=True, with_cancel=True)
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
 
     def import_table_from_csv(self, conn_idx, table_name):
         conn = self.conn_manager.get_connection(self.get_conn_index(conn_idx))
@@ -690,52 +1137,70 @@ class MainWindow(QMainWindow):
             self.log_message('未选择CSV文件')
             QMessageBox.information(self, '导入取消', '未选择CSV文件')
             return
-        try:
-            with open(path, 'r', encoding='utf-8-sig') as f:
-                reader = csv.reader(f)
-                headers = next(reader)
-                rows = list(reader)
-            if not rows:
+        if not supports(conn, CAP_SQL):
+            self.log_message('暂不支持该类型')
+            QMessageBox.warning(self, '导入失败', '暂不支持该类型')
+            return
+        def do_import(progress_callback=None, cancel_event=None):
+            client = create_client(conn)
+            try:
+                if supports(conn, CAP_BULK_LOAD):
+                    # 批量装载（如 PostgreSQL 的 COPY FROM STDIN）由服务器解析 CSV，文件不读入内存；首行为字段名
+                    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                        headers = next(csv.reader([f.readline()]), None)
+                        if not headers:
+                            return 0
+                        return client.copy_from(table_name, f, headers, header=False)
+                # 逐批读取、逐批插入，整个文件在一个事务中提交；失败或取消时回滚
+                dialect = dialect_of(conn)
+                with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                    reader = csv.reader(f)
+                    headers = next(reader, None)
+                    if not headers:
+                        return 0
+                    dbconn = client.connect()
+                    cursor = dbconn.cursor()
+                    placeholders = ','.join([placeholder_of(dialect)] * len(headers))
+                    columns = ','.join(quote_ident(h, dialect) for h in headers)
+                    sql = f'INSERT INTO {quote_ident(table_name, dialect)} ({columns}) VALUES ({placeholders})'
+                    count = 0
+                    try:
+                        while True:
+                            if cancel_event is not None and cancel_event.is_set():
+                                raise InterruptedError('导入已取消')
+                            rows = list(itertools.islice(reader, IMPORT_BATCH_SIZE))
+                            if not rows:
+                                break
+                            cursor.executemany(sql, rows)
+                            count += len(rows)
+                            if progress_callback is not None:
+                                progress_callback(count)
+                        dbconn.commit()
+                    except BaseException:
+                        dbconn.rollback()
+                        raise
+                    return count
+            finally:
+                client.close()
+
+        def on_progress(count):
+            self.statusBar().showMessage(f'正在导入表[{table_name}]: 已写入 {count} 行')
+
+        def on_finished(count, error):
+            if error is not None:
+                self.log_message(f'导入失败: {error}')
+                QMessageBox.critical(self, '导入失败', str(error))
+            elif not count:
                 self.log_message('CSV文件无数据')
                 QMessageBox.information(self, '导入提示', 'CSV文件无数据')
-                return
-            if conn['type'] == 'MySQL':
-                from db.mysql_client import MySQLClient
-                client = MySQLClient(
-                    host=conn['host'],
-                    port=conn['port'],
-                    user=conn['user'],
-                    password=conn['password'],
-                    database=conn['database']
-                )
-                dbconn = client.connect()
-                cursor = dbconn.cursor()
-                placeholders = ','.join(['%s'] * len(headers))
-                columns = ','.join([f"`{h}`" for h in headers])
-                sql = f'INSERT INTO `{table_name}` ({columns}) VALUES ({placeholders})'
-                cursor.executemany(sql, rows)
-                dbconn.commit()
-                client.close()
-            elif conn['type'] == 'SQLite':
-                from db.sqlite_client import SQLiteClient
-                client = SQLiteClient(conn['db_path'])
-                dbconn = client.connect()
-                cursor = dbconn.cursor()
-                placeholders = ','.join(['?'] * len(headers))
-                columns = ','.join([f'"{h}"' for h in headers])
-                sql = f'INSERT INTO "{table_name}" ({columns}) VALUES ({placeholders})'
-                cursor.executemany(sql, rows)
-                dbconn.commit()
-                client.close()
             else:
-                self.log_message('暂不支持该类型')
-                QMessageBox.warning(self, '导入失败', '暂不支持该类型')
-                return
-            self.log_message(f'CSV数据已成功导入表[{table_name}]，共{len(rows)}行')
-            QMessageBox.information(self, '导入成功', f'CSV数据已成功导入表[{table_name}]，共{len(rows)}行')
-        except Exception as e:
-            self.log_message(f'导入失败: {e}')
-            QMessageBox.critical(self, '导入失败', str(e))
+                self.log_message(f'CSV数据已成功导入表[{table_name}]，共{count}行')
+                QMessageBox.information(self, '导入成功', f'CSV数据已成功导入表[{table_name}]，共{count}行')
+
+        job = self.scheduler.submit(do_import, conn=conn, title=f'导入[{table_name}]', priority=PRIORITY_BULK,
+                                    with_progress=True, with_cancel=True)
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
 
     def view_table_data(self, conn_idx, table_name):
         tab_title = f'数据:{table_name}'
@@ -745,89 +1210,28 @@ class MainWindow(QMainWindow):
         if not conn:
             self.log_message('连接信息无效')
             return
+        self.touch_connection(self.get_conn_index(conn_idx))
+        if not supports(conn, CAP_SQL):
+            self.log_message('暂不支持该类型')
+            return
         try:
-            if conn['type'] == 'MySQL':
-                from db.mysql_client import MySQLClient
-                client = MySQLClient(
-                    host=conn['host'],
-                    port=conn['port'],
-                    user=conn['user'],
-                    password=conn['password'],
-                    database=conn['database']
-                )
-                dbconn = client.connect()
-                cursor = dbconn.cursor()
-                cursor.execute(f'SELECT * FROM `{table_name}` LIMIT 1')
-                headers = [d[0] for d in cursor.description]
-                client.close()
-                def fetch_page(page, page_size):
-                    client2 = MySQLClient(
-                        host=conn['host'],
-                        port=conn['port'],
-                        user=conn['user'],
-                        password=conn['password'],
-                        database=conn['database']
-                    )
-                    dbconn2 = client2.connect()
-                    cursor2 = dbconn2.cursor()
-                    offset = (page-1)*page_size
-                    cursor2.execute(f'SELECT * FROM `{table_name}` LIMIT %s OFFSET %s', (page_size, offset))
-                    rows = cursor2.fetchall()
-                    cursor2.execute(f'SELECT COUNT(*) FROM `{table_name}`')
-                    total = cursor2.fetchone()[0]
-                    client2.close()
-                    return rows, total
-                # 获取主键信息
-                client = MySQLClient(
-                    host=conn['host'],
-                    port=conn['port'],
-                    user=conn['user'],
-                    password=conn['password'],
-                    database=conn['database']
-                )
-                dbconn = client.connect()
-                cursor = dbconn.cursor()
-                cursor.execute(f"SHOW KEYS FROM `{table_name}` WHERE Key_name = 'PRIMARY'")
-                pk_fields = [row[4] for row in cursor.fetchall()]
-                client.close()
-                db_client = MySQLClient(
-                    host=conn['host'],
-                    port=conn['port'],
-                    user=conn['user'],
-                    password=conn['password'],
-                    database=conn['database']
-                )
-            elif conn['type'] == 'SQLite':
-                from db.sqlite_client import SQLiteClient
-                client = SQLiteClient(conn['db_path'])
-                dbconn = client.connect()
-                cursor = dbconn.cursor()
-                cursor.execute(f'SELECT * FROM "{table_name}" LIMIT 1')
+            client = create_client(conn)
+            try:
+                cursor = client.stream_cursor() if supports(conn, CAP_READ_POOL) else client.connect().cursor()
+                cursor.execute(f'SELECT * FROM {quote_ident(table_name, dialect_of(conn))} LIMIT 0')
                 headers = [d[0] for d in cursor.description]
+            finally:
                 client.close()
-                def fetch_page(page, page_size):
-                    client2 = SQLiteClient(conn['db_path'])
-                    dbconn2 = client2.connect()
-                    cursor2 = dbconn2.cursor()
-                    offset = (page-1)*page_size
-                    cursor2.execute(f'SELECT * FROM "{table_name}" LIMIT ? OFFSET ?', (page_size, offset))
-                    rows = cursor2.fetchall()
-                    cursor2.execute(f'SELECT COUNT(*) FROM "{table_name}"')
-                    total = cursor2.fetchone()[0]
-                    client2.close()
-                    return rows, total
-                # 获取主键信息
-                client = SQLiteClient(conn['db_path'])
-                dbconn = client.connect()
-                cursor = dbconn.cursor()
-                cursor.execute(f"PRAGMA table_info('{table_name}')")
-                pk_fields = [row[1] for row in cursor.fetchall() if row[5]]
-                client.close()
-                db_client = SQLiteClient(conn['db_path'])
-            else:
-                self.log_message('暂不支持该类型')
-                return
-            viewer = TableDataViewer(headers, fetch_page_callback=fetch_page, parent=self, db_client=db_client, table_name=table_name, pk_fields=pk_fields)
+            pk_fields = create_client(conn).get_primary_keys(table_name)
+            # TEXT/BLOB 等大字段翻页时只取前缀和长度
+            large = large_columns(create_client(conn).get_table_schema(table_name), dialect_of(conn))
+            # 分页方式（主键翻页、行数估计）由驱动能力决定
+            fetch_page = TablePager(conn, table_name, pk_fields, columns=headers, large_columns=large)
+            db_client = create_client(conn)
+            indexed_columns = db_client.get_indexed_columns(table_name)
+            viewer = TableDataViewer(headers, fetch_page_callback=fetch_page, parent=self, db_client=db_client, table_name=table_name, pk_fields=pk_fields,
+                                     indexed_columns=indexed_columns, scheduler=self.scheduler, conn=conn,
+                                     large_columns=large)
             self.tabs.addTab(viewer, tab_title)
             self.tabs.setCurrentWidget(viewer)
         except Exception as e:
@@ -844,45 +1248,36 @@ class MainWindow(QMainWindow):
             self.log_message('连接信息无效')
             QMessageBox.warning(self, '可视化失败', '连接信息无效')
             return
-        try:
-            if conn['type'] == 'MySQL':
-                from db.mysql_client import MySQLClient
-                client = MySQLClient(
-                    host=conn['host'],
-                    port=conn['port'],
-                    user=conn['user'],
-                    password=conn['password'],
-                    database=conn['database']
-                )
-                dbconn = client.connect()
-                cursor = dbconn.cursor()
-                cursor.execute(f'SELECT * FROM `{table_name}`')
-                rows = cursor.fetchall()
-                headers = [d[0] for d in cursor.description]
-                client.close()
-            elif conn['type'] == 'SQLite':
-                from db.sqlite_client import SQLiteClient
-                client = SQLiteClient(conn['db_path'])
-                dbconn = client.connect()
-                cursor = dbconn.cursor()
-                cursor.execute(f'SELECT * FROM "{table_name}"')
-                rows = cursor.fetchall()
-                headers = [d[0] for d in cursor.description]
+        if not supports(conn, CAP_SQL):
+            self.log_message('暂不支持该类型')
+            QMessageBox.warning(self, '可视化失败', '暂不支持该类型')
+            return
+
+        def load():
+            client = create_client(conn)
+            try:
+                cursor = client.stream_cursor() if supports(conn, CAP_READ_POOL) else client.connect().cursor()
+                cursor.execute(f'SELECT * FROM {quote_ident(table_name, dialect_of(conn))}')
+                return ColumnarResult.from_cursor(cursor)
+            finally:
                 client.close()
-            else:
-                self.log_message('暂不支持该类型')
-                QMessageBox.warning(self, '可视化失败', '暂不支持该类型')
+
+        def on_finished(rows, error):
+            if error is not None:
+                self.log_message(f'可视化失败: {error}')
+                QMessageBox.critical(self, '可视化失败', str(error))
                 return
-            if not rows:
+            if not len(rows):
                 QMessageBox.information(self, '可视化提示', '表无数据，无法可视化')
                 return
             # 以QWidget方式嵌入tab
-            widget = VisualizeDialog(table_name, headers, rows, self)
+            widget = VisualizeDialog(table_name, rows.headers, rows, self, loader=load, scheduler=self.scheduler,
+                                     conn=conn)
             self.tabs.addTab(widget, tab_title)
             self.tabs.setCurrentWidget(widget)
-        except Exception as e:
-            self.log_message(f'可视化失败: {e}')
-            QMessageBox.critical(self, '可视化失败', str(e))
+
+        job = self.scheduler.submit(load, conn=conn, title=f'可视化[{table_name}]', priority=PRIORITY_INTERACTIVE)
+        job.finished.connect(on_finished)
 
     def show_info(self, title, msg):
         if title == '使用说明':
@@ -977,7 +1372,7 @@ class MainWindow(QMainWindow):
         if not backup_dir:
             return
         try:
-            src = os.path.join(os.path.dirname(__file__), 'db', 'connections.json.enc')
+            src = CONNECTIONS_FILE
             if not os.path.exists(src):
                 self.log_message('无加密配置文件可备份')
                 return
@@ -988,13 +1383,58 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.log_message(f'备份失败: {e}')
 
+    def backup_database(self, idx):
+        conn = self.conn_manager.get_connection(self.get_conn_index(idx))
+        if not conn:
+            self.log_message('连接信息无效')
+            return
+        database = idx.get('database') if isinstance(idx, dict) else None
+        if supports(conn, CAP_DATABASES) and not (database or conn.get('database')):
+            QMessageBox.warning(self, '备份失败', '请在具体数据库节点上执行备份')
+            return
+        title = database or conn.get('database') or conn.get('db_path', '')
+        dlg = BackupDialog(title, self)
+        if dlg.exec_() != dlg.Accepted:
+            return
+        options = dlg.get_options()
+
+        backed_up = {}
+
+        def on_progress(info):
+            self.statusBar().showMessage(
+                f"正在备份[{title}] {info['tables_done']}/{info['tables_total']} 表: {info['table']} ({info['rows']}行)")
+            backed_up[info['table']] = info['rows']
+            job.update_rows(sum(backed_up.values()))
+
+        def on_finished(result, error):
+            if error is not None:
+                self.log_message(f'备份失败: {error}')
+                QMessageBox.critical(self, '备份失败', str(error))
+                return
+            self.log_message(f'数据库备份完成: {result}')
+            QMessageBox.information(self, '备份成功', f'数据库[{title}]已备份到\n{result}')
+
+        job = self.scheduler.submit(backup_database, conn, database=database, conn=conn, title=f'备份[{title}]',
+                                    priority=PRIORITY_BULK, with_progress=True, with_cancel=True, **options)
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
+
     def restore_data(self):
+        choice, ok = QInputDialog.getItem(self, '恢复数据', '恢复内容：', ['数据库备份', '连接配置'], 0, False)
+        if not ok:
+            return
+        if choice == '数据库备份':
+            self.restore_database()
+        else:
+            self.restore_config()
+
+    def restore_config(self):
         from PyQt5.QtWidgets import QFileDialog
         path, _ = QFileDialog.getOpenFileName(self, '选择备份文件', '', '加密配置 (*.enc)')
         if not path:
             return
         try:
-            dst = os.path.join(os.path.dirname(__file__), 'db', 'connections.json.enc')
+            dst = CONNECTIONS_FILE
             shutil.copy2(path, dst)
             self.conn_manager.load_connections()
             self.refresh_db_tree()
@@ -1002,10 +1442,113 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.log_message(f'恢复失败: {e}')
 
+    def restore_database(self):
+        dlg = RestoreDialog(self.conn_manager.get_connections(), self)
+        if dlg.exec_() != dlg.Accepted:
+            return
+        options = dlg.get_options()
+        conn = self.conn_manager.get_connection(options.pop('conn_idx'))
+        if not conn:
+            self.log_message('连接信息无效')
+            return
+        backup_dir = options.pop('backup_dir')
+        phases = {'schema': '建表', 'data': '导入数据', 'index': '创建索引'}
+
+        restored = {}
+
+        def on_progress(info):
+            restored[info['table']] = info['rows']
+            job.update_rows(sum(restored.values()))
+            self.statusBar().showMessage(
+                f"正在恢复 {info['tables_done']}/{info['tables_total']} 表 - "
+                f"{phases.get(info['phase'], info['phase'])}: {info['table']} ({info['rows']}行)")
+
+        def on_finished(result, error):
+            if error is not None:
+                self.log_message(f'恢复失败: {error}')
+                QMessageBox.critical(self, '恢复失败', str(error))
+                return
+            total = sum(result.values())
+            self.refresh_db_tree()
+            self.log_message(f'数据库恢复完成，共{len(result)}张表{total}行')
+            QMessageBox.information(self, '恢复成功', f'已恢复{len(result)}张表，共{total}行')
+
+        job = self.scheduler.submit(restore_backup, conn, backup_dir, conn=conn, title=f'恢复[{os.path.basename(backup_dir)}]',
+                                    priority=PRIORITY_BULK, with_progress=True, with_cancel=True, **options)
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
+
     def open_sql_editor_tab(self):
         self.add_sql_editor_tab()
 
+    def open_history_tab(self):
+        tab_title = '查询历史'
+        if self.switch_to_tab(tab_title):
+            self.tabs.currentWidget().refresh()
+            return
+        panel = HistoryPanel(self.history)
+        panel.rerun_requested.connect(self.rerun_history_sql)
+        self.tabs.addTab(panel, tab_title)
+        self.tabs.setCurrentWidget(panel)
+
+    def rerun_history_sql(self, sql, connection):
+        self.add_sql_editor_tab()
+        editor = self.tabs.currentWidget()
+        if not isinstance(editor, SQLEditor):
+            return
+        # 按记录中的连接名称选择连接，找不到时使用当前连接
+        idx = editor.conn_combo.findText(connection)
+        if idx >= 0:
+            editor.conn_combo.setCurrentIndex(idx)
+        editor.sql_edit.setPlainText(sql)
+        editor.exec_btn.click()
+
+    def run_fanout_query(self):
+        connections = self.conn_manager.get_connections()
+        if not connections:
+            QMessageBox.warning(self, '多连接执行', '请先新建数据库连接')
+            return
+        dlg = FanoutDialog(connections, self)
+        if dlg.exec_() != dlg.Accepted:
+            return
+        options = dlg.get_options()
+        targets = [(label, self.conn_manager.get_connection(idx)) for label, idx in options.pop('targets')]
+        sql = options['sql']
+
+        def on_progress(info):
+            self.statusBar().showMessage(f"多连接执行: {info['done']}/{info['total']}，{info['label']} {'完成' if info['ok'] else '失败'}")
+
+        def on_finished(result, error):
+            if error is not None:
+                self.log_message(f'多连接执行失败: {error}')
+                QMessageBox.critical(self, '多连接执行失败', str(error))
+                return
+            for s in result['shards']:
+                self.history.record(sql, s['label'], None, s['elapsed_ms'], s['rows'],
+                                    'ok' if s['status'] == '成功' else 'error', s['error'])
+            widget = FanoutResultWidget(result)
+            self.tabs.addTab(widget, f'多连接结果({len(targets)})')
+            self.tabs.setCurrentWidget(widget)
+            self.log_message('多连接执行完成')
+
+        # 各连接的并发由 fanout_query 自己的线程池控制，这里不按连接限流
+        job = self.scheduler.submit(fanout_query, targets, title=f'多连接执行({len(targets)})',
+                                    with_progress=True, with_cancel=True, **options)
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
+
+    def closeEvent(self, event):
+        self.scheduler.shutdown()
+        self.health.stop()
+        # 等待 SQLite 写线程中已提交的修改完成
+        close_pools()
+        # 等待历史记录写完
+        self.history.close()
+        super().closeEvent(event)
+
 def main():
+    # 并行导出使用进程池，打包后需要此调用
+    multiprocessing.freeze_support()
     # 检查并创建db目录
     db_dir = os.path.join(os.path.dirname(__file__), 'db')
     if not os.path.exists(db_dir):
@@ -0,0 +1,124 @@
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QComboBox, QLineEdit, QPushButton, QFileDialog, QDialogButtonBox, QMessageBox, QCheckBox
+from db.export_writers import COMPRESSIONS
+from db.client_factory import driver_of, supports, CAP_BULK_TOOLS
+import os
+
+
+class BackupDialog(QDialog):
+    def __init__(self, title, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f'备份数据库 - {title}')
+        self.resize(420, 170)
+        layout = QVBoxLayout(self)
+        dir_layout = QHBoxLayout()
+        dir_layout.addWidget(QLabel('备份目录:'))
+        self.dir_edit = QLineEdit()
+        dir_layout.addWidget(self.dir_edit)
+        browse_btn = QPushButton('选择')
+        browse_btn.clicked.connect(self.browse_dir)
+        dir_layout.addWidget(browse_btn)
+        layout.addLayout(dir_layout)
+        worker_layout = QHBoxLayout()
+        worker_layout.addWidget(QLabel('并行线程数:'))
+        self.workers_box = QSpinBox()
+        self.workers_box.setRange(1, 32)
+        self.workers_box.setValue(min(4, os.cpu_count() or 4))
+        worker_layout.addWidget(self.workers_box)
+        worker_layout.addWidget(QLabel('压缩:'))
+        self.compression_combo = QComboBox()
+        for name in COMPRESSIONS:
+            self.compression_combo.addItem(name or '不压缩', name)
+        self.compression_combo.setCurrentIndex(self.compression_combo.findData('gzip'))
+        worker_layout.addWidget(self.compression_combo)
+        layout.addLayout(worker_layout)
+        btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        btns.accepted.connect(self.accept)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def browse_dir(self):
+        path = QFileDialog.getExistingDirectory(self, '选择备份目录')
+        if path:
+            self.dir_edit.setText(path)
+
+    def accept(self):
+        if not self.dir_edit.text() or not os.path.isdir(self.dir_edit.text()):
+            QMessageBox.warning(self, '错误', '请选择有效的备份目录')
+            return
+        super().accept()
+
+    def get_options(self):
+        return {
+            'out_dir': self.dir_edit.text(),
+            'workers': self.workers_box.value(),
+            'compression': self.compression_combo.currentData(),
+        }
+
+
+class RestoreDialog(QDialog):
+    def __init__(self, connections, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('恢复数据库备份')
+        self.resize(460, 220)
+        self.connections = connections
+        layout = QVBoxLayout(self)
+        dir_layout = QHBoxLayout()
+        dir_layout.addWidget(QLabel('备份目录:'))
+        self.dir_edit = QLineEdit()
+        dir_layout.addWidget(self.dir_edit)
+        browse_btn = QPushButton('选择')
+        browse_btn.clicked.connect(self.browse_dir)
+        dir_layout.addWidget(browse_btn)
+        layout.addLayout(dir_layout)
+        conn_layout = QHBoxLayout()
+        conn_layout.addWidget(QLabel('目标连接:'))
+        self.conn_combo = QComboBox()
+        for idx, conn in enumerate(connections):
+            if not supports(conn, CAP_BULK_TOOLS):
+                continue
+            label = f"[{conn['type']}] {driver_of(conn).label(conn)}"
+            self.conn_combo.addItem(label, idx)
+        conn_layout.addWidget(self.conn_combo)
+        layout.addLayout(conn_layout)
+        db_layout = QHBoxLayout()
+        db_layout.addWidget(QLabel('目标数据库(MySQL):'))
+        self.db_edit = QLineEdit()
+        self.db_edit.setPlaceholderText('默认使用备份中的库名')
+        db_layout.addWidget(self.db_edit)
+        layout.addLayout(db_layout)
+        opt_layout = QHBoxLayout()
+        opt_layout.addWidget(QLabel('并行线程数:'))
+        self.workers_box = QSpinBox()
+        self.workers_box.setRange(1, 32)
+        self.workers_box.setValue(min(4, os.cpu_count() or 4))
+        opt_layout.addWidget(self.workers_box)
+        self.drop_check = QCheckBox('覆盖已存在的表')
+        opt_layout.addWidget(self.drop_check)
+        layout.addLayout(opt_layout)
+        btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        btns.accepted.connect(self.accept)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def browse_dir(self):
+        path = QFileDialog.getExistingDirectory(self, '选择备份目录（包含manifest.json）')
+        if path:
+            self.dir_edit.setText(path)
+
+    def accept(self):
+        if not os.path.exists(os.path.join(self.dir_edit.text(), 'manifest.json')):
+            QMessageBox.warning(self, '错误', '所选目录不是有效的备份目录')
+            return
+        if self.conn_combo.count() == 0:
+            QMessageBox.warning(self, '错误', '没有可用的目标连接')
+            return
+        super().accept()
+
+    def get_options(self):
+        return {
+            'backup_dir': self.dir_edit.text(),
+            'conn_idx': self.conn_combo.currentData(),
+            'database': self.db_edit.text() or None,
+            'workers': self.workers_box.value(),
+            'drop_existing': self.drop_check.isChecked(),
+        }
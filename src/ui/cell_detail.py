@@ -0,0 +1,211 @@
+import json
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTabWidget, QPlainTextEdit,
+                             QScrollArea, QFileDialog, QMessageBox)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap, QFont
+from .job_scheduler import PRIORITY_INTERACTIVE, PRIORITY_BULK
+from .storage_view import format_bytes
+from db.large_values import read_value, save_value, KIND_BINARY, DETAIL_LIMIT
+
+HEX_PREVIEW_BYTES = 64 * 1024  # 十六进制视图最多显示的字节数，更多内容请保存到文件
+TEXT_PREVIEW_CHARS = 1024 * 1024
+
+
+def preview_text(value, limit=80):
+    """
+    表格单元格中显示的简短文字：二进制显示为十六进制，文本只取第一行的前 limit 个字符
+    """
+    if value is None:
+        return ''
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value[:limit // 2])
+        return '0x' + data.hex() + ('…' if len(value) > len(data) else '')
+    text = str(value)
+    line = text.split('\n', 1)[0][:limit]
+    return line + ('…' if len(line) < len(text) else '')
+
+
+def hex_dump(data, limit=HEX_PREVIEW_BYTES):
+    lines = []
+    for offset in range(0, min(len(data), limit), 16):
+        chunk = data[offset:offset + 16]
+        hex_part = ' '.join(f'{b:02x}' for b in chunk)
+        text_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
+        lines.append(f'{offset:08x}  {hex_part:<47}  {text_part}')
+    if len(data) > limit:
+        lines.append(f'...（仅显示前 {format_bytes(limit)}）')
+    return '\n'.join(lines)
+
+
+class CellDetailPane(QWidget):
+    """
+    大字段详情：显示选中单元格的已加载部分，按需读取完整值，提供文本/十六进制/图片/JSON 预览和分段保存到文件
+    """
+
+    def __init__(self, conn=None, table_name=None, scheduler=None, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.table_name = table_name
+        self.scheduler = scheduler
+        self.job = None
+        self.column = None
+        self.kind = None
+        self.key = None  # {主键列: 值}，None 表示无法定位该行
+        self.value = None
+        self.size = None  # 值的字节数
+        self.complete = False
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        top = QHBoxLayout()
+        self.info_label = QLabel('')
+        self.load_btn = QPushButton('读取完整内容')
+        self.save_btn = QPushButton('保存到文件')
+        top.addWidget(self.info_label)
+        top.addStretch()
+        top.addWidget(self.load_btn)
+        top.addWidget(self.save_btn)
+        layout.addLayout(top)
+        self.views = QTabWidget()
+        mono = QFont('Monospace')
+        mono.setStyleHint(QFont.TypeWriter)
+        self.text_view = QPlainTextEdit()
+        self.text_view.setReadOnly(True)
+        self.hex_view = QPlainTextEdit()
+        self.hex_view.setReadOnly(True)
+        self.hex_view.setFont(mono)
+        self.hex_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.json_view = QPlainTextEdit()
+        self.json_view.setReadOnly(True)
+        self.json_view.setFont(mono)
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignCenter)
+        image_area = QScrollArea()
+        image_area.setWidget(self.image_label)
+        image_area.setWidgetResizable(True)
+        self.views.addTab(self.text_view, '文本')
+        self.views.addTab(self.hex_view, '十六进制')
+        self.views.addTab(image_area, '图片')
+        self.views.addTab(self.json_view, 'JSON')
+        layout.addWidget(self.views)
+        self.load_btn.clicked.connect(self.load_full)
+        self.save_btn.clicked.connect(self.save_to_file)
+
+    def show_value(self, column, kind, value, size, complete, key):
+        """
+        :param value: 已加载的值（可能只是前缀）
+        :param size: 完整值的字节数，未知时为 None
+        :param complete: value 是否为完整值
+        """
+        if self.job is not None and self.job.is_active():
+            self.scheduler.cancel(self.job)
+        self.job = None
+        self.column = column
+        self.kind = kind
+        self.key = key
+        self.size = size
+        self.complete = complete
+        self.set_value(value)
+
+    def set_value(self, value):
+        self.value = bytes(value) if isinstance(value, memoryview) else value
+        unit = '字节' if self.kind == KIND_BINARY or isinstance(self.value, bytes) else '字符'
+        size = '' if self.size is None else f'，共 {format_bytes(self.size)}'
+        if self.value is None:
+            text = f'[{self.column}] NULL'
+        elif self.complete:
+            text = f'[{self.column}] {len(self.value)} {unit}{size}'
+        else:
+            text = f'[{self.column}] 已加载前 {len(self.value)} {unit}{size}'
+        self.info_label.setText(text)
+        can_fetch = self.key is not None and self.conn is not None
+        self.load_btn.setEnabled(not self.complete and can_fetch)
+        self.save_btn.setEnabled(self.value is not None and (self.complete or can_fetch))
+        self.load_btn.setToolTip('' if can_fetch or self.complete else '表没有主键，无法定位该行读取完整内容')
+        self.update_views()
+
+    def update_views(self):
+        value = self.value
+        if isinstance(value, bytes):
+            data = value
+            text = value[:TEXT_PREVIEW_CHARS].decode('utf-8', errors='replace')
+        else:
+            text = '' if value is None else str(value)[:TEXT_PREVIEW_CHARS]
+            data = text[:HEX_PREVIEW_BYTES].encode('utf-8')
+        self.text_view.setPlainText(text)
+        self.hex_view.setPlainText(hex_dump(data))
+        pixmap = QPixmap()
+        if isinstance(value, bytes) and self.complete and pixmap.loadFromData(value):
+            self.image_label.setPixmap(pixmap)
+        else:
+            self.image_label.clear()
+            self.image_label.setText('不是图片' if self.complete else '读取完整内容后预览')
+        self.json_view.setPlainText(self._json_text(value))
+
+    def _json_text(self, value):
+        if value is None:
+            return ''
+        if not self.complete:
+            return '读取完整内容后格式化'
+        try:
+            raw = value.decode('utf-8') if isinstance(value, bytes) else str(value)
+            return json.dumps(json.loads(raw), ensure_ascii=False, indent=2)
+        except (ValueError, UnicodeDecodeError):
+            return '不是有效的 JSON'
+
+    def load_full(self):
+        if self.key is None or (self.job is not None and self.job.is_active()):
+            return
+        self.load_btn.setEnabled(False)
+        self.info_label.setText(f'[{self.column}] 正在读取...')
+        job = self.job = self.scheduler.submit(read_value, self.conn, self.table_name, self.column, self.kind,
+                                               self.key, title=f'读取[{self.table_name}.{self.column}]',
+                                               priority=PRIORITY_INTERACTIVE, conn=self.conn)
+        job.finished.connect(lambda result, error: self.on_loaded(job, result, error))
+
+    def on_loaded(self, job, result, error):
+        if job is not self.job:
+            return  # 读取期间已切换到其他单元格
+        if error is not None:
+            self.load_btn.setEnabled(True)
+            self.info_label.setText(f'[{self.column}] 读取失败: {error}')
+            return
+        value, self.size, self.complete = result
+        self.set_value(value)
+        if not self.complete:
+            self.info_label.setText(self.info_label.text() + f'（超过 {format_bytes(DETAIL_LIMIT)} 的部分请保存到文件查看）')
+
+    def save_to_file(self):
+        path, _ = QFileDialog.getSaveFileName(self, '保存到文件', self.column or '', '所有文件 (*)')
+        if not path:
+            return
+        if self.complete:
+            try:
+                with open(path, 'wb') as f:
+                    f.write(self.value if isinstance(self.value, bytes) else str(self.value).encode('utf-8'))
+            except OSError as e:
+                QMessageBox.warning(self, '保存失败', str(e))
+            return
+        self.save_btn.setEnabled(False)
+
+        def on_progress(written):
+            self.info_label.setText(f'[{self.column}] 正在保存: 已写出 {format_bytes(written)}')
+
+        def on_finished(written, error):
+            self.save_btn.setEnabled(True)
+            if error is not None:
+                QMessageBox.warning(self, '保存失败', str(error))
+                return
+            self.info_label.setText(f'[{self.column}] 已保存到 {path}（{format_bytes(written)}）')
+
+        job = self.scheduler.submit(save_value, self.conn, self.table_name, self.column, self.kind, self.key, path,
+                                    title=f'保存[{self.table_name}.{self.column}]', priority=PRIORITY_BULK,
+                                    conn=self.conn, with_progress=True, with_cancel=True)
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
+
+    def memory_bytes(self):
+        return len(self.value) if isinstance(self.value, (bytes, str)) else 0
+
+    def clear(self):
+        self.show_value(None, None, None, None, True, None)
+        self.info_label.setText('')
@@ -1,14 +1,18 @@
-from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox, QFileDialog, QMessageBox, QWidget)
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox, QFileDialog, QMessageBox, QWidget,
+                             QFormLayout, QSpinBox, QCheckBox)
 from PyQt5.QtCore import Qt
-from db.mysql_client import MySQLClient
-from db.sqlite_client import SQLiteClient
-from .thread_worker import WorkerThread
+from PyQt5 import sip
+from db.client_factory import create_client, driver_names, get_driver
+from db.sqlite_client import PROFILES, DEFAULT_PROFILE, JOURNAL_MODES, SYNCHRONOUS_MODES, TEMP_STORES
+from .job_scheduler import PRIORITY_INTERACTIVE
 from PyQt5.QtGui import QIcon
 from db.utils import resource_path
+import os
 
 class ConnectionDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, scheduler=None):
         super().__init__(parent)
+        self.scheduler = scheduler  # 测试连接作为交互任务提交到调度器
         icon_path = resource_path('res/img/favicon.ico')
         self.setWindowIcon(QIcon(icon_path))
         self.setWindowTitle('新建/编辑数据库连接')
@@ -23,12 +27,12 @@ class ConnectionDialog(QDialog):
         type_layout = QHBoxLayout()
         type_layout.addWidget(QLabel('数据库类型:'))
         self.type_combo = QComboBox()
-        self.type_combo.addItems(['MySQL', 'SQLite'])
+        self.type_combo.addItems(driver_names())
         self.type_combo.currentTextChanged.connect(self.on_type_changed)
         type_layout.addWidget(self.type_combo)
         layout.addLayout(type_layout)
 
-        # MySQL参数
+        # 服务器类数据库参数
         self.mysql_widget = QWidget()
         mysql_layout = QVBoxLayout()
         self.host_edit = QLineEdit('localhost')
@@ -45,19 +49,60 @@ class ConnectionDialog(QDialog):
         mysql_layout.addWidget(self.user_edit)
         mysql_layout.addWidget(QLabel('密码:'))
         mysql_layout.addWidget(self.pwd_edit)
-        mysql_layout.addWidget(QLabel('数据库名(可选):'))
+        self.db_label = QLabel('数据库名(可选):')
+        mysql_layout.addWidget(self.db_label)
         mysql_layout.addWidget(self.db_edit)
         self.mysql_widget.setLayout(mysql_layout)
 
-        # SQLite参数
+        # 文件类数据库（SQLite）参数
         self.sqlite_widget = QWidget()
-        sqlite_layout = QHBoxLayout()
+        sqlite_layout = QVBoxLayout()
+        sqlite_layout.setContentsMargins(0, 0, 0, 0)
+        path_layout = QHBoxLayout()
         self.sqlite_path_edit = QLineEdit()
         self.sqlite_browse_btn = QPushButton('选择文件')
         self.sqlite_browse_btn.clicked.connect(self.browse_sqlite_file)
-        sqlite_layout.addWidget(self.sqlite_path_edit)
-        sqlite_layout.addWidget(self.sqlite_browse_btn)
+        path_layout.addWidget(self.sqlite_path_edit)
+        path_layout.addWidget(self.sqlite_browse_btn)
+        sqlite_layout.addLayout(path_layout)
+        # SQLite 性能配置：选择预设后可逐项调整，建立连接时执行对应的 PRAGMA
+        self.profile_widget = QWidget()
+        profile_form = QFormLayout(self.profile_widget)
+        profile_form.setContentsMargins(0, 0, 0, 0)
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItems(list(PROFILES) + ['自定义'])
+        self.journal_combo = QComboBox()
+        self.journal_combo.addItems(['不设置'] + list(JOURNAL_MODES))
+        self.synchronous_combo = QComboBox()
+        self.synchronous_combo.addItems(['不设置'] + list(SYNCHRONOUS_MODES))
+        self.cache_spin = QSpinBox()
+        self.cache_spin.setRange(0, 64 * 1024)
+        self.cache_spin.setSuffix(' MB')
+        self.cache_spin.setSpecialValueText('不设置')
+        self.mmap_spin = QSpinBox()
+        self.mmap_spin.setRange(0, 64 * 1024)
+        self.mmap_spin.setSuffix(' MB')
+        self.mmap_spin.setSpecialValueText('不设置')
+        self.temp_store_combo = QComboBox()
+        self.temp_store_combo.addItems(['不设置'] + list(TEMP_STORES))
+        self.read_only_check = QCheckBox('只读打开（仅浏览，不能修改数据）')
+        profile_form.addRow('性能配置:', self.profile_combo)
+        profile_form.addRow('journal_mode:', self.journal_combo)
+        profile_form.addRow('synchronous:', self.synchronous_combo)
+        profile_form.addRow('cache_size:', self.cache_spin)
+        profile_form.addRow('mmap_size:', self.mmap_spin)
+        profile_form.addRow('temp_store:', self.temp_store_combo)
+        profile_form.addRow('', self.read_only_check)
+        sqlite_layout.addWidget(self.profile_widget)
         self.sqlite_widget.setLayout(sqlite_layout)
+        self.profile_combo.currentTextChanged.connect(self.on_profile_changed)
+        for combo in (self.journal_combo, self.synchronous_combo, self.temp_store_combo):
+            combo.currentIndexChanged.connect(self.on_profile_edited)
+        for spin in (self.cache_spin, self.mmap_spin):
+            spin.valueChanged.connect(self.on_profile_edited)
+        self.read_only_check.toggled.connect(self.on_profile_edited)
+        self._applying_profile = False
+        self.on_profile_changed(DEFAULT_PROFILE)
 
         layout.addWidget(self.mysql_widget)
         layout.addWidget(self.sqlite_widget)
@@ -79,8 +124,71 @@ class ConnectionDialog(QDialog):
         self.on_type_changed(self.type_combo.currentText())
 
     def on_type_changed(self, db_type):
-        self.mysql_widget.setVisible(db_type == 'MySQL')
-        self.sqlite_widget.setVisible(db_type == 'SQLite')
+        driver = get_driver(db_type)
+        if driver is None:
+            return
+        self.mysql_widget.setVisible(not driver.file_based)
+        self.sqlite_widget.setVisible(driver.file_based)
+        self.profile_widget.setVisible(driver.dialect == 'sqlite')
+        self.db_label.setText('库编号(可选，默认0):' if driver.dialect == 'redis' else '数据库名(可选):')
+        # 端口仍为另一种数据库的默认值时切换为当前类型的默认端口；Redis 用户名仅用于 ACL，默认留空
+        if driver.file_based:
+            return
+        for name in driver_names():
+            other = get_driver(name)
+            if other is driver or other.file_based or other.default_port is None:
+                continue
+            if self.port_edit.text() == str(other.default_port):
+                self.port_edit.setText(str(driver.default_port or ''))
+                if self.user_edit.text() == other.default_user:
+                    self.user_edit.setText(driver.default_user)
+
+    def on_profile_changed(self, name):
+        profile = PROFILES.get(name)
+        if profile is None:
+            return  # 自定义：保留当前各项
+        self.set_sqlite_options(profile['pragmas'], profile['read_only'])
+
+    def on_profile_edited(self, *args):
+        # 手动修改任一项后，不再与预设一致时显示为自定义
+        if self._applying_profile:
+            return
+        pragmas, read_only = self.sqlite_options()
+        for name, profile in PROFILES.items():
+            if profile['pragmas'] == pragmas and profile['read_only'] == read_only:
+                self.profile_combo.setCurrentText(name)
+                return
+        self.profile_combo.setCurrentText('自定义')
+
+    def set_sqlite_options(self, pragmas, read_only):
+        self._applying_profile = True
+        try:
+            self.journal_combo.setCurrentText(pragmas.get('journal_mode', '不设置'))
+            self.synchronous_combo.setCurrentText(pragmas.get('synchronous', '不设置'))
+            self.temp_store_combo.setCurrentText(pragmas.get('temp_store', '不设置'))
+            # cache_size 负数为 KiB，界面以 MB 显示
+            self.cache_spin.setValue(-pragmas['cache_size'] // 1024 if pragmas.get('cache_size', 0) < 0 else 0)
+            self.mmap_spin.setValue(pragmas.get('mmap_size', 0) // (1024 * 1024))
+            self.read_only_check.setChecked(bool(read_only))
+        finally:
+            self._applying_profile = False
+
+    def sqlite_options(self):
+        """
+        :return: (pragmas, read_only)
+        """
+        pragmas = {}
+        if self.journal_combo.currentIndex() > 0:
+            pragmas['journal_mode'] = self.journal_combo.currentText()
+        if self.synchronous_combo.currentIndex() > 0:
+            pragmas['synchronous'] = self.synchronous_combo.currentText()
+        if self.cache_spin.value():
+            pragmas['cache_size'] = -self.cache_spin.value() * 1024
+        if self.mmap_spin.value():
+            pragmas['mmap_size'] = self.mmap_spin.value() * 1024 * 1024
+        if self.temp_store_combo.currentIndex() > 0:
+            pragmas['temp_store'] = self.temp_store_combo.currentText()
+        return pragmas, self.read_only_check.isChecked()
 
     def browse_sqlite_file(self):
         path, _ = QFileDialog.getOpenFileName(self, '选择SQLite数据库文件', os.getcwd(), 'SQLite Files (*.db *.sqlite);;All Files (*)')
@@ -88,33 +196,20 @@ class ConnectionDialog(QDialog):
             self.sqlite_path_edit.setText(path)
 
     def test_connection(self):
-        db_type = self.type_combo.currentText()
-        if db_type == 'MySQL':
-            params = {
-                'host': self.host_edit.text(),
-                'port': int(self.port_edit.text()),
-                'user': self.user_edit.text(),
-                'password': self.pwd_edit.text(),
-                'database': self.db_edit.text() or None
-            }
-            def do_test():
-                client = MySQLClient(**params)
-                return client.test_connection()
-        elif db_type == 'SQLite':
-            db_path = self.sqlite_path_edit.text()
-            def do_test():
-                client = SQLiteClient(db_path)
-                return client.test_connection()
-        else:
+        info = self.get_connection_info()
+        if info is None:
             QMessageBox.warning(self, '错误', '不支持的数据库类型')
             return
+        def do_test():
+            return create_client(info).test_connection()
 
         self.test_btn.setEnabled(False)
-        self.thread = WorkerThread(do_test)
-        self.thread.finished.connect(self.on_test_connection_result)
-        self.thread.start()
+        job = self.scheduler.submit(do_test, title='测试连接', priority=PRIORITY_INTERACTIVE, conn=info)
+        job.finished.connect(self.on_test_connection_result)
 
     def on_test_connection_result(self, result, error):
+        if sip.isdeleted(self):
+            return  # 测试期间对话框已关闭
         self.test_btn.setEnabled(True)
         if error is not None:
             QMessageBox.warning(self, '测试连接', str(error))
@@ -127,21 +222,41 @@ class ConnectionDialog(QDialog):
 
     def get_connection_info(self):
         db_type = self.type_combo.currentText()
-        if db_type == 'MySQL':
-            return {
-                'type': 'MySQL',
-                'host': self.host_edit.text(),
-                'port': int(self.port_edit.text()),
-                'user': self.user_edit.text(),
-                'password': self.pwd_edit.text(),
-                'database': self.db_edit.text() or None
-            }
-        elif db_type == 'SQLite':
-            return {
-                'type': 'SQLite',
+        driver = get_driver(db_type)
+        if driver is None:
+            return None
+        if driver.file_based:
+            info = {
+                'type': db_type,
                 'db_path': self.sqlite_path_edit.text()
             }
-        return None
+            if driver.dialect == 'sqlite':
+                info['pragmas'], info['read_only'] = self.sqlite_options()
+                info['profile'] = self.profile_combo.currentText()
+            return info
+        return {
+            'type': db_type,
+            'host': self.host_edit.text(),
+            'port': int(self.port_edit.text()),
+            'user': self.user_edit.text(),
+            'password': self.pwd_edit.text(),
+            'database': self.db_edit.text() or None
+        }
+
+    def set_connection_info(self, conn):
+        # 编辑连接时预填充
+        self.type_combo.setCurrentText(conn['type'])
+        driver = get_driver(conn['type'])
+        if driver is not None and driver.file_based:
+            self.sqlite_path_edit.setText(conn.get('db_path', ''))
+            self.set_sqlite_options(conn.get('pragmas') or {}, conn.get('read_only', False))
+            self.on_profile_edited()
+            return
+        self.host_edit.setText(conn.get('host', ''))
+        self.port_edit.setText(str(conn.get('port', '')))
+        self.user_edit.setText(conn.get('user') or '')
+        self.pwd_edit.setText(conn.get('password') or '')
+        self.db_edit.setText(str(conn.get('database') or ''))
 
     def accept(self):
         info = self.get_connection_info()
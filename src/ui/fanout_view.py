@@ -0,0 +1,162 @@
+from PyQt5.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QComboBox, QListWidget,
+                             QListWidgetItem, QPlainTextEdit, QDialogButtonBox, QMessageBox, QPushButton, QTableWidget,
+                             QTableWidgetItem, QTableView, QSplitter, QAbstractItemView)
+from PyQt5.QtCore import Qt
+from db.fanout import AGGREGATE_FUNCS, SOURCE_COLUMN, aggregate_result
+from .result_model import ResultTableModel
+from db.client_factory import driver_of, supports, CAP_SQL, CAP_DATABASES
+
+
+class FanoutDialog(QDialog):
+    def __init__(self, connections, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('多连接执行')
+        self.resize(620, 520)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel('选择要执行的连接:'))
+        select_layout = QHBoxLayout()
+        all_btn = QPushButton('全选')
+        none_btn = QPushButton('全不选')
+        select_layout.addWidget(all_btn)
+        select_layout.addWidget(none_btn)
+        select_layout.addStretch()
+        layout.addLayout(select_layout)
+        self.conn_list = QListWidget()
+        for idx, conn in enumerate(connections):
+            if not supports(conn, CAP_SQL):
+                continue
+            label = f"[{conn['type']}] {driver_of(conn).label(conn)}"
+            if supports(conn, CAP_DATABASES):
+                label += f"/{conn['database']}"
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, idx)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.conn_list.addItem(item)
+        layout.addWidget(self.conn_list)
+        all_btn.clicked.connect(lambda: self._check_all(Qt.Checked))
+        none_btn.clicked.connect(lambda: self._check_all(Qt.Unchecked))
+        layout.addWidget(QLabel('SQL（各连接执行同一条语句）:'))
+        self.sql_edit = QPlainTextEdit()
+        layout.addWidget(self.sql_edit)
+        opt_layout = QHBoxLayout()
+        opt_layout.addWidget(QLabel('最大并发数:'))
+        self.workers_box = QSpinBox()
+        self.workers_box.setRange(1, 64)
+        self.workers_box.setValue(8)
+        opt_layout.addWidget(self.workers_box)
+        opt_layout.addWidget(QLabel('单连接超时(秒):'))
+        self.timeout_box = QSpinBox()
+        self.timeout_box.setRange(1, 3600)
+        self.timeout_box.setValue(30)
+        opt_layout.addWidget(self.timeout_box)
+        opt_layout.addStretch()
+        layout.addLayout(opt_layout)
+        btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        btns.accepted.connect(self.accept)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def _check_all(self, state):
+        for i in range(self.conn_list.count()):
+            self.conn_list.item(i).setCheckState(state)
+
+    def selected(self):
+        return [(self.conn_list.item(i).text(), self.conn_list.item(i).data(Qt.UserRole))
+                for i in range(self.conn_list.count()) if self.conn_list.item(i).checkState() == Qt.Checked]
+
+    def accept(self):
+        if not self.selected():
+            QMessageBox.warning(self, '错误', '请至少选择一个连接')
+            return
+        if not self.sql_edit.toPlainText().strip():
+            QMessageBox.warning(self, '错误', '请输入SQL语句')
+            return
+        super().accept()
+
+    def get_options(self):
+        return {
+            'targets': self.selected(),
+            'sql': self.sql_edit.toPlainText().strip().rstrip(';'),
+            'max_workers': self.workers_box.value(),
+            'timeout': self.timeout_box.value(),
+        }
+
+
+class FanoutResultWidget(QWidget):
+    def __init__(self, outcome, parent=None):
+        super().__init__(parent)
+        self.result = outcome['result']
+        shards = outcome['shards']
+        layout = QVBoxLayout(self)
+        ok = sum(1 for s in shards if s['status'] == '成功')
+        rows = len(self.result) if self.result is not None else 0
+        layout.addWidget(QLabel(f'共 {len(shards)} 个连接，成功 {ok} 个，失败 {len(shards) - ok} 个；合并结果 {rows} 行'))
+        splitter = QSplitter(Qt.Vertical)
+        # 各分片执行情况
+        self.shard_table = QTableWidget(len(shards), 5)
+        self.shard_table.setHorizontalHeaderLabels(['连接', '状态', '行数', '耗时(ms)', '错误'])
+        self.shard_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.shard_table.horizontalHeader().setStretchLastSection(True)
+        for row, s in enumerate(shards):
+            values = [s['label'], s['status'], '' if s['rows'] is None else str(s['rows']),
+                      '' if s['elapsed_ms'] is None else f"{s['elapsed_ms']:.0f}", s['error'] or '']
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if s['status'] != '成功':
+                    item.setForeground(Qt.red)
+                self.shard_table.setItem(row, col, item)
+        splitter.addWidget(self.shard_table)
+        result_widget = QWidget()
+        result_layout = QVBoxLayout(result_widget)
+        result_layout.setContentsMargins(0, 0, 0, 0)
+        # 跨分片聚合：未设置聚合函数的列作为分组键
+        agg_layout = QHBoxLayout()
+        agg_layout.addWidget(QLabel('聚合:'))
+        self.agg_col_box = QComboBox()
+        self.agg_func_box = QComboBox()
+        self.agg_func_box.addItems(AGGREGATE_FUNCS)
+        self.add_agg_btn = QPushButton('添加')
+        self.apply_agg_btn = QPushButton('按其余列分组聚合')
+        self.detail_btn = QPushButton('显示明细')
+        self.agg_label = QLabel('')
+        for w in (self.agg_col_box, self.agg_func_box, self.add_agg_btn, self.apply_agg_btn, self.detail_btn,
+                  self.agg_label):
+            agg_layout.addWidget(w)
+        agg_layout.addStretch()
+        result_layout.addLayout(agg_layout)
+        self.model = ResultTableModel(self.result)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        result_layout.addWidget(self.table)
+        splitter.addWidget(result_widget)
+        splitter.setSizes([150, 450])
+        layout.addWidget(splitter)
+        self._aggregations = {}
+        if self.result is not None:
+            self.agg_col_box.addItems([h for h in self.result.headers if h != SOURCE_COLUMN])
+        else:
+            for w in (self.agg_col_box, self.agg_func_box, self.add_agg_btn, self.apply_agg_btn, self.detail_btn):
+                w.setEnabled(False)
+        self.add_agg_btn.clicked.connect(self.add_aggregation)
+        self.apply_agg_btn.clicked.connect(self.apply_aggregation)
+        self.detail_btn.clicked.connect(self.show_detail)
+
+    def add_aggregation(self):
+        col = self.result.headers.index(self.agg_col_box.currentText())
+        self._aggregations[col] = self.agg_func_box.currentText()
+        self.agg_label.setText(', '.join(f'{f}({self.result.headers[c]})' for c, f in sorted(self._aggregations.items())))
+
+    def apply_aggregation(self):
+        if not self._aggregations:
+            QMessageBox.warning(self, '聚合', '请先添加至少一个聚合列')
+            return
+        try:
+            self.model.set_result(aggregate_result(self.result, self._aggregations))
+        except TypeError as e:
+            QMessageBox.warning(self, '聚合失败', f'列值类型不支持该聚合: {e}')
+
+    def show_detail(self):
+        self._aggregations = {}
+        self.agg_label.setText('')
+        self.model.set_result(self.result)
@@ -0,0 +1,116 @@
+from datetime import datetime
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QCheckBox, QPushButton, QTableWidget,
+                             QTableWidgetItem, QPlainTextEdit, QSplitter, QAbstractItemView, QLabel)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+
+
+class HistoryPanel(QWidget):
+    # 请求重新执行：(SQL, 连接名称)
+    rerun_requested = pyqtSignal(str, str)
+
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self._entries = []
+        layout = QVBoxLayout(self)
+        search_layout = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText('搜索SQL或连接（多个词同时匹配，支持前缀）')
+        self.favorite_box = QCheckBox('仅收藏')
+        self.refresh_btn = QPushButton('刷新')
+        search_layout.addWidget(self.search_edit)
+        search_layout.addWidget(self.favorite_box)
+        search_layout.addWidget(self.refresh_btn)
+        layout.addLayout(search_layout)
+        splitter = QSplitter(Qt.Vertical)
+        self.table = QTableWidget()
+        self.table.setColumnCount(7)
+        self.table.setHorizontalHeaderLabels(['时间', '连接', '耗时(ms)', '行数', '状态', '收藏', 'SQL'])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        splitter.addWidget(self.table)
+        self.sql_view = QPlainTextEdit()
+        self.sql_view.setReadOnly(True)
+        splitter.addWidget(self.sql_view)
+        splitter.setSizes([400, 120])
+        layout.addWidget(splitter)
+        btn_layout = QHBoxLayout()
+        self.rerun_btn = QPushButton('重新执行')
+        self.favorite_btn = QPushButton('收藏/取消收藏')
+        self.delete_btn = QPushButton('删除')
+        self.status_label = QLabel('')
+        btn_layout.addWidget(self.rerun_btn)
+        btn_layout.addWidget(self.favorite_btn)
+        btn_layout.addWidget(self.delete_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.status_label)
+        layout.addLayout(btn_layout)
+        # 输入停顿后再搜索，避免每个按键都查询
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self.refresh)
+        self.search_edit.textChanged.connect(lambda _: self._search_timer.start())
+        self.favorite_box.toggled.connect(lambda _: self.refresh())
+        self.refresh_btn.clicked.connect(self.refresh)
+        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        self.table.cellDoubleClicked.connect(lambda row, col: self.rerun_selected())
+        self.rerun_btn.clicked.connect(self.rerun_selected)
+        self.favorite_btn.clicked.connect(self.toggle_favorite)
+        self.delete_btn.clicked.connect(self.delete_selected)
+        self.refresh()
+
+    def refresh(self):
+        # 先落盘队列中的记录，保证刚执行的语句能搜到
+        self.history.flush()
+        self._entries = self.history.search(self.search_edit.text(), self.favorite_box.isChecked())
+        self.table.setRowCount(len(self._entries))
+        for row, e in enumerate(self._entries):
+            values = [
+                datetime.fromtimestamp(e['executed_at']).strftime('%Y-%m-%d %H:%M:%S'),
+                e['connection'] or '',
+                '' if e['duration_ms'] is None else f"{e['duration_ms']:.1f}",
+                '' if e['rows'] is None else str(e['rows']),
+                '成功' if e['status'] == 'ok' else '失败',
+                '★' if e['favorite'] else '',
+                ' '.join(e['sql'].split())[:200],
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+        self.status_label.setText(f'显示最近 {len(self._entries)} 条匹配记录')
+        self.sql_view.clear()
+
+    def selected_entry(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self._entries[rows[0].row()]
+
+    def on_selection_changed(self):
+        e = self.selected_entry()
+        if e is None:
+            self.sql_view.clear()
+            return
+        text = e['sql']
+        if e['error']:
+            text += f"\n\n-- 错误: {e['error']}"
+        self.sql_view.setPlainText(text)
+
+    def rerun_selected(self):
+        e = self.selected_entry()
+        if e is not None:
+            self.rerun_requested.emit(e['sql'], e['connection'] or '')
+
+    def toggle_favorite(self):
+        e = self.selected_entry()
+        if e is not None:
+            self.history.set_favorite(e['id'], not e['favorite'])
+            self.refresh()
+
+    def delete_selected(self):
+        e = self.selected_entry()
+        if e is not None:
+            self.history.delete(e['id'])
+            self.refresh()
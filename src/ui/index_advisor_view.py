@@ -0,0 +1,182 @@
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+                             QPlainTextEdit, QSplitter, QMessageBox, QAbstractItemView, QHeaderView)
+from PyQt5.QtCore import Qt
+from .job_scheduler import PRIORITY_NORMAL, PRIORITY_BULK
+from db.index_advisor import workload_of, clear_workload, advise, measure, create_indexes
+
+
+class IndexAdvisorWidget(QWidget):
+    """
+    索引建议：分析本连接执行过的查询，列出建议创建的索引；
+    勾选后可生成/执行 CREATE INDEX，并在创建前后重新执行相关查询对比耗时
+    """
+
+    COLUMNS = ['表', '索引列', '原因', '次数', '累计耗时(ms)', '行数估计', '得分', '创建前(ms)', '创建后(ms)']
+
+    def __init__(self, conn, label, scheduler, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.scheduler = scheduler
+        self.suggestions = []
+        self.before = {}  # {建议序号: 各语句耗时}
+        self.after = {}
+        self.job = None
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.info_label = QLabel(f'连接: {label}')
+        self.analyze_btn = QPushButton('分析')
+        self.measure_btn = QPushButton('测量所选')
+        self.create_btn = QPushButton('创建所选索引')
+        self.clear_btn = QPushButton('清空记录')
+        top.addWidget(self.info_label)
+        top.addStretch()
+        for btn in (self.analyze_btn, self.measure_btn, self.create_btn, self.clear_btn):
+            top.addWidget(btn)
+        layout.addLayout(top)
+        splitter = QSplitter(Qt.Vertical)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        splitter.addWidget(self.table)
+        self.sql_view = QPlainTextEdit()
+        self.sql_view.setPlaceholderText('勾选建议后在此显示 CREATE INDEX 语句，可复制后自行执行')
+        splitter.addWidget(self.sql_view)
+        splitter.setSizes([300, 150])
+        layout.addWidget(splitter)
+        self.status_label = QLabel('')
+        layout.addWidget(self.status_label)
+        self.analyze_btn.clicked.connect(self.analyze)
+        self.measure_btn.clicked.connect(self.measure_checked)
+        self.create_btn.clicked.connect(self.create_checked)
+        self.clear_btn.clicked.connect(self.clear_workload)
+        self.table.itemChanged.connect(self.update_sql_view)
+        self.update_status()
+
+    def update_status(self, text=''):
+        entries = workload_of(self.conn)
+        count = sum(e['count'] for e in entries)
+        self.status_label.setText(f'已记录 {len(entries)} 条不同语句，共执行 {count} 次' + (f'；{text}' if text else ''))
+
+    def analyze(self):
+        entries = workload_of(self.conn)
+        if not entries:
+            QMessageBox.information(self, '索引建议', '还没有记录到查询：在 SQL 编辑器中执行语句或在表数据中筛选、排序后再分析')
+            return
+        if self.job is not None and self.job.is_active():
+            return
+
+        def on_progress(done):
+            self.update_status(f'正在分析第 {done}/{len(entries)} 条')
+
+        def on_finished(result, error):
+            self.analyze_btn.setEnabled(True)
+            if error is not None:
+                self.update_status(f'分析失败: {error}')
+                return
+            self.suggestions, skipped = result
+            self.before, self.after = {}, {}
+            self.fill_table()
+            text = f'得到 {len(self.suggestions)} 条建议'
+            if skipped:
+                text += f'，{len(skipped)} 条语句无法分析'
+                self.sql_view.setPlainText('\n'.join(f'-- {reason}: {sql}' for sql, reason in skipped))
+            self.update_status(text)
+
+        self.analyze_btn.setEnabled(False)
+        self.job = self.scheduler.submit(advise, self.conn, entries, title='索引分析', priority=PRIORITY_NORMAL,
+                                         conn=self.conn, with_progress=True, with_cancel=True)
+        self.job.progress.connect(on_progress)
+        self.job.finished.connect(on_finished)
+
+    def fill_table(self):
+        self.table.blockSignals(True)
+        self.table.setRowCount(len(self.suggestions))
+        for row, s in enumerate(self.suggestions):
+            values = [s['table'], ', '.join(s['columns']), s['reasons'], str(s['count']), f"{s['total_ms']:.0f}",
+                      '' if s['rows'] is None else str(s['rows']), f"{s['score']:.0f}",
+                      self._timing(self.before.get(row)), self._timing(self.after.get(row))]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col == 0:
+                    item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                    item.setCheckState(Qt.Unchecked)
+                self.table.setItem(row, col, item)
+        self.table.blockSignals(False)
+        self.update_sql_view()
+
+    @staticmethod
+    def _timing(timings):
+        values = [t for t in timings or [] if t is not None]
+        return f'{sum(values):.1f}' if values else ''
+
+    def checked_rows(self):
+        return [row for row in range(self.table.rowCount())
+                if self.table.item(row, 0).checkState() == Qt.Checked]
+
+    def update_sql_view(self, *args):
+        rows = self.checked_rows()
+        if rows:
+            self.sql_view.setPlainText(';\n'.join(self.suggestions[r]['sql'] for r in rows) + ';')
+
+    def measure_checked(self):
+        # 未创建的建议记为创建前，已创建的记为创建后
+        rows = self.checked_rows()
+        if not rows:
+            QMessageBox.information(self, '测量耗时', '请先勾选要测量的建议')
+            return
+        conn = self.conn
+        targets = [(row, self.suggestions[row]) for row in rows]
+
+        def run(cancel_event=None):
+            return [(row, measure(conn, s['database'], s['statements'], cancel_event=cancel_event))
+                    for row, s in targets]
+
+        def on_finished(result, error):
+            if error is not None:
+                QMessageBox.critical(self, '测量失败', str(error))
+                return
+            for row, timings in result:
+                target = self.after if self.suggestions[row].get('created') else self.before
+                target[row] = timings
+                self.table.item(row, 7).setText(self._timing(self.before.get(row)))
+                self.table.item(row, 8).setText(self._timing(self.after.get(row)))
+            self.update_status('测量完成（只重新执行 SELECT，各取 3 次的中位数）')
+
+        self.update_status('正在重新执行相关查询...')
+        job = self.scheduler.submit(run, title='测量查询耗时', priority=PRIORITY_NORMAL, conn=conn, with_cancel=True)
+        job.finished.connect(on_finished)
+
+    def create_checked(self):
+        rows = [row for row in self.checked_rows() if not self.suggestions[row].get('created')]
+        if not rows:
+            QMessageBox.information(self, '创建索引', '请先勾选尚未创建的建议')
+            return
+        statements = '\n'.join(self.suggestions[r]['sql'] for r in rows)
+        if QMessageBox.question(self, '创建索引', f'将在数据库中执行:\n{statements}\n\n大表建索引可能耗时较长并锁表，确定继续吗？',
+                                QMessageBox.Yes | QMessageBox.No) != QMessageBox.Yes:
+            return
+        selected = [self.suggestions[r] for r in rows]
+
+        def on_finished(result, error):
+            if error is not None:
+                QMessageBox.critical(self, '创建索引失败', str(error))
+                return
+            failed = []
+            for s, err in result:
+                if err is None:
+                    s['created'] = True
+                else:
+                    failed.append(f"{s['sql']}: {err}")
+            if failed:
+                QMessageBox.warning(self, '创建索引', '以下索引创建失败:\n' + '\n'.join(failed))
+            self.update_status(f'已创建 {len(result) - len(failed)} 个索引，可再次“测量所选”对比耗时')
+
+        job = self.scheduler.submit(create_indexes, self.conn, selected, title='创建索引', priority=PRIORITY_BULK,
+                                    conn=self.conn)
+        job.finished.connect(on_finished)
+
+    def clear_workload(self):
+        clear_workload(self.conn)
+        self.update_status()
@@ -0,0 +1,241 @@
+import bisect
+import collections
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, pyqtSignal
+from db.client_factory import get_driver, set_client_hook, supports, CAP_CANCEL
+
+# 统一的后台任务调度：
+# - 固定大小的工作线程池，所有耗时操作都提交到这里，而不是各自新建线程
+# - 按优先级出队：用户正在等待的操作（分页、展开、可视化）先于批量任务（导出、传输、备份）
+# - 同一连接同时运行的任务数有上限，批量任务不会占满某个数据库的连接
+# - 始终为交互任务保留一个工作线程和每个连接的一个名额，批量任务排满时分页仍能立即执行
+# - 每个任务带取消标记（threading.Event），支持取消的函数通过 cancel_event 参数检查
+# - 任务运行中创建的客户端会登记到任务上，取消时对支持 CAP_CANCEL 的驱动直接中断正在执行的查询
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: '交互', PRIORITY_NORMAL: '普通', PRIORITY_BULK: '批量'}
+
+QUEUED, RUNNING, CANCELLING, DONE, FAILED, CANCELLED = '排队', '运行中', '取消中', '完成', '失败', '已取消'
+ACTIVE_STATES = (QUEUED, RUNNING, CANCELLING)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def connection_key(conn):
+    """
+    同一服务器（SQLite 为同一文件）上的任务共享并发名额
+    :return: (键, 显示名称)
+    """
+    driver = get_driver(conn['type'])
+    if driver is not None and driver.file_based:
+        return conn.get('db_path', ''), conn.get('db_path', '')
+    return (conn['type'], conn.get('host'), conn.get('port')), f"{conn.get('user')}@{conn.get('host')}:{conn.get('port')}"
+
+
+class Job(QObject):
+    finished = pyqtSignal(object, object)  # result, error
+    progress = pyqtSignal(object)
+
+    def __init__(self, job_id, title, func, args, kwargs, priority, conn_key, conn_label):
+        super().__init__()
+        self.id = job_id
+        self.title = title
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.conn_key = conn_key
+        self.conn_label = conn_label
+        self.cancel_event = threading.Event()
+        self._clients = []  # 运行中创建的可中断客户端
+        self._clients_lock = threading.Lock()
+        self.state = QUEUED
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.ended_at = None
+        self.rows = None  # 已处理行数，用于计算速率
+        self.detail = ''
+        self.progress.connect(self._track)
+
+    def is_active(self):
+        return self.state in ACTIVE_STATES
+
+    def attach_client(self, conn, client):
+        # 在工作线程中调用
+        if not supports(conn, CAP_CANCEL):
+            return
+        with self._clients_lock:
+            self._clients.append(client)
+
+    def interrupt(self):
+        # MySQL 的 KILL QUERY 需要另建连接，在单独的线程里执行，不阻塞界面
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            threading.Thread(target=self._cancel_client, args=(client,), daemon=True).start()
+
+    @staticmethod
+    def _cancel_client(client):
+        try:
+            client.cancel()
+        except Exception:
+            pass  # 查询可能已经结束、连接已关闭
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.ended_at or time.time()) - self.started_at
+
+    def throughput(self):
+        elapsed = self.elapsed()
+        if self.rows is None or elapsed <= 0:
+            return None
+        return self.rows / elapsed
+
+    def update_rows(self, rows):
+        # 进度中的行数不是累计值时（如按表/分区回报），由调用方换算后设置
+        self.rows = rows
+
+    def _track(self, info):
+        if isinstance(info, int):
+            self.rows = info
+        elif isinstance(info, dict):
+            if isinstance(info.get('rows'), int):
+                self.rows = info['rows']
+            if 'done' in info and 'total' in info:
+                self.detail = f"{info['done']}/{info['total']}"
+            elif 'tables_done' in info:
+                self.detail = f"{info['tables_done']}/{info['tables_total']} 表"
+            elif 'checked' in info:
+                self.detail = f"已检查 {info['checked']} 块"
+
+
+class JobScheduler(QObject):
+    job_added = pyqtSignal(object)
+    job_changed = pyqtSignal(object)
+    _job_done = pyqtSignal(object, object, object)  # 工作线程 -> 主线程
+
+    def __init__(self, max_workers=4, per_connection=2, keep_finished=50, parent=None):
+        super().__init__(parent)
+        self.max_workers = max(1, max_workers)
+        self.per_connection = max(1, per_connection)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        self._ids = itertools.count(1)
+        self._queue = []  # [(优先级, 序号, Job)]，保持有序
+        self._running = set()
+        self.finished_jobs = collections.deque(maxlen=keep_finished)
+        self._job_done.connect(self._on_job_done)
+
+    def submit(self, func, *args, title='', priority=PRIORITY_NORMAL, conn=None,
+               with_progress=False, with_cancel=False, **kwargs):
+        """
+        提交后台任务，返回 Job；连接 job.finished / job.progress 获取结果和进度。
+        :param conn: 任务使用的连接配置，用于限制单个数据库上的并发数；None 表示不限制
+        :param with_progress: 向函数传入 progress_callback
+        :param with_cancel: 向函数传入 cancel_event，函数需自行检查
+        """
+        conn_key, conn_label = connection_key(conn) if conn is not None else (None, '')
+        job = Job(next(self._ids), title or getattr(func, '__name__', '任务'), func, args, dict(kwargs),
+                  priority, conn_key, conn_label)
+        if with_progress:
+            job.kwargs['progress_callback'] = job.progress.emit
+        if with_cancel:
+            job.kwargs['cancel_event'] = job.cancel_event
+        bisect.insort(self._queue, (priority, job.id, job))
+        self.job_added.emit(job)
+        self._dispatch()
+        return job
+
+    def jobs(self):
+        """
+        :return: 运行中与排队中的任务，按执行顺序
+        """
+        running = sorted(self._running, key=lambda j: j.started_at)
+        return running + [job for _, _, job in self._queue]
+
+    def cancel(self, job):
+        if not job.is_active():
+            return
+        job.cancel_event.set()
+        if job.state == QUEUED:
+            self._queue = [item for item in self._queue if item[2] is not job]
+            self._finish(job, CANCELLED, None, JobCancelled('任务已取消'))
+            return
+        job.state = CANCELLING
+        job.interrupt()
+        self.job_changed.emit(job)
+
+    def cancel_all(self):
+        for job in self.jobs():
+            self.cancel(job)
+
+    def clear_finished(self):
+        self.finished_jobs.clear()
+
+    def _can_start(self, job):
+        # 交互任务可以使用保留的名额
+        reserve = 0 if job.priority == PRIORITY_INTERACTIVE else 1
+        if len(self._running) >= self.max_workers - (reserve if self.max_workers > 1 else 0):
+            return False
+        if job.conn_key is None:
+            return True
+        same = sum(1 for j in self._running if j.conn_key == job.conn_key)
+        return same < self.per_connection + (1 - reserve)
+
+    def _dispatch(self):
+        # 按优先级依次尝试，被连接并发数挡住的任务不阻塞后面其他连接的任务
+        i = 0
+        while i < len(self._queue) and len(self._running) < self.max_workers:
+            job = self._queue[i][2]
+            if not self._can_start(job):
+                i += 1
+                continue
+            del self._queue[i]
+            job.state = RUNNING
+            job.started_at = time.time()
+            self._running.add(job)
+            self._pool.submit(self._run, job)
+            self.job_changed.emit(job)
+
+    def _run(self, job):
+        set_client_hook(job.attach_client)
+        try:
+            result = job.func(*job.args, **job.kwargs)
+            self._job_done.emit(job, result, None)
+        except Exception as e:
+            self._job_done.emit(job, None, e)
+        finally:
+            set_client_hook(None)
+            with job._clients_lock:
+                job._clients = []
+
+    def _on_job_done(self, job, result, error):
+        self._running.discard(job)
+        if job.cancel_event.is_set() and error is not None:
+            self._finish(job, CANCELLED, None, error)
+        else:
+            self._finish(job, DONE if error is None else FAILED, result, error)
+        self._dispatch()
+
+    def _finish(self, job, state, result, error):
+        job.state = state
+        job.ended_at = time.time()
+        # 已结束的任务只保留统计信息，释放函数及参数引用的数据
+        job.func, job.args, job.kwargs = None, (), {}
+        self.finished_jobs.appendleft(job)
+        self.job_changed.emit(job)
+        job.finished.emit(result, error)
+
+    def shutdown(self):
+        # 退出时通知运行中的任务停止，丢弃排队任务（不再回调），不等待运行中的任务结束
+        for job in self.jobs():
+            job.cancel_event.set()
+        self._queue = []
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,93 @@
+from PyQt5.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+                             QPushButton, QAbstractItemView, QHeaderView)
+from PyQt5.QtCore import Qt, QTimer
+from .job_scheduler import PRIORITY_NAMES
+
+
+def _format_rate(rate):
+    if rate is None:
+        return ''
+    if rate >= 10000:
+        return f'{rate / 1000:.0f}k 行/秒'
+    return f'{rate:.0f} 行/秒'
+
+
+class JobsDock(QDockWidget):
+    """后台任务面板：列出运行中、排队中和最近结束的任务"""
+
+    COLUMNS = ['任务', '连接', '优先级', '状态', '进度', '速率', '耗时']
+
+    def __init__(self, scheduler, parent=None):
+        super().__init__('后台任务', parent)
+        self.scheduler = scheduler
+        self.setObjectName('JobsDock')
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setContentsMargins(4, 4, 4, 4)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+        btn_layout = QHBoxLayout()
+        self.cancel_btn = QPushButton('取消所选')
+        self.cancel_btn.clicked.connect(self.cancel_selected)
+        self.clear_btn = QPushButton('清除已结束')
+        self.clear_btn.clicked.connect(self.clear_finished)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.cancel_btn)
+        btn_layout.addWidget(self.clear_btn)
+        layout.addLayout(btn_layout)
+        self.setWidget(widget)
+        self._rows = []  # 表格行对应的 Job
+        # 有任务运行时定时刷新耗时和速率
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+        scheduler.job_added.connect(self.on_job_changed)
+        scheduler.job_changed.connect(self.on_job_changed)
+        self.refresh()
+
+    def on_job_changed(self, job):
+        self.refresh()
+        if self.scheduler.jobs():
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def refresh(self):
+        if not self.isVisible() and self._rows:
+            return
+        self._rows = self.scheduler.jobs() + list(self.scheduler.finished_jobs)
+        self.table.setRowCount(len(self._rows))
+        for row, job in enumerate(self._rows):
+            progress = job.detail
+            if job.rows is not None:
+                progress = (progress + ' ' if progress else '') + f'{job.rows} 行'
+            values = [job.title, job.conn_label, PRIORITY_NAMES.get(job.priority, str(job.priority)), job.state,
+                      progress, _format_rate(job.throughput()), f'{job.elapsed():.1f}s' if job.started_at else '']
+            for col, value in enumerate(values):
+                item = self.table.item(row, col)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.table.setItem(row, col, item)
+                item.setText(value)
+                if job.is_active():
+                    item.setData(Qt.ForegroundRole, None)
+                else:
+                    item.setForeground(Qt.gray)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def cancel_selected(self):
+        for index in self.table.selectionModel().selectedRows():
+            if index.row() < len(self._rows):
+                self.scheduler.cancel(self._rows[index.row()])
+
+    def clear_finished(self):
+        self.scheduler.clear_finished()
+        self.refresh()
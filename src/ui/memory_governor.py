@@ -0,0 +1,67 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+# 全局内存预算：统计各标签页持有的结果数据（近似字节数），合计超出预算时，
+# 从最久未使用的非当前标签页开始让其休眠，直到回到预算以内
+# 标签页控件实现以下接口即参与统计：
+# - memory_bytes()：当前持有的近似字节数
+# - hibernate()：释放行数据，保留查询、分页、筛选等状态；有未提交修改或正在加载时可以不休眠
+# - rehydrate()：切换回该标签页时恢复数据
+# - hibernated：是否处于休眠状态
+
+MEMORY_BUDGET = 512 * 1024 * 1024
+MIN_HIBERNATE_BYTES = 1024 * 1024  # 占用很小的标签页不休眠，避免来回重新加载
+CELL_BYTES = 96  # 一个 QTableWidgetItem 及其文字的近似开销
+CHECK_INTERVAL = 2000  # 毫秒
+
+
+class MemoryGovernor(QObject):
+    usage_changed = pyqtSignal(object, object, int)  # (已用字节, 预算, 已休眠的标签页数)
+
+    def __init__(self, tabs, budget=MEMORY_BUDGET, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.budget = budget
+        self._last_used = {}  # 标签页控件 -> 最近一次切换到它的时间
+        tabs.currentChanged.connect(self.on_current_changed)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        self.timer.start(CHECK_INTERVAL)
+
+    def managed_widgets(self):
+        widgets = []
+        for i in range(self.tabs.count()):
+            widget = self.tabs.widget(i)
+            if hasattr(widget, 'memory_bytes'):
+                widgets.append(widget)
+        return widgets
+
+    def on_current_changed(self, index):
+        widget = self.tabs.widget(index)
+        if widget is None:
+            return
+        self._last_used[widget] = time.monotonic()
+        if getattr(widget, 'hibernated', False):
+            widget.rehydrate()
+        self.check()
+
+    def forget(self, widget):
+        # 标签页关闭时调用
+        self._last_used.pop(widget, None)
+
+    def check(self):
+        widgets = self.managed_widgets()
+        sizes = {w: w.memory_bytes() for w in widgets}
+        total = sum(sizes.values())
+        if total > self.budget:
+            current = self.tabs.currentWidget()
+            candidates = [w for w in widgets
+                          if w is not current and not w.hibernated and sizes[w] >= MIN_HIBERNATE_BYTES]
+            candidates.sort(key=lambda w: self._last_used.get(w, 0))
+            for widget in candidates:
+                if total <= self.budget:
+                    break
+                widget.hibernate()
+                total -= sizes[widget] - widget.memory_bytes()
+        self.usage_changed.emit(total, self.budget, sum(1 for w in widgets if w.hibernated))
+        return total
@@ -0,0 +1,37 @@
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QComboBox, QCheckBox, QDialogButtonBox
+import os
+
+
+class ParallelExportDialog(QDialog):
+    def __init__(self, table_name, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f'并行导出 - {table_name}')
+        self.resize(360, 160)
+        layout = QVBoxLayout(self)
+        worker_layout = QHBoxLayout()
+        worker_layout.addWidget(QLabel('工作进程数:'))
+        self.workers_box = QSpinBox()
+        self.workers_box.setRange(1, 64)
+        self.workers_box.setValue(min(8, os.cpu_count() or 4))
+        worker_layout.addWidget(self.workers_box)
+        layout.addLayout(worker_layout)
+        strategy_layout = QHBoxLayout()
+        strategy_layout.addWidget(QLabel('分区方式:'))
+        self.strategy_combo = QComboBox()
+        self.strategy_combo.addItem('按主键最小/最大值等分', 'minmax')
+        self.strategy_combo.addItem('按主键采样等分行数', 'sample')
+        strategy_layout.addWidget(self.strategy_combo)
+        layout.addLayout(strategy_layout)
+        self.shards_check = QCheckBox('保留为分片文件（不合并）')
+        layout.addWidget(self.shards_check)
+        btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        btns.accepted.connect(self.accept)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def get_options(self):
+        return {
+            'workers': self.workers_box.value(),
+            'strategy': self.strategy_combo.currentData(),
+            'keep_shards': self.shards_check.isChecked(),
+        }
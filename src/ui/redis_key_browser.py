@@ -0,0 +1,286 @@
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLabel,
+                             QLineEdit, QComboBox, QTextEdit, QSplitter, QMessageBox, QFileDialog, QAbstractItemView,
+                             QHeaderView)
+from PyQt5.QtCore import Qt
+from .job_scheduler import PRIORITY_INTERACTIVE, PRIORITY_BULK
+from db.client_factory import create_client
+from db.export_writers import open_export_stream
+
+KEY_TYPES = ['全部', 'string', 'hash', 'list', 'set', 'zset', 'stream']
+PAGE_KEYS = 500  # 每次滚动到底部时加载的键数
+
+
+def _display(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='backslashreplace')
+    return str(value)
+
+
+def _format_ttl(ttl_ms):
+    if ttl_ms is None or ttl_ms == -2:
+        return ''
+    if ttl_ms == -1:
+        return '永久'
+    if ttl_ms >= 60000:
+        return f'{ttl_ms / 1000:.0f}s'
+    return f'{ttl_ms / 1000:.1f}s'
+
+
+def _format_size(size):
+    if size is None:
+        return ''
+    if size >= 1024 * 1024:
+        return f'{size / 1024 / 1024:.1f} MB'
+    if size >= 1024:
+        return f'{size / 1024:.1f} KB'
+    return f'{size} B'
+
+
+class RedisKeyBrowser(QWidget):
+    """
+    Redis 键浏览：SCAN 增量加载，滚动到底部时继续扫描；类型、TTL、内存占用随每批键一起用 pipeline 读取
+    """
+
+    COLUMNS = ['键', '类型', 'TTL', '内存']
+
+    def __init__(self, conn, scheduler, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.scheduler = scheduler
+        self.client = create_client(conn)  # redis-py 连接池线程安全，各后台任务共用
+        self.cursor = 0
+        self.finished = False  # 已遍历完整个键空间
+        self.job = None
+        self.value_job = None
+        self.match = '*'
+        self.key_type = None
+        self.keys = []  # 表格行对应的键（bytes）
+        self.init_ui()
+        self.restart()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        search_layout = QHBoxLayout()
+        self.match_edit = QLineEdit('*')
+        self.match_edit.setPlaceholderText('MATCH 模式，如 user:*')
+        self.type_combo = QComboBox()
+        self.type_combo.addItems(KEY_TYPES)
+        self.search_btn = QPushButton('扫描')
+        self.delete_btn = QPushButton('删除所选')
+        self.delete_match_btn = QPushButton('删除全部匹配')
+        self.export_btn = QPushButton('导出匹配')
+        search_layout.addWidget(QLabel('匹配'))
+        search_layout.addWidget(self.match_edit)
+        search_layout.addWidget(QLabel('类型'))
+        search_layout.addWidget(self.type_combo)
+        search_layout.addWidget(self.search_btn)
+        search_layout.addStretch()
+        search_layout.addWidget(self.delete_btn)
+        search_layout.addWidget(self.delete_match_btn)
+        search_layout.addWidget(self.export_btn)
+        layout.addLayout(search_layout)
+        splitter = QSplitter(Qt.Horizontal)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        splitter.addWidget(self.table)
+        self.value_view = QTextEdit()
+        self.value_view.setReadOnly(True)
+        splitter.addWidget(self.value_view)
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 2)
+        layout.addWidget(splitter)
+        self.status_label = QLabel('')
+        layout.addWidget(self.status_label)
+        self.search_btn.clicked.connect(self.restart)
+        self.match_edit.returnPressed.connect(self.restart)
+        self.delete_btn.clicked.connect(self.delete_selected)
+        self.delete_match_btn.clicked.connect(self.delete_matching)
+        self.export_btn.clicked.connect(self.export_matching)
+        self.table.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+        self.table.itemSelectionChanged.connect(self.show_selected_value)
+
+    def restart(self):
+        # 新的扫描：丢弃正在进行的加载，从游标 0 开始
+        if self.job is not None and self.job.is_active():
+            self.scheduler.cancel(self.job)
+        self.job = None
+        self.match = self.match_edit.text().strip() or '*'
+        self.key_type = None if self.type_combo.currentIndex() == 0 else self.type_combo.currentText()
+        self.cursor = 0
+        self.finished = False
+        self.keys = []
+        self.table.setRowCount(0)
+        self.value_view.clear()
+        self.load_more()
+
+    def on_scrolled(self, value):
+        bar = self.table.verticalScrollBar()
+        if value >= bar.maximum() - 5:
+            self.load_more()
+
+    def load_more(self):
+        if self.finished or (self.job is not None and self.job.is_active()):
+            return
+        client, cursor, match, key_type = self.client, self.cursor, self.match, self.key_type
+
+        def load():
+            next_cursor, keys = client.scan_keys(cursor, match, key_type=key_type, limit=PAGE_KEYS)
+            return next_cursor, client.key_info(keys), client.key_count()
+
+        self.status_label.setText(f'已加载 {len(self.keys)} 个键，正在扫描...')
+        job = self.scheduler.submit(load, conn=self.conn, title=f'扫描键[{match}]', priority=PRIORITY_INTERACTIVE)
+        job.finished.connect(lambda result, error: self.on_loaded(job, result, error))
+        self.job = job
+
+    def on_loaded(self, job, result, error):
+        if job is not self.job:
+            return  # 已重新开始扫描
+        if error is not None:
+            self.status_label.setText(f'扫描失败: {error}')
+            return
+        self.cursor, infos, total = result
+        self.finished = self.cursor == 0
+        row = self.table.rowCount()
+        self.table.setRowCount(row + len(infos))
+        for info in infos:
+            values = [_display(info['key']), info['type'], _format_ttl(info['ttl_ms']), _format_size(info['memory'])]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+            self.keys.append(info['key'])
+            row += 1
+        state = '已扫描完' if self.finished else '滚动到底部继续加载'
+        self.status_label.setText(f'已加载 {len(self.keys)} 个键（库中共 {total} 个），{state}')
+        # MATCH 很稀疏、本次扫描匹配的键不足一页时继续加载
+        if not self.finished and len(self.keys) < PAGE_KEYS:
+            self.load_more()
+
+    def show_selected_value(self):
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        if len(rows) != 1:
+            return
+        key = self.keys[rows[0]]
+        key_type = self.table.item(rows[0], 1).text()
+        client = self.client
+        job = self.scheduler.submit(client.get_value, key, key_type, conn=self.conn, title='读取键值',
+                                    priority=PRIORITY_INTERACTIVE)
+        job.finished.connect(lambda result, error: self.on_value_loaded(job, key, key_type, result, error))
+        self.value_job = job
+
+    def on_value_loaded(self, job, key, key_type, result, error):
+        if job is not self.value_job:
+            return
+        if error is not None:
+            self.value_view.setPlainText(f'读取失败: {error}')
+            return
+        value, size = result
+        lines = [f'键: {_display(key)}', f'类型: {key_type}']
+        if key_type == 'string':
+            lines.append(f'长度: {size} 字节' + ('（仅显示开头部分）' if size > len(value) else ''))
+            lines += ['', _display(value)]
+        elif value is not None:
+            items = list(value.items()) if isinstance(value, dict) else list(value)
+            lines.append(f'元素数: {size}' + (f'（仅显示前 {len(items)} 个）' if size > len(items) else ''))
+            lines.append('')
+            for item in items:
+                if isinstance(item, tuple):
+                    lines.append(' | '.join(_display(v) for v in item))
+                else:
+                    lines.append(_display(item))
+        else:
+            lines.append('键不存在或类型不支持预览')
+        self.value_view.setPlainText('\n'.join(lines))
+
+    def delete_selected(self):
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()}, reverse=True)
+        if not rows:
+            return
+        if QMessageBox.question(self, '删除键', f'确定删除选中的 {len(rows)} 个键吗？',
+                                QMessageBox.Yes | QMessageBox.No) != QMessageBox.Yes:
+            return
+        keys = [self.keys[r] for r in rows]
+
+        def on_finished(result, error):
+            if error is not None:
+                QMessageBox.critical(self, '删除失败', str(error))
+                return
+            for r in rows:
+                self.table.removeRow(r)
+                del self.keys[r]
+            self.status_label.setText(f'已删除 {result} 个键')
+
+        job = self.scheduler.submit(self.client.delete_keys, keys, conn=self.conn, title='删除键',
+                                    priority=PRIORITY_INTERACTIVE)
+        job.finished.connect(on_finished)
+
+    def delete_matching(self):
+        match, key_type = self.match_edit.text().strip() or '*', None
+        if self.type_combo.currentIndex() != 0:
+            key_type = self.type_combo.currentText()
+        desc = f'匹配 {match}' + (f' 的 {key_type} 类型' if key_type else '')
+        if QMessageBox.question(self, '删除键', f'确定删除{desc}的全部键吗？此操作不可撤销。',
+                                QMessageBox.Yes | QMessageBox.No) != QMessageBox.Yes:
+            return
+
+        def on_finished(result, error):
+            if error is not None:
+                QMessageBox.critical(self, '删除失败', str(error))
+            else:
+                QMessageBox.information(self, '删除完成', f'已删除 {result} 个键')
+            self.restart()
+
+        conn = self.conn
+
+        def do_delete(progress_callback=None, cancel_event=None):
+            # 批量任务使用独立连接，关闭标签页不影响其继续执行
+            client = create_client(conn)
+            try:
+                return client.delete_matching(match, key_type=key_type,
+                                              progress_callback=progress_callback, cancel_event=cancel_event)
+            finally:
+                client.close()
+
+        job = self.scheduler.submit(do_delete, conn=self.conn,
+                                    title=f'删除键[{match}]', priority=PRIORITY_BULK,
+                                    with_progress=True, with_cancel=True)
+        job.finished.connect(on_finished)
+
+    def export_matching(self):
+        path, _ = QFileDialog.getSaveFileName(self, '导出键', 'redis_keys.jsonl',
+                                              'JSON Lines (*.jsonl);;JSON Lines gzip (*.jsonl.gz)')
+        if not path:
+            return
+        compression = 'gzip' if path.endswith('.gz') else ''
+        match, key_type = self.match_edit.text().strip() or '*', None
+        if self.type_combo.currentIndex() != 0:
+            key_type = self.type_combo.currentText()
+        conn = self.conn
+
+        def do_export(progress_callback=None, cancel_event=None):
+            client = create_client(conn)
+            stream = open_export_stream(path, compression)
+            try:
+                return client.export_matching(stream, match, key_type=key_type,
+                                              progress_callback=progress_callback, cancel_event=cancel_event)
+            finally:
+                stream.close()
+                client.close()
+
+        def on_finished(result, error):
+            if error is not None:
+                QMessageBox.critical(self, '导出失败', str(error))
+            else:
+                QMessageBox.information(self, '导出成功', f'已导出 {result} 个键到\n{path}')
+
+        job = self.scheduler.submit(do_export, conn=self.conn, title=f'导出键[{match}]', priority=PRIORITY_BULK,
+                                    with_progress=True, with_cancel=True)
+        job.finished.connect(on_finished)
+
+    def release_result(self):
+        # 关闭标签页时停止加载并释放连接池
+        if self.job is not None and self.job.is_active():
+            self.scheduler.cancel(self.job)
+        self.keys = []
+        self.client.close()
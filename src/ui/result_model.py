@@ -0,0 +1,50 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+
+
+class ResultTableModel(QAbstractTableModel):
+    # 只读结果模型：单元格按需从列式结果中取值，不预先创建任何表格项
+    def __init__(self, result=None, parent=None):
+        super().__init__(parent)
+        self._result = result
+        self._view = None  # 本地排序/筛选后的行号数组，None 表示原始顺序
+
+    def set_result(self, result):
+        self.beginResetModel()
+        self._result = result
+        self._view = None
+        self.endResetModel()
+
+    def set_view(self, indices):
+        self.beginResetModel()
+        self._view = indices
+        self.endResetModel()
+
+    def source_row(self, row):
+        return row if self._view is None else int(self._view[row])
+
+    def result(self):
+        return self._result
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._result is None:
+            return 0
+        return len(self._result) if self._view is None else len(self._view)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._result is None:
+            return 0
+        return len(self._result.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self._result is None:
+            return QVariant()
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return str(self._result.value(self.source_row(index.row()), index.column()))
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or self._result is None:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self._result.headers[section]
+        return str(self.source_row(section) + 1)
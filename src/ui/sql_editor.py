@@ -1,6 +1,13 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton, QTableWidget, QTableWidgetItem, QLabel, QTextEdit, QFrame
-from PyQt5.QtCore import Qt, QRect, QSize, pyqtSlot
-from PyQt5.QtGui import QColor, QPainter, QTextFormat
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton, QTableView, QLabel, QTextEdit, QFrame, QComboBox, QLineEdit, QMessageBox, QCompleter
+from PyQt5.QtCore import Qt, QRect, QSize, pyqtSlot, QStringListModel
+from PyQt5.QtGui import QColor, QPainter, QTextFormat, QTextCursor
+from db.result_buffer import ColumnarResult
+from db.result_view import ResultView
+from db.spill_store import SpillResult, spill_result, load_spilled
+from db.query_builder import FILTER_OPERATORS, NO_VALUE_OPERATORS
+from .result_model import ResultTableModel
+from .sql_highlighter import SQLHighlighter
+from .job_scheduler import PRIORITY_INTERACTIVE, PRIORITY_BULK
 import os
 
 class LineNumberArea(QWidget):
@@ -29,6 +36,64 @@ class SQLPlainTextEdit(QPlainTextEdit):
         self.cursorPositionChanged.connect(self.highlight_current_line)
         self.update_line_number_area_width(0)
         self.highlight_current_line()
+        self.highlighter = SQLHighlighter(self.document())
+        self.updateRequest.connect(self.update_highlight_range)
+        # 自动补全：候选来自内存中的 SchemaIndex，按键时不访问数据库
+        self.schema_index = None
+        self._completion_prefix = ''
+        self.completer = QCompleter(self)
+        self.completer.setModel(QStringListModel(self.completer))
+        self.completer.setWidget(self)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.completer.activated.connect(self.insert_completion)
+
+    def set_schema_index(self, index):
+        self.schema_index = index
+
+    def set_dialect(self, dialect):
+        self.highlighter.set_dialect(dialect)
+
+    def current_statement(self):
+        # 光标所在的语句（按分号切分），用于解析 FROM/JOIN 中的表别名
+        text = self.toPlainText()
+        pos = self.textCursor().position()
+        start = text.rfind(';', 0, pos) + 1
+        end = text.find(';', pos)
+        return text[start:end if end >= 0 else len(text)], text[start:pos]
+
+    def insert_completion(self, word):
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.Left, QTextCursor.KeepAnchor, len(self._completion_prefix))
+        cursor.insertText(word)
+        self.setTextCursor(cursor)
+
+    def keyPressEvent(self, event):
+        popup = self.completer.popup()
+        if popup.isVisible() and event.key() in (Qt.Key_Enter, Qt.Key_Return, Qt.Key_Tab, Qt.Key_Escape, Qt.Key_Backtab):
+            # 交给补全弹窗处理
+            event.ignore()
+            return
+        manual = event.key() == Qt.Key_Space and event.modifiers() & Qt.ControlModifier
+        if not manual:
+            super().keyPressEvent(event)
+        if self.schema_index is None:
+            return
+        text = event.text()
+        if not manual and (not text or not (text[-1].isalnum() or text[-1] in '_.')):
+            popup.hide()
+            return
+        statement, before = self.current_statement()
+        prefix, words = self.schema_index.complete(before, statement)
+        if not words or (not manual and not prefix and not before.endswith('.')) or words == [prefix]:
+            popup.hide()
+            return
+        self._completion_prefix = prefix
+        self.completer.model().setStringList(words)
+        popup.setCurrentIndex(self.completer.model().index(0, 0))
+        rect = self.cursorRect()
+        rect.setWidth(popup.sizeHintForColumn(0) + popup.verticalScrollBar().sizeHint().width())
+        self.completer.complete(rect)
 
     def set_dark_mode(self, dark):
         self._dark_mode = dark
@@ -40,9 +105,16 @@ class SQLPlainTextEdit(QPlainTextEdit):
         else:
             self.setStyleSheet('')
         self.line_number_area.set_dark_mode(dark)
+        self.highlighter.set_dark_mode(dark)
         self.update()
         self.highlight_current_line()
 
+    def update_highlight_range(self, rect, dy):
+        first = self.firstVisibleBlock().blockNumber()
+        last = self.cursorForPosition(self.viewport().rect().bottomLeft()).blockNumber()
+        if (first, last) != self.highlighter.visible_range:
+            self.highlighter.highlight_visible(first, last)
+
     def line_number_area_width(self):
         digits = len(str(max(1, self.blockCount())))
         return 10 + self.fontMetrics().width('9') * digits
@@ -98,8 +170,10 @@ class SQLPlainTextEdit(QPlainTextEdit):
         self.setExtraSelections(extra_selections)
 
 class SQLEditor(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, scheduler=None):
         super().__init__(parent)
+        self.scheduler = scheduler  # 休眠时写盘、切换回来时读回都在后台任务中进行
+        self.job = None
         self.init_ui()
 
     def init_ui(self):
@@ -116,21 +190,212 @@ class SQLEditor(QWidget):
 
         self.result_label = QLabel('')
         layout.addWidget(self.result_label)
-        self.result_table = QTableWidget()
+        # 结果筛选区：在已加载的结果上本地筛选，不重新查询
+        filter_layout = QHBoxLayout()
+        self.filter_col_box = QComboBox()
+        self.filter_op_box = QComboBox()
+        self.filter_op_box.addItems(FILTER_OPERATORS)
+        self.filter_value_edit = QLineEdit()
+        self.filter_value_edit.setPlaceholderText('值（LIKE 可用 %，IN 用逗号分隔）')
+        self.add_filter_btn = QPushButton('筛选')
+        self.clear_filter_btn = QPushButton('清除筛选')
+        filter_layout.addWidget(self.filter_col_box)
+        filter_layout.addWidget(self.filter_op_box)
+        filter_layout.addWidget(self.filter_value_edit)
+        filter_layout.addWidget(self.add_filter_btn)
+        filter_layout.addWidget(self.clear_filter_btn)
+        layout.addLayout(filter_layout)
+        self.filter_label = QLabel('')
+        self.filter_label.hide()
+        layout.addWidget(self.filter_label)
+        self.result_model = ResultTableModel()
+        self.result_table = QTableView()
+        self.result_table.setModel(self.result_model)
+        # 点击表头本地排序：升序 → 降序 → 取消
+        header = self.result_table.horizontalHeader()
+        header.setSectionsClickable(True)
+        header.sectionClicked.connect(self.on_header_clicked)
         layout.addWidget(self.result_table)
+        self.add_filter_btn.clicked.connect(self.add_filter)
+        self.filter_value_edit.returnPressed.connect(self.add_filter)
+        self.clear_filter_btn.clicked.connect(self.clear_filters)
+        self.filter_op_box.currentTextChanged.connect(
+            lambda op: self.filter_value_edit.setEnabled(op not in NO_VALUE_OPERATORS))
+        self._result_view = None
+        self._filters = []  # [(列号, 运算符, 值)]
+        self._order_by = None  # (列号, 'ASC'/'DESC')
+        self.hibernated = False  # 结果由内存预算暂存到磁盘，切换回来时读回
+        self.set_filter_enabled(False)
 
     def set_result(self, headers, rows):
-        self.result_table.clear()
+        # rows 可以是行元组列表，也可以是已构建好的 ColumnarResult / SpillResult
+        old = self.result_model.result()
         if not headers:
-            self.result_table.setRowCount(0)
-            self.result_table.setColumnCount(0)
+            rows = None
+        elif isinstance(rows, (list, tuple)) or rows is None:
+            rows = ColumnarResult.from_rows(headers, rows or [])
+        self.result_model.set_result(rows)
+        if old is not None and old is not rows and hasattr(old, 'close'):
+            old.close()
+        self.hibernated = False
+        self._filters = []
+        self._order_by = None
+        self.filter_col_box.clear()
+        self.result_table.horizontalHeader().setSortIndicatorShown(False)
+        self.update_filter_label()
+        # 溢写到磁盘的结果不是列式存储，不支持本地排序/筛选
+        if isinstance(rows, ColumnarResult):
+            self._result_view = ResultView(rows)
+            self.filter_col_box.addItems(rows.headers)
+            self.set_filter_enabled(True)
+        else:
+            self._result_view = None
+            self.set_filter_enabled(False)
+            if rows is not None:
+                self.filter_label.setText('结果集较大已溢写到磁盘，不支持本地排序和筛选')
+                self.filter_label.show()
+
+    def set_filter_enabled(self, enabled):
+        for w in (self.filter_col_box, self.filter_op_box, self.filter_value_edit,
+                  self.add_filter_btn, self.clear_filter_btn):
+            w.setEnabled(enabled)
+
+    def add_filter(self):
+        if self._result_view is None or self.filter_col_box.currentIndex() < 0:
+            return
+        op = self.filter_op_box.currentText()
+        value = None if op in NO_VALUE_OPERATORS else self.filter_value_edit.text()
+        self._filters.append((self.filter_col_box.currentIndex(), op, value))
+        if not self.apply_view():
+            self._filters.pop()
+            return
+        self.filter_value_edit.clear()
+
+    def clear_filters(self):
+        if self._filters:
+            self._filters = []
+            self.apply_view()
+
+    def on_header_clicked(self, col):
+        if self._result_view is None:
+            return
+        if not self._order_by or self._order_by[0] != col:
+            self._order_by = (col, 'ASC')
+        elif self._order_by[1] == 'ASC':
+            self._order_by = (col, 'DESC')
+        else:
+            self._order_by = None
+        self.update_sort_indicator()
+        self.apply_view()
+
+    def update_sort_indicator(self):
+        header = self.result_table.horizontalHeader()
+        if self._order_by:
+            col, direction = self._order_by
+            header.setSortIndicatorShown(True)
+            header.setSortIndicator(col, Qt.AscendingOrder if direction == 'ASC' else Qt.DescendingOrder)
+        else:
+            header.setSortIndicatorShown(False)
+
+    def apply_view(self):
+        try:
+            indices = self._result_view.apply(self._filters, self._order_by)
+        except (ValueError, TypeError) as e:
+            QMessageBox.warning(self, '筛选失败', str(e))
+            return False
+        self.result_model.set_view(indices)
+        self.update_filter_label()
+        return True
+
+    def update_filter_label(self):
+        headers = self.result_model.result().headers if self._result_view is not None else []
+        parts = []
+        for col, op, value in self._filters:
+            parts.append(f'{headers[col]} {op}' if op in NO_VALUE_OPERATORS else f'{headers[col]} {op} {value}')
+        text = ''
+        if parts:
+            text = '筛选: ' + ' AND '.join(parts) + f'（{self.result_model.rowCount()} / {len(self.result_model.result())} 行）'
+        if self._order_by:
+            text += ('    ' if text else '') + f'排序: {headers[self._order_by[0]]} {self._order_by[1]}'
+        self.filter_label.setText(text)
+        self.filter_label.setVisible(bool(text))
+
+    def set_schema_index(self, index):
+        self.sql_edit.set_schema_index(index)
+
+    def set_dialect(self, dialect):
+        # 语法高亮的注释规则随连接的方言变化
+        self.sql_edit.set_dialect(dialect)
+
+    def release_result(self):
+        # 标签页关闭时释放结果集（溢写文件随之删除）
+        self.set_result([], [])
+
+    def memory_bytes(self):
+        result = self.result_model.result()
+        if result is None:
+            return 0
+        size = result.nbytes
+        if self._result_view is not None:
+            size += self._result_view.nbytes
+        return size
+
+    def hibernate(self):
+        # 内存中的结果在后台写到临时文件，完成后替换模型，筛选和排序条件保留；已溢写的结果只丢弃行缓存
+        if self.job is not None and self.job.is_active():
             return
-        self.result_table.setColumnCount(len(headers))
-        self.result_table.setHorizontalHeaderLabels(headers)
-        if not rows:
-            self.result_table.setRowCount(0)
+        result = self.result_model.result()
+        if isinstance(result, SpillResult):
+            result.drop_cache()
+            return
+        if not isinstance(result, ColumnarResult) or not len(result):
+            return
+        self.hibernated = True
+        self.filter_label.setText('正在休眠：结果写入磁盘...')
+        self.filter_label.show()
+        self.job = self.scheduler.submit(spill_result, result, title='休眠查询结果', priority=PRIORITY_BULK)
+        self.job.finished.connect(lambda spill, error: self.on_spilled(result, spill, error))
+
+    def on_spilled(self, result, spill, error):
+        if self.result_model.result() is not result or not self.hibernated:
+            # 写盘期间执行了新查询、关闭了标签页或已切换回来
+            if spill is not None:
+                spill.close()
+            return
+        if error is not None:
+            self.hibernated = False
+            self.update_filter_label()
+            return
+        filters, order_by = self._filters, self._order_by
+        self.set_result(result.headers, spill)
+        self._filters, self._order_by = filters, order_by
+        self.hibernated = True
+        self.filter_label.setText('已休眠：结果暂存到磁盘，切换回来时恢复')
+
+    def rehydrate(self):
+        result = self.result_model.result()
+        self.hibernated = False
+        if not isinstance(result, SpillResult):
+            # 写盘尚未完成，结果仍在内存中，完成后丢弃临时文件
+            self.update_filter_label()
+            return
+        if self.job is not None and self.job.is_active():
+            return
+        self.filter_label.setText('正在从磁盘读回结果...')
+        self.job = self.scheduler.submit(load_spilled, result, title='恢复查询结果', priority=PRIORITY_INTERACTIVE)
+        self.job.finished.connect(lambda loaded, error: self.on_rehydrated(result, loaded, error))
+
+    def on_rehydrated(self, spill, result, error):
+        if self.result_model.result() is not spill:
+            return  # 读回期间执行了新查询或关闭了标签页
+        if error is not None:
+            # 溢写的结果仍可浏览，只是不支持本地排序和筛选
+            self.filter_label.setText('结果已暂存到磁盘，读回失败，不支持本地排序和筛选')
+            QMessageBox.warning(self, '恢复结果失败', str(error))
             return
-        self.result_table.setRowCount(len(rows))
-        for row_idx, row in enumerate(rows):
-            for col_idx, value in enumerate(row):
-                self.result_table.setItem(row_idx, col_idx, QTableWidgetItem(str(value)))
+        filters, order_by = self._filters, self._order_by
+        self.set_result(spill.headers, result)
+        self._filters, self._order_by = filters, order_by
+        self.update_sort_indicator()
+        if filters or order_by:
+            self.apply_view()
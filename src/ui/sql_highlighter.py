@@ -0,0 +1,213 @@
+import re
+from PyQt5.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont, QTextBlockUserData
+from db.schema_index import SQL_KEYWORDS
+
+# SQL 语法高亮：
+# - 每个文本块（行）结束时的词法状态保存在 blockState 中（普通 / 块注释 / 字符串 / 反引号 / $$ 引用），
+#   修改一行后 Qt 只会重新处理该行，状态不变时不会继续处理后续行
+# - 文档超过 LAZY_BLOCKS 行时进入延迟模式：可视区域外的行只计算结束状态、不设置格式，
+#   滚动到可视区域时再补上格式，粘贴大脚本时不会卡住界面
+
+LAZY_BLOCKS = 5000
+VIEWPORT_MARGIN = 50
+
+NORMAL, BLOCK_COMMENT, SINGLE_QUOTE, DOUBLE_QUOTE, BACKTICK = 0, 1, 2, 3, 4
+DOLLAR_BASE = 16  # $tag$ 引用的状态为 DOLLAR_BASE + 标签序号
+
+_KEYWORDS = set(SQL_KEYWORDS) | {
+    'BEGIN', 'COMMIT', 'ROLLBACK', 'PROCEDURE', 'FUNCTION', 'TRIGGER', 'RETURNS', 'RETURN', 'DECLARE',
+    'IF', 'FOREIGN', 'REFERENCES', 'CONSTRAINT', 'CHECK', 'AUTO_INCREMENT', 'ENGINE', 'CHARSET', 'COLLATE',
+    'INT', 'INTEGER', 'BIGINT', 'SMALLINT', 'TINYINT', 'VARCHAR', 'CHAR', 'TEXT', 'BLOB', 'DATE', 'DATETIME',
+    'TIMESTAMP', 'DECIMAL', 'FLOAT', 'DOUBLE', 'BOOLEAN', 'TRUE', 'FALSE', 'CAST', 'COALESCE', 'OVER',
+    'PARTITION', 'WINDOW', 'RECURSIVE', 'LATERAL', 'NATURAL', 'ANALYZE', 'VACUUM', 'PRAGMA', 'GRANT', 'REVOKE',
+}
+_DELIMS = re.compile(r"--|/\*|'|\"|`|\$(?:[A-Za-z_]\w*)?\$")
+_DELIMS_HASH = re.compile(r"--|#|/\*|'|\"|`|\$(?:[A-Za-z_]\w*)?\$")  # MySQL 的 # 行注释
+HASH_COMMENT_DIALECTS = {'mysql'}  # PostgreSQL 中 # 是运算符（按位异或），SQLite 不支持
+_TOKENS = re.compile(r"(?P<word>[A-Za-z_]\w*)|(?P<number>\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)")
+_CLOSERS = {SINGLE_QUOTE: "'", DOUBLE_QUOTE: '"', BACKTICK: '`'}
+_OPENERS = {"'": SINGLE_QUOTE, '"': DOUBLE_QUOTE, '`': BACKTICK}
+
+
+class _BlockData(QTextBlockUserData):
+    # 标记该行已按当前内容设置过格式
+    pass
+
+
+def _find_quote_end(text, pos, quote):
+    # 支持反斜杠转义和重复引号转义，返回结束引号之后的位置，未结束返回 -1
+    n = len(text)
+    while pos < n:
+        i = text.find(quote, pos)
+        if i < 0:
+            return -1
+        backslashes = 0
+        j = i - 1
+        while j >= pos and text[j] == '\\':
+            backslashes += 1
+            j -= 1
+        if backslashes % 2:
+            pos = i + 1
+            continue
+        if i + 1 < n and text[i + 1] == quote:
+            pos = i + 2
+            continue
+        return i + 1
+    return -1
+
+
+class SQLLexer:
+    """按行词法分析，行之间只通过整数状态衔接"""
+
+    def __init__(self, dialect=None):
+        self.dollar_tags = []
+        self.set_dialect(dialect)
+
+    def set_dialect(self, dialect):
+        self.delims = _DELIMS_HASH if dialect in HASH_COMMENT_DIALECTS else _DELIMS
+
+    def _dollar_state(self, tag):
+        if tag not in self.dollar_tags:
+            self.dollar_tags.append(tag)
+        return DOLLAR_BASE + self.dollar_tags.index(tag)
+
+    def _close(self, text, pos, state):
+        # 从延续状态中寻找结束位置，返回结束后的位置或 -1
+        if state == BLOCK_COMMENT:
+            i = text.find('*/', pos)
+            return -1 if i < 0 else i + 2
+        if state >= DOLLAR_BASE:
+            tag = self.dollar_tags[state - DOLLAR_BASE]
+            i = text.find(tag, pos)
+            return -1 if i < 0 else i + len(tag)
+        return _find_quote_end(text, pos, _CLOSERS[state])
+
+    def scan(self, text, state, spans=None):
+        """
+        :param spans: 传入列表时收集 (起点, 长度, 类别)，类别为 comment/string/identifier；
+                      为 None 时只计算行末状态
+        :return: 行末状态
+        """
+        pos = 0
+        n = len(text)
+        if state != NORMAL:
+            end = self._close(text, 0, state)
+            kind = 'comment' if state == BLOCK_COMMENT else 'identifier' if state == BACKTICK else 'string'
+            if end < 0:
+                if spans is not None:
+                    spans.append((0, n, kind))
+                return state
+            if spans is not None:
+                spans.append((0, end, kind))
+            pos = end
+        while pos < n:
+            m = self.delims.search(text, pos)
+            if not m:
+                break
+            token, start = m.group(0), m.start()
+            if token in ('--', '#'):
+                if spans is not None:
+                    spans.append((start, n - start, 'comment'))
+                return NORMAL
+            if token == '/*':
+                new_state, kind, body = BLOCK_COMMENT, 'comment', start + 2
+            elif token in _OPENERS:
+                new_state = _OPENERS[token]
+                kind, body = ('identifier' if token == '`' else 'string'), start + 1
+            else:
+                new_state, kind, body = self._dollar_state(token), 'string', m.end()
+            end = self._close(text, body, new_state)
+            if end < 0:
+                if spans is not None:
+                    spans.append((start, n - start, kind))
+                return new_state
+            if spans is not None:
+                spans.append((start, end - start, kind))
+            pos = end
+        return NORMAL
+
+
+class SQLHighlighter(QSyntaxHighlighter):
+    def __init__(self, document, dark=False, dialect=None):
+        super().__init__(document)
+        self.dialect = dialect
+        self.lexer = SQLLexer(dialect)
+        self.visible_range = (0, 0)  # 由编辑器更新的可视行号范围
+        self.set_dark_mode(dark, rehighlight=False)
+
+    def set_dark_mode(self, dark, rehighlight=True):
+        colors = {
+            'keyword': ('#0033B3', '#CC7832'),
+            'string': ('#067D17', '#6A8759'),
+            'identifier': ('#871094', '#9876AA'),
+            'number': ('#1750EB', '#6897BB'),
+            'comment': ('#8C8C8C', '#808080'),
+        }
+        self.formats = {}
+        for kind, (light, dark_color) in colors.items():
+            fmt = QTextCharFormat()
+            fmt.setForeground(QColor(dark_color if dark else light))
+            if kind == 'keyword':
+                fmt.setFontWeight(QFont.Bold)
+            if kind == 'comment':
+                fmt.setFontItalic(True)
+            self.formats[kind] = fmt
+        if rehighlight:
+            self.rehighlight()
+
+    def set_dialect(self, dialect):
+        # 切换连接后注释规则可能不同，需要重新计算所有行的状态
+        if dialect == self.dialect:
+            return
+        self.dialect = dialect
+        self.lexer.set_dialect(dialect)
+        self.rehighlight()
+
+    def is_lazy(self):
+        return self.document().blockCount() > LAZY_BLOCKS
+
+    def highlightBlock(self, text):
+        state = max(self.previousBlockState(), NORMAL)
+        block = self.currentBlock()
+        number = block.blockNumber()
+        first, last = self.visible_range
+        if not (first - VIEWPORT_MARGIN <= number <= last + VIEWPORT_MARGIN) and self.is_lazy():
+            self.setCurrentBlockState(self.lexer.scan(text, state))
+            # 没有 userData 的行表示尚未设置格式
+            if block.userData() is not None:
+                self.setCurrentBlockUserData(None)
+            return
+        spans = []
+        self.setCurrentBlockState(self.lexer.scan(text, state, spans))
+        self.setCurrentBlockUserData(_BlockData())
+        # 在字符串/注释之间的普通代码中标出关键字和数字
+        pos = 0
+        for start, length, kind in spans + [(len(text), 0, None)]:
+            if start > pos:
+                self._highlight_code(text, pos, start)
+            if kind is not None:
+                self.setFormat(start, length, self.formats[kind])
+            pos = start + length
+
+    def _highlight_code(self, text, start, end):
+        for m in _TOKENS.finditer(text, start, end):
+            if m.lastgroup == 'word':
+                if m.group(0).upper() in _KEYWORDS:
+                    self.setFormat(m.start(), m.end() - m.start(), self.formats['keyword'])
+            else:
+                self.setFormat(m.start(), m.end() - m.start(), self.formats['number'])
+
+    def highlight_visible(self, first, last):
+        """
+        可视区域变化时调用：为延迟模式下未设置格式的行补上高亮
+        """
+        self.visible_range = (first, last)
+        if not self.is_lazy():
+            return
+        doc = self.document()
+        block = doc.findBlockByNumber(max(0, first - VIEWPORT_MARGIN))
+        stop = last + VIEWPORT_MARGIN
+        while block.isValid() and block.blockNumber() <= stop:
+            if block.userData() is None:
+                self.rehighlightBlock(block)
+            block = block.next()
@@ -0,0 +1,115 @@
+import time
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+                             QAbstractItemView, QHeaderView)
+from PyQt5.QtCore import Qt
+from .job_scheduler import PRIORITY_INTERACTIVE
+from db.storage_stats import read_storage_stats, cached_storage_stats
+
+
+def format_bytes(size):
+    if size is None:
+        return ''
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024 or unit == 'GB':
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+
+
+class _SortItem(QTableWidgetItem):
+    # 按 UserRole 中的数值排序，显示格式化后的文字；没有数值的排在最前
+    def __lt__(self, other):
+        a, b = self.data(Qt.UserRole), other.data(Qt.UserRole)
+        if a is None or b is None:
+            return a is None and b is not None
+        return a < b
+
+
+class StorageStatsWidget(QWidget):
+    """
+    库中各表的存储占用，可按任一列排序；统计在后台读取，打开时先显示缓存的结果
+    """
+
+    COLUMNS = [('表', 'table'), ('行数估计', 'rows'), ('平均行长', 'avg_row_length'), ('数据', 'data_bytes'),
+               ('索引', 'index_bytes'), ('合计', 'total_bytes'), ('空闲', 'free_bytes'), ('碎片率', 'fragmentation'),
+               ('索引数', 'indexes')]
+
+    def __init__(self, conn, database, scheduler, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self.database = database
+        self.scheduler = scheduler
+        self.job = None
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.info_label = QLabel('')
+        self.refresh_btn = QPushButton('重新统计')
+        top.addWidget(self.info_label)
+        top.addStretch()
+        top.addWidget(self.refresh_btn)
+        layout.addLayout(top)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for title, _ in self.COLUMNS])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+        self.summary_label = QLabel('')
+        layout.addWidget(self.summary_label)
+        self.refresh_btn.clicked.connect(self.refresh)
+        stats = cached_storage_stats(conn, database)
+        if stats is not None:
+            self.show_stats(stats)
+        else:
+            self.refresh()
+
+    def refresh(self):
+        if self.job is not None and self.job.is_active():
+            return
+        self.refresh_btn.setEnabled(False)
+        self.info_label.setText('正在统计...')
+        self.job = self.scheduler.submit(read_storage_stats, self.conn, self.database, title='存储占用统计',
+                                         priority=PRIORITY_INTERACTIVE, conn=self.conn)
+        self.job.finished.connect(self.on_loaded)
+
+    def on_loaded(self, stats, error):
+        self.refresh_btn.setEnabled(True)
+        if error is not None:
+            self.info_label.setText(f'统计失败: {error}')
+            return
+        self.show_stats(stats)
+
+    def show_stats(self, stats):
+        tables = stats['tables']
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(tables))
+        for row, info in enumerate(tables):
+            for col, (_, key) in enumerate(self.COLUMNS):
+                value = info[key]
+                if key == 'table':
+                    item = QTableWidgetItem(value)
+                else:
+                    if value is None:
+                        text = ''
+                    elif key.endswith('_bytes'):
+                        text = format_bytes(value)
+                    elif key == 'avg_row_length':
+                        text = f'{value:.0f} B'
+                    elif key == 'fragmentation':
+                        text = f'{value * 100:.1f}%'
+                    else:
+                        text = str(value)
+                    item = _SortItem(text)
+                    item.setData(Qt.UserRole, value)
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+        self.table.setSortingEnabled(True)
+        computed = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stats['computed_at']))
+        self.info_label.setText(f"共 {len(tables)} 张表，统计于 {computed}（耗时 {stats['elapsed_ms']:.0f} ms）")
+        total_data = sum(t['data_bytes'] for t in tables)
+        total_index = sum(t['index_bytes'] for t in tables)
+        summary = f'数据合计 {format_bytes(total_data)}，索引合计 {format_bytes(total_index)}'
+        extra = stats['summary']
+        if 'free_pages' in extra:
+            summary += (f"；文件 {format_bytes(extra['file_bytes'])}，空闲页 {extra['free_pages']} 个"
+                        f"（{format_bytes(extra['free_bytes'])}，VACUUM 可回收）")
+        self.summary_label.setText(summary)
@@ -1,12 +1,30 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLabel, QSpinBox, QLineEdit, QMessageBox
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLabel, QSpinBox, QLineEdit, QMessageBox, QComboBox, QSplitter
 from PyQt5.QtCore import Qt
-from .thread_worker import WorkerThread
+from .job_scheduler import PRIORITY_INTERACTIVE
+from .memory_governor import CELL_BYTES
+from .cell_detail import CellDetailPane, preview_text
+from .storage_view import format_bytes
+from db.result_buffer import ColumnarResult
+from db.query_builder import FILTER_OPERATORS, NO_VALUE_OPERATORS
+from db.large_values import size_header, is_truncated, PREFIX_LENGTH
 
 class TableDataViewer(QWidget):
-    def __init__(self, headers, fetch_page_callback, parent=None, db_client=None, table_name=None, pk_fields=None):
+    def __init__(self, headers, fetch_page_callback, parent=None, db_client=None, table_name=None, pk_fields=None,
+                 indexed_columns=None, scheduler=None, conn=None, large_columns=None):
         super().__init__(parent)
+        self.scheduler = scheduler  # 分页查询作为交互任务提交到调度器
+        self.conn = conn
+        self.job = None
         self.headers = headers
-        self.fetch_page_callback = fetch_page_callback  # (page, page_size) -> (rows, total)
+        self.fetch_page_callback = fetch_page_callback  # (page, page_size, filters, order_by) -> (rows, total)
+        self.filters = []  # [(列名, 运算符, 值)]，在服务器端作为 WHERE 条件
+        self.order_by = None  # (列名, 'ASC'/'DESC')
+        # 最近一次加载成功的 (筛选, 排序, 页码)；服务器拒绝新条件时（如类型不匹配）恢复到这里
+        self._loaded_query = ([], None, 1)
+        self._loading_query = None
+        self.indexed_columns = indexed_columns  # 索引首列集合，None 表示未知
+        # 大字段 {列名: 类型}：每页只取前缀，完整长度附在每行末尾，完整值在详情区按需读取
+        self.large_columns = {c: k for c, k in (large_columns or {}).items() if c in headers}
         self.page = 1
         self.page_size = 20
         self.total = 0
@@ -17,6 +35,7 @@ class TableDataViewer(QWidget):
         self._changes = {}  # {(row, col): new_value}
         self._added_rows = []  # 新增行索引
         self._deleted_rows = set()  # 删除行索引
+        self.hibernated = False  # 由内存预算释放了当前页数据，切换回来时重新加载
         self.init_ui()
         self.load_page()
 
@@ -34,10 +53,42 @@ class TableDataViewer(QWidget):
         editlayout.addWidget(self.rollback_btn)
         editlayout.addStretch()
         layout.addLayout(editlayout)
+        # 筛选条件区
+        filterlayout = QHBoxLayout()
+        self.filter_col_box = QComboBox()
+        self.filter_col_box.addItems(self.headers)
+        self.filter_op_box = QComboBox()
+        self.filter_op_box.addItems(FILTER_OPERATORS)
+        self.filter_value_edit = QLineEdit()
+        self.filter_value_edit.setPlaceholderText('值（LIKE 可用 %，IN 用逗号分隔）')
+        self.add_filter_btn = QPushButton('添加条件')
+        self.clear_filter_btn = QPushButton('清除条件')
+        filterlayout.addWidget(QLabel('筛选'))
+        filterlayout.addWidget(self.filter_col_box)
+        filterlayout.addWidget(self.filter_op_box)
+        filterlayout.addWidget(self.filter_value_edit)
+        filterlayout.addWidget(self.add_filter_btn)
+        filterlayout.addWidget(self.clear_filter_btn)
+        layout.addLayout(filterlayout)
+        self.filter_label = QLabel('')
+        self.filter_label.setWordWrap(True)
+        self.filter_label.hide()
+        layout.addWidget(self.filter_label)
         # 表格
         self.table = QTableWidget()
         self.table.setEditTriggers(QTableWidget.AllEditTriggers)
-        layout.addWidget(self.table)
+        # 点击表头在服务器端排序：升序 → 降序 → 取消
+        header = self.table.horizontalHeader()
+        header.setSectionsClickable(True)
+        header.sectionClicked.connect(self.on_header_clicked)
+        # 大字段和二进制值在表格中只显示预览，选中后在下方详情区查看
+        self.detail = CellDetailPane(self.conn, self.table_name, self.scheduler)
+        self.detail.hide()
+        splitter = QSplitter(Qt.Vertical)
+        splitter.addWidget(self.table)
+        splitter.addWidget(self.detail)
+        splitter.setSizes([400, 200])
+        layout.addWidget(splitter)
         # 分页控件
         pagelayout = QHBoxLayout()
         self.prev_btn = QPushButton('上一页')
@@ -72,22 +123,93 @@ class TableDataViewer(QWidget):
         self.commit_btn.clicked.connect(self.commit_changes)
         self.rollback_btn.clicked.connect(self.rollback_changes)
         self.table.itemChanged.connect(self.on_item_changed)
+        self.table.currentCellChanged.connect(self.on_current_cell_changed)
+        self.table.cellDoubleClicked.connect(self.on_cell_double_clicked)
+        self.add_filter_btn.clicked.connect(self.add_filter)
+        self.filter_value_edit.returnPressed.connect(self.add_filter)
+        self.clear_filter_btn.clicked.connect(self.clear_filters)
+        self.filter_op_box.currentTextChanged.connect(
+            lambda op: self.filter_value_edit.setEnabled(op not in NO_VALUE_OPERATORS))
+
+    def add_filter(self):
+        column = self.filter_col_box.currentText()
+        op = self.filter_op_box.currentText()
+        value = None if op in NO_VALUE_OPERATORS else self.filter_value_edit.text()
+        if not column:
+            return
+        if op == 'IN' and not value.strip():
+            QMessageBox.warning(self, '筛选', 'IN 条件至少需要一个值')
+            return
+        self.filters.append((column, op, value))
+        self.filter_value_edit.clear()
+        self.apply_query()
+
+    def clear_filters(self):
+        if not self.filters:
+            return
+        self.filters = []
+        self.apply_query()
+
+    def on_header_clicked(self, col):
+        column = self.headers[col]
+        if not self.order_by or self.order_by[0] != column:
+            self.order_by = (column, 'ASC')
+        elif self.order_by[1] == 'ASC':
+            self.order_by = (column, 'DESC')
+        else:
+            self.order_by = None
+        self.apply_query()
+
+    def apply_query(self):
+        # 条件变化后从第一页重新加载
+        self.update_filter_label()
+        self.page = 1
+        self.load_page()
+
+    def update_filter_label(self):
+        parts = []
+        for column, op, value in self.filters:
+            parts.append(f'{column} {op}' if op in NO_VALUE_OPERATORS else f'{column} {op} {value}')
+        text = ''
+        if parts:
+            text = '条件: ' + ' AND '.join(parts)
+        if self.order_by:
+            column, direction = self.order_by
+            text += ('    ' if text else '') + f'排序: {column} {direction}'
+            if self.indexed_columns is not None and column not in self.indexed_columns:
+                text += f'  （警告：[{column}] 没有索引，大表排序可能很慢）'
+        self.filter_label.setText(text)
+        self.filter_label.setVisible(bool(text))
 
     def load_page(self):
+        # 上一次加载未完成时（如连续点击表头），等它结束后再按最新条件加载
+        if self.job is not None and self.job.is_active():
+            self._reload_pending = True
+            return
+        self._reload_pending = False
         self.refresh_btn.setEnabled(False)
         self.table.setDisabled(True)
+        filters, order_by = list(self.filters), self.order_by
+        self._loading_query = (filters, order_by, self.page)
         def fetch():
-            return self.fetch_page_callback(self.page, self.page_size)
-        self.thread = WorkerThread(fetch)
-        self.thread.finished.connect(self.on_page_loaded)
-        self.thread.start()
+            return self.fetch_page_callback(self.page, self.page_size, filters, order_by)
+        self.job = self.scheduler.submit(fetch, title=f'分页[{self.table_name}] 第{self.page}页',
+                                         priority=PRIORITY_INTERACTIVE, conn=self.conn)
+        self.job.finished.connect(self.on_page_loaded)
 
     def on_page_loaded(self, result, error):
+        if self._reload_pending:
+            self.load_page()
+            return
         self.refresh_btn.setEnabled(True)
         self.table.setDisabled(False)
         if error:
+            filters, order_by, page = self._loaded_query
+            self.filters, self.order_by, self.page = list(filters), order_by, page
+            self.update_filter_label()
             QMessageBox.warning(self, '加载失败', str(error))
             return
+        self._loaded_query = self._loading_query
         rows, total = result
         self.total = total
         self.table.blockSignals(True)
@@ -95,20 +217,74 @@ class TableDataViewer(QWidget):
         self.table.setColumnCount(len(self.headers))
         self.table.setRowCount(len(rows))
         self.table.setHorizontalHeaderLabels(self.headers)
-        self._original_data = [list(row) for row in rows]
+        header = self.table.horizontalHeader()
+        if self.order_by:
+            header.setSortIndicatorShown(True)
+            header.setSortIndicator(self.headers.index(self.order_by[0]),
+                                    Qt.AscendingOrder if self.order_by[1] == 'ASC' else Qt.DescendingOrder)
+        else:
+            header.setSortIndicatorShown(False)
+        if not isinstance(rows, ColumnarResult):
+            rows = ColumnarResult.from_rows(self.headers + [size_header(c) for c in self.large_columns], rows)
+        self._original_data = rows
         self._changes = {}
         self._added_rows = []
         self._deleted_rows = set()
-        for row_idx, row in enumerate(rows):
-            for col_idx, value in enumerate(row):
-                item = QTableWidgetItem(str(value))
-                self.table.setItem(row_idx, col_idx, item)
+        for row_idx in range(len(rows)):
+            for col_idx in range(len(self.headers)):
+                self.table.setItem(row_idx, col_idx, self.make_item(row_idx, col_idx))
         self.table.blockSignals(False)
+        self.detail.clear()
+        self.detail.hide()
         total_pages = max(1, (self.total + self.page_size - 1) // self.page_size)
         self.page_label.setText(f'第 {self.page} / {total_pages} 页, 共 {self.total} 条')
         self.prev_btn.setEnabled(self.page > 1)
         self.next_btn.setEnabled(self.page < total_pages)
 
+    def cell_value(self, row, col):
+        """
+        :return: (已加载的值, 值的字节数, 是否被截断)；不是大字段时字节数为 None
+        """
+        value = self._original_data.value(row, col)
+        column = self.headers[col]
+        if column not in self.large_columns:
+            return value, None, False
+        position = len(self.headers) + list(self.large_columns).index(column)
+        size = self._original_data.value(row, position)
+        if is_truncated(value):
+            return value[:PREFIX_LENGTH], size, True
+        return value, size, False
+
+    def make_item(self, row, col):
+        value, size, truncated = self.cell_value(row, col)
+        if truncated or isinstance(value, (bytes, bytearray, memoryview)):
+            # 只加载了前缀或是二进制值时不能在表格中直接编辑，否则提交时会写回不完整/错误的值
+            item = QTableWidgetItem(preview_text(value))
+            item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            size = size if size is not None else len(value)
+            item.setToolTip(f'共 {format_bytes(size)}' + ('，双击在详情区读取完整内容' if truncated else ''))
+            return item
+        return QTableWidgetItem(str(value))
+
+    def on_current_cell_changed(self, row, col, *args):
+        if row < 0 or col < 0 or row >= len(self._original_data) or row in self._added_rows:
+            self.detail.hide()
+            return
+        column = self.headers[col]
+        value, size, truncated = self.cell_value(row, col)
+        if column not in self.large_columns and not isinstance(value, (bytes, bytearray, memoryview)):
+            self.detail.hide()
+            return
+        key = None
+        if self.pk_fields and all(pk in self.headers for pk in self.pk_fields):
+            key = {pk: self._original_data.value(row, self.headers.index(pk)) for pk in self.pk_fields}
+        self.detail.show_value(column, self.large_columns.get(column), value, size, not truncated, key)
+        self.detail.show()
+
+    def on_cell_double_clicked(self, row, col):
+        if not self.detail.isHidden() and self.detail.load_btn.isEnabled():
+            self.detail.load_full()
+
     def add_row(self):
         self.table.blockSignals(True)
         row_idx = self.table.rowCount()
@@ -130,7 +306,8 @@ class TableDataViewer(QWidget):
     def on_item_changed(self, item):
         row, col = item.row(), item.column()
         if row < len(self._original_data):
-            old = str(self._original_data[row][col]) if self._original_data[row][col] is not None else ''
+            value = self._original_data.value(row, col)
+            old = str(value) if value is not None else ''
             if item.text() != old:
                 self._changes[(row, col)] = item.text()
             elif (row, col) in self._changes:
@@ -141,32 +318,43 @@ class TableDataViewer(QWidget):
         if not self.db_client or not self.table_name or not self.pk_fields:
             QMessageBox.warning(self, '提交失败', '缺少数据库信息，无法提交')
             return
-        # 新增
-        for row_idx in self._added_rows:
-            values = [self.table.item(row_idx, col).text() for col in range(self.table.columnCount())]
-            try:
-                self.db_client.insert_row(self.table_name, self.headers, values)
-            except Exception as e:
-                QMessageBox.critical(self, '插入失败', f'第{row_idx+1}行: {e}')
-                return
-        # 修改
-        for (row, col), new_value in self._changes.items():
-            pk_dict = {pk: self._original_data[row][self.headers.index(pk)] for pk in self.pk_fields}
-            try:
-                self.db_client.update_row(self.table_name, self.headers[col], new_value, pk_dict)
-            except Exception as e:
-                QMessageBox.critical(self, '修改失败', f'第{row+1}行: {e}')
+        inserts = [(row_idx, [self.table.item(row_idx, col).text() for col in range(self.table.columnCount())])
+                   for row_idx in self._added_rows]
+        updates = [(row, self.headers[col], new_value, self.pk_of(row))
+                   for (row, col), new_value in self._changes.items()]
+        deletes = [(row_idx, self.pk_of(row_idx)) for row_idx in self._deleted_rows]
+        client, table, headers = self.db_client, self.table_name, self.headers
+
+        def write():
+            # SQLite 的全部修改在写线程的一个事务中提交；其他驱动逐行执行
+            apply = getattr(client, 'apply_changes', None)
+            if apply is not None:
+                apply(table, headers, inserts, updates, deletes)
                 return
-        # 删除
-        for row_idx in self._deleted_rows:
-            pk_dict = {pk: self._original_data[row_idx][self.headers.index(pk)] for pk in self.pk_fields}
-            try:
-                self.db_client.delete_row(self.table_name, pk_dict)
-            except Exception as e:
-                QMessageBox.critical(self, '删除失败', f'第{row_idx+1}行: {e}')
+            steps = [(f'新增第{row + 1}行', client.insert_row, (table, headers, values)) for row, values in inserts]
+            steps += [(f'修改第{row + 1}行', client.update_row, (table, col, value, pk)) for row, col, value, pk in updates]
+            steps += [(f'删除第{row + 1}行', client.delete_row, (table, pk)) for row, pk in deletes]
+            for label, func, args in steps:
+                try:
+                    func(*args)
+                except Exception as e:
+                    raise RuntimeError(f'{label}: {e}') from e
+
+        def on_finished(result, error):
+            self.commit_btn.setEnabled(True)
+            if error is not None:
+                QMessageBox.critical(self, '提交失败', str(error))
                 return
-        QMessageBox.information(self, '提交成功', '所有更改已提交')
-        self.load_page()
+            QMessageBox.information(self, '提交成功', '所有更改已提交')
+            self.load_page()
+
+        self.commit_btn.setEnabled(False)
+        job = self.scheduler.submit(write, title=f'提交修改[{self.table_name}]', priority=PRIORITY_INTERACTIVE,
+                                    conn=self.conn)
+        job.finished.connect(on_finished)
+
+    def pk_of(self, row):
+        return {pk: self._original_data.value(row, self.headers.index(pk)) for pk in self.pk_fields}
 
     def rollback_changes(self):
         self.load_page()
@@ -196,3 +384,25 @@ class TableDataViewer(QWidget):
                 self.load_page()
         except Exception:
             pass
+
+    def memory_bytes(self):
+        size = self._original_data.nbytes if isinstance(self._original_data, ColumnarResult) else 0
+        return size + self.table.rowCount() * self.table.columnCount() * CELL_BYTES + self.detail.memory_bytes()
+
+    def hibernate(self):
+        # 有未提交的修改或正在加载时不休眠；页码、筛选和排序条件保留
+        if self._changes or self._added_rows or self._deleted_rows or \
+                (self.job is not None and self.job.is_active()):
+            return
+        self.table.blockSignals(True)
+        self.table.setRowCount(0)
+        self.table.blockSignals(False)
+        self.detail.clear()
+        self.detail.hide()
+        self._original_data = []
+        self.hibernated = True
+        self.page_label.setText(f'第 {self.page} 页（已休眠，切换回来时重新加载）')
+
+    def rehydrate(self):
+        self.hibernated = False
+        self.load_page()
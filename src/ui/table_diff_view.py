@@ -0,0 +1,94 @@
+from PyQt5.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QComboBox, QLineEdit,
+                             QDialogButtonBox, QMessageBox, QPlainTextEdit, QPushButton, QFileDialog)
+from db.client_factory import driver_of, supports, CAP_BULK_TOOLS, CAP_DATABASES
+
+
+class TableDiffDialog(QDialog):
+    def __init__(self, table_name, connections, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f'数据对比 - {table_name}')
+        self.resize(460, 220)
+        layout = QVBoxLayout(self)
+        conn_layout = QHBoxLayout()
+        conn_layout.addWidget(QLabel('目标连接:'))
+        self.conn_combo = QComboBox()
+        for idx, conn in enumerate(connections):
+            if not supports(conn, CAP_BULK_TOOLS):
+                continue
+            label = f"[{conn['type']}] {driver_of(conn).label(conn)}"
+            if supports(conn, CAP_DATABASES):
+                label += f"/{conn['database']}"
+            self.conn_combo.addItem(label, idx)
+        conn_layout.addWidget(self.conn_combo)
+        layout.addLayout(conn_layout)
+        db_layout = QHBoxLayout()
+        db_layout.addWidget(QLabel('目标数据库(MySQL):'))
+        self.db_edit = QLineEdit()
+        self.db_edit.setPlaceholderText('默认使用连接配置中的库')
+        db_layout.addWidget(self.db_edit)
+        layout.addLayout(db_layout)
+        table_layout = QHBoxLayout()
+        table_layout.addWidget(QLabel('目标表名:'))
+        self.table_edit = QLineEdit(table_name)
+        table_layout.addWidget(self.table_edit)
+        layout.addLayout(table_layout)
+        opt_layout = QHBoxLayout()
+        opt_layout.addWidget(QLabel('初始分块数:'))
+        self.chunks_box = QSpinBox()
+        self.chunks_box.setRange(1, 4096)
+        self.chunks_box.setValue(64)
+        opt_layout.addWidget(self.chunks_box)
+        opt_layout.addWidget(QLabel('并行线程数:'))
+        self.workers_box = QSpinBox()
+        self.workers_box.setRange(1, 32)
+        self.workers_box.setValue(4)
+        opt_layout.addWidget(self.workers_box)
+        layout.addLayout(opt_layout)
+        btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        btns.accepted.connect(self.accept)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def accept(self):
+        if self.conn_combo.count() == 0 or not self.table_edit.text().strip():
+            QMessageBox.warning(self, '错误', '请选择目标连接并填写目标表名')
+            return
+        super().accept()
+
+    def get_options(self):
+        return {
+            'conn_idx': self.conn_combo.currentData(),
+            'dst_database': self.db_edit.text() or None,
+            'dst_table': self.table_edit.text().strip(),
+            'chunks': self.chunks_box.value(),
+            'workers': self.workers_box.value(),
+        }
+
+
+class TableDiffResultWidget(QWidget):
+    def __init__(self, summary, script, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        label = QLabel(summary)
+        label.setWordWrap(True)
+        layout.addWidget(label)
+        layout.addWidget(QLabel('同步脚本（在目标库执行后与源表一致）:'))
+        self.script_edit = QPlainTextEdit(script)
+        self.script_edit.setReadOnly(True)
+        layout.addWidget(self.script_edit)
+        btn_layout = QHBoxLayout()
+        save_btn = QPushButton('保存脚本')
+        save_btn.clicked.connect(self.save_script)
+        btn_layout.addWidget(save_btn)
+        btn_layout.addStretch()
+        layout.addLayout(btn_layout)
+
+    def save_script(self):
+        path, _ = QFileDialog.getSaveFileName(self, '保存同步脚本', 'sync.sql', 'SQL Files (*.sql)')
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.script_edit.toPlainText())
+        except Exception as e:
+            QMessageBox.warning(self, '保存失败', str(e))
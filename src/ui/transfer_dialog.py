@@ -0,0 +1,63 @@
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QComboBox, QLineEdit, QCheckBox, QDialogButtonBox, QMessageBox
+from db.client_factory import driver_of, supports, CAP_BULK_TOOLS, CAP_DATABASES
+
+
+class TransferDialog(QDialog):
+    def __init__(self, table_name, connections, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f'传输表 - {table_name}')
+        self.resize(460, 220)
+        layout = QVBoxLayout(self)
+        conn_layout = QHBoxLayout()
+        conn_layout.addWidget(QLabel('目标连接:'))
+        self.conn_combo = QComboBox()
+        for idx, conn in enumerate(connections):
+            if not supports(conn, CAP_BULK_TOOLS):
+                continue
+            label = f"[{conn['type']}] {driver_of(conn).label(conn)}"
+            if supports(conn, CAP_DATABASES):
+                label += f"/{conn['database']}"
+            self.conn_combo.addItem(label, idx)
+        conn_layout.addWidget(self.conn_combo)
+        layout.addLayout(conn_layout)
+        db_layout = QHBoxLayout()
+        db_layout.addWidget(QLabel('目标数据库(MySQL):'))
+        self.db_edit = QLineEdit()
+        self.db_edit.setPlaceholderText('默认使用连接配置中的库')
+        db_layout.addWidget(self.db_edit)
+        layout.addLayout(db_layout)
+        table_layout = QHBoxLayout()
+        table_layout.addWidget(QLabel('目标表名:'))
+        self.table_edit = QLineEdit(table_name)
+        table_layout.addWidget(self.table_edit)
+        layout.addLayout(table_layout)
+        opt_layout = QHBoxLayout()
+        self.create_check = QCheckBox('自动建表（类型自动映射）')
+        self.create_check.setChecked(True)
+        opt_layout.addWidget(self.create_check)
+        opt_layout.addWidget(QLabel('批大小:'))
+        self.batch_box = QSpinBox()
+        self.batch_box.setRange(100, 100000)
+        self.batch_box.setSingleStep(500)
+        self.batch_box.setValue(2000)
+        opt_layout.addWidget(self.batch_box)
+        layout.addLayout(opt_layout)
+        btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        btns.accepted.connect(self.accept)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def accept(self):
+        if self.conn_combo.count() == 0 or not self.table_edit.text().strip():
+            QMessageBox.warning(self, '错误', '请选择目标连接并填写目标表名')
+            return
+        super().accept()
+
+    def get_options(self):
+        return {
+            'conn_idx': self.conn_combo.currentData(),
+            'dst_database': self.db_edit.text() or None,
+            'dst_table': self.table_edit.text().strip(),
+            'create_table': self.create_check.isChecked(),
+            'batch_size': self.batch_box.value(),
+        }
@@ -4,14 +4,28 @@ from matplotlib.figure import Figure
 import numpy as np
 import matplotlib
 from PyQt5.QtGui import QIcon
+from db.result_buffer import ColumnarResult
+from .job_scheduler import PRIORITY_INTERACTIVE
 
 class VisualizeDialog(QDialog):
-    def __init__(self, table_name, fields, data, parent=None):
+    def __init__(self, table_name, fields, data, parent=None, loader=None, scheduler=None, conn=None):
+        """
+        :param loader: 重新读取数据的函数，提供时标签页可以休眠（释放数据），切换回来时在调度器中重新读取
+        """
         super().__init__(parent)
         self.setWindowIcon(QIcon('favicon.ico'))
         self.setWindowTitle(f'可视化 - {table_name}')
         self.resize(600, 500)
+        self.table_name = table_name
         self.fields = fields
+        self.loader = loader
+        self.scheduler = scheduler
+        self.conn = conn
+        self.job = None
+        self.hibernated = False
+        # 统一为列式结果，绘图时直接拿到NumPy数组
+        if not isinstance(data, ColumnarResult):
+            data = ColumnarResult.from_rows(fields, data)
         self.data = data
         self.init_ui()
 
@@ -49,10 +63,15 @@ class VisualizeDialog(QDialog):
         matplotlib.rcParams['axes.unicode_minus'] = False    # 正确显示负号
         field = self.field_combo.currentText()
         chart_type = self.chart_combo.currentText()
-        # 统计该字段的分布
-        values = [row[self.fields.index(field)] for row in self.data]
+        # 统计该字段的分布（忽略NULL）
+        values, nulls = self.data.column_array(self.fields.index(field))
+        values = values[~nulls]
+        if values.dtype == object:
+            values = values.astype(str)
         # 简单计数
         unique, counts = np.unique(values, return_counts=True)
+        if unique.dtype.kind == 'M':
+            unique = unique.astype(str)
         self.figure.clear()
         ax = self.figure.add_subplot(111)
         if chart_type == '柱状图':
@@ -66,6 +85,34 @@ class VisualizeDialog(QDialog):
         ax.set_title(f'{field} 分布')
         self.canvas.draw()
 
+    def memory_bytes(self):
+        return self.data.nbytes if self.data is not None else 0
+
+    def hibernate(self):
+        # 只释放数据，字段和图表类型的选择以及已绘制的图表保留
+        if self.loader is None or self.scheduler is None or self.data is None:
+            return
+        self.data = None
+        self.hibernated = True
+        self.plot_btn.setEnabled(False)
+
+    def rehydrate(self):
+        if self.job is not None and self.job.is_active():
+            return
+        self.plot_btn.setText('加载中...')
+        self.job = self.scheduler.submit(self.loader, conn=self.conn, title=f'可视化[{self.table_name}]',
+                                         priority=PRIORITY_INTERACTIVE)
+        self.job.finished.connect(self.on_reloaded)
+
+    def on_reloaded(self, data, error):
+        self.plot_btn.setText('绘制')
+        if error is not None:
+            QMessageBox.warning(self, '重新加载失败', str(error))
+            return
+        self.data = data
+        self.hibernated = False
+        self.plot_btn.setEnabled(True)
+
     def export_image(self):
         path, _ = QFileDialog.getSaveFileName(self, '导出图片', '', 'PNG Image (*.png)')
         if not path:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 测试直接导入 src 下的模块（与程序运行时的导入方式一致：from db.xxx import ...）
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -0,0 +1,52 @@
+import sqlite3
+import pytest
+
+import db.index_advisor as index_advisor
+from db.index_advisor import measure
+
+
+@pytest.fixture
+def sqlite_conn(tmp_path):
+    path = str(tmp_path / 'advisor.db')
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)')
+    db.executemany('INSERT INTO t (name) VALUES (?)', [('a1',), ('a2',), ('b1',)])
+    db.commit()
+    db.close()
+    return {'type': 'SQLite', 'db_path': path}
+
+
+def test_measure_sqlite(sqlite_conn):
+    timings = measure(sqlite_conn, None, [("SELECT * FROM t WHERE name LIKE 'a%'", None),
+                                          ('SELECT * FROM t WHERE id = ?', [1]),
+                                          ('DELETE FROM t', None)], repeat=2)
+    assert timings[0] is not None and timings[1] is not None
+    assert timings[2] is None  # 只重新执行查询
+
+
+def test_measure_without_params_skips_format(monkeypatch):
+    # pymysql 只有在参数不为 None 时才做 % 格式化，语句中的 % 字面量不能被当作占位符
+    pymysql = pytest.importorskip('pymysql')
+    executed = []
+
+    class Cursor(pymysql.cursors.Cursor):
+        def execute(self, query, args=None):
+            executed.append(self.mogrify(query, args))
+
+        def fetchmany(self, size=None):
+            return []
+
+        def close(self):
+            pass
+
+    class Client:
+        def stream_cursor(self):
+            return Cursor(object())
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(index_advisor, 'create_client', lambda conn, database=None: Client())
+    sql = "SELECT DATE_FORMAT(d, '%Y') FROM t WHERE name LIKE 'a%'"
+    measure({'type': 'MySQL'}, 'db', [(sql, None), (sql, ())], repeat=1)
+    assert executed == [sql, sql]
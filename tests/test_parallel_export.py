@@ -0,0 +1,15 @@
+import pytest
+
+from db.parallel_export import is_integer_type
+
+
+@pytest.mark.parametrize('type_name', ['int(11)', 'int(10) unsigned', 'BIGINT', 'bigint unsigned', 'integer',
+                                       'INTEGER', 'int4', 'smallint', 'bigserial', 'UNSIGNED BIG INT'])
+def test_integer_types(type_name):
+    assert is_integer_type(type_name)
+
+
+@pytest.mark.parametrize('type_name', ['point', 'multipoint', 'interval', 'varchar(10)', 'INTERVAL DAY', 'text',
+                                       '', None])
+def test_non_integer_types(type_name):
+    assert not is_integer_type(type_name)
@@ -0,0 +1,189 @@
+# PostgresClient 测试，需要可连接的 PostgreSQL 服务器，连接不上时跳过
+# 连接参数取自环境变量 PGHOST / PGPORT / PGUSER / PGPASSWORD / PGDATABASE
+import io
+import os
+import uuid
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+
+from db.postgres_client import PostgresClient, StreamCursor, quote_pg
+
+ROWS = [(1, 'a', 1.5), (2, 'b,"c"', None), (3, '中文\n换行', 3.0)]
+
+
+def make_client():
+    return PostgresClient(os.environ.get('PGHOST', 'localhost'), int(os.environ.get('PGPORT', 5432)),
+                          os.environ.get('PGUSER', 'postgres'), os.environ.get('PGPASSWORD', ''),
+                          os.environ.get('PGDATABASE', 'postgres'), connect_timeout=3)
+
+
+@pytest.fixture(scope='module')
+def server():
+    client = make_client()
+    try:
+        client.connect()
+    except psycopg2.Error as e:
+        pytest.skip(f'PostgreSQL 不可用: {e}')
+    client.close()
+
+
+@pytest.fixture
+def table(server):
+    name = f'dbtool_test_{uuid.uuid4().hex[:8]}'
+    admin = make_client()
+    conn = admin.connect()
+    with conn.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {quote_pg(name)} (id integer PRIMARY KEY, name text NOT NULL, '
+                       f'v double precision DEFAULT 0)')
+        cursor.execute(f"COMMENT ON COLUMN {quote_pg(name)}.name IS '名称'")
+        cursor.executemany(f'INSERT INTO {quote_pg(name)} VALUES (%s, %s, %s)', ROWS)
+    conn.commit()
+    yield name
+    conn = admin.connect()
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {quote_pg(name)}')
+    conn.commit()
+    admin.close()
+
+
+def select_all(name):
+    client = make_client()
+    try:
+        with client.connect().cursor() as cursor:
+            cursor.execute(f'SELECT id, name, v FROM {quote_pg(name)} ORDER BY id')
+            return cursor.fetchall()
+    finally:
+        client.close()
+
+
+def test_get_table_schema(table):
+    schema = make_client().get_table_schema(table)
+    assert [col['Field'] for col in schema] == ['id', 'name', 'v']
+    by_name = {col['Field']: col for col in schema}
+    assert by_name['id']['Key'] == 'PRI'
+    assert by_name['id']['Null'] == 'NO'
+    assert by_name['name']['Type'] == 'text'
+    assert by_name['name']['Comment'] == '名称'
+    assert by_name['v']['Null'] == 'YES'
+    assert by_name['v']['Default'] == '0'
+    assert make_client().get_primary_keys(table) == ['id']
+
+
+def test_get_table_schema_missing_table(server):
+    assert make_client().get_table_schema('dbtool_no_such_table') == []
+
+
+def test_stream_cursor_select(table):
+    client = make_client()
+    try:
+        cursor = client.stream_cursor()
+        assert isinstance(cursor, StreamCursor)
+        cursor.execute(f'SELECT id, name FROM {quote_pg(table)} WHERE id >= %s ORDER BY id', (1,))
+        # 命名游标 execute 后已预取一批，列名立即可用
+        assert [d[0] for d in cursor.description] == ['id', 'name']
+        assert cursor.fetchone() == (1, 'a')
+        assert cursor.fetchmany(1) == [(2, 'b,"c"')]
+        assert cursor.fetchall() == [(3, '中文\n换行')]
+        assert cursor.fetchone() is None
+        cursor.close()
+    finally:
+        client.close()
+
+
+def test_stream_cursor_iterates_across_batches(table, monkeypatch):
+    monkeypatch.setattr('db.postgres_client.STREAM_ITERSIZE', 2)
+    client = make_client()
+    try:
+        cursor = client.stream_cursor()
+        cursor.execute(f'SELECT id FROM {quote_pg(table)} ORDER BY id')
+        assert [row[0] for row in cursor] == [1, 2, 3]
+        cursor.close()
+    finally:
+        client.close()
+
+
+def test_stream_cursor_non_select(table):
+    client = make_client()
+    try:
+        cursor = client.stream_cursor()
+        cursor.execute(f'UPDATE {quote_pg(table)} SET v = v + 1 WHERE v IS NOT NULL')
+        # 非查询语句走普通游标：没有结果集，rowcount 为受影响行数
+        assert cursor.description is None
+        assert cursor.rowcount == 2
+        cursor.close()
+        client.conn.commit()
+    finally:
+        client.close()
+    assert [row[2] for row in select_all(table)] == [2.5, None, 4.0]
+
+
+def test_copy_round_trip(table):
+    client = make_client()
+    buf = io.BytesIO()
+    try:
+        assert client.copy_to(table, buf, header=True) == len(ROWS)
+    finally:
+        client.close()
+    data = buf.getvalue()
+    assert data.decode('utf-8').splitlines()[0] == 'id,name,v'
+
+    admin = make_client()
+    conn = admin.connect()
+    with conn.cursor() as cursor:
+        cursor.execute(f'TRUNCATE {quote_pg(table)}')
+    conn.commit()
+    admin.close()
+
+    client = make_client()
+    try:
+        assert client.copy_from(table, io.BytesIO(data), ['id', 'name', 'v'], header=True) == len(ROWS)
+    finally:
+        client.close()
+    assert select_all(table) == ROWS
+
+
+def test_copy_from_rolls_back_on_error(table):
+    client = make_client()
+    bad = io.BytesIO('id,name,v\n10,x,1\n1,duplicate,2\n'.encode('utf-8'))
+    try:
+        with pytest.raises(psycopg2.Error):
+            client.copy_from(table, bad, ['id', 'name', 'v'])
+    finally:
+        client.close()
+    # 主键冲突导致整个 COPY 回滚，已读入的第一行也不会留下
+    assert select_all(table) == ROWS
+
+
+def test_estimate_rows(table):
+    client = make_client()
+    try:
+        conn = client.connect()
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f'ANALYZE {quote_pg(table)}')
+        conn.autocommit = False
+        assert client.estimate_rows(table) == len(ROWS)
+        assert client.estimate_rows('dbtool_no_such_table') is None
+    finally:
+        client.close()
+
+
+def test_crud(table):
+    client = make_client()
+    client.insert_row(table, ['id', 'name', 'v'], [4, 'd', 4.5])
+    assert client.conn is None  # 每个写操作使用独立连接，结束后关闭
+    client.update_row(table, 'name', 'dd', {'id': 4})
+    client.update_row(table, 'v', None, {'id': 1})
+    assert select_all(table) == [(1, 'a', None)] + ROWS[1:] + [(4, 'dd', 4.5)]
+    client.delete_row(table, {'id': 4})
+    client.delete_row(table, {'id': 2})
+    assert [row[0] for row in select_all(table)] == [1, 3]
+
+
+def test_insert_row_duplicate_key_raises(table):
+    client = make_client()
+    with pytest.raises(psycopg2.IntegrityError):
+        client.insert_row(table, ['id', 'name'], [1, 'dup'])
+    assert client.conn is None
+    assert select_all(table) == ROWS
@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+from db.query_history import QueryHistory
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = QueryHistory(str(tmp_path / 'history.db'))
+    yield history
+    history.close()
+
+
+def test_record_and_search(history):
+    history.record('SELECT * FROM users', connection='local')
+    history.record('DELETE FROM orders', connection='local', status='error', error='locked')
+    assert history.flush()
+    assert [e['sql'] for e in history.search('users')] == ['SELECT * FROM users']
+    assert history.count() == 2
+
+
+def test_failing_op_does_not_stop_writer(history):
+    history.record('SELECT 1')
+    history.set_favorite([1])  # 无法绑定的参数，该操作失败
+    history.record('SELECT 2')
+    assert history.flush()
+    # 出错的操作被回滚，同批记录照常写入，写线程继续工作
+    assert history.count() == 2
+    history.record('SELECT 3')
+    assert history.flush()
+    assert history.count() == 3
+
+
+def test_failing_batch_is_dropped(history):
+    history.record('SELECT 1')
+    assert history.flush()
+    history.record('SELECT bad', rows=object())  # 无法绑定的值，整批写入失败
+    assert history.flush()
+    history.record('SELECT 2')
+    assert history.flush()
+    assert [e['sql'] for e in history.search()] == ['SELECT 2', 'SELECT 1']
+
+
+def test_favorite_and_delete(history):
+    history.record('SELECT 1')
+    history.record('SELECT 2')
+    assert history.flush()
+    first, second = sorted(e['id'] for e in history.search())
+    history.set_favorite(first)
+    history.delete(second)
+    assert history.flush()
+    assert [e['sql'] for e in history.search(favorites_only=True)] == ['SELECT 1']
+    assert history.count() == 1
+
+
+def test_flush_times_out(history):
+    # 其他连接持有写锁时，写线程等待锁释放
+    blocker = sqlite3.connect(history.path)
+    blocker.execute('BEGIN EXCLUSIVE')
+    try:
+        history.record('SELECT 1')
+        assert history.flush(timeout=0.05) is False
+    finally:
+        blocker.rollback()
+        blocker.close()
+    assert history.flush(timeout=5)
+    assert history.count() == 1
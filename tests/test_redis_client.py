@@ -0,0 +1,167 @@
+# RedisClient 测试，需要可连接的 Redis 服务器，连接不上时跳过
+# 连接参数取自环境变量 REDIS_HOST / REDIS_PORT / REDIS_PASSWORD / REDIS_DB（默认 15 号库）
+# 所有测试键带随机前缀，结束后只删除这些键
+import base64
+import io
+import json
+import os
+import uuid
+import pytest
+
+redis = pytest.importorskip('redis')
+
+from db.redis_client import RedisClient
+
+
+def make_client():
+    return RedisClient(os.environ.get('REDIS_HOST', 'localhost'), int(os.environ.get('REDIS_PORT', 6379)), None,
+                       os.environ.get('REDIS_PASSWORD'), os.environ.get('REDIS_DB', 15), connect_timeout=3)
+
+
+@pytest.fixture
+def client():
+    client = make_client()
+    try:
+        client.connect()
+    except redis.RedisError as e:
+        pytest.skip(f'Redis 不可用: {e}')
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def prefix(client):
+    prefix = f'dbtool_test:{uuid.uuid4().hex[:8]}:'
+    yield prefix
+    for key in client.conn.scan_iter(match=prefix + '*'):
+        client.conn.delete(key)
+
+
+def test_scan_keys_limit_and_resume(client, prefix):
+    expected = {f'{prefix}{i}'.encode() for i in range(300)}
+    client.conn.mset({key: b'x' for key in expected})
+    seen = []
+    cursor, keys = client.scan_keys(0, prefix + '*', count=50, limit=20)
+    # COUNT 只是提示，一次 SCAN 可能多返回一些，但收集到 limit 个后就停止并返回游标
+    assert len(keys) >= 20
+    assert cursor != 0
+    seen.extend(keys)
+    calls = 1
+    while cursor != 0:
+        cursor, keys = client.scan_keys(cursor, prefix + '*', count=50, limit=20)
+        seen.extend(keys)
+        calls += 1
+    assert calls > 1
+    # SCAN 可能重复返回同一个键，但不会遗漏
+    assert set(seen) == expected
+
+
+def test_scan_keys_max_calls(client, prefix):
+    client.conn.set(prefix + 'only', b'1')
+    cursor, keys = client.scan_keys(0, prefix + 'nomatch*', count=10, limit=500, max_calls=1)
+    assert keys == []
+    # 只调用一次 SCAN，键空间大于 COUNT 时尚未遍历完
+    if client.key_count() > 10:
+        assert cursor != 0
+
+
+def test_scan_keys_type_filter(client, prefix):
+    client.conn.set(prefix + 's', b'1')
+    client.conn.rpush(prefix + 'l', b'1')
+    keys = []
+    cursor = 0
+    while True:
+        cursor, batch = client.scan_keys(cursor, prefix + '*', key_type='list')
+        keys.extend(batch)
+        if cursor == 0:
+            break
+    assert keys == [(prefix + 'l').encode()]
+
+
+def test_key_info(client, prefix):
+    client.conn.set(prefix + 's', b'v', px=60000)
+    client.conn.hset(prefix + 'h', mapping={'f': 'v'})
+    info = client.key_info([prefix + 's', prefix + 'h', prefix + 'missing'])
+    assert [item['type'] for item in info] == ['string', 'hash', 'none']
+    assert 0 < info[0]['ttl_ms'] <= 60000
+    assert info[1]['ttl_ms'] == -1  # 未设置过期时间
+    assert info[0]['memory'] > 0
+    assert info[2]['memory'] is None
+
+
+def test_key_info_memory_error(client, prefix, monkeypatch):
+    # 模拟 MEMORY USAGE 被禁用：服务器对该命令返回错误，类型和 TTL 仍正常返回
+    def failing_memory_usage(self, key, samples=None):
+        return self.execute_command('MEMORY', 'NO-SUCH-SUBCOMMAND', key)
+
+    monkeypatch.setattr(redis.client.Pipeline, 'memory_usage', failing_memory_usage, raising=False)
+    client.conn.set(prefix + 's', b'v')
+    client.conn.rpush(prefix + 'l', b'a', b'b')
+    info = client.key_info([prefix + 's', prefix + 'l'])
+    assert [item['type'] for item in info] == ['string', 'list']
+    assert [item['ttl_ms'] for item in info] == [-1, -1]
+    assert [item['memory'] for item in info] == [None, None]
+
+
+def test_delete_matching(client, prefix, monkeypatch):
+    monkeypatch.setattr('db.redis_client.PIPELINE_BATCH', 7)
+    client.conn.mset({f'{prefix}del:{i}': b'x' for i in range(50)})
+    client.conn.set(prefix + 'keep', b'x')
+    progress = []
+    deleted = client.delete_matching(prefix + 'del:*', progress_callback=progress.append)
+    assert deleted == 50
+    assert progress and progress[-1] == 50
+    assert list(client.conn.scan_iter(match=prefix + 'del:*')) == []
+    assert client.conn.exists(prefix + 'keep') == 1
+
+
+def test_delete_matching_cancelled(client, prefix):
+    client.conn.set(prefix + 'a', b'x')
+
+    class Cancelled:
+        def is_set(self):
+            return True
+
+    with pytest.raises(RuntimeError):
+        client.delete_matching(prefix + '*', cancel_event=Cancelled())
+    assert client.conn.exists(prefix + 'a') == 1
+
+
+def test_export_matching(client, prefix):
+    binary = bytes(range(256))
+    client.conn.set(prefix + 'str', '文本'.encode('utf-8'), px=60000)
+    client.conn.set(prefix + 'bin', binary)
+    client.conn.hset(prefix + 'hash', mapping={'f': 'v', 'b': b'\xff\xfe'})
+    client.conn.rpush(prefix + 'list', b'a', b'\x80')
+    client.conn.sadd(prefix + 'set', b'm')
+    client.conn.zadd(prefix + 'zset', {b'z': 1.5})
+    client.conn.xadd(prefix + 'stream', {'k': b'v'}, id='1-0')
+    client.conn.set((prefix + 'key-').encode() + b'\xff', b'v')
+    buf = io.BytesIO()
+    assert client.export_matching(buf, prefix + '*') == 8
+    lines = buf.getvalue().decode('utf-8').splitlines()
+    records = [json.loads(line) for line in lines]
+    assert all(set(r) == {'key', 'type', 'ttl_ms', 'value'} for r in records)
+    by_key = {r['key'] if isinstance(r['key'], str) else 'binary-key': r for r in records}
+
+    assert by_key[prefix + 'str']['type'] == 'string'
+    assert by_key[prefix + 'str']['value'] == '文本'
+    assert 0 < by_key[prefix + 'str']['ttl_ms'] <= 60000
+    # 不是合法 UTF-8 的值保存为 {"base64": ...}
+    assert base64.b64decode(by_key[prefix + 'bin']['value']['base64']) == binary
+    assert by_key[prefix + 'bin']['ttl_ms'] is None
+    assert by_key[prefix + 'hash']['value'] == {'f': 'v', 'b': {'base64': base64.b64encode(b'\xff\xfe').decode()}}
+    assert by_key[prefix + 'list']['value'] == ['a', {'base64': base64.b64encode(b'\x80').decode()}]
+    assert by_key[prefix + 'set']['value'] == ['m']
+    assert by_key[prefix + 'zset']['value'] == [['z', 1.5]]
+    assert by_key[prefix + 'stream']['value'] == [['1-0', {'k': 'v'}]]
+    key = by_key['binary-key']['key']
+    assert base64.b64decode(key['base64']) == (prefix + 'key-').encode() + b'\xff'
+
+
+def test_export_matching_type_filter(client, prefix):
+    client.conn.set(prefix + 's', b'1')
+    client.conn.sadd(prefix + 'set', b'1')
+    buf = io.BytesIO()
+    assert client.export_matching(buf, prefix + '*', key_type='set') == 1
+    assert json.loads(buf.getvalue())['key'] == prefix + 'set'
@@ -0,0 +1,48 @@
+from db.restore import split_mysql_ddl
+
+ORDERS_DDL = '''CREATE TABLE `orders` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `user_id` int NOT NULL,
+  `code` varchar(32) NOT NULL,
+  `note` text,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_code` (`code`),
+  KEY `idx_user` (`user_id`),
+  FULLTEXT KEY `ft_note` (`note`),
+  CONSTRAINT `fk_user` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE,
+  CONSTRAINT `chk_code` CHECK ((`code` <> _utf8mb4''))
+) ENGINE=InnoDB AUTO_INCREMENT=10 DEFAULT CHARSET=utf8mb4'''
+
+
+def test_secondary_indexes_and_foreign_keys_are_split_out():
+    create, index_sql, fk_sql = split_mysql_ddl('orders', ORDERS_DDL)
+    assert create == '''CREATE TABLE `orders` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `user_id` int NOT NULL,
+  `code` varchar(32) NOT NULL,
+  `note` text,
+  PRIMARY KEY (`id`),
+  CONSTRAINT `chk_code` CHECK ((`code` <> _utf8mb4''))
+) ENGINE=InnoDB AUTO_INCREMENT=10 DEFAULT CHARSET=utf8mb4'''
+    assert index_sql == ('ALTER TABLE `orders` ADD UNIQUE KEY `uk_code` (`code`), ADD KEY `idx_user` (`user_id`), '
+                         'ADD FULLTEXT KEY `ft_note` (`note`)')
+    assert fk_sql == ('ALTER TABLE `orders` ADD CONSTRAINT `fk_user` FOREIGN KEY (`user_id`) '
+                      'REFERENCES `users` (`id`) ON DELETE CASCADE')
+
+
+def test_table_without_secondary_indexes_is_unchanged():
+    ddl = 'CREATE TABLE `t` (\n  `id` int NOT NULL,\n  PRIMARY KEY (`id`)\n) ENGINE=InnoDB'
+    assert split_mysql_ddl('t', ddl) == (ddl, None, None)
+
+
+def test_partition_clause_after_engine_is_kept():
+    ddl = ('CREATE TABLE `logs` (\n  `id` int NOT NULL,\n  `at` date NOT NULL,\n  PRIMARY KEY (`id`,`at`),\n'
+           '  KEY `idx_at` (`at`)\n) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4\n'
+           '/*!50100 PARTITION BY RANGE (year(`at`))\n(PARTITION p2023 VALUES LESS THAN (2024) ENGINE = InnoDB,\n'
+           ' PARTITION pmax VALUES LESS THAN MAXVALUE ENGINE = InnoDB) */')
+    create, index_sql, fk_sql = split_mysql_ddl('logs', ddl)
+    assert create.endswith(ddl[ddl.index(') ENGINE=InnoDB'):])
+    assert '`idx_at`' not in create
+    assert create.count('PRIMARY KEY') == 1
+    assert index_sql == 'ALTER TABLE `logs` ADD KEY `idx_at` (`at`)'
+    assert fk_sql is None
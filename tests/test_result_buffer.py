@@ -0,0 +1,40 @@
+import datetime
+
+from db.result_buffer import ColumnarResult
+
+UTC8 = datetime.timezone(datetime.timedelta(hours=8))
+
+
+def test_naive_datetime_column_stays_numeric():
+    result = ColumnarResult(['t'])
+    result.append_rows([(datetime.datetime(2024, 1, 1, 10, 30),), (None,)])
+    assert result.column_kind(0) == 'datetime'
+    values, nulls = result.column_array(0)
+    assert values.dtype.kind == 'M'
+    assert list(nulls) == [False, True]
+    assert result.value(0, 0) == datetime.datetime(2024, 1, 1, 10, 30)
+    assert result.value(1, 0) is None
+
+
+def test_datetime_column_is_stored_as_int64():
+    # 按 datetime64 存储每行 8 字节，而不是逐行保存字符串
+    result = ColumnarResult(['t'])
+    start = datetime.datetime(2024, 1, 1)
+    result.append_rows([(start + datetime.timedelta(seconds=i),) for i in range(10000)])
+    assert result.nbytes < 10000 * 10
+    assert list(result.rows(9998)) == [(start + datetime.timedelta(seconds=9998),),
+                                       (start + datetime.timedelta(seconds=9999),)]
+
+
+def test_tz_aware_datetime_keeps_offset():
+    result = ColumnarResult(['t'])
+    result.append_rows([(datetime.datetime(2024, 1, 1, 10, 30, tzinfo=UTC8),)])
+    assert result.column_kind(0) == 'str'
+    assert result.value(0, 0) == '2024-01-01 10:30:00+08:00'
+
+
+def test_tz_aware_batch_converts_naive_column():
+    result = ColumnarResult(['t'])
+    result.append_rows([(datetime.datetime(2024, 1, 1),)])
+    result.append_rows([(datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc),)])
+    assert [result.value(i, 0) for i in range(2)] == ['2024-01-01 00:00:00', '2024-01-02 00:00:00+00:00']
@@ -0,0 +1,20 @@
+from db.result_buffer import ColumnarResult
+from db.result_view import ResultView
+
+
+def test_desc_sort_keeps_equal_keys_in_original_order():
+    result = ColumnarResult.from_rows(['id', 'g', 'name'], [
+        (0, 1, 'b'), (1, 2, 'a'), (2, 1, 'a'), (3, None, None), (4, 2, 'b'), (5, 1, 'a'),
+    ])
+    view = ResultView(result)
+    assert list(view.apply(order_by=(1, 'DESC'))) == [1, 4, 0, 2, 5, 3]
+    assert list(view.apply(order_by=(1, 'ASC'))) == [0, 2, 5, 1, 4, 3]
+    assert list(view.apply(order_by=(2, 'DESC'))) == [0, 4, 1, 2, 5, 3]
+
+
+def test_like_matches_decoded_bytes():
+    result = ColumnarResult.from_rows(['data'], [(b'abc',), (b'xyz',), (None,)])
+    view = ResultView(result)
+    assert list(view.apply(filters=[(0, 'LIKE', 'ab%')])) == [0]
+    assert list(view.apply(filters=[(0, 'LIKE', "b'%")])) == []
+    assert list(view.apply(filters=[(0, 'NOT LIKE', 'ab%')])) == [1]
@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+from db.table_diff import compare_tables, generate_sync_script
+
+ROWS = 500
+
+
+def make_db(path, rows):
+    c = sqlite3.connect(path)
+    c.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT, amount REAL)')
+    c.executemany('INSERT INTO t VALUES (?, ?, ?)', rows)
+    c.commit()
+    c.close()
+    return {'type': 'SQLite', 'db_path': str(path)}
+
+
+@pytest.fixture
+def pair(tmp_path):
+    rows = [(i, f'name {i}', i * 1.5) for i in range(1, ROWS + 1)]
+    src = make_db(tmp_path / 'src.db', rows)
+    target = [r for r in rows if r[0] not in (10, 250)]  # 只在源表中
+    target = [(i, 'changed', a) if i in (30, 420) else (i, n, a) for i, n, a in target]
+    target += [(ROWS + 5, 'extra', 0.0), (ROWS + 40, 'extra', 1.0)]  # 只在目标表中
+    dst = make_db(tmp_path / 'dst.db', target)
+    return src, dst
+
+
+def test_compare_tables_finds_all_differences(pair):
+    src, dst = pair
+    diff = compare_tables(src, 't', dst, chunks=2, leaf_rows=10, workers=2)
+    assert diff['pk'] == 'id'
+    assert [r[0] for r in diff['only_in_source']] == [10, 250]
+    assert [r[0] for r in diff['only_in_target']] == [ROWS + 5, ROWS + 40]
+    assert [(s[0], s[1], d[1]) for s, d in diff['changed']] == [(30, 'name 30', 'changed'), (420, 'name 420', 'changed')]
+    # 不一致的块被细分后才逐行对比
+    assert diff['chunks_checked'] > 2
+
+
+def test_identical_tables_have_no_differences(tmp_path):
+    rows = [(i, f'name {i}', i * 1.5) for i in range(1, 101)]
+    src = make_db(tmp_path / 'a.db', rows)
+    dst = make_db(tmp_path / 'b.db', rows)
+    diff = compare_tables(src, 't', dst, chunks=4, leaf_rows=10)
+    assert diff['only_in_source'] == diff['only_in_target'] == diff['changed'] == []
+    assert diff['chunks_mismatched'] == 0
+
+
+def test_sync_script_makes_target_match_source(pair):
+    src, dst = pair
+    diff = compare_tables(src, 't', dst, chunks=2, leaf_rows=10, workers=2)
+    script = generate_sync_script(diff, 't', 'sqlite')
+    assert script.count('DELETE FROM') == 2
+    assert script.count('UPDATE') == 2
+    assert script.count('INSERT INTO') == 2
+    c = sqlite3.connect(dst['db_path'])
+    c.executescript(script)
+    c.close()
+    again = compare_tables(src, 't', dst, chunks=2, leaf_rows=10, workers=2)
+    assert again['only_in_source'] == again['only_in_target'] == again['changed'] == []
+
+
+def test_empty_diff_gives_empty_script():
+    diff = {'pk': 'id', 'columns': ['id', 'name'], 'only_in_source': [], 'only_in_target': [], 'changed': []}
+    assert generate_sync_script(diff, 't', 'mysql') == ''
@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+from db.transfer import build_create_table, map_column_type
+
+
+@pytest.mark.parametrize('col_type, expected', [
+    ('int(11)', 'INTEGER'), ('bigint unsigned', 'INTEGER'), ('tinyint(1)', 'INTEGER'),
+    ('decimal(10,2)', 'NUMERIC'), ('double', 'REAL'), ('float', 'REAL'),
+    ('varchar(64)', 'TEXT'), ('datetime', 'TEXT'), ('json', 'TEXT'),
+    ('longblob', 'BLOB'), ('varbinary(16)', 'BLOB'),
+])
+def test_mysql_to_sqlite(col_type, expected):
+    assert map_column_type(col_type, 'mysql', 'sqlite') == expected
+
+
+@pytest.mark.parametrize('col_type, pk, expected', [
+    ('INTEGER', False, 'BIGINT'), ('VARCHAR(40)', False, 'VARCHAR(40)'), ('TEXT', False, 'LONGTEXT'),
+    ('TEXT', True, 'VARCHAR(255)'), ('BLOB', False, 'LONGBLOB'), ('', True, 'VARBINARY(255)'),
+    ('REAL', False, 'DOUBLE'), ('DECIMAL(12,4)', False, 'DECIMAL(12,4)'), ('NUMERIC', False, 'DECIMAL(38,10)'),
+    ('DATETIME', False, 'DATETIME'), ('boolean', False, 'BOOLEAN'),
+])
+def test_sqlite_to_mysql(col_type, pk, expected):
+    assert map_column_type(col_type, 'sqlite', 'mysql', pk=pk) == expected
+
+
+def test_same_dialect_keeps_type():
+    assert map_column_type('enum(\'a\',\'b\')', 'mysql', 'mysql') == "enum('a','b')"
+
+
+COLUMNS = [
+    {'name': 'id', 'type': 'int(11)', 'nullable': False, 'pk': True},
+    {'name': 'name', 'type': 'varchar(64)', 'nullable': True, 'pk': False},
+    {'name': 'data', 'type': 'blob', 'nullable': False, 'pk': False},
+]
+
+
+def test_build_create_table_for_sqlite():
+    sql = build_create_table('user data', COLUMNS, 'mysql', 'sqlite')
+    assert sql == ('CREATE TABLE IF NOT EXISTS "user data" (\n  "id" INTEGER NOT NULL,\n  "name" TEXT,\n'
+                   '  "data" BLOB NOT NULL,\n  PRIMARY KEY ("id")\n)')
+    c = sqlite3.connect(':memory:')
+    c.execute(sql)
+    assert [(r[1], r[2], r[3], r[5]) for r in c.execute('PRAGMA table_info("user data")')] == [
+        ('id', 'INTEGER', 1, 1), ('name', 'TEXT', 0, 0), ('data', 'BLOB', 1, 0)]
+
+
+def test_build_create_table_for_mysql_with_composite_key():
+    columns = [
+        {'name': 'tenant', 'type': 'TEXT', 'nullable': False, 'pk': True},
+        {'name': 'id', 'type': 'INTEGER', 'nullable': False, 'pk': True},
+        {'name': 'note', 'type': 'TEXT', 'nullable': True, 'pk': False},
+    ]
+    assert build_create_table('t', columns, 'sqlite', 'mysql') == (
+        'CREATE TABLE IF NOT EXISTS `t` (\n  `tenant` VARCHAR(255) NOT NULL,\n  `id` BIGINT NOT NULL,\n'
+        '  `note` LONGTEXT,\n  PRIMARY KEY (`tenant`, `id`)\n)')